@@ -9,6 +9,11 @@ warnings.filterwarnings('ignore')
 # Neo4j
 from neo4j import GraphDatabase
 
+# 인덱스/제약조건 준비 (sense-backend와 같은 정의 사용)
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "sense-backend"))
+from services.graph_schema import ensure_graph_schema
+
 # Chroma
 import chromadb
 from chromadb.config import Settings
@@ -319,6 +324,10 @@ def load_neo4j_data(nodes_csv: str, relationships_csv: str, session):
         
         print(f"  ✓ {node_type} 노드 적재 완료")
     
+    # 관계 적재의 id 조회가 라벨 전체 스캔이 되지 않도록 인덱스 먼저 생성
+    schema_report = ensure_graph_schema(session)
+    print(f"\n✓ 인덱스/제약조건 준비 완료: {schema_report}")
+    
     # 관계 CSV 읽기 및 배치 적재
     relationships_df = pd.read_csv(relationships_csv, encoding='utf-8-sig')
     print(f"\n관계 CSV 로드: {len(relationships_df)}개")
@@ -394,6 +403,10 @@ with get_neo4j_session() as session:
     else:
         print(f"\n✓ Neo4j 데이터가 정상적으로 적재되어 있습니다.")
         
+        # 인덱스/제약조건은 여러 번 실행해도 안전하므로 기존 데이터에도 적용
+        schema_report = ensure_graph_schema(session)
+        print(f"✓ 인덱스/제약조건 확인 완료: {schema_report}")
+        
         # 노드 타입별 통계
         print("\n노드 타입별 통계:")
         for label in session.run("CALL db.labels()").values():
@@ -1,9 +1,16 @@
 """AdvisorAgent - 관찰 및 추론 결과 생성 (노트북 기반)"""
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import logging
 import asyncio
 from google import genai
-from config import GOOGLE_API_KEY, GEMINI_MODEL
+from config import (
+    GOOGLE_API_KEY, GEMINI_MODEL, ADVISOR_GRAPH_MAX_CHARS, ADVISOR_VECTOR_MAX_CHARS,
+    NEARBY_RADIUS_KM, NEARBY_TOP_K
+)
+from services.metrics import track_stage, record_gemini_error, record_gemini_usage
+from services.tracing import start_span
+from services.local_answer import LocalAnswerEngine, detect_hazard
+from services.shelter_ranking import places_reference, distance_label
 from models import (
     AdvisoryResult,
     PlanningResult, AnalysisResult
@@ -15,8 +22,13 @@ logger = logging.getLogger(__name__)
 class AdvisorAgent:
     """관찰 및 추론 결과 생성 에이전트"""
     
-    def __init__(self):
+    def __init__(self, local_answer: Optional[LocalAnswerEngine] = None):
         self.client = genai.Client(api_key=GOOGLE_API_KEY)
+        # LLM 오류 시 사용할 로컬 답변 엔진
+        self.local_answer = local_answer or LocalAnswerEngine()
+        # 프롬프트에 넣을 검색 결과 길이 상한
+        self.graph_max_chars = ADVISOR_GRAPH_MAX_CHARS
+        self.vector_max_chars = ADVISOR_VECTOR_MAX_CHARS
     
     async def infer(
         self,
@@ -31,8 +43,8 @@ class AdvisorAgent:
         logger.info(f"[AdvisorAgent] 관찰 및 추론 시작: {input_text[:100]}...")
         
         # 노트북의 format_graph_results, format_vector_results 구조 사용
-        graph_text = self._format_graph_results(analysis.graph_results, max_length=2000)
-        vector_text = self._format_vector_results(analysis.vector_results, max_length=3000)
+        graph_text = self._format_graph_results(analysis.graph_results, max_length=self.graph_max_chars)
+        vector_text = self._format_vector_results(analysis.vector_results, max_length=self.vector_max_chars)
         
         # 위치 정보 추가
         location_context = ""
@@ -82,11 +94,17 @@ JSON만 응답하고 설명은 제외하세요.
         
         try:
             # Gemini API는 동기식이므로 비동기로 실행
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
-                model=GEMINI_MODEL,
-                contents=prompt.strip()
-            )
+            try:
+                with start_span("gemini.generate", stage="llm_advisor"), track_stage("llm_advisor"):
+                    response = await asyncio.to_thread(
+                        self.client.models.generate_content,
+                        model=GEMINI_MODEL,
+                        contents=prompt.strip()
+                    )
+            except Exception as e:
+                record_gemini_error("llm_advisor", e)
+                raise
+            record_gemini_usage("llm_advisor", response)
             
             from utils import extract_text_from_response, parse_json_from_text
             
@@ -119,41 +137,92 @@ JSON만 응답하고 설명은 제외하세요.
                 evidence = str(evidence)
             
             # evidence에 대피소 정보 추가 (위치 정보가 있을 때)
-            if location_info:
-                nearby_shelters = self._find_nearby_shelters(
-                    analysis.graph_results,
-                    location_info["lat"],
-                    location_info["lon"],
-                    location_info.get("radius_km", 5.0)
-                )
-                if nearby_shelters:
-                    shelter_info = "\n주변 안전 거점 (반경 내 대피소):\n"
-                    for i, shelter in enumerate(nearby_shelters[:5], 1):
-                        name = shelter.get('name', '대피소')
-                        address = shelter.get('address', '')
-                        distance = shelter.get('distance_km', '')
-                        shelter_type = shelter.get('shelter_type', '대피소')
-                        shelter_info += f"{i}. {name} ({shelter_type})"
-                        if address:
-                            shelter_info += f" - {address}"
-                        if distance:
-                            shelter_info += f" [거리: {distance}km]"
-                        shelter_info += "\n"
-                    evidence = evidence + "\n\n" + shelter_info if evidence else shelter_info
+            # 위험 구역 확인/도보 거리 계산(재로드 포함)은 이벤트 루프 밖에서 실행
+            location_evidence, places = await asyncio.to_thread(
+                self.build_location_evidence,
+                analysis.graph_results.get("nearby"), location_info, detect_hazard(input_text)
+            )
+            if location_evidence:
+                evidence = evidence + "\n\n" + location_evidence if evidence else location_evidence
             
             logger.info(f"[AdvisorAgent] 관찰 및 추론 완료")
             return AdvisoryResult(
                 conclusion=conclusion,
-                evidence=evidence
+                evidence=evidence,
+                places_reference=places,
+                location_evidence=location_evidence
             )
         except Exception as e:
-            # Fallback 추론 결과 (오류 발생)
-            logger.error(f"[AdvisorAgent] 추론 오류: {str(e)}")
+            # LLM 오류 시 로컬 데이터(대피소/정책/행동요령 문서)로 답변 생성
+            logger.error(f"[AdvisorAgent] 추론 오류: {str(e)}, 로컬 답변으로 대체")
+            local = await asyncio.to_thread(
+                self.local_answer.answer, input_text, location_info, "advisor_error"
+            )
             return AdvisoryResult(
-                conclusion=f"관찰 및 추론 과정에서 오류가 발생했습니다: {str(e)}. 아직 관찰할 정보가 확인되지 않았습니다.",
-                evidence=""
+                conclusion=local["conclusion"],
+                evidence=local["evidence"],
+                places_reference=local["places_reference"],
+                fallback_reason=f"advisor_error: {str(e)[:200]}"
             )
     
+    def build_location_evidence(
+        self,
+        nearby: Optional[Dict],
+        location_info: Optional[Dict],
+        hazard: Optional[str] = None
+    ) -> Tuple[Optional[str], Optional[Dict[str, Dict[str, Any]]]]:
+        """사용자 위치 기준 주변 대피소 evidence와 places_reference 생성
+
+        nearby는 NEARBY_SOURCE=neo4j일 때 RAG 서비스의 위치 쿼리 결과(DB에서 거리순 정렬된 상위 k개)이며,
+        없거나 조회에 실패했으면 최근접 대피소 사전 계산 격자에서 찾습니다.
+        후보는 층수/이동 능력/재난 유형/면적 점수(services/shelter_ranking.py) 순으로 정렬하며,
+        사용자 위치 주변 위험 구역 요약과 재난 관련 위험 구역 영향권 대피소 표시를 함께 넣습니다.
+        """
+        if not location_info or location_info.get("lat") is None or location_info.get("lon") is None:
+            return None, None
+        
+        try:
+            zone_text = self.local_answer.zone_report(float(location_info["lat"]), float(location_info["lon"]))
+        except Exception as e:
+            logger.warning(f"[AdvisorAgent] 주변 위험 구역 확인 오류: {e}")
+            zone_text = None
+        radius_km = location_info.get("radius_km", NEARBY_RADIUS_KM)
+        floor, mobility = location_info.get("floor"), location_info.get("mobility")
+        if nearby is not None and not nearby.get("error"):
+            nearby_shelters = self.local_answer.rank_candidates(
+                float(location_info["lat"]), float(location_info["lon"]), nearby.get("results", []),
+                NEARBY_TOP_K, hazard, floor, mobility
+            )
+            source = "Graph RAG"
+        else:
+            try:
+                nearby_shelters = self.local_answer.ranked_shelters(
+                    float(location_info["lat"]), float(location_info["lon"]), NEARBY_TOP_K,
+                    hazard, floor, mobility, radius_km
+                )
+            except Exception as e:
+                logger.warning(f"[AdvisorAgent] 격자 주변 대피소 검색 오류: {e}")
+                return zone_text, None
+            source = "Local"
+        if not nearby_shelters:
+            return zone_text, None
+        
+        shelter_info = "\n주변 안전 거점 (반경 내 대피소, 층수/재난 유형 반영 순위):\n"
+        for i, shelter in enumerate(nearby_shelters[:5], 1):
+            name = shelter.get('name', '대피소')
+            address = shelter.get('address', '')
+            distance = shelter.get('distance_km', '')
+            shelter_type = shelter.get('shelter_type', '대피소')
+            shelter_info += f"{i}. {name} ({shelter_type})"
+            if address:
+                shelter_info += f" - {address}"
+            if distance != '':
+                shelter_info += f" [{distance_label(shelter)}]"
+            shelter_info += "\n"
+        if zone_text:
+            shelter_info += zone_text + "\n"
+        return shelter_info, places_reference(nearby_shelters[:5], source)
+    
     def _format_graph_results(self, graph_results: Dict, max_length: int = 2000) -> str:
         """Graph RAG 결과 포맷팅 (노트북 구조)"""
         if graph_results.get("error"):
@@ -330,86 +399,3 @@ JSON만 응답하고 설명은 제외하세요.
         except Exception as e:
             logger.warning(f"[AdvisorAgent] 장소 레퍼런스 추출 오류: {e}")
             return None
-    
-    def _find_nearby_shelters(self, graph_results: Dict, lat: float, lon: float, radius_km: float) -> List[Dict[str, Any]]:
-        """반경 내 대피소 찾기 (Graph RAG 결과 활용)"""
-        shelters = []
-        
-        try:
-            results = graph_results.get("results", [])
-            if not results:
-                return shelters
-            
-            # Haversine 거리 계산 함수
-            from math import radians, sin, cos, sqrt, atan2
-            
-            def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-                """두 지점 간 거리 계산 (km)"""
-                R = 6371  # 지구 반경 (km)
-                lat1_rad = radians(lat1)
-                lat2_rad = radians(lat2)
-                delta_lat = radians(lat2 - lat1)
-                delta_lon = radians(lon2 - lon1)
-                a = sin(delta_lat/2)**2 + cos(lat1_rad) * cos(lat2_rad) * sin(delta_lon/2)**2
-                c = 2 * atan2(sqrt(a), sqrt(1-a))
-                return R * c
-            
-            for record in results:
-                shelter_info = {}
-                shelter_lat = None
-                shelter_lon = None
-                
-                for key, value in record.items():
-                    # Neo4j Node 객체인 경우
-                    if hasattr(value, 'properties'):
-                        props = value.properties
-                        if isinstance(props, dict):
-                            if 'lat' in props and 'lon' in props:
-                                shelter_lat = float(props['lat'])
-                                shelter_lon = float(props['lon'])
-                                shelter_info['name'] = props.get('name', '')
-                                shelter_info['address'] = props.get('address', '')
-                                shelter_info['shelter_type'] = props.get('shelter_type', '')
-                    # 딕셔너리인 경우
-                    elif isinstance(value, dict):
-                        if 'lat' in value and 'lon' in value:
-                            shelter_lat = float(value['lat'])
-                            shelter_lon = float(value['lon'])
-                            shelter_info['name'] = value.get('name', '')
-                            shelter_info['address'] = value.get('address', '')
-                            shelter_info['shelter_type'] = value.get('shelter_type', '')
-                    # 직접 속성인 경우
-                    elif key == 'lat' or key == 's.lat' or key.endswith('.lat'):
-                        try:
-                            shelter_lat = float(value)
-                        except:
-                            pass
-                    elif key == 'lon' or key == 's.lon' or key.endswith('.lon'):
-                        try:
-                            shelter_lon = float(value)
-                        except:
-                            pass
-                    elif key == 'name' or key == 's.name' or key.endswith('.name'):
-                        shelter_info['name'] = str(value)
-                    elif key == 'address' or key == 's.address' or key.endswith('.address'):
-                        shelter_info['address'] = str(value)
-                    elif key == 'shelter_type' or key == 's.shelter_type' or key.endswith('.shelter_type'):
-                        shelter_info['shelter_type'] = str(value)
-                
-                # 거리 계산 및 필터링
-                if shelter_lat is not None and shelter_lon is not None:
-                    distance = haversine_distance(lat, lon, shelter_lat, shelter_lon)
-                    if distance <= radius_km:
-                        shelter_info['distance_km'] = round(distance, 2)
-                        shelters.append(shelter_info)
-            
-            # 거리순 정렬
-            shelters.sort(key=lambda x: x.get('distance_km', float('inf')))
-            
-            # 최대 10개만 반환
-            return shelters[:10]
-            
-        except Exception as e:
-            logger.warning(f"[AdvisorAgent] 대피소 검색 오류: {e}")
-            return shelters
-
@@ -3,8 +3,10 @@ from typing import Dict, Any, Optional
 import logging
 import asyncio
 from google import genai
-from config import GOOGLE_API_KEY, GEMINI_MODEL
+from config import GOOGLE_API_KEY, GEMINI_MODEL, NEARBY_RADIUS_KM, NEARBY_SOURCE
 from services.rag_service import HybridRAGService
+from services.metrics import track_stage, record_gemini_error, record_gemini_usage
+from services.tracing import start_span
 from models import AnalysisResult, PlanningResult
 
 logger = logging.getLogger(__name__)
@@ -30,46 +32,70 @@ class AnalystAgent:
         if planning and planning.search_plan:
             sub_problems = planning.search_plan.get("sub_problems", [])
         
-        # 서브 문제가 있으면 노트북 방식으로 각 서브 문제별 검색
-        if sub_problems:
-            logger.info(f"[AnalystAgent] 서브 문제 {len(sub_problems)}개 검색 시작")
-            
-            with self.rag_service.get_neo4j_session() as session:
-                # 스키마 가져오기
-                schema = await asyncio.to_thread(
-                    self.rag_service.get_neo4j_schema, session
-                )
-                if not self.rag_service._schema_cache:
-                    self.rag_service._schema_cache = schema
+        # NEARBY_SOURCE=neo4j이고 좌표가 있으면 주변 시설을 전용 위치 쿼리로 검색과 동시에 조회
+        # (기본값 grid는 AdvisorAgent가 사전 계산 격자에서 바로 찾음)
+        nearby_task = None
+        if NEARBY_SOURCE == "neo4j" and user_info and user_info.get("lat") is not None and user_info.get("lon") is not None:
+            nearby_task = asyncio.create_task(asyncio.to_thread(
+                self.rag_service.nearby_facilities,
+                float(user_info["lat"]), float(user_info["lon"]), NEARBY_RADIUS_KM
+            ))
+        
+        try:
+            # 서브 문제가 있으면 노트북 방식으로 각 서브 문제별 검색
+            if sub_problems:
+                logger.info(f"[AnalystAgent] 서브 문제 {len(sub_problems)}개 검색 시작")
                 
-                # 서브 문제별 검색 실행 (노트북 방식)
-                search_results = await self.rag_service.search_sub_problems(
-                    sub_problems, schema, session, use_cache=True
-                )
+                # LLM 생성 Cypher를 실행하므로 읽기 전용 세션 사용 (쓰기는 서버가 거부)
+                with self.rag_service.get_neo4j_session(read_only=True) as session:
+                    # 스키마 가져오기 (캐시 사용)
+                    schema = await self.rag_service.get_schema(session, use_cache=True)
+                    
+                    # 서브 문제별 검색 실행 (노트북 방식)
+                    search_results = await self.rag_service.search_sub_problems(
+                        sub_problems, schema, session, use_cache=True
+                    )
+                    
+                    graph_results = search_results["graph_results"]
+                    vector_results = search_results["vector_results"]
+                    
+                    # 통합 결과에서 count 추출
+                    graph_count = graph_results.get("count", 0)
+                    vector_count = vector_results.get("count", 0)
+                    logger.info(f"[AnalystAgent] 서브 문제별 검색 완료: Graph RAG {graph_count}개, Vector RAG {vector_count}개")
+            else:
+                # 서브 문제가 없으면 기본 방식으로 검색
+                logger.info("[AnalystAgent] 서브 문제 없음, 기본 검색 수행")
+                search_results = await self.rag_service.search(input_text, use_cache=True)
                 
                 graph_results = search_results["graph_results"]
                 vector_results = search_results["vector_results"]
                 
-                # 통합 결과에서 count 추출
                 graph_count = graph_results.get("count", 0)
                 vector_count = vector_results.get("count", 0)
-                logger.info(f"[AnalystAgent] 서브 문제별 검색 완료: Graph RAG {graph_count}개, Vector RAG {vector_count}개")
-        else:
-            # 서브 문제가 없으면 기본 방식으로 검색
-            logger.info("[AnalystAgent] 서브 문제 없음, 기본 검색 수행")
-            search_results = await self.rag_service.search(input_text, use_cache=True)
-            
-            graph_results = search_results["graph_results"]
-            vector_results = search_results["vector_results"]
+                logger.info(f"[AnalystAgent] 검색 결과: Graph RAG {graph_count}개, Vector RAG {vector_count}개")
             
-            graph_count = graph_results.get("count", 0)
-            vector_count = vector_results.get("count", 0)
-            logger.info(f"[AnalystAgent] 검색 결과: Graph RAG {graph_count}개, Vector RAG {vector_count}개")
+            if nearby_task is not None:
+                graph_results["nearby"] = await nearby_task
+                logger.info(f"[AnalystAgent] 주변 시설 {graph_results['nearby']['count']}개")
+        finally:
+            # 검색 중 예외/취소로 주변 시설 조회 결과를 기다리지 않게 되면 Task를 정리
+            if nearby_task is not None and not nearby_task.done():
+                nearby_task.cancel()
         
         # LLM을 사용하여 검색 결과 분석 및 요약
         graph_summary = self._format_graph_results(graph_results)
         vector_summary = self._format_vector_results(vector_results)
         
+        # f-string 표현식 안에 백슬래시를 쓸 수 없으므로 (Python 3.11) 미리 구성
+        location_context = ""
+        if user_info:
+            location_context = (
+                '사용자 위치 정보:\n- 위도: ' + str(user_info.get('lat', 'N/A'))
+                + '\n- 경도: ' + str(user_info.get('lon', 'N/A'))
+                + '\n- 층수: ' + str(user_info.get('floor', 'N/A')) + '\n'
+            )
+        
         prompt = f"""
 당신은 재난대응 정보 분석 전문가입니다.
 Graph RAG와 Vector RAG 검색 결과를 분석하여, 사용자 질문에 대한 핵심 정보를 추출하세요.
@@ -77,7 +103,7 @@ Graph RAG와 Vector RAG 검색 결과를 분석하여, 사용자 질문에 대
 사용자 입력:
 {input_text}
 
-{('사용자 위치 정보:\n- 위도: ' + str(user_info.get('lat', 'N/A')) + '\n- 경도: ' + str(user_info.get('lon', 'N/A')) + '\n- 층수: ' + str(user_info.get('floor', 'N/A')) + '\n') if user_info else ''}
+{location_context}
 
 PlanningAgent 계획:
 {planning.search_plan if planning else 'N/A'}
@@ -102,11 +128,17 @@ JSON만 응답하고 설명은 제외하세요.
         
         try:
             # Gemini API는 동기식이므로 비동기로 실행
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
-                model=GEMINI_MODEL,
-                contents=prompt.strip()
-            )
+            try:
+                with start_span("gemini.generate", stage="llm_analysis"), track_stage("llm_analysis"):
+                    response = await asyncio.to_thread(
+                        self.client.models.generate_content,
+                        model=GEMINI_MODEL,
+                        contents=prompt.strip()
+                    )
+            except Exception as e:
+                record_gemini_error("llm_analysis", e)
+                raise
+            record_gemini_usage("llm_analysis", response)
             
             from utils import extract_text_from_response, parse_json_from_text
             
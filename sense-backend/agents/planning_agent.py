@@ -4,6 +4,8 @@ import logging
 import asyncio
 from google import genai
 from config import GOOGLE_API_KEY, GEMINI_MODEL
+from services.metrics import track_stage, record_gemini_error, record_gemini_usage
+from services.tracing import start_span
 from models import PlanningResult
 
 logger = logging.getLogger(__name__)
@@ -15,8 +17,12 @@ class PlanningAgent:
     def __init__(self):
         self.client = genai.Client(api_key=GOOGLE_API_KEY)
     
-    async def plan(self, input_text: str, user_info: Optional[dict] = None) -> PlanningResult:
-        """검색 계획 수립 (질문을 서브 문제로 분해하고 구체적인 검색 전략 수립)"""
+    async def plan(self, input_text: str, user_info: Optional[dict] = None, conversation_context: str = "") -> PlanningResult:
+        """검색 계획 수립 (질문을 서브 문제로 분해하고 구체적인 검색 전략 수립)
+        
+        Args:
+            conversation_context: 압축된 이전 대화 맥락 (누적 요약 + 최근 턴, 멀티턴 대화에서 사용)
+        """
         
         logger.info(f"[PlanningAgent] 질문 분석 시작: {input_text[:100]}...")
         question = input_text
@@ -30,6 +36,14 @@ class PlanningAgent:
 - 경도: {user_info.get('lon', 'N/A')} (좌표 기반 거리 계산 가능)
 - 층수: {user_info.get('floor', 'N/A')} (고층 건물 안전 고려 필요)
 - 참고: 위도/경도가 제공되면 반드시 위치 기반 검색 전략 수립
+"""
+        
+        # 이전 대화 맥락 추가 (후속 질문의 생략된 지역명/재난 유형 보완용)
+        history_context = ""
+        if conversation_context:
+            history_context = f"""
+이전 대화 맥락 (현재 질문에서 생략된 지역명, 재난 유형, 상황 정보를 보완하는 데만 활용):
+{conversation_context}
 """
         
         # LLM을 사용하여 질문을 서브 문제로 분해
@@ -39,6 +53,7 @@ class PlanningAgent:
 {question}
 
 {location_context}
+{history_context}
 
 **1단계: 사용자 발화 의도 분석**
 - 사용자가 구체적으로 언급한 정보를 정확히 추출하세요:
@@ -167,11 +182,17 @@ JSON만 응답하고 설명은 제외하세요.
         
         try:
             # Gemini API는 동기식이므로 비동기로 실행
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
-                model=GEMINI_MODEL,
-                contents=prompt.strip()
-            )
+            try:
+                with start_span("gemini.generate", stage="llm_planning"), track_stage("llm_planning"):
+                    response = await asyncio.to_thread(
+                        self.client.models.generate_content,
+                        model=GEMINI_MODEL,
+                        contents=prompt.strip()
+                    )
+            except Exception as e:
+                record_gemini_error("llm_planning", e)
+                raise
+            record_gemini_usage("llm_planning", response)
             
             from utils import extract_text_from_response, parse_json_from_text
             
@@ -1,13 +1,42 @@
 """FastAPI 엔드포인트"""
+import asyncio
+import hashlib
+import hmac
+import json
 import logging
-from fastapi import FastAPI, HTTPException
+import time
+import uuid
+from urllib.parse import quote
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse, Response as HTTPResponse
+from starlette.routing import Match
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 import html
+import orjson
+from brotli_asgi import BrotliMiddleware
 
 from graph import Orchestrator
 from models import Response
+from services.metrics import (
+    REQUEST_COUNT, REQUESTS_IN_FLIGHT, REQUEST_LATENCY, CONVERSATIONS,
+    render_latest, update_neo4j_pool, mark_process_dead
+)
+from services.tracing import setup_tracing
+from services.conversation_store import create_conversation_store
+from services.data_version import bump_data_version, get_base_version, get_data_version
+from services.admission import AdmissionController, AdmissionRejected
+from services.graph_schema import check_on_startup
+from services.shelter_grid import resolve_types
+from services.offline_bundle import BundleStore, bundle_texts
+from services.mass_notify import NotificationMatcher
+from services.hazard_events import EventInbox, HazardEventStore, watch_events
+from config import (
+    ADMIN_TOKEN, ADMISSION_RETRY_AFTER_SECONDS, BATCH_MAX_ITEMS, GRAPH_SCHEMA_STARTUP, EVENT_POLL_SECONDS,
+    CHAT_RESPONSE_DETAIL, RESPONSE_COMPRESSION_ENABLED, RESPONSE_COMPRESSION_MIN_BYTES, RESPONSE_BROTLI_QUALITY,
+    SHELTERS_MAX_RESULTS, SHELTERS_MAX_RADIUS_KM, SHELTERS_CACHE_MAX_AGE
+)
 
 # 로깅 설정
 logging.basicConfig(
@@ -17,7 +46,18 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-app = FastAPI(title="SENSE API", version="1.0.0")
+class FastJSONResponse(JSONResponse):
+    """orjson 직렬화 응답 (numpy 값, 숫자 키 허용)
+
+    FastAPI의 ORJSONResponse와 같은 직렬화이며, /chat 응답은 이 클래스로 바로 반환해
+    explanation 같은 자유 형식 dict를 pydantic이 다시 검증/직렬화하지 않도록 합니다.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+app = FastAPI(title="SENSE API", version="1.0.0", default_response_class=FastJSONResponse)
 
 # CORS 설정
 app.add_middleware(
@@ -28,8 +68,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 응답 압축 (Accept-Encoding에 br이 있으면 brotli, 없으면 gzip). /bundle은 이미 압축된 본문이라 제외
+if RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(
+        BrotliMiddleware,
+        quality=RESPONSE_BROTLI_QUALITY,
+        minimum_size=RESPONSE_COMPRESSION_MIN_BYTES,
+        gzip_fallback=True,
+        excluded_handlers=[r"^/bundle$"]
+    )
+
+
+def _endpoint_label(request: Request) -> str:
+    """요청 경로를 라우트 템플릿으로 변환 (/conversations/{conversation_id} 등, 카디널리티 제한)"""
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    """엔드포인트별 요청 수, 처리 중 요청 수, 처리 시간 기록"""
+    endpoint = _endpoint_label(request)
+    REQUESTS_IN_FLIGHT.labels(endpoint=endpoint).inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        REQUESTS_IN_FLIGHT.labels(endpoint=endpoint).dec()
+        REQUEST_COUNT.labels(method=request.method, endpoint=endpoint, status=str(status)).inc()
+        REQUEST_LATENCY.labels(method=request.method, endpoint=endpoint).observe(
+            time.perf_counter() - start
+        )
+
+
+# 트레이싱 설정 (TRACING_ENABLED=true일 때 span 기록)
+setup_tracing()
+
+# 동시 처리 제한 (답변 캐시/요청 병합 뒤에 적용, 포화 시 Orchestrator의 로컬 답변 엔진으로 대체)
+admission = AdmissionController()
+
 # Orchestrator 인스턴스
-orchestrator = Orchestrator()
+orchestrator = Orchestrator(admission)
+
+# 모바일 오프라인 번들 (데이터 버전이 바뀐 뒤 첫 /bundle 요청에서 갱신)
+bundle_store = BundleStore()
+notification_matcher = NotificationMatcher(orchestrator.local_answer.shelter_grid)
+
+# 재난 이벤트 실시간 수집 (그래프 증분 반영 + 영향 범위만 캐시 무효화)
+event_store = HazardEventStore(
+    orchestrator.analyst_agent.rag_service.upsert_event,
+    orchestrator.analyst_agent.rag_service.fetch_events
+)
+event_inbox = EventInbox(event_store)
+_event_watcher: Optional[asyncio.Task] = None
 
 
 class UserInfo(BaseModel):
@@ -37,6 +134,7 @@ class UserInfo(BaseModel):
     lat: float  # 위도
     lon: float  # 경도
     floor: int  # 층수
+    mobility: Optional[Literal["normal", "limited", "wheelchair"]] = None  # 이동 능력 (대피소 순위에 반영)
 
 
 class ChatRequest(BaseModel):
@@ -45,21 +143,87 @@ class ChatRequest(BaseModel):
     user_info: Optional[UserInfo] = None  # 초기 유저 정보 (좌표, 층수)
     conversation_id: Optional[str] = None
     history: Optional[List[Dict[str, str]]] = None
+    mode: Literal["full", "local"] = "full"  # local: LLM 없이 로컬 데이터로 즉시 답변
+    detail: Optional[Literal["minimal", "standard", "debug"]] = None  # 응답 상세도 (기본값 CHAT_RESPONSE_DETAIL)
 
 
 class ChatResponse(BaseModel):
-    """채팅 응답"""
+    """채팅 응답 (detail에 따라 일부 필드 생략)
+
+    minimal: answer, places_reference, conversation_id
+    standard: + conclusion, evidence, 요약 explanation
+    debug: + 전체 explanation(검색 계획, 분석 근거, advisory), places_html
+    """
     answer: str
-    conclusion: str
-    evidence: str
-    explanation: Dict[str, Any]
+    conclusion: Optional[str] = None
+    evidence: Optional[str] = None
+    explanation: Optional[Dict[str, Any]] = None
     places_reference: Optional[Dict[str, Dict[str, Any]]] = None  # 결론에 언급된 장소 레퍼런스
     places_html: Optional[str] = None  # 장소 HTML 시각화
     conversation_id: Optional[str] = None
 
 
-# 대화 히스토리 저장 (메모리 기반, 프로덕션에서는 Redis 등 사용)
-conversations: Dict[str, List[Dict[str, str]]] = {}
+class BatchChatItem(BaseModel):
+    """배치 채팅 항목"""
+    message: str
+    user_info: Optional[UserInfo] = None
+    history: Optional[List[Dict[str, str]]] = None
+    mode: Literal["full", "local"] = "full"
+
+
+class BatchChatRequest(BaseModel):
+    """배치 채팅 요청 (캐시 사전 적재, 평가용)"""
+    items: List[BatchChatItem]
+    concurrency: Optional[int] = None  # 배치 내 동시 실행 수 (BATCH_CONCURRENCY 이내)
+    detail: Optional[Literal["minimal", "standard", "debug"]] = None  # 항목 응답 상세도
+
+
+class BatchChatItemResult(BaseModel):
+    """배치 항목 결과"""
+    index: int
+    ok: bool
+    result: Optional[ChatResponse] = None
+    error: Optional[str] = None
+    elapsed_ms: float
+
+
+class NotifyEventRequest(BaseModel):
+    """재난 이벤트 (진앙 + 반경 또는 다각형)"""
+    event_id: Optional[str] = None
+    event_type: str  # 지진, 강우 등 (Event 노드의 event_type)
+    severity: Literal["LOW", "MEDIUM", "HIGH", "CRITICAL"] = "HIGH"
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    radius_km: Optional[float] = None
+    polygon: Optional[List[List[float]]] = None  # [[경도, 위도], ...]
+
+
+class HazardEventRequest(NotifyEventRequest):
+    """실시간 수집 재난 이벤트 (같은 event_id로 다시 보내면 갱신, active=false면 종료)"""
+    name: Optional[str] = None
+    description: Optional[str] = None
+    date: Optional[str] = None  # YYYY-MM-DD
+    active: bool = True
+    magnitude: Optional[float] = None
+    pga: Optional[float] = None
+    rainfall: Optional[float] = None
+    duration: Optional[float] = None
+
+
+class BatchChatResponse(BaseModel):
+    """배치 채팅 응답"""
+    results: List[BatchChatItemResult]
+    succeeded: int
+    failed: int
+    elapsed_ms: float
+
+
+# 대화 히스토리 저장소 (CONVERSATION_STORE_BACKEND: memory | sqlite)
+conversation_store = create_conversation_store()
+
+
+def _update_conversation_metric():
+    CONVERSATIONS.labels(backend=conversation_store.backend).set(conversation_store.size())
 
 
 def generate_places_html(places_reference: Dict[str, Dict[str, Any]]) -> str:
@@ -194,10 +358,54 @@ def generate_places_html(places_reference: Dict[str, Dict[str, Any]]) -> str:
         html_parts.append('</div>')
     
     html_parts.append('</div>')
-    
+
     return '\n'.join(html_parts)
 
 
+def _explanation_summary(explanation: Dict[str, Any]) -> Dict[str, Any]:
+    """standard 응답용 explanation (검색 계획/분석 근거/advisory 중복 내용 제외, 출처와 건수만)"""
+    summary = {}
+    for key, value in explanation.items():
+        if key == "planning":
+            summary["planning"] = {"sub_problems": len((value.get("search_plan") or {}).get("sub_problems", []))}
+        elif key == "analysis":
+            summary["analysis"] = {k: value[k] for k in ("graph_count", "vector_count") if k in value}
+        elif key == "advisory":
+            # advisory의 결론/증거/장소는 응답 본문과 같으므로 대체 사유만 유지
+            if value.get("fallback"):
+                summary["advisory"] = {"fallback": value["fallback"]}
+        elif key != "guidelines":
+            summary[key] = value
+    return summary
+
+
+def _chat_payload(result: Dict[str, Any], detail: str, conversation_id: Optional[str] = None) -> Dict[str, Any]:
+    """Orchestrator 결과를 응답 상세도(minimal | standard | debug)에 맞춰 응답 dict로 변환"""
+    places = result.get("places_reference")
+    if detail == "debug":
+        return {
+            "answer": result["answer"],
+            "conclusion": result["conclusion"],
+            "evidence": result["evidence"],
+            "explanation": result["explanation"],
+            "places_reference": places,
+            "places_html": generate_places_html(places) if places else None,
+            "conversation_id": conversation_id
+        }
+
+    # 값이 없는 장소 속성(도로 거리, 노출 구역 등)은 생략
+    if places:
+        places = {key: {k: v for k, v in place.items() if v is not None} for key, place in places.items()}
+    payload = {"answer": result["answer"], "places_reference": places, "conversation_id": conversation_id}
+    if detail == "standard":
+        payload.update(
+            conclusion=result["conclusion"],
+            evidence=result["evidence"],
+            explanation=_explanation_summary(result["explanation"])
+        )
+    return payload
+
+
 @app.get("/")
 async def root():
     """루트 엔드포인트"""
@@ -213,11 +421,11 @@ async def chat(request: ChatRequest):
     logger.info(f"[API] 채팅 요청 수신: {request.message[:100]}...")
     try:
         # 대화 히스토리 가져오기
-        history = []
-        if request.conversation_id and request.conversation_id in conversations:
-            history = conversations[request.conversation_id]
-        elif request.history:
-            history = request.history
+        history = None
+        if request.conversation_id:
+            history = await asyncio.to_thread(conversation_store.get, request.conversation_id)
+        if history is None:
+            history = request.history or []
         
         # 유저 정보 변환
         user_info = None
@@ -225,73 +433,326 @@ async def chat(request: ChatRequest):
             user_info = {
                 "lat": request.user_info.lat,
                 "lon": request.user_info.lon,
-                "floor": request.user_info.floor
+                "floor": request.user_info.floor,
+                "mobility": request.user_info.mobility
             }
         
-        # Orchestrator 실행
-        logger.info(f"[API] Orchestrator 실행 시작 (user_info: {user_info is not None})")
-        result = await orchestrator.process(request.message, history, user_info)
-        logger.info("[API] Orchestrator 실행 완료")
-        
-        # 대화 히스토리 업데이트
-        conversation_id = request.conversation_id or "default"
-        if conversation_id not in conversations:
-            conversations[conversation_id] = []
+        if request.mode == "local":
+            # 로컬 답변은 LLM을 쓰지 않으므로 동시 실행 제한 없이 처리
+            result = await orchestrator.process(
+                request.message, history, user_info, request.conversation_id, mode="local"
+            )
+        else:
+            # Orchestrator 실행 (캐시/병합 뒤 동시 실행 수 제한, 좌표가 있는 요청 우선)
+            try:
+                logger.info(f"[API] Orchestrator 실행 시작 (user_info: {user_info is not None})")
+                result = await orchestrator.process(
+                    request.message, history, user_info, request.conversation_id
+                )
+                logger.info("[API] Orchestrator 실행 완료")
+            except AdmissionRejected as e:
+                logger.warning(f"[API] 요청 거절: {e}")
+                raise HTTPException(
+                    status_code=503,
+                    detail=str(e),
+                    headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)}
+                )
         
-        # 사용자 메시지 추가
-        conversations[conversation_id].append({
-            "role": "user",
-            "content": request.message
-        })
+        # 대화 히스토리 업데이트 (conversation_id가 없으면 새 대화로 발급)
+        conversation_id = request.conversation_id or uuid.uuid4().hex
+        await asyncio.to_thread(conversation_store.append, conversation_id, [
+            {"role": "user", "content": request.message},      # 사용자 메시지
+            {"role": "assistant", "content": result["answer"]}  # 어시스턴트 메시지
+        ])
+        _update_conversation_metric()
         
-        # 어시스턴트 메시지 추가
-        conversations[conversation_id].append({
-            "role": "assistant",
-            "content": result["answer"]
-        })
-        
-        # 장소 레퍼런스가 있으면 HTML 시각화 생성
-        places_html = None
-        if result.get("places_reference"):
-            places_html = generate_places_html(result.get("places_reference"))
-        
-        return ChatResponse(
-            answer=result["answer"],
-            conclusion=result["conclusion"],
-            evidence=result["evidence"],
-            explanation=result["explanation"],
-            places_reference=result.get("places_reference"),
-            places_html=places_html,
-            conversation_id=conversation_id
-        )
+        # 응답 상세도에 맞춰 필드를 줄이고 orjson으로 바로 직렬화 (장소 HTML은 debug에서만 생성)
+        return FastJSONResponse(_chat_payload(result, request.detail or CHAT_RESPONSE_DETAIL, conversation_id))
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch(request: BatchChatRequest):
+    """배치 채팅 엔드포인트 (대화 저장소에는 기록하지 않음)"""
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"배치 항목은 최대 {BATCH_MAX_ITEMS}개입니다")
+    
+    logger.info(f"[API] 배치 채팅 요청 수신: {len(request.items)}개")
+    start = time.perf_counter()
+    items = [
+        {
+            "input": item.message,
+            "user_info": item.user_info.model_dump() if item.user_info else None,
+            "conversation_history": item.history,
+            "mode": item.mode
+        }
+        for item in request.items
+    ]
+    outcomes = await orchestrator.process_many(items, request.concurrency)
+    
+    detail = request.detail or CHAT_RESPONSE_DETAIL
+    results = [
+        {
+            "index": outcome["index"],
+            "ok": outcome["ok"],
+            "result": _chat_payload(outcome["result"], detail) if outcome["ok"] else None,
+            "error": outcome.get("error"),
+            "elapsed_ms": outcome["elapsed_ms"]
+        }
+        for outcome in outcomes
+    ]
+    
+    succeeded = sum(1 for r in results if r["ok"])
+    return FastJSONResponse({
+        "results": results,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+    })
+
+
 @app.get("/health")
 async def health():
     """헬스 체크"""
     return {"status": "ok"}
 
 
+def _shelter_query(lat: float, lon: float, types: Optional[List[str]], radius_km: Optional[float]) -> List[str]:
+    """대피소 조회 파라미터 검사 (type은 반복 또는 쉼표 구분)"""
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise HTTPException(status_code=400, detail="lat/lon 범위가 올바르지 않습니다")
+    if radius_km is not None and not (0 < radius_km <= SHELTERS_MAX_RADIUS_KM):
+        raise HTTPException(status_code=400, detail=f"radius_km는 0 초과 {SHELTERS_MAX_RADIUS_KM} 이하여야 합니다")
+    try:
+        return resolve_types([t.strip() for value in types or [] for t in value.split(",") if t.strip()])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _cacheable(request: Request, build, lat: float, lon: float, *key_parts) -> HTTPResponse:
+    """데이터 버전 + 격자 버전 + 질의 셀의 이벤트 변경 횟수 + 요청 파라미터로 ETag를 만들고,
+    If-None-Match가 같으면 본문 없이 304 (이벤트 수집은 영향 지역 셀의 ETag만 바꿈)"""
+    version = get_base_version()
+    shelter_grid = orchestrator.local_answer.shelter_grid
+    key = "|".join(str(part) for part in (
+        version, shelter_grid.version, shelter_grid.cell_revision(lat, lon), round(lat, 6), round(lon, 6), *key_parts
+    ))
+    etag = f'"{hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={SHELTERS_CACHE_MAX_AGE}"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return HTTPResponse(status_code=304, headers=headers)
+    return FastJSONResponse({**build(), "data_version": version}, headers=headers)
+
+
+@app.get("/shelters/nearest")
+async def nearest_shelters(
+    request: Request,
+    lat: float,
+    lon: float,
+    k: int = 5,
+    type: Optional[List[str]] = Query(None),
+    radius_km: Optional[float] = None
+):
+    """좌표 기준 가까운 시설 k개 (사전 계산 격자, LLM 파이프라인을 거치지 않음)"""
+    types = _shelter_query(lat, lon, type, radius_km)
+    k = max(1, min(k, SHELTERS_MAX_RESULTS))
+
+    def build():
+        shelters = orchestrator.local_answer.shelter_grid.nearest(lat, lon, k, types, radius_km)
+        return {
+            "lat": lat, "lon": lon, "types": types, "radius_km": radius_km, "count": len(shelters),
+            "shelters": shelters, "events": event_store.covering(lat, lon)
+        }
+
+    return _cacheable(request, build, lat, lon, "nearest", k, ",".join(types), radius_km)
+
+
+@app.get("/shelters/within")
+async def shelters_within(
+    request: Request,
+    lat: float,
+    lon: float,
+    radius_km: float = 1.0,
+    type: Optional[List[str]] = Query(None),
+    limit: int = SHELTERS_MAX_RESULTS
+):
+    """좌표 기준 반경 내 시설 전체 (거리순, limit개까지)"""
+    types = _shelter_query(lat, lon, type, radius_km)
+    limit = max(1, min(limit, SHELTERS_MAX_RESULTS))
+
+    def build():
+        shelters = orchestrator.local_answer.shelter_grid.within(lat, lon, radius_km, types, limit)
+        return {
+            "lat": lat, "lon": lon, "types": types, "radius_km": radius_km, "count": len(shelters),
+            "shelters": shelters, "events": event_store.covering(lat, lon)
+        }
+
+    return _cacheable(request, build, lat, lon, "within", radius_km, ",".join(types), limit)
+
+
+def _bundle_contents():
+    local_answer = orchestrator.local_answer
+    return local_answer.shelter_grid.facilities(), bundle_texts(local_answer.all_policies(), local_answer.guidelines())
+
+
+@app.get("/bundle")
+async def offline_bundle(request: Request, since: Optional[str] = None):
+    """모바일 오프라인 번들 (since가 보관 중인 이전 버전이면 delta, 아니면 full)"""
+    await asyncio.to_thread(bundle_store.ensure, get_base_version(), _bundle_contents)
+    kind, version, body = await asyncio.to_thread(bundle_store.read, since)
+    etag = f'"{since}-{version}"' if kind == "delta" else f'"{version}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={SHELTERS_CACHE_MAX_AGE}",
+        "X-Bundle-Version": version,
+        "X-Bundle-Kind": kind,
+    }
+    if kind == "delta":
+        headers["X-Bundle-Base"] = since
+    if since == version or etag in (tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")):
+        return HTTPResponse(status_code=304, headers=headers)
+    return HTTPResponse(content=body, media_type="application/octet-stream", headers=headers)
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 메트릭 (멀티 워커 환경에서는 PROMETHEUS_MULTIPROC_DIR 기반 합산)"""
+    update_neo4j_pool(orchestrator.analyst_agent.rag_service.neo4j_driver)
+    body, content_type = render_latest()
+    return HTTPResponse(content=body, media_type=content_type)
+
+
+@app.on_event("startup")
+async def startup():
+    """로컬 답변 데이터/대피소 격자 미리 로드 (포화 시 첫 대체 응답 지연 방지), Neo4j 인덱스 확인"""
+    global _event_watcher
+    await asyncio.to_thread(orchestrator.local_answer.load)
+    await asyncio.to_thread(_check_graph_schema)
+    try:
+        await asyncio.to_thread(event_store.sync)
+    except Exception as e:
+        logger.warning(f"[HazardEvents] 진행 중 이벤트 초기 적재 실패: {e}")
+    if EVENT_POLL_SECONDS > 0:
+        _event_watcher = asyncio.create_task(watch_events(event_store, event_inbox))
+
+
+def _check_graph_schema() -> None:
+    with orchestrator.analyst_agent.rag_service.get_neo4j_session() as session:
+        check_on_startup(session, GRAPH_SCHEMA_STARTUP)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """워커 종료 시 이벤트 확인 태스크 중지, 백그라운드 요약 마무리, live gauge 정리 (멀티 워커 메트릭)"""
+    if _event_watcher is not None:
+        _event_watcher.cancel()
+    try:
+        await asyncio.wait_for(orchestrator.history_manager.wait_for_folds(), timeout=10)
+    except asyncio.TimeoutError:
+        logger.warning("[HistoryManager] 종료 시 백그라운드 요약이 끝나지 않아 중단")
+    mark_process_dead()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """/admin/* 인증: X-Admin-Token 헤더가 ADMIN_TOKEN과 같아야 함 (ADMIN_TOKEN이 없으면 모두 거부)"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="ADMIN_TOKEN이 설정되지 않아 관리자 API를 사용할 수 없습니다")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="관리자 토큰이 올바르지 않습니다")
+
+
+@app.post("/admin/cache/invalidate", dependencies=[Depends(require_admin)])
+async def invalidate_cache(reason: Optional[str] = None):
+    """그래프/문서 재적재 후 캐시 무효화 (데이터 버전 변경, 요청을 받은 워커에만 적용)"""
+    version = bump_data_version(reason or "admin")
+    return {"data_version": version}
+
+
+@app.post("/admin/events", dependencies=[Depends(require_admin)])
+async def ingest_event(request: HazardEventRequest):
+    """재난 이벤트 수집: Event 노드/관계 MERGE 후 영향 범위 캐시만 무효화 (다른 워커는 EVENT_POLL_SECONDS 안에 반영)"""
+    try:
+        return await asyncio.to_thread(event_store.ingest, request.model_dump(exclude_none=True))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"[HazardEvents] 이벤트 그래프 반영 실패: {e}")
+        raise HTTPException(status_code=503, detail="이벤트를 그래프에 반영하지 못했습니다")
+
+
+@app.get("/admin/events", dependencies=[Depends(require_admin)])
+async def active_events():
+    """이 워커가 알고 있는 진행 중 이벤트 (영향 지역 포함)"""
+    return {"data_version": get_data_version(), "events": event_store.active()}
+
+
+@app.post("/admin/notify/match", dependencies=[Depends(require_admin)])
+async def notify_match(request: NotifyEventRequest):
+    """이벤트 영향 범위의 등록 사용자별 알림 payload (JSON Lines 스트림)"""
+    if not await asyncio.to_thread(notification_matcher.load):
+        raise HTTPException(status_code=503, detail="등록된 사용자 위치가 없습니다 (NOTIFY_USERS_PATH)")
+    try:
+        matched = await asyncio.to_thread(notification_matcher.match, request.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    lines = (
+        json.dumps(payload, ensure_ascii=False) + "\n"
+        for payload in notification_matcher.payloads(matched)
+    )
+    return StreamingResponse(lines, media_type="application/x-ndjson", headers={
+        "X-Event-Id": quote(matched["event"]["event_id"]),
+        "X-Affected-Users": str(len(matched["users"])),
+        "X-Match-Ms": f"{matched['elapsed_ms']:.0f}",
+    })
+
+
+@app.get("/admin/cypher/stats", dependencies=[Depends(require_admin)])
+async def cypher_stats(limit: int = 20, sort: str = "max_ms"):
+    """실행된 Cypher 형태(fingerprint)별 통계 상위 목록 (요청을 받은 워커의 값)"""
+    query_stats = orchestrator.analyst_agent.rag_service.query_stats
+    try:
+        fingerprints = query_stats.top(limit=max(1, min(limit, 500)), sort=sort)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "sort": sort,
+        "tracked": query_stats.size(),
+        "slow_ms": query_stats.slow_ms,
+        "profile_sample_rate": query_stats.profile_sample_rate,
+        "fingerprints": fingerprints
+    }
+
+
+@app.delete("/admin/cypher/stats", dependencies=[Depends(require_admin)])
+async def reset_cypher_stats():
+    """Cypher 통계 초기화 (요청을 받은 워커에만 적용)"""
+    orchestrator.analyst_agent.rag_service.query_stats.clear()
+    return {"message": "Cypher stats cleared"}
+
+
 @app.get("/conversations/{conversation_id}")
 async def get_conversation(conversation_id: str):
     """대화 히스토리 조회"""
-    if conversation_id not in conversations:
+    messages = await asyncio.to_thread(conversation_store.get, conversation_id)
+    if messages is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
     return {
         "conversation_id": conversation_id,
-        "messages": conversations[conversation_id]
+        "messages": messages
     }
 
 
 @app.delete("/conversations/{conversation_id}")
 async def delete_conversation(conversation_id: str):
     """대화 히스토리 삭제"""
-    if conversation_id in conversations:
-        del conversations[conversation_id]
+    if await asyncio.to_thread(conversation_store.delete, conversation_id):
+        _update_conversation_metric()
         return {"message": "Conversation deleted"}
     else:
         raise HTTPException(status_code=404, detail="Conversation not found")
@@ -0,0 +1 @@
+"""오프라인 벤치마크 (Gemini / Neo4j / Chroma 로컬 대체 구현 포함)"""
@@ -0,0 +1,301 @@
+"""Hybrid RAG 검색 품질 + 지연 시간 평가
+
+라벨 질문 세트(eval_sets.json: 구별 대피소, 재난 연쇄, 행동요령 검색, 기존 test_questions)를
+설정 조합별로 Orchestrator.process에 실행하고 다음을 비교표로 출력합니다.
+- Graph RAG 정확도: 파이프라인이 실행한 Cypher 결과가 라벨의 노드/관계/개수와 일치하는지
+- Vector RAG recall@k / hit@k: 질문으로 검색한 상위 k개 청크 중 라벨 청크 비율
+  (recall@k = 맞힌 라벨 청크 수 / min(k, 전체 라벨 청크 수))
+- 질문별 전체 처리 시간과 Gemini 토큰 사용량 (sense_gemini_tokens_total 증가분)
+
+설정 조합은 --top-k, --chunk-size, --graph-max-chars, --vector-max-chars 값의 곱집합입니다.
+기본은 로컬 대체 구현(benchmarks.fakes)으로 실행하며, --live를 주면 실제 Gemini/Neo4j/Chroma를 사용합니다
+(이 경우 청크 크기는 적재된 컬렉션 기준이므로 --chunk-size는 무시됩니다).
+
+사용법 (sense-backend 디렉터리에서):
+    python -m benchmarks.evaluate --top-k 3 5 10 --chunk-size 300 500 1000
+    python -m benchmarks.evaluate --live --top-k 5 --vector-max-chars 1500 3000 --sets guideline_lookup
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import itertools
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set
+
+from benchmarks.run import (
+    add_latency_arguments, install_stand_ins, latency_config, report_header, summarize, write_report
+)
+
+logger = logging.getLogger(__name__)
+
+EVAL_SETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "eval_sets.json")
+
+
+def load_eval_sets(path: str = EVAL_SETS_PATH, names: Optional[List[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+    with open(path, encoding="utf-8") as f:
+        sets = json.load(f)["sets"]
+    return {name: items for name, items in sets.items() if not names or name in names}
+
+
+class GraphLabels:
+    """그래프 라벨 해석 및 채점 (전처리 CSV로 만든 메모리 그래프 기준)"""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._names: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        for node in graph.nodes.values():
+            if node.get("name"):
+                self._names[node["type"]][str(node["name"])].add(node["id"])
+
+    def expected_ids(self, spec: Dict[str, Any]) -> List[str]:
+        label = spec["label"]
+        if spec.get("rel"):
+            nodes = [start for start, end, _ in self.graph.by_type.get(spec["rel"], [])
+                     if start["type"] == label and end["id"] == spec["to"]]
+        else:
+            nodes = list(self.graph.by_label.get(label, []))
+        where = spec.get("where") or {}
+        nodes = [n for n in nodes if all(str(n.get(k)) == v for k, v in where.items())]
+        if spec["kind"] == "argmax":
+            nodes = sorted(nodes, key=lambda n: n.get(spec["order_by"]) or 0, reverse=True)[:1]
+        return [n["id"] for n in nodes]
+
+    def expected_edges(self, spec: Dict[str, Any]) -> Set[tuple]:
+        return {
+            (start["name"], end["name"])
+            for rel in spec["rels"]
+            for start, end, _ in self.graph.by_type.get(rel, [])
+            if start["id"] == spec["from"]
+        }
+
+    def _record_ids(self, label: str, record: Dict[str, Any]) -> Set[str]:
+        """레코드의 문자열 값 중 노드 이름과 일치하는 노드 id"""
+        ids = set()
+        for value in record.values():
+            if isinstance(value, str):
+                ids |= self._names[label].get(value, set())
+        return ids
+
+    def score(self, spec: Dict[str, Any], records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        kind = spec["kind"]
+        if kind == "edges":
+            expected = self.expected_edges(spec)
+            found = {pair for pair in expected for r in records if set(pair) <= set(map(str, r.values()))}
+            matched = [r for r in records if any(set(pair) <= set(map(str, r.values())) for pair in expected)]
+            return {
+                "correct": bool(expected) and found == expected,
+                "precision": round(len(matched) / len(records), 4) if records else 0.0,
+                "recall": round(len(found) / len(expected), 4) if expected else None
+            }
+
+        expected = set(self.expected_ids(spec))
+        if kind == "count":
+            values = [v for r in records for v in r.values() if isinstance(v, (int, float)) and not isinstance(v, bool)]
+            return {"correct": len(expected) in values, "expected": len(expected), "returned": values[:3]}
+
+        mapped = [ids for ids in (self._record_ids(spec["label"], r) for r in records) if ids]
+        if kind == "argmax":
+            return {"correct": bool(mapped) and bool(mapped[0] & expected), "expected": sorted(expected)}
+
+        hits = [ids for ids in mapped if ids & expected]
+        precision = len(hits) / len(mapped) if mapped else 0.0
+        return {"correct": bool(mapped) and precision >= 0.9, "precision": round(precision, 4), "returned": len(mapped)}
+
+
+class VectorLabels:
+    """청크 라벨 (원본 파일 + 본문 키워드) 해석 및 recall@k 채점"""
+
+    def __init__(self, collection):
+        snapshot = collection.get(include=["documents"])
+        self.chunks = list(zip(snapshot["ids"], snapshot["documents"]))
+
+    @staticmethod
+    def _source(chunk_id: str) -> str:
+        return chunk_id.rsplit("_chunk_", 1)[0]
+
+    def _is_relevant(self, spec: Dict[str, Any], chunk_id: str, text: str) -> bool:
+        keywords = spec.get("contains") or []
+        return self._source(chunk_id) in spec["files"] and (not keywords or any(k in (text or "") for k in keywords))
+
+    def score(self, spec: Dict[str, Any], documents: List[Dict[str, Any]], k: int) -> Dict[str, Any]:
+        relevant = {cid for cid, text in self.chunks if self._is_relevant(spec, cid, text)}
+        top = documents[:k]
+        hits = sum(1 for d in top if d["id"] in relevant or self._is_relevant(spec, d["id"], d.get("text")))
+        return {
+            "recall": round(hits / min(k, len(relevant)), 4) if relevant else None,
+            "hit": hits > 0,
+            "relevant": len(relevant)
+        }
+
+
+def _tokens_used() -> float:
+    from services.metrics import GEMINI_TOKENS
+    return sum(s.value for metric in GEMINI_TOKENS.collect() for s in metric.samples if s.name.endswith("_total"))
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return round(sum(values) / len(values), 4) if values else None
+
+
+def aggregate(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    graph = [i["graph"] for i in items if i.get("graph")]
+    vector = [i["vector"] for i in items if i.get("vector")]
+    return {
+        "questions": len(items),
+        "graph_accuracy": _mean([float(g["correct"]) for g in graph]),
+        "graph_precision": _mean([g.get("precision") for g in graph]),
+        "vector_recall": _mean([v["recall"] for v in vector]),
+        "vector_hit": _mean([float(v["hit"]) for v in vector]),
+        "latency_ms": summarize([i["latency_ms"] for i in items]),
+        "tokens_per_question": _mean([i["tokens"] for i in items])
+    }
+
+
+async def evaluate_config(orchestrator, config: Dict[str, Any], sets: Dict[str, List[Dict[str, Any]]],
+                          graph_labels: GraphLabels, args: argparse.Namespace) -> Dict[str, Any]:
+    rag = orchestrator.analyst_agent.rag_service
+    advisor = orchestrator.advisor_agent
+    rag.vector_top_k = config["top_k"]
+    advisor.graph_max_chars = config["graph_max_chars"]
+    advisor.vector_max_chars = config["vector_max_chars"]
+    if not args.live:
+        from benchmarks.fakes import InMemoryCollection
+        rag.chroma_collection = InMemoryCollection.from_guidelines(
+            latency=rag.chroma_collection.latency, chunk_size=config["chunk_size"], overlap=config["chunk_size"] // 5
+        )
+    # 설정마다 같은 조건에서 측정하도록 질문 단위 캐시 비우기
+    rag._embedding_cache.clear()
+    rag._cypher_cache.clear()
+    rag._schema_cache = None
+    vector_labels = VectorLabels(rag.chroma_collection)
+
+    captured = []
+    analyze = orchestrator.analyst_agent.analyze
+
+    async def capture(*a, **kw):
+        result = await analyze(*a, **kw)
+        captured.append(result)
+        return result
+
+    orchestrator.analyst_agent.analyze = capture
+    results = {}
+    try:
+        for set_name, items in sets.items():
+            rows = []
+            for item in items:
+                captured.clear()
+                tokens_before = _tokens_used()
+                start = time.perf_counter()
+                response = await orchestrator.process(item["question"], user_info=item.get("user_info"))
+                latency_ms = (time.perf_counter() - start) * 1000
+                row = {
+                    "id": item["id"],
+                    "latency_ms": round(latency_ms, 3),
+                    "tokens": _tokens_used() - tokens_before,
+                    "fallback": response["explanation"].get("advisory", {}).get("fallback")
+                }
+                if item.get("graph"):
+                    records = captured[0].graph_results.get("results", []) if captured else []
+                    row["graph"] = graph_labels.score(item["graph"], records)
+                if item.get("vector"):
+                    search = await asyncio.to_thread(rag.vector_rag_search, item["question"], config["top_k"])
+                    row["vector"] = vector_labels.score(item["vector"], search.get("results", []), config["top_k"])
+                rows.append(row)
+            results[set_name] = {"summary": aggregate(rows), "items": rows}
+    finally:
+        orchestrator.analyst_agent.analyze = analyze
+
+    all_rows = [row for r in results.values() for row in r["items"]]
+    return {"config": config, "summary": aggregate(all_rows), "sets": results}
+
+
+def format_table(evaluations: List[Dict[str, Any]], live: bool) -> str:
+    """설정 × 세트 비교표 (markdown)"""
+    header = "| top_k | chunk | graph/vector chars | set | n | graph acc | graph prec | recall@k | hit@k | p50 ms | p95 ms | tokens/q |"
+    lines = [header, "|" + "---|" * (header.count("|") - 1)]
+
+    def fmt(value: Any) -> str:
+        return "-" if value is None else (f"{value:.3f}" if isinstance(value, float) else str(value))
+
+    for evaluation in evaluations:
+        config = evaluation["config"]
+        rows = [(name, r["summary"]) for name, r in evaluation["sets"].items()] + [("all", evaluation["summary"])]
+        for name, s in rows:
+            lines.append("| " + " | ".join([
+                str(config["top_k"]),
+                "ingested" if live else str(config["chunk_size"]),
+                f"{config['graph_max_chars']}/{config['vector_max_chars']}",
+                name, str(s["questions"]),
+                fmt(s["graph_accuracy"]), fmt(s["graph_precision"]),
+                fmt(s["vector_recall"]), fmt(s["vector_hit"]),
+                fmt(s["latency_ms"].get("p50")), fmt(s["latency_ms"].get("p95")),
+                fmt(s["tokens_per_question"])
+            ]) + " |")
+    return "\n".join(lines)
+
+
+async def run_evaluation(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from graph import Orchestrator
+    from benchmarks.fakes import InMemoryGraph
+
+    sets = load_eval_sets(args.eval_sets, args.sets)
+    graph_labels = GraphLabels(InMemoryGraph.from_csv())
+    orchestrator = Orchestrator()
+
+    configs = [
+        {"top_k": top_k, "chunk_size": chunk_size, "graph_max_chars": graph_chars, "vector_max_chars": vector_chars}
+        for top_k, chunk_size, graph_chars, vector_chars in itertools.product(
+            args.top_k, args.chunk_size if not args.live else [None], args.graph_max_chars, args.vector_max_chars
+        )
+    ]
+    evaluations = []
+    for config in configs:
+        logger.warning(f"[Evaluate] 설정 평가: {config}")
+        evaluations.append(await evaluate_config(orchestrator, config, sets, graph_labels, args))
+    return evaluations
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Hybrid RAG 검색 품질 + 지연 시간 평가")
+    parser.add_argument("--live", action="store_true", help="실제 Gemini/Neo4j/Chroma 사용 (기본: 로컬 대체 구현)")
+    parser.add_argument("--eval-sets", default=EVAL_SETS_PATH, help="라벨 질문 세트 JSON")
+    parser.add_argument("--sets", nargs="*", help="평가할 세트 이름 (기본: 전체)")
+    parser.add_argument("--top-k", type=int, nargs="+", default=[5], help="Vector RAG top_k 후보")
+    parser.add_argument("--chunk-size", type=int, nargs="+", default=[500], help="청크 크기 후보 (로컬 대체 구현만)")
+    parser.add_argument("--graph-max-chars", type=int, nargs="+", default=[2000], help="Advisor 프롬프트 Graph 결과 길이 후보")
+    parser.add_argument("--vector-max-chars", type=int, nargs="+", default=[3000], help="Advisor 프롬프트 Vector 결과 길이 후보")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: data/benchmarks/eval-<시각>.json)")
+    add_latency_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+
+    # 같은 질문이 설정마다 반복되므로 답변 캐시는 끔
+    os.environ["ANSWER_CACHE_ENABLED"] = "false"
+    if not args.live:
+        install_stand_ins(args)
+
+    evaluations = asyncio.run(run_evaluation(args))
+    table = format_table(evaluations, args.live)
+    report = {
+        **report_header(),
+        "mode": "live" if args.live else "offline",
+        "latency_ms": None if args.live else latency_config(args),
+        "evaluations": evaluations,
+        "table": table
+    }
+    output = write_report(report, args.output, "eval")
+    print(table)
+    print(f"\n[Evaluate] 결과 저장: {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,672 @@
+"""벤치마크용 외부 서비스 로컬 대체 구현
+
+API 키와 실행 중인 서비스 없이 파이프라인 성능을 측정하기 위해 다음을 대체합니다.
+- genai.Client: 프롬프트 종류별 고정 응답(검색 계획 JSON, Cypher 템플릿, 분석/추론 JSON)과
+  해시 기반 결정적 임베딩을 반환하며, 호출마다 설정한 지연 시간만큼 대기합니다
+- Neo4j: neo4j_nodes_complete.csv / neo4j_relationships_complete.csv를 메모리 그래프로 적재하고,
+  서비스가 사용하는 단순 Cypher(단일 hop MATCH, WHERE, RETURN, ORDER BY, LIMIT)와 이벤트 수집
+  쿼리(rag_service.upsert_event/fetch_events)만 해석합니다
+- Chroma: 국민행동요령 문서를 적재 스크립트(hybrid_rag_advanced.py)와 같은 방식(파일별 청크,
+  id `<파일명>_chunk_<번호>`)으로 나누어 같은 임베딩으로 적재한 메모리 컬렉션
+
+install()은 프로세스 전역으로 적용되므로 벤치마크 실행 프로세스에서만 호출합니다.
+"""
+import os
+import re
+import json
+import time
+import zlib
+import random
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import partial
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import EMBEDDING_DIM, PROCESSED_DATA_DIR
+from services.graph_schema import LOCATION_PROPERTY, POINT_LABELS, expected_indexes
+from services.lexical_index import bigrams
+from services.spatial_index import haversine_km
+from services.local_answer import GUIDELINES_FILE, NODES_FILE, RELATIONSHIPS_FILE, detect_hazard
+
+
+@dataclass
+class LatencyProfile:
+    """외부 호출별 지연 시간 (ms). jitter는 평균 대비 ±비율"""
+    llm_ms: float = 800.0
+    embed_ms: float = 80.0
+    neo4j_ms: float = 5.0
+    chroma_ms: float = 10.0
+    jitter: float = 0.2
+    seed: int = 42
+
+    def __post_init__(self):
+        self._random = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def sleep(self, mean_ms: float) -> None:
+        if mean_ms <= 0:
+            return
+        with self._lock:
+            factor = 1 + self._random.uniform(-self.jitter, self.jitter)
+        time.sleep(mean_ms * factor / 1000)
+
+
+def hashed_embedding(text: str, dim: int = EMBEDDING_DIM) -> List[float]:
+    """문자 bigram 해시 임베딩 (같은 텍스트는 항상 같은 벡터, 겹치는 bigram이 많을수록 유사)"""
+    vector = np.zeros(dim, dtype=np.float32)
+    for term in bigrams(text):
+        h = zlib.crc32(term.encode("utf-8"))
+        vector[h % dim] += 1.0 if (h >> 16) & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm > 0 else vector).tolist()
+
+
+# ---------------------------------------------------------------------------
+# Neo4j
+# ---------------------------------------------------------------------------
+
+class FakeCypherError(Exception):
+    """메모리 그래프가 해석하지 못하는 Cypher"""
+
+
+class Record(dict):
+    """neo4j.Record 대체 (dict 접근 + data())"""
+
+    def data(self) -> Dict[str, Any]:
+        return dict(self)
+
+
+class Result(list):
+    """neo4j.Result 대체 (반복 + single() + consume())"""
+
+    def __init__(self, records=(), plan: Optional[Dict[str, Any]] = None, profile: Optional[Dict[str, Any]] = None):
+        super().__init__(records)
+        self.plan = plan
+        self.profile = profile
+
+    def single(self) -> Optional[Record]:
+        return self[0] if self else None
+
+    def consume(self) -> SimpleNamespace:
+        return SimpleNamespace(plan=self.plan, profile=self.profile)
+
+
+_NODE = r"\((\w*)(?::(\w+))?\s*(?:\{([^}]*)\})?\)"
+_MATCH_PATTERN = re.compile(
+    rf"^MATCH\s+{_NODE}(?:\s*-\[(\w*)(?::(\w+))?\]->\s*{_NODE})?"
+    r"(?:\s+WHERE\s+(.+?))?\s+RETURN\s+(.+?)"
+    r"(?:\s+ORDER\s+BY\s+(.+?))?(?:\s+LIMIT\s+(\d+))?;?$",
+    re.IGNORECASE
+)
+_PROPERTY_PATTERN = re.compile(r"(\w+)\s*:\s*'([^']*)'")
+_CONDITION_PATTERN = re.compile(
+    r"^(\w+)\.(\w+)\s+(?:(IS\s+NOT\s+NULL)|(IS\s+NULL)|(=|<>|CONTAINS)\s+'([^']*)')$",
+    re.IGNORECASE
+)
+_AGGREGATE_PATTERN = re.compile(r"^count\((\*|\w+)\)$", re.IGNORECASE)
+
+
+class InMemoryGraph:
+    """전처리 CSV로 만든 메모리 그래프"""
+
+    def __init__(self, nodes: Dict[str, Dict[str, Any]], relationships: List[Tuple[str, str, str, Dict[str, Any]]]):
+        self.nodes = nodes
+        self.by_label: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for node in nodes.values():
+            self.by_label[node["type"]].append(node)
+        self.by_type: Dict[str, List[Tuple[Dict, Dict, Dict]]] = defaultdict(list)
+        self._write_lock = threading.Lock()
+        for from_id, to_id, rel_type, props in relationships:
+            if from_id in nodes and to_id in nodes:
+                self.by_type[rel_type].append((nodes[from_id], nodes[to_id], props))
+
+    @classmethod
+    def from_csv(cls, data_dir: str = PROCESSED_DATA_DIR) -> "InMemoryGraph":
+        node_df = pd.read_csv(os.path.join(data_dir, NODES_FILE), encoding="utf-8-sig", low_memory=False)
+        rel_df = pd.read_csv(os.path.join(data_dir, RELATIONSHIPS_FILE), encoding="utf-8-sig", low_memory=False)
+        nodes = {}
+        for row in node_df.to_dict("records"):
+            node = {k: v for k, v in row.items() if not _is_missing(v)}
+            if node["type"] in POINT_LABELS and "lat" in node and "lon" in node:
+                node[LOCATION_PROPERTY] = {"latitude": float(node["lat"]), "longitude": float(node["lon"])}
+            nodes[row["id"]] = node
+        relationships = []
+        rel_props = [c for c in rel_df.columns if c not in ("from_id", "from_type", "to_id", "to_type", "relationship_type")]
+        for row in rel_df.to_dict("records"):
+            props = {k: row[k] for k in rel_props if not _is_missing(row[k])}
+            relationships.append((row["from_id"], row["to_id"], row["relationship_type"], props))
+        return cls(nodes, relationships)
+
+    @property
+    def regions(self) -> List[str]:
+        return sorted({n["gu"] for n in self.by_label.get("Admin", []) if n.get("gu")})
+
+    @property
+    def hazards(self) -> List[str]:
+        return sorted({n["hazard_type"] for n in self.by_label.get("Hazard", []) if n.get("hazard_type")})
+
+    def run(self, query: str) -> Result:
+        query = " ".join(query.split())
+        if query.upper() == "CALL DB.LABELS()":
+            return Result(Record(label=label) for label in sorted(self.by_label))
+        if query.upper() == "CALL DB.RELATIONSHIPTYPES()":
+            return Result(Record(relationshipType=t) for t in sorted(self.by_type))
+
+        match = _MATCH_PATTERN.match(query)
+        if not match:
+            raise FakeCypherError(f"지원하지 않는 Cypher: {query[:200]}")
+        (a_var, a_label, a_props, r_var, r_type, b_var, b_label, b_props,
+         where, returns, order_by, limit) = match.groups()
+
+        rows = self._match(a_var, a_label, a_props, r_var, r_type, b_var, b_label, b_props)
+        if where:
+            conditions = [self._parse_condition(c) for c in re.split(r"\s+AND\s+", where, flags=re.IGNORECASE)]
+            rows = [row for row in rows if all(cond(row) for cond in conditions)]
+
+        records = self._project(rows, returns)
+        if order_by:
+            records = self._order(records, order_by)
+        if limit:
+            records = records[:int(limit)]
+        return Result(records)
+
+    def nearby(self, labels: List[str], lat: float, lon: float, radius_m: float, k: int,
+               min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> Result:
+        """rag_service.nearby_facilities_query와 같은 결과 (bounding box -> 거리 -> 상위 k개)"""
+        candidates = [
+            node for label in labels for node in self.by_label.get(label, [])
+            if LOCATION_PROPERTY in node
+            and min_lat <= node["lat"] <= max_lat and min_lon <= node["lon"] <= max_lon
+        ]
+        if not candidates:
+            return Result()
+        distances = haversine_km(
+            lat, lon, np.array([n["lat"] for n in candidates]), np.array([n["lon"] for n in candidates])
+        ) * 1000
+        order = [i for i in np.argsort(distances, kind="stable") if distances[i] <= radius_m][:int(k)]
+        return Result(
+            Record(
+                id=candidates[i]["id"], name=candidates[i].get("name"), address=candidates[i].get("address"),
+                shelter_type=candidates[i].get("shelter_type"), label=candidates[i]["type"],
+                lat=candidates[i]["lat"], lon=candidates[i]["lon"], distance=float(distances[i])
+            )
+            for i in order
+        )
+
+    def upsert_event(self, relationship_type: str, id: str, properties: Dict[str, Any], hazard: str,
+                     hazard_id: str, relationship: Dict[str, Any]) -> Result:
+        """rag_service.upsert_event와 같은 결과 (Event MERGE 후 Hazard 관계 재연결)"""
+        with self._write_lock:
+            node = self.nodes.get(id)
+            if node is None:
+                node = self.nodes[id] = {"id": id, "type": "Event"}
+                self.by_label["Event"].append(node)
+            for key, value in properties.items():
+                if value is None:
+                    node.pop(key, None)
+                else:
+                    node[key] = value
+            for rel_type in ("UPDATES", "TRIGGERS"):
+                self.by_type[rel_type] = [rel for rel in self.by_type[rel_type] if rel[0] is not node]
+            target = next((n for n in self.by_label["Hazard"] if n.get("hazard_type") == hazard), None)
+            if target is None:
+                target = self.nodes[hazard_id] = {"id": hazard_id, "type": "Hazard", "hazard_type": hazard, "name": hazard}
+                self.by_label["Hazard"].append(target)
+            self.by_type[relationship_type].append((node, target, dict(relationship)))
+        return Result()
+
+    def events(self, since: float) -> Result:
+        """rag_service.fetch_events와 같은 결과"""
+        hazards = {
+            rel[0]["id"]: rel[1].get("hazard_type")
+            for rel_type in ("UPDATES", "TRIGGERS") for rel in self.by_type.get(rel_type, [])
+        }
+        rows = [
+            Record(
+                event_id=node["id"], event_type=node.get("event_type"), name=node.get("name"),
+                severity=node.get("severity"), hazard=node.get("hazard") or hazards.get(node["id"]),
+                lat=node.get("lat"), lon=node.get("lon"), radius_km=node.get("radius_km"),
+                polygon=node.get("polygon"), active=node.get("active", True),
+                ingested_at=float(node.get("ingested_at", 0.0))
+            )
+            for node in self.by_label.get("Event", []) if float(node.get("ingested_at", 0.0)) > since
+        ]
+        return Result(sorted(rows, key=lambda row: row["ingested_at"]))
+
+    def _match(self, a_var, a_label, a_props, r_var, r_type, b_var, b_label, b_props) -> List[Dict[str, Any]]:
+        a_filter = dict(_PROPERTY_PATTERN.findall(a_props or ""))
+        if b_var is None:  # 관계 패턴이 없는 단일 노드 MATCH
+            candidates = self.by_label.get(a_label, []) if a_label else self.nodes.values()
+            return [{a_var: n} for n in candidates if _matches(n, a_label, a_filter)]
+
+        b_filter = dict(_PROPERTY_PATTERN.findall(b_props or ""))
+        triples = self.by_type.get(r_type, []) if r_type else [t for ts in self.by_type.values() for t in ts]
+        rows = []
+        for start, end, props in triples:
+            if _matches(start, a_label, a_filter) and _matches(end, b_label, b_filter):
+                rows.append({a_var: start, r_var: props, b_var: end})
+        return rows
+
+    @staticmethod
+    def _parse_condition(text: str):
+        match = _CONDITION_PATTERN.match(text.strip())
+        if not match:
+            raise FakeCypherError(f"지원하지 않는 WHERE 조건: {text}")
+        var, prop, not_null, is_null, op, value = match.groups()
+        if not_null:
+            return lambda row: row[var].get(prop) is not None
+        if is_null:
+            return lambda row: row[var].get(prop) is None
+        op = op.upper()
+        if op == "=":
+            return lambda row: str(row[var].get(prop)) == value
+        if op == "<>":
+            return lambda row: row[var].get(prop) is not None and str(row[var].get(prop)) != value
+        return lambda row: value in str(row[var].get(prop) or "")
+
+    @staticmethod
+    def _project(rows: List[Dict[str, Any]], returns: str) -> List[Record]:
+        columns = []
+        for item in returns.split(","):
+            parts = re.split(r"\s+AS\s+", item.strip(), flags=re.IGNORECASE)
+            columns.append((parts[0].strip(), parts[-1].strip()))
+
+        def evaluate(expr: str, row: Dict[str, Any]) -> Any:
+            if expr.lower().startswith("keys(") and expr.endswith(")"):
+                return list(row[expr[5:-1]].keys())
+            if "." in expr:
+                var, prop = expr.split(".", 1)
+                if var not in row:
+                    raise FakeCypherError(f"정의되지 않은 변수: {var}")
+                return row[var].get(prop)
+            if expr not in row:
+                raise FakeCypherError(f"지원하지 않는 RETURN 식: {expr}")
+            return dict(row[expr])
+
+        aggregates = {alias: _AGGREGATE_PATTERN.match(expr) for expr, alias in columns}
+        if not any(aggregates.values()):
+            return [Record((alias, evaluate(expr, row)) for expr, alias in columns) for row in rows]
+
+        # count()가 있으면 나머지 컬럼으로 그룹화
+        keys = [(expr, alias) for expr, alias in columns if not aggregates[alias]]
+        groups: Dict[tuple, int] = defaultdict(int)
+        for row in rows:
+            groups[tuple(_hashable(evaluate(expr, row)) for expr, _ in keys)] += 1
+        if not groups and not keys:
+            groups[()] = 0
+        records = []
+        for group, count in groups.items():
+            values = dict(zip((alias for _, alias in keys), group))
+            records.append(Record(
+                (alias, count if aggregates[alias] else values[alias]) for _, alias in columns
+            ))
+        return records
+
+    @staticmethod
+    def _order(records: List[Record], order_by: str) -> List[Record]:
+        for item in reversed(order_by.split(",")):
+            parts = item.strip().split()
+            column, descending = parts[0], len(parts) > 1 and parts[1].upper() == "DESC"
+            if records and column not in records[0]:
+                raise FakeCypherError(f"ORDER BY는 RETURN 컬럼만 지원: {column}")
+            present = [r for r in records if r.get(column) is not None]
+            missing = [r for r in records if r.get(column) is None]
+            records = sorted(present, key=lambda r: r[column], reverse=descending) + missing
+        return records
+
+
+def split_text(text: str, chunk_size: int, overlap: int) -> List[str]:
+    """고정 크기 분할 (겹침 포함, 가능하면 문장/줄 경계에서 자름)"""
+    if len(text) <= chunk_size:
+        return [text]
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = start + chunk_size
+        if end < len(text):
+            boundary = max(text.rfind(".", start, end), text.rfind("\n", start, end))
+            if boundary > start + chunk_size // 2:
+                end = boundary + 1
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and np.isnan(value)) or value == ""
+
+
+def _matches(node: Dict[str, Any], label: Optional[str], props: Dict[str, str]) -> bool:
+    if label and node["type"] != label:
+        return False
+    return all(str(node.get(k)) == v for k, v in props.items())
+
+
+def _hashable(value: Any) -> Any:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True) if isinstance(value, (dict, list)) else value
+
+
+class FakeSession:
+    def __init__(self, graph: InMemoryGraph, latency: LatencyProfile):
+        self.graph = graph
+        self.latency = latency
+
+    def run(self, query: Any, parameters: Optional[dict] = None, **kwargs) -> Result:
+        """neo4j.Query(타임아웃)와 $파라미터를 받아 메모리 그래프에서 실행
+
+        EXPLAIN/PROFILE은 실제로 실행한 결과 행 수를 예상 행 수/db hits로 돌려주고,
+        주변 시설 point 쿼리(point.withinBBox)는 파라미터로 직접 계산합니다.
+        """
+        self.latency.sleep(self.latency.neo4j_ms)
+        parameters = {**(parameters or {}), **kwargs}
+        text = getattr(query, "text", query).lstrip()
+        prefix = text.split(None, 1)[0].upper() if text else ""
+        if prefix in ("EXPLAIN", "PROFILE"):
+            text = text[len(prefix):].lstrip()
+
+        if "point.withinBBox" in text:
+            rows = self.graph.nearby(re.findall(r"MATCH \(n:(\w+)\)", text), **parameters)
+        elif "MERGE (e:Event" in text:
+            rows = self.graph.upsert_event(re.search(r"MERGE \(e\)-\[r:(\w+)\]", text).group(1), **parameters)
+        elif "MATCH (e:Event)" in text and "$since" in text:
+            rows = self.graph.events(float(parameters["since"]))
+        elif text.upper().startswith("SHOW INDEXES"):
+            # 메모리 그래프는 graph_schema가 준비한 상태로 간주
+            rows = Result(
+                Record(type=kind, labelsOrTypes=[label], properties=[prop], state="ONLINE")
+                for label, prop, kind in expected_indexes()
+            )
+        else:
+            for name, value in parameters.items():
+                text = text.replace(f"${name}", "'" + str(value).replace("'", "") + "'")
+            rows = self.graph.run(text)
+
+        if prefix == "EXPLAIN":
+            return Result(plan={"operatorType": "ProduceResults@neo4j", "args": {"EstimatedRows": float(len(rows))}, "children": []})
+        if prefix == "PROFILE":
+            return Result(rows, profile={"operatorType": "ProduceResults@neo4j", "dbHits": len(rows), "rows": len(rows), "children": []})
+        return rows
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeDriver:
+    """neo4j.Driver 대체"""
+
+    def __init__(self, graph: InMemoryGraph, latency: LatencyProfile):
+        self.graph = graph
+        self.latency = latency
+
+    def session(self, **kwargs) -> FakeSession:
+        return FakeSession(self.graph, self.latency)
+
+    def verify_connectivity(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Chroma
+# ---------------------------------------------------------------------------
+
+class InMemoryCollection:
+    """chromadb Collection 대체 (코사인 거리, 전수 검색)"""
+
+    def __init__(self, name: str, latency: Optional[LatencyProfile] = None):
+        self.name = name
+        self.latency = latency
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self._vectors = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+
+    @classmethod
+    def from_guidelines(
+        cls,
+        data_dir: str = PROCESSED_DATA_DIR,
+        latency: Optional[LatencyProfile] = None,
+        chunk_size: int = 500,
+        overlap: int = 100
+    ) -> "InMemoryCollection":
+        """전처리 CSV의 섹션을 파일별로 합친 뒤 chunk_size 문자 단위로 분할하여 적재"""
+        collection = cls("disaster_docs", latency)
+        docs = pd.read_csv(os.path.join(data_dir, GUIDELINES_FILE)).dropna(subset=["content"])
+        ids, documents, metadatas = [], [], []
+        for file_name, group in docs.groupby("file_name", sort=False):
+            text = "\n\n".join(group["content"].astype(str))
+            chunks = split_text(text, chunk_size, overlap)
+            for i, chunk in enumerate(chunks):
+                ids.append(f"{file_name}_chunk_{i}")
+                documents.append(chunk)
+                metadatas.append({
+                    "source": f"{file_name}.md",
+                    "disaster_type": group["disaster_type"].iloc[0],
+                    "chunk_index": i,
+                    "chunk_count": len(chunks)
+                })
+        collection.add(ids, documents, [hashed_embedding(text) for text in documents], metadatas)
+        return collection
+
+    def add(self, ids: List[str], documents: List[str], embeddings: List[List[float]], metadatas: Optional[List[dict]] = None) -> None:
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self._vectors = np.vstack([self._vectors, vectors / np.where(norms > 0, norms, 1)])
+        self.ids.extend(ids)
+        self.documents.extend(documents)
+        self.metadatas.extend(metadatas or [{} for _ in ids])
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def get(self, **kwargs) -> Dict[str, List[Any]]:
+        return {"ids": list(self.ids), "documents": list(self.documents), "metadatas": list(self.metadatas)}
+
+    def query(self, query_embeddings: List[List[float]], n_results: int = 10, **kwargs) -> Dict[str, List[List[Any]]]:
+        if self.latency:
+            self.latency.sleep(self.latency.chroma_ms)
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for embedding in query_embeddings:
+            query = np.asarray(embedding, dtype=np.float32)
+            norm = np.linalg.norm(query)
+            distances = 1 - self._vectors @ (query / norm if norm > 0 else query)
+            k = min(n_results, len(distances))
+            top = np.argpartition(distances, k - 1)[:k] if k else np.empty(0, dtype=np.int64)
+            top = top[np.argsort(distances[top], kind="stable")]
+            result["ids"].append([self.ids[i] for i in top])
+            result["documents"].append([self.documents[i] for i in top])
+            result["metadatas"].append([self.metadatas[i] for i in top])
+            result["distances"].append([float(distances[i]) for i in top])
+        return result
+
+
+class FakeChromaClient:
+    """chromadb.PersistentClient / HttpClient 대체"""
+
+    def __init__(self, collections: Dict[str, InMemoryCollection], latency: LatencyProfile, *args, **kwargs):
+        self.collections = collections
+        self.latency = latency
+
+    def get_collection(self, name: str, **kwargs) -> InMemoryCollection:
+        if name not in self.collections:
+            raise ValueError(f"Collection {name} does not exist.")
+        return self.collections[name]
+
+    def create_collection(self, name: str, **kwargs) -> InMemoryCollection:
+        self.collections[name] = InMemoryCollection(name, self.latency)
+        return self.collections[name]
+
+    def get_or_create_collection(self, name: str, **kwargs) -> InMemoryCollection:
+        return self.collections.get(name) or self.create_collection(name)
+
+
+# ---------------------------------------------------------------------------
+# Gemini
+# ---------------------------------------------------------------------------
+
+def _section(prompt: str, header: str) -> str:
+    """프롬프트에서 header 다음 줄부터 빈 줄 전까지"""
+    start = prompt.find(header)
+    if start < 0:
+        return ""
+    body = prompt[start + len(header):].lstrip("\n")
+    return body.split("\n\n", 1)[0].strip()
+
+
+def _estimate_tokens(text: str) -> int:
+    """토큰 수 근사 (한국어 위주 텍스트 기준 약 2자당 1토큰)"""
+    return max(1, len(text) // 2)
+
+
+class _FakeModels:
+    def __init__(self, latency: LatencyProfile, regions: List[str], hazards: List[str]):
+        self.latency = latency
+        self.regions = regions
+        self.hazards = hazards
+
+    def generate_content(self, model: str, contents: Any, **kwargs) -> SimpleNamespace:
+        self.latency.sleep(self.latency.llm_ms)
+        prompt = contents if isinstance(contents, str) else str(contents)
+        if "Cypher 쿼리 전문가" in prompt:
+            text = self._cypher(_section(prompt, "# 사용자 질문:"))
+        elif prompt.startswith("재난대응 검색 계획 전문가"):
+            text = json.dumps(self._plan(_section(prompt, "사용자 질문:"), "사용자 위치 정보" in prompt), ensure_ascii=False)
+        elif "재난대응 정보 분석 전문가" in prompt:
+            text = json.dumps(self._analysis(_section(prompt, "사용자 입력:")), ensure_ascii=False)
+        elif '"conclusion"' in prompt:
+            text = json.dumps(self._advice(_section(prompt, "사용자 입력:")), ensure_ascii=False)
+        else:
+            text = "재난 유형과 사용자 위치, 이미 안내된 대피소와 행동요령을 요약한 문장입니다."
+        return SimpleNamespace(text=text, usage_metadata=SimpleNamespace(
+            prompt_token_count=_estimate_tokens(prompt),
+            candidates_token_count=_estimate_tokens(text)
+        ))
+
+    def embed_content(self, model: str, contents: Any, config: Any = None, **kwargs) -> SimpleNamespace:
+        self.latency.sleep(self.latency.embed_ms)
+        texts = [contents] if isinstance(contents, str) else list(contents)
+        dim = getattr(config, "output_dimensionality", None) or EMBEDDING_DIM
+        return SimpleNamespace(embeddings=[SimpleNamespace(values=hashed_embedding(t, dim)) for t in texts])
+
+    def _region(self, question: str) -> Optional[str]:
+        return next((r for r in self.regions if r in question), None)
+
+    def _hazard(self, question: str) -> Optional[str]:
+        return next((h for h in self.hazards if h in question), None) or detect_hazard(question)
+
+    def _cypher(self, question: str) -> str:
+        """생성 프롬프트의 예시와 같은 형태의 Cypher 템플릿"""
+        region = self._region(question)
+        admin = f"(a:Admin {{gu: '{region}'}})" if region else "(a:Admin)"
+        if "유발" in question:
+            return "MATCH (h1:Hazard)-[:TRIGGERS]->(h2:Hazard) RETURN h1.name, h2.name"
+        if "증가" in question:
+            return "MATCH (h1:Hazard)-[:INCREASES_RISK_OF]->(h2:Hazard) RETURN h1.name, h2.name"
+        if "몇 개" in question or "개수" in question:
+            return f"MATCH (s:Shelter)-[:IN]->{admin} RETURN count(s)"
+        if "임시주거" in question:
+            return f"MATCH (t:TemporaryHousing)-[:IN]->{admin} RETURN t.name, t.address, t.lat, t.lon LIMIT 10"
+        if "가장 큰" in question:
+            return f"MATCH (s:Shelter)-[:IN]->{admin} RETURN s.name, s.address, s.area ORDER BY s.area DESC LIMIT 5"
+        if "대피소" in question or "시설" in question:
+            return f"MATCH (s:Shelter)-[:IN]->{admin} RETURN s.name, s.address, s.shelter_type, s.lat, s.lon LIMIT 10"
+        hazard = self._hazard(question)
+        hazard_filter = f" {{hazard_type: '{hazard}'}}" if hazard in self.hazards else ""
+        return f"MATCH (p:Policy)-[:GUIDES]->(h:Hazard{hazard_filter}) RETURN p.name, p.content LIMIT 5"
+
+    def _plan(self, question: str, has_location: bool) -> Dict[str, Any]:
+        region = self._region(question)
+        hazard = self._hazard(question)
+        wants_shelter = any(word in question for word in ("대피소", "시설", "어디", "알려주세요", "찾고 싶어요"))
+        sub_problems = [{
+            "id": 1,
+            "question": question,
+            "graph_search": {
+                "target_nodes": ["Shelter", "Admin"] if wants_shelter else ["Policy", "Hazard"],
+                "target_relations": ["IN"] if wants_shelter else ["GUIDES"],
+                "query_intent": "대피소 위치 검색" if wants_shelter else "재난 행동요령 검색",
+                "region_filter": region,
+                "location_based": has_location
+            },
+            "vector_search": {
+                "keywords": [k for k in (hazard, "대피소" if wants_shelter else "행동요령") if k],
+                "focus": f"{hazard or '재난'} 관련 문서",
+                "top_k": 3
+            }
+        }]
+        if has_location and not wants_shelter:
+            sub_problems.append({
+                "id": 2,
+                "question": "현재 위치 주변 대피소 찾기",
+                "graph_search": {
+                    "target_nodes": ["Shelter", "Admin"],
+                    "target_relations": ["IN"],
+                    "query_intent": "위치 기반 대피소 검색",
+                    "location_based": True
+                },
+                "vector_search": {"keywords": ["대피소", "위치"], "focus": "대피소 관련 문서", "top_k": 3}
+            })
+        return {
+            "sub_problems": sub_problems,
+            "overall_strategy": {"approach": "서브 문제별 Graph/Vector 검색", "priority": [sp["id"] for sp in sub_problems]},
+            "instructions": "대피소 정보와 행동요령을 함께 확인"
+        }
+
+    @staticmethod
+    def _analysis(question: str) -> Dict[str, Any]:
+        return {
+            "key_findings": [f"'{question[:40]}' 관련 검색 결과를 확인했습니다."],
+            "shelters": [],
+            "guidelines": [],
+            "risks": [],
+            "reasoning": "Graph RAG와 Vector RAG 검색 결과를 종합하여 분석했습니다."
+        }
+
+    @staticmethod
+    def _advice(question: str) -> Dict[str, Any]:
+        return {
+            "conclusion": f"'{question[:40]}'에 대해 검색된 대피소와 행동요령 정보를 관찰했습니다.",
+            "evidence": "1. Graph RAG에서 관찰한 정보: 대피소/정책 노드\n2. Vector RAG에서 관찰한 정보: 국민행동요령 문서\n3. 추론 과정: 두 결과를 연결"
+        }
+
+
+class FakeGenaiClient:
+    """google.genai.Client 대체"""
+
+    def __init__(self, latency: LatencyProfile, regions: List[str], hazards: List[str], *args, **kwargs):
+        self.models = _FakeModels(latency, regions, hazards)
+
+
+def install(latency: LatencyProfile, data_dir: str = PROCESSED_DATA_DIR) -> InMemoryGraph:
+    """genai.Client, Neo4j 드라이버, Chroma 클라이언트를 로컬 대체 구현으로 교체
+
+    Orchestrator(및 api 모듈)를 import/생성하기 전에 호출해야 합니다.
+    """
+    import chromadb
+    from google import genai
+    from services import rag_service
+
+    graph = InMemoryGraph.from_csv(data_dir)
+    collections = {"disaster_docs": InMemoryCollection.from_guidelines(data_dir, latency)}
+
+    genai.Client = partial(FakeGenaiClient, latency, graph.regions, graph.hazards)
+    rag_service.GraphDatabase = SimpleNamespace(driver=lambda *args, **kwargs: FakeDriver(graph, latency))
+    chromadb.PersistentClient = chromadb.HttpClient = partial(FakeChromaClient, collections, latency)
+    return graph
@@ -0,0 +1,363 @@
+"""/chat 부하 시나리오 (오프라인 대체 구현 사용)
+
+실제 재난 상황의 트래픽 형태를 재현하여 /chat에 개방형(open-loop) 부하를 겁니다.
+도착 시각은 seed로 고정되므로 같은 옵션이면 같은 트래픽이 재생됩니다.
+
+시나리오:
+- alert_burst: 재난 문자 직후 같은(또는 거의 같은) 질문이 짧은 시간에 몰리는 경우
+- shelter_search: 서울 전역 좌표에서 주변 대피소를 찾는 요청이 꾸준히 들어오는 경우
+- multi_turn: 같은 대화(conversation_id)에서 후속 질문이 이어지는 경우
+- mixed: 위 세 가지를 동시에
+
+측정 항목: 시나리오별 지연 시간 분포와 상태 코드/오류율, 로컬 답변 대체 건수, 이벤트 루프 지연,
+대화 저장소 증가량, RSS 및 admission 대기열 시계열, 단계별 지연 시간.
+
+사용법 (sense-backend 디렉터리에서):
+    python -m benchmarks.load --scenario alert_burst --burst 200
+    python -m benchmarks.load --scenario mixed --duration 60 --rate 4 --max-in-flight 8 --max-queue 32
+"""
+import os
+import time
+import random
+import asyncio
+import argparse
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from benchmarks.run import (
+    StageRecorder, add_latency_arguments, install_stand_ins, latency_config,
+    peak_rss_mb, report_header, summarize, write_report
+)
+
+logger = logging.getLogger(__name__)
+
+SCENARIOS = ["alert_burst", "shelter_search", "multi_turn", "mixed"]
+
+# 재난 문자 직후 몰리는 질문 (대부분 동일 문장, 일부는 표현만 다름)
+ALERT_QUESTION = "지진 발생 시 어떻게 행동해야 하나요?"
+ALERT_VARIANTS = [
+    "지진이 났어요 어떻게 해야 하나요?",
+    "지진 발생했는데 어떻게 행동해야 하나요?",
+    "지진 행동요령 알려주세요",
+]
+
+SHELTER_QUESTIONS = [
+    "가까운 대피소를 알려주세요.",
+    "지진이 발생했을 때 가까운 대피소를 찾고 싶어요.",
+    "근처 임시주거시설은 어디에 있나요?",
+    "지금 위치에서 가장 가까운 옥외대피소는 어디인가요?",
+]
+
+CONVERSATION_SCRIPTS = [
+    ["지진이 났어요. 어떻게 해야 하나요?", "가까운 대피소는 어디인가요?", "할머니와 함께 있는데 계단으로 내려가도 되나요?"],
+    ["공습경보가 발령되면 어떻게 해야 하나요?", "근처 대피소를 알려주세요.", "아이와 함께 가려면 무엇을 챙겨야 하나요?"],
+    ["비가 많이 와서 집 앞에 물이 차고 있어요.", "대피해야 하나요?", "가까운 임시주거시설은 어디인가요?", "차를 가지고 가도 되나요?"],
+]
+
+# 서울시 대략적인 범위 (좌표 균등 추출)
+SEOUL_BOUNDS = {"lat": (37.46, 37.68), "lon": (126.84, 127.16)}
+
+
+@dataclass
+class Session:
+    """사용자 한 명의 요청 흐름 (턴이 여러 개면 같은 conversation_id로 순차 전송)"""
+    kind: str
+    start: float  # 시작 시각 (초, 부하 시작 기준)
+    turns: List[Dict[str, Any]]
+    think_time: float = 0.0  # 턴 사이 대기 (초)
+
+
+@dataclass
+class LoadStats:
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    outcomes: Dict[str, Dict[str, int]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(int)))
+    start_delays: List[float] = field(default_factory=list)  # 예정 시각 대비 실제 전송 지연
+
+
+def _random_location(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "lat": round(rng.uniform(*SEOUL_BOUNDS["lat"]), 5),
+        "lon": round(rng.uniform(*SEOUL_BOUNDS["lon"]), 5),
+        "floor": rng.choice([1, 1, 2, 3, 5, 10, 15])
+    }
+
+
+def _poisson_times(rng: random.Random, rate: float, duration: float) -> List[float]:
+    """초당 rate건의 포아송 도착 시각"""
+    times, now = [], 0.0
+    if rate <= 0:
+        return times
+    while True:
+        now += rng.expovariate(rate)
+        if now >= duration:
+            return times
+        times.append(now)
+
+
+def alert_burst(rng: random.Random, args: argparse.Namespace) -> List[Session]:
+    """burst_window초 안에 burst건 도착, variant_ratio만큼 표현이 다른 질문, 절반은 좌표 포함"""
+    sessions = []
+    for _ in range(args.burst):
+        message = rng.choice(ALERT_VARIANTS) if rng.random() < args.variant_ratio else ALERT_QUESTION
+        user_info = _random_location(rng) if rng.random() < 0.5 else None
+        sessions.append(Session("alert_burst", rng.uniform(0, args.burst_window), [{"message": message, "user_info": user_info}]))
+    return sessions
+
+
+def shelter_search(rng: random.Random, args: argparse.Namespace) -> List[Session]:
+    return [
+        Session("shelter_search", t, [{"message": rng.choice(SHELTER_QUESTIONS), "user_info": _random_location(rng)}])
+        for t in _poisson_times(rng, args.rate, args.duration)
+    ]
+
+
+def multi_turn(rng: random.Random, args: argparse.Namespace) -> List[Session]:
+    sessions = []
+    for t in _poisson_times(rng, args.conversation_rate, args.duration):
+        user_info = _random_location(rng) if rng.random() < 0.7 else None
+        script = rng.choice(CONVERSATION_SCRIPTS)
+        turns = [{"message": message, "user_info": user_info} for message in script]
+        sessions.append(Session("multi_turn", t, turns, think_time=args.think_time))
+    return sessions
+
+
+def build_sessions(args: argparse.Namespace) -> List[Session]:
+    rng = random.Random(args.seed)
+    if args.scenario == "mixed":
+        sessions = alert_burst(rng, args) + shelter_search(rng, args) + multi_turn(rng, args)
+    else:
+        sessions = globals()[args.scenario](rng, args)
+    return sorted(sessions, key=lambda s: s.start)
+
+
+async def _monitor_loop_lag(interval: float, lags: List[float], stop: asyncio.Event) -> None:
+    """interval마다 깨어나며 예정보다 늦게 깨어난 시간(ms)을 기록"""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, (time.perf_counter() - expected) * 1000))
+
+
+def _current_rss_mb() -> float:
+    """현재 RSS (MB). /proc이 없는 환경에서는 최대 RSS로 대체"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def _conversation_footprint(store) -> Dict[str, int]:
+    """대화 저장소 크기 (메모리 저장소는 메시지 수와 본문 바이트까지)"""
+    footprint = {"conversations": store.size()}
+    conversations = getattr(store, "_conversations", None)
+    if conversations is not None:
+        with store._lock:
+            messages = [m for _, stored in conversations.values() for m in stored]
+        footprint["messages"] = len(messages)
+        footprint["content_bytes"] = sum(len(m.get("content", "").encode("utf-8")) for m in messages)
+    return footprint
+
+
+async def _sample(api, started: float, interval: float, timeline: List[Dict[str, Any]], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        timeline.append({
+            "t": round(time.perf_counter() - started, 2),
+            "rss_mb": _current_rss_mb(),
+            "in_flight": api.admission.in_flight,
+            "queue_depth": api.admission.queue_depth,
+            **_conversation_footprint(api.conversation_store)
+        })
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def _outcome(response) -> str:
+    """응답 분류: HTTP 상태 코드, 200이지만 로컬 답변으로 대체된 경우 local:<reason>"""
+    if response.status_code != 200:
+        return str(response.status_code)
+    explanation = response.json().get("explanation") or {}
+    if explanation.get("mode") == "local":
+        return f"local:{explanation.get('reason') or 'requested'}"
+    return "200"
+
+
+async def _run_session(client, session: Session, started: float, stats: LoadStats) -> None:
+    scheduled = started + session.start
+    if scheduled > time.perf_counter():
+        await asyncio.sleep(scheduled - time.perf_counter())
+    stats.start_delays.append(max(0.0, time.perf_counter() - scheduled) * 1000)
+
+    conversation_id = None
+    for index, turn in enumerate(session.turns):
+        if index and session.think_time:
+            await asyncio.sleep(session.think_time)
+        payload = dict(turn, conversation_id=conversation_id)
+        begin = time.perf_counter()
+        try:
+            response = await client.post("/chat", json=payload)
+            outcome = _outcome(response)
+            if response.status_code == 200:
+                conversation_id = response.json().get("conversation_id")
+        except Exception as e:
+            outcome = type(e).__name__
+        stats.latencies[session.kind].append((time.perf_counter() - begin) * 1000)
+        stats.outcomes[session.kind][outcome] += 1
+        if conversation_id is None:
+            # 첫 턴이 실패하면 후속 질문은 보내지 않음
+            break
+
+
+async def run_load(args: argparse.Namespace, recorder: StageRecorder) -> Dict[str, Any]:
+    import httpx
+    import api
+
+    sessions = build_sessions(args)
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://load", timeout=None)
+
+    # 로컬 답변 인덱스 등 첫 호출 비용 제외 (API startup 이벤트는 ASGITransport에서 실행되지 않음)
+    await asyncio.to_thread(api.orchestrator.local_answer.load)
+    recorder.reset()
+
+    stats = LoadStats()
+    lags: List[float] = []
+    timeline: List[Dict[str, Any]] = []
+    stop = asyncio.Event()
+    started = time.perf_counter()
+    monitors = [
+        asyncio.create_task(_monitor_loop_lag(args.lag_interval, lags, stop)),
+        asyncio.create_task(_sample(api, started, args.sample_interval, timeline, stop)),
+    ]
+    conversations_before = _conversation_footprint(api.conversation_store)
+    rss_before = _current_rss_mb()
+
+    await asyncio.gather(*(_run_session(client, s, started, stats) for s in sessions))
+    wall_seconds = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*monitors)
+    await client.aclose()
+
+    conversations_after = _conversation_footprint(api.conversation_store)
+    scenarios = {}
+    for kind, latencies in sorted(stats.latencies.items()):
+        outcomes = dict(stats.outcomes[kind])
+        total = sum(outcomes.values())
+        errors = sum(n for o, n in outcomes.items() if o != "200" and not o.startswith("local:"))
+        scenarios[kind] = {
+            "requests": total,
+            "latency_ms": summarize(latencies),
+            "outcomes": outcomes,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "local_fallback_rate": round(
+                sum(n for o, n in outcomes.items() if o.startswith("local:")) / total, 4
+            ) if total else 0.0
+        }
+
+    total_requests = sum(s["requests"] for s in scenarios.values())
+    return {
+        "sessions": len(sessions),
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(total_requests / wall_seconds, 3) if wall_seconds else None,
+        "scenarios": scenarios,
+        "all": summarize([v for values in stats.latencies.values() for v in values]),
+        "send_delay_ms": summarize(stats.start_delays),
+        "event_loop_lag_ms": summarize(lags),
+        "conversations": {
+            "before": conversations_before,
+            "after": conversations_after,
+            "growth": {k: conversations_after[k] - conversations_before.get(k, 0) for k in conversations_after}
+        },
+        "rss_mb": {"before_run": rss_before, "after_run": _current_rss_mb(), "peak": peak_rss_mb()},
+        "stages_ms": {stage: summarize(values) for stage, values in sorted(recorder.durations.items())},
+        "timeline": timeline
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="/chat 부하 시나리오")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="mixed")
+    parser.add_argument("--duration", type=float, default=30.0, help="shelter_search/multi_turn 도착 구간 (초)")
+    parser.add_argument("--rate", type=float, default=3.0, help="shelter_search 초당 도착 수")
+    parser.add_argument("--conversation-rate", type=float, default=0.5, help="multi_turn 초당 새 대화 수")
+    parser.add_argument("--think-time", type=float, default=2.0, help="multi_turn 턴 사이 대기 (초)")
+    parser.add_argument("--burst", type=int, default=100, help="alert_burst 요청 수")
+    parser.add_argument("--burst-window", type=float, default=2.0, help="alert_burst 도착 구간 (초)")
+    parser.add_argument("--variant-ratio", type=float, default=0.2, help="alert_burst 중 표현이 다른 질문 비율")
+    parser.add_argument("--max-in-flight", type=int, help="ADMISSION_MAX_IN_FLIGHT 재정의")
+    parser.add_argument("--max-queue", type=int, help="ADMISSION_MAX_QUEUE 재정의")
+    parser.add_argument("--queue-timeout", type=float, help="ADMISSION_QUEUE_TIMEOUT_SECONDS 재정의")
+    parser.add_argument("--no-answer-cache", action="store_true", help="시맨틱 답변 캐시 끄기")
+    parser.add_argument("--lag-interval", type=float, default=0.05, help="이벤트 루프 지연 측정 주기 (초)")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="RSS/대기열/대화 수 기록 주기 (초)")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: data/benchmarks/load-<scenario>-<시각>.json)")
+    add_latency_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+
+    # api/config import 전에 설정 (admission 한도 조정으로 워커 수/대기열 크기 검증)
+    overrides = {
+        "ADMISSION_MAX_IN_FLIGHT": args.max_in_flight,
+        "ADMISSION_MAX_QUEUE": args.max_queue,
+        "ADMISSION_QUEUE_TIMEOUT_SECONDS": args.queue_timeout,
+    }
+    for name, value in overrides.items():
+        if value is not None:
+            os.environ[name] = str(value)
+    if args.no_answer_cache:
+        os.environ["ANSWER_CACHE_ENABLED"] = "false"
+    recorder = install_stand_ins(args)
+
+    from config import (
+        ADMISSION_MAX_IN_FLIGHT, ADMISSION_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT_SECONDS, ANSWER_CACHE_ENABLED
+    )
+
+    result = asyncio.run(run_load(args, recorder))
+    report = {
+        **report_header(),
+        "config": {
+            "scenario": args.scenario,
+            "duration": args.duration,
+            "rate": args.rate,
+            "conversation_rate": args.conversation_rate,
+            "think_time": args.think_time,
+            "burst": args.burst,
+            "burst_window": args.burst_window,
+            "variant_ratio": args.variant_ratio,
+            "admission": {
+                "max_in_flight": ADMISSION_MAX_IN_FLIGHT,
+                "max_queue": ADMISSION_MAX_QUEUE,
+                "queue_timeout": ADMISSION_QUEUE_TIMEOUT_SECONDS
+            },
+            "answer_cache": ANSWER_CACHE_ENABLED,
+            "latency_ms": latency_config(args),
+            "seed": args.seed
+        },
+        **result
+    }
+    output = write_report(report, args.output, f"load-{args.scenario}")
+
+    for kind, stats in report["scenarios"].items():
+        latency = stats["latency_ms"]
+        print(
+            f"[Load] {kind}: {stats['requests']}건, p50 {latency.get('p50')}ms, p95 {latency.get('p95')}ms, "
+            f"p99 {latency.get('p99')}ms, 오류율 {stats['error_rate']}, 로컬 대체 {stats['local_fallback_rate']}"
+        )
+    print(
+        f"[Load] 전체 {report['throughput_rps']} req/s, 이벤트 루프 지연 p99 "
+        f"{report['event_loop_lag_ms'].get('p99')}ms, 대화 +{report['conversations']['growth'].get('conversations')}, "
+        f"peak RSS {report['rss_mb']['peak']}MB -> {output}"
+    )
+    return report
+
+
+if __name__ == "__main__":
+    main()
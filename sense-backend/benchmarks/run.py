@@ -0,0 +1,288 @@
+"""오프라인 파이프라인 벤치마크
+
+Gemini / Neo4j / Chroma를 로컬 대체 구현(benchmarks.fakes)으로 바꾸고 Orchestrator.process 또는
+/chat을 고정 동시성으로 호출하여 단계별 지연 시간(p50/p95/p99), 처리량, 최대 RSS를 JSON으로 저장합니다.
+단계 구분은 트레이싱 span 기준입니다 (gemini.generate는 stage 속성, 나머지는 span 이름).
+
+사용법 (sense-backend 디렉터리에서):
+    python -m benchmarks.run --target orchestrator --requests 200 --concurrency 8
+    python -m benchmarks.run --target api --llm-ms 300 --output data/benchmarks/api.json
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+import resource
+import platform
+import subprocess
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# config import 전에 설정해야 하는 값 (외부 서비스 없이 실행)
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("CONVERSATION_STORE_BACKEND", "memory")
+
+import numpy as np
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider, SpanProcessor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = "data/benchmarks"
+
+# hybrid_rag_advanced.py의 시민 시나리오 테스트 질의
+QUESTIONS = [
+    "강남구에 있는 대피소는 몇 개인가요?",
+    "지진이 발생했을 때 가까운 대피소를 찾고 싶어요. 서초구 근처 대피소를 알려주세요.",
+    "임시주거시설은 어디에 있나요?",
+    "지진 발생 시 어떻게 행동해야 하나요?",
+    "공습경보가 발령되면 어떻게 해야 하나요?",
+    "서초구의 옥외대피소 중 가장 큰 시설은 어디인가요?",
+    "지진이 다른 재난을 유발할 수 있나요?",
+    "산사태 위험 지역 근처에 대피소가 있나요?",
+    "노후 시설물이 붕괴 위험을 증가시킬 수 있나요?"
+]
+
+# 좌표가 있는 요청 비율을 맞추기 위한 서울 시내 위치 (강남역, 서초역, 시청, 잠실역)
+LOCATIONS = [
+    {"lat": 37.4979, "lon": 127.0276, "floor": 3},
+    {"lat": 37.4837, "lon": 127.0324, "floor": 1},
+    {"lat": 37.5663, "lon": 126.9779, "floor": 12},
+    {"lat": 37.5133, "lon": 127.1001, "floor": 5},
+]
+
+
+class StageRecorder(SpanProcessor):
+    """종료된 span의 소요 시간을 단계별로 수집 (내보내기 큐 없이 메모리에 누적)"""
+
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+
+    def on_end(self, span) -> None:
+        stage = span.attributes.get("stage") or span.name
+        self.durations[stage].append((span.end_time - span.start_time) / 1e6)
+
+    def reset(self) -> None:
+        self.durations.clear()
+
+
+def build_requests(count: int, location_ratio: float) -> List[Dict[str, Any]]:
+    """질문 목록을 순환하며 요청 생성 (location_ratio 비율만큼 좌표 포함)"""
+    requests = []
+    for i in range(count):
+        item = {"message": QUESTIONS[i % len(QUESTIONS)], "user_info": None}
+        if int((i + 1) * location_ratio) > int(i * location_ratio):
+            item["user_info"] = LOCATIONS[i % len(LOCATIONS)]
+        requests.append(item)
+    return requests
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """지연 시간 분포 요약 (ms)"""
+    if not values:
+        return {"count": 0}
+    data = np.asarray(values)
+    p50, p95, p99 = np.percentile(data, [50, 95, 99])
+    return {
+        "count": int(len(data)),
+        "mean": round(float(data.mean()), 3),
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "max": round(float(data.max()), 3)
+    }
+
+
+def peak_rss_mb() -> float:
+    """프로세스 최대 RSS (MB, Linux는 KB 단위 / macOS는 byte 단위)"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+async def _orchestrator_caller():
+    from graph import Orchestrator
+
+    orchestrator = Orchestrator()
+
+    async def call(item: Dict[str, Any]) -> str:
+        result = await orchestrator.process(item["message"], user_info=item["user_info"])
+        return "fallback" if result["explanation"].get("advisory", {}).get("fallback") else "ok"
+
+    return call, None
+
+
+async def _api_caller():
+    import httpx
+    import api
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://benchmark", timeout=None)
+
+    async def call(item: Dict[str, Any]) -> str:
+        response = await client.post("/chat", json=item)
+        return str(response.status_code)
+
+    return call, client
+
+
+async def run_benchmark(args: argparse.Namespace, recorder: StageRecorder) -> Dict[str, Any]:
+    call, client = await (_api_caller() if args.target == "api" else _orchestrator_caller())
+
+    # 워밍업: 스키마 캐시, 로컬 인덱스 등 첫 호출 비용을 측정에서 제외
+    for item in build_requests(args.warmup, args.location_ratio):
+        await call(item)
+    recorder.reset()
+
+    requests = build_requests(args.requests, args.location_ratio)
+    latencies: List[float] = []
+    outcomes: Dict[str, int] = defaultdict(int)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def worker(item: Dict[str, Any]) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                outcome = await call(item)
+            except Exception as e:
+                outcome = type(e).__name__
+            latencies.append((time.perf_counter() - start) * 1000)
+            outcomes[outcome] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(item) for item in requests))
+    wall_seconds = time.perf_counter() - started
+
+    if client is not None:
+        await client.aclose()
+
+    return {
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(requests) / wall_seconds, 3) if wall_seconds else None,
+        "outcomes": dict(outcomes),
+        "latency_ms": {
+            "request": summarize(latencies),
+            "stages": {stage: summarize(values) for stage, values in sorted(recorder.durations.items())}
+        }
+    }
+
+
+def add_latency_arguments(parser: argparse.ArgumentParser) -> None:
+    """로컬 대체 구현의 지연 시간 옵션 (run / load 공용)"""
+    parser.add_argument("--llm-ms", type=float, default=800.0, help="Gemini 생성 호출 평균 지연")
+    parser.add_argument("--embed-ms", type=float, default=80.0, help="Gemini 임베딩 호출 평균 지연")
+    parser.add_argument("--neo4j-ms", type=float, default=5.0, help="Neo4j 쿼리 평균 지연")
+    parser.add_argument("--chroma-ms", type=float, default=10.0, help="Chroma 검색 평균 지연")
+    parser.add_argument("--jitter", type=float, default=0.2, help="지연 시간 변동 비율 (±)")
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def latency_config(args: argparse.Namespace) -> Dict[str, float]:
+    return {
+        "llm": args.llm_ms, "embed": args.embed_ms, "neo4j": args.neo4j_ms,
+        "chroma": args.chroma_ms, "jitter": args.jitter
+    }
+
+
+def install_stand_ins(args: argparse.Namespace) -> StageRecorder:
+    """외부 서비스를 로컬 대체 구현으로 바꾸고 span 수집기 등록
+
+    config를 읽는 환경변수(ANSWER_CACHE_ENABLED 등)는 이 함수 호출 전에 설정해야 합니다.
+    """
+    from benchmarks.fakes import LatencyProfile, install
+
+    install(LatencyProfile(
+        llm_ms=args.llm_ms, embed_ms=args.embed_ms, neo4j_ms=args.neo4j_ms,
+        chroma_ms=args.chroma_ms, jitter=args.jitter, seed=args.seed
+    ))
+
+    recorder = StageRecorder()
+    provider = TracerProvider()
+    provider.add_span_processor(recorder)
+    trace.set_tracer_provider(provider)
+    return recorder
+
+
+def write_report(report: Dict[str, Any], output: Optional[str], prefix: str) -> str:
+    """결과 JSON 저장 (경로가 없으면 data/benchmarks/<prefix>-<시각>.json)"""
+    output = output or os.path.join(
+        DEFAULT_OUTPUT_DIR, f"{prefix}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return output
+
+
+def report_header() -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version()
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="오프라인 파이프라인 벤치마크")
+    parser.add_argument("--target", choices=["orchestrator", "api"], default="orchestrator")
+    parser.add_argument("--requests", type=int, default=100, help="측정 요청 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 요청 수")
+    parser.add_argument("--warmup", type=int, default=len(QUESTIONS), help="측정 전 워밍업 요청 수")
+    parser.add_argument("--location-ratio", type=float, default=0.5, help="좌표가 있는 요청 비율 (0~1)")
+    parser.add_argument("--answer-cache", action="store_true", help="시맨틱 답변 캐시 사용 (기본: 끔)")
+    parser.add_argument("--output", help=f"결과 JSON 경로 (기본: {DEFAULT_OUTPUT_DIR}/<target>-<시각>.json)")
+    add_latency_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+
+    # 반복 질문이 답변 캐시에 걸리면 파이프라인을 측정하지 못하므로 기본은 끔
+    os.environ["ANSWER_CACHE_ENABLED"] = "true" if args.answer_cache else "false"
+    recorder = install_stand_ins(args)
+
+    rss_before = peak_rss_mb()
+    result = asyncio.run(run_benchmark(args, recorder))
+
+    report = {
+        **report_header(),
+        "config": {
+            "target": args.target,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "location_ratio": args.location_ratio,
+            "answer_cache": args.answer_cache,
+            "latency_ms": latency_config(args),
+            "seed": args.seed
+        },
+        **result,
+        "rss_mb": {"before_run": rss_before, "peak": peak_rss_mb()}
+    }
+    output = write_report(report, args.output, args.target)
+
+    request_stats = report["latency_ms"]["request"]
+    print(
+        f"[Benchmark] {args.target}: {args.requests}건, 동시성 {args.concurrency}, "
+        f"{report['throughput_rps']} req/s, p50 {request_stats.get('p50')}ms, "
+        f"p95 {request_stats.get('p95')}ms, p99 {request_stats.get('p99')}ms, "
+        f"peak RSS {report['rss_mb']['peak']}MB -> {output}"
+    )
+    return report
+
+
+if __name__ == "__main__":
+    main()
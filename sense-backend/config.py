@@ -21,3 +21,133 @@ GEMINI_MODEL = "gemini-2.5-flash"
 GEMINI_EMBEDDING_MODEL = "gemini-embedding-001"
 EMBEDDING_DIM = 384
 
+# API 서버 설정
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))  # 2 이상이면 Prometheus multiprocess 모드 사용
+CHAT_RESPONSE_DETAIL = os.getenv("CHAT_RESPONSE_DETAIL", "standard")  # /chat 기본 응답 상세도: minimal | standard | debug
+RESPONSE_COMPRESSION_ENABLED = os.getenv("RESPONSE_COMPRESSION_ENABLED", "true").lower() == "true"  # brotli, 미지원 클라이언트는 gzip
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1000"))  # 이보다 작은 응답은 압축하지 않음
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))  # 0~11, 높을수록 작지만 느림
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")  # /admin/* 요청의 X-Admin-Token 헤더 값 (비어 있으면 /admin/* 비활성화)
+
+# 트레이싱 설정 (OpenTelemetry)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACE_FILE_PATH = os.getenv("TRACE_FILE_PATH", "data/traces/traces-{pid}.jsonl")  # {pid}: 워커 프로세스 ID
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")  # 설정 시 파일 대신 OTLP로 전송
+
+# 대화 저장소 설정
+CONVERSATION_STORE_BACKEND = os.getenv("CONVERSATION_STORE_BACKEND", "memory")  # memory | sqlite
+CONVERSATION_DB_PATH = os.getenv("CONVERSATION_DB_PATH", "data/conversations.db")
+CONVERSATION_MAX_CONVERSATIONS = int(os.getenv("CONVERSATION_MAX_CONVERSATIONS", "10000"))
+CONVERSATION_MAX_MESSAGES = int(os.getenv("CONVERSATION_MAX_MESSAGES", "50"))  # 대화당 최대 메시지 수
+CONVERSATION_TTL_SECONDS = int(os.getenv("CONVERSATION_TTL_SECONDS", str(24 * 3600)))
+
+# 대화 히스토리 압축 설정
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", "3"))  # 그대로 유지할 최근 턴 수
+HISTORY_FOLD_BATCH_TURNS = int(os.getenv("HISTORY_FOLD_BATCH_TURNS", "2"))  # 요약에 한 번에 반영할 턴 수
+HISTORY_SUMMARY_MAX_CHARS = int(os.getenv("HISTORY_SUMMARY_MAX_CHARS", "800"))
+HISTORY_SUMMARY_CACHE_SIZE = int(os.getenv("HISTORY_SUMMARY_CACHE_SIZE", "10000"))
+
+# 데이터 버전 (그래프/문서 재적재 시 변경하면 캐시가 분리됨)
+DATA_VERSION = os.getenv("DATA_VERSION", "1")
+
+# 시맨틱 답변 캐시 설정
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))  # 코사인 유사도 임계값
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "600"))
+ANSWER_CACHE_CELL_DEG = float(os.getenv("ANSWER_CACHE_CELL_DEG", "0.01"))  # 위치 셀 크기 (약 1km)
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000"))
+
+# 전처리된 원본 데이터 (geojson/CSV, 로컬 답변 엔진 등에서 사용)
+PROCESSED_DATA_DIR = os.getenv("PROCESSED_DATA_DIR", "../data/processed")
+
+# 동시 처리 제한 (admission control)
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "8"))  # 동시에 실행할 파이프라인 수
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))  # 초과 시 503
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "3"))  # 초과 시 로컬 답변으로 대체
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "5"))
+
+# 외부 호출 결과 캐시 (질문 임베딩, 질문별 Cypher 쿼리)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+CYPHER_CACHE_SIZE = int(os.getenv("CYPHER_CACHE_SIZE", "2000"))
+
+# 검색/프롬프트 크기 (평가 하네스에서 설정별 품질/지연 비교에 사용)
+VECTOR_TOP_K = int(os.getenv("VECTOR_TOP_K", "0"))  # 0이면 PlanningAgent가 정한 서브 문제별 top_k 사용
+ADVISOR_GRAPH_MAX_CHARS = int(os.getenv("ADVISOR_GRAPH_MAX_CHARS", "2000"))  # AdvisorAgent 프롬프트의 Graph RAG 결과 길이
+ADVISOR_VECTOR_MAX_CHARS = int(os.getenv("ADVISOR_VECTOR_MAX_CHARS", "3000"))  # AdvisorAgent 프롬프트의 Vector RAG 결과 길이
+
+# 배치 처리 (/chat/batch)
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "200"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))  # 모든 배치 요청이 공유하는 동시 실행 수
+BATCH_EMBED_CHUNK = int(os.getenv("BATCH_EMBED_CHUNK", "100"))  # 임베딩 API 1회 호출당 텍스트 수
+
+# LLM 생성 Cypher 안전성/비용 검사
+CYPHER_GUARD_ENABLED = os.getenv("CYPHER_GUARD_ENABLED", "true").lower() == "true"
+CYPHER_DEFAULT_LIMIT = int(os.getenv("CYPHER_DEFAULT_LIMIT", "50"))  # LIMIT이 없는 쿼리에 붙이는 값
+CYPHER_MAX_LIMIT = int(os.getenv("CYPHER_MAX_LIMIT", "200"))  # 이보다 큰 LIMIT은 이 값으로 줄임
+CYPHER_MAX_ESTIMATED_ROWS = float(os.getenv("CYPHER_MAX_ESTIMATED_ROWS", "100000"))  # EXPLAIN 예상 행 수 상한
+CYPHER_TIMEOUT_SECONDS = float(os.getenv("CYPHER_TIMEOUT_SECONDS", "5"))  # 서버 측 트랜잭션 타임아웃 (0이면 미설정)
+CYPHER_GUARD_CACHE_SIZE = int(os.getenv("CYPHER_GUARD_CACHE_SIZE", "2000"))
+
+# 실행된 Cypher 형태(fingerprint)별 통계 / 느린 쿼리 로그
+CYPHER_SLOW_MS = float(os.getenv("CYPHER_SLOW_MS", "500"))  # 이 이상 걸린 쿼리는 WARNING 로그
+CYPHER_PROFILE_SAMPLE_RATE = float(os.getenv("CYPHER_PROFILE_SAMPLE_RATE", "0.05"))  # PROFILE로 실행해 db hits를 잴 비율 (0~1)
+CYPHER_STATS_MAX_FINGERPRINTS = int(os.getenv("CYPHER_STATS_MAX_FINGERPRINTS", "500"))
+
+# Neo4j 인덱스/제약조건 (API 시작 시 verify: 확인만, ensure: 없으면 생성, off: 건너뜀)
+GRAPH_SCHEMA_STARTUP = os.getenv("GRAPH_SCHEMA_STARTUP", "verify")
+
+# 사용자 좌표 기준 주변 시설 조회 (Neo4j location point 인덱스, 거리순 상위 k개)
+NEARBY_FACILITY_LABELS = [l.strip() for l in os.getenv("NEARBY_FACILITY_LABELS", "Shelter,TemporaryHousing").split(",") if l.strip()]
+NEARBY_RADIUS_KM = float(os.getenv("NEARBY_RADIUS_KM", "5.0"))
+NEARBY_TOP_K = int(os.getenv("NEARBY_TOP_K", "10"))
+NEARBY_SOURCE = os.getenv("NEARBY_SOURCE", "grid")  # grid: 사전 계산 격자, neo4j: location point 쿼리
+
+# 최근접 대피소 사전 계산 격자 (python -m services.shelter_grid build)
+SHELTER_GRID_DIR = os.getenv("SHELTER_GRID_DIR", "data/shelter_grid")
+SHELTER_GRID_BBOX = [float(v) for v in os.getenv("SHELTER_GRID_BBOX", "37.41,126.76,37.72,127.20").split(",")]  # 남,서,북,동 (서울)
+SHELTER_GRID_CELL_DEG = float(os.getenv("SHELTER_GRID_CELL_DEG", "0.0025"))  # 약 280m x 220m
+SHELTER_GRID_K = int(os.getenv("SHELTER_GRID_K", "16"))  # 셀·유형별 후보 수 (격자로 답할 수 있는 k 상한)
+
+# 도로망 도보 거리 (services/road_graph.py, OSM PBF 또는 LineString GeoJSON 경로, 비우면 직선 거리만 사용)
+ROAD_NETWORK_PATH = os.getenv("ROAD_NETWORK_PATH", "")
+ROAD_GRAPH_DIR = os.getenv("ROAD_GRAPH_DIR", "data/road_graph")
+ROUTE_MAX_WALK_KM = float(os.getenv("ROUTE_MAX_WALK_KM", "6.0"))  # 도로 탐색 거리 상한
+ROUTE_MAX_DETOUR = float(os.getenv("ROUTE_MAX_DETOUR", "2.5"))  # 가장 먼 목적지 직선 거리 대비 탐색 한도 배수
+ROUTE_SNAP_MAX_M = float(os.getenv("ROUTE_SNAP_MAX_M", "300"))  # 좌표를 도로 노드에 붙이는 최대 거리
+ROUTE_CACHE_SIZE = int(os.getenv("ROUTE_CACHE_SIZE", "2048"))  # 출발 노드별 결과 캐시 크기
+
+# 위험 구역 노출 확인 (services/risk_zones.py). 그래프 Zone 노드가 없으면 전처리/원본 CSV 사용
+RISK_ZONE_SOURCE_DIR = os.getenv("RISK_ZONE_SOURCE_DIR", "../data")  # 원본 CSV 디렉토리
+RISK_ZONE_RADIUS_M = {
+    key.strip(): float(value)
+    for key, value in (item.split("=") for item in os.getenv(
+        "RISK_ZONE_RADIUS_M", "casualty=300,landslide=300,collapse=200,old_facility=100,disaster_district=300"
+    ).split(",") if "=" in item)
+}  # 구역 유형별 영향 반경
+RISK_ZONE_REPORT_M = float(os.getenv("RISK_ZONE_REPORT_M", "500"))  # 사용자 위치 주변 위험 구역 보고 반경
+RISK_ZONE_PENALTY = float(os.getenv("RISK_ZONE_PENALTY", "0.5"))  # 노출된 대피소 순위 점수 감소 비율
+
+# 주변 대피소 순위 (거리/층수 기반 도달 점수, 재난 유형별 시설 적합도, 면적 가중합)
+SHELTER_RANK_WEIGHTS = {
+    key.strip(): float(value)
+    for key, value in (item.split("=") for item in os.getenv("SHELTER_RANK_WEIGHTS", "reach=0.6,type=0.25,capacity=0.15").split(",") if "=" in item)
+}
+SHELTER_RANK_CANDIDATES = int(os.getenv("SHELTER_RANK_CANDIDATES", "16"))  # 유형별로 순위를 매길 격자 후보 수
+
+# 재난 이벤트 대량 알림 매칭 (services/mass_notify.py, /admin/notify/match)
+NOTIFY_USERS_PATH = os.getenv("NOTIFY_USERS_PATH", "")  # 등록 사용자 위치 CSV(user_id,lat,lon) 또는 NPZ
+NOTIFY_CHUNK_SIZE = int(os.getenv("NOTIFY_CHUNK_SIZE", "131072"))  # 최근접 대피소 일괄 계산 단위
+
+# 재난 이벤트 실시간 수집 (services/hazard_events.py, POST /admin/events)
+EVENT_INBOX_DIR = os.getenv("EVENT_INBOX_DIR", "")  # 이벤트 JSON/JSONL 파일을 넣는 디렉터리 (비우면 API로만 수집)
+EVENT_POLL_SECONDS = float(os.getenv("EVENT_POLL_SECONDS", "5"))  # inbox 확인/다른 워커 이벤트 동기화 주기 (0이면 끔)
+
+# 모바일 오프라인 번들 (/bundle, python -m services.offline_bundle export)
+BUNDLE_DIR = os.getenv("BUNDLE_DIR", "data/bundles")
+BUNDLE_KEEP_VERSIONS = int(os.getenv("BUNDLE_KEEP_VERSIONS", "5"))  # delta를 제공할 이전 버전 수 (현재 포함)
+BUNDLE_COMPRESSION_LEVEL = int(os.getenv("BUNDLE_COMPRESSION_LEVEL", "9"))
+
+# 대피소 조회 API (/shelters/nearest, /shelters/within)
+SHELTERS_MAX_RESULTS = int(os.getenv("SHELTERS_MAX_RESULTS", "200"))  # 응답당 최대 시설 수
+SHELTERS_MAX_RADIUS_KM = float(os.getenv("SHELTERS_MAX_RADIUS_KM", "20"))
+SHELTERS_CACHE_MAX_AGE = int(os.getenv("SHELTERS_CACHE_MAX_AGE", "300"))  # Cache-Control max-age (초)
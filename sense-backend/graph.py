@@ -1,8 +1,11 @@
 """LangGraph Orchestrator - 에이전트 흐름 제어"""
-from typing import TypedDict, Annotated, Optional
+from typing import TypedDict, Annotated, Optional, Any, List, Dict
 from langgraph.graph import StateGraph, END
 import operator
 import asyncio
+import hashlib
+import logging
+import time
 
 from models import (
     ConversationState, UserInfo, PlanningResult,
@@ -11,6 +14,18 @@ from models import (
 from agents.planning_agent import PlanningAgent
 from agents.analyst_agent import AnalystAgent
 from agents.advisor_agent import AdvisorAgent
+from services.tracing import start_span, set_span_attributes
+from services.history_manager import HistoryManager
+from services.answer_cache import SemanticAnswerCache, answer_profile, location_cell
+from services.single_flight import AsyncSingleFlight
+from services.admission import (
+    AdmissionController, AdmissionRejected, AdmissionTimeout, PRIORITY_BATCH, PRIORITY_DEFAULT, PRIORITY_LOCATION
+)
+from services.local_answer import LocalAnswerEngine, detect_hazard
+from services.data_version import get_data_version
+from config import ANSWER_CACHE_ENABLED, BATCH_CONCURRENCY, NEARBY_RADIUS_KM, NEARBY_SOURCE
+
+logger = logging.getLogger(__name__)
 
 
 class State(TypedDict):
@@ -18,6 +33,7 @@ class State(TypedDict):
     messages: Annotated[list, operator.add]
     input: str
     user_info: Optional[dict]  # {"lat": float, "lon": float, "floor": int}
+    conversation_context: str  # 압축된 이전 대화 맥락 (누적 요약 + 최근 턴)
     planning: Optional[PlanningResult]
     analysis: Optional[AnalysisResult]
     advisory: Optional[AdvisoryResult]
@@ -27,10 +43,22 @@ class State(TypedDict):
 class Orchestrator:
     """Orchestrator - 에이전트 순서 보장"""
     
-    def __init__(self):
+    def __init__(self, admission: Optional[AdmissionController] = None):
         self.planning_agent = PlanningAgent()
         self.analyst_agent = AnalystAgent()
-        self.advisor_agent = AdvisorAgent()
+        # LLM 없는 로컬 답변 엔진 (정책은 그래프에서 1회 적재)
+        self.local_answer = LocalAnswerEngine(
+            policy_loader=self.analyst_agent.rag_service.fetch_policies,
+            zone_loader=self.analyst_agent.rag_service.fetch_zones
+        )
+        self.advisor_agent = AdvisorAgent(self.local_answer)
+        self.history_manager = HistoryManager()
+        self.answer_cache = SemanticAnswerCache() if ANSWER_CACHE_ENABLED else None
+        self.flights = AsyncSingleFlight("orchestrator")
+        # 파이프라인 동시 실행 제한 (None이면 제한 없음, 벤치마크/평가용)
+        self.admission = admission
+        # 모든 배치 요청(process_many)이 공유하는 동시 실행 제한
+        self.batch_limit = asyncio.Semaphore(BATCH_CONCURRENCY)
         
         # LangGraph 생성
         self.graph = self._build_graph()
@@ -56,10 +84,15 @@ class Orchestrator:
         """PlanningAgent 노드"""
         user_info = state.get("user_info")
         
-        planning_result = await self.planning_agent.plan(
-            state["input"],
-            user_info
-        )
+        with start_span("graph.planning"):
+            planning_result = await self.planning_agent.plan(
+                state["input"],
+                user_info,
+                state.get("conversation_context", "")
+            )
+            set_span_attributes(
+                sub_problem__count=len(planning_result.search_plan.get("sub_problems", []))
+            )
         
         # Explanation 업데이트
         explanation = state.get("explanation", {})
@@ -78,11 +111,16 @@ class Orchestrator:
         user_info = state.get("user_info")
         planning = state["planning"]
         
-        analysis_result = await self.analyst_agent.analyze(
-            state["input"],
-            user_info,
-            planning
-        )
+        with start_span("graph.analysis"):
+            analysis_result = await self.analyst_agent.analyze(
+                state["input"],
+                user_info,
+                planning
+            )
+            set_span_attributes(
+                graph__count=analysis_result.graph_results.get("count", 0),
+                vector__count=analysis_result.vector_results.get("count", 0)
+            )
         
         # Explanation 업데이트
         explanation = state.get("explanation", {})
@@ -103,23 +141,16 @@ class Orchestrator:
         planning = state["planning"]
         analysis = state["analysis"]
         
-        # location_info 생성 (user_info가 있는 경우)
-        location_info = None
-        if user_info:
-            location_info = {
-                "lat": user_info.get("lat"),
-                "lon": user_info.get("lon"),
-                "floor": user_info.get("floor"),
-                "radius_km": 5.0  # 기본 반경 5km
-            }
-        
-        advisory_result = await self.advisor_agent.infer(
-            state["input"],
-            None,  # profile 제거
-            planning,
-            analysis,
-            location_info
-        )
+        location_info = self._location_info(user_info)
+        
+        with start_span("graph.advisor", has_location=location_info is not None):
+            advisory_result = await self.advisor_agent.infer(
+                state["input"],
+                None,  # profile 제거
+                planning,
+                analysis,
+                location_info
+            )
         
         # Explanation 업데이트
         explanation = state.get("explanation", {})
@@ -128,6 +159,8 @@ class Orchestrator:
             "evidence": advisory_result.evidence,
             "places_reference": advisory_result.places_reference
         }
+        if advisory_result.fallback_reason:
+            explanation["advisory"]["fallback"] = advisory_result.fallback_reason
         
         # 응답 메시지 생성
         response_text = self._format_response(advisory_result)
@@ -142,6 +175,19 @@ class Orchestrator:
             "messages": [assistant_msg]
         }
     
+    @staticmethod
+    def _location_info(user_info: Optional[dict]) -> Optional[dict]:
+        """location_info 생성 (user_info가 있는 경우)"""
+        if not user_info:
+            return None
+        return {
+            "lat": user_info.get("lat"),
+            "lon": user_info.get("lon"),
+            "floor": user_info.get("floor"),
+            "mobility": user_info.get("mobility"),
+            "radius_km": NEARBY_RADIUS_KM
+        }
+    
     def _format_response(self, advisory: AdvisoryResult) -> str:
         """최종 응답 포맷팅"""
         parts = []
@@ -159,18 +205,171 @@ class Orchestrator:
         
         return "\n".join(parts)
     
-    async def process(self, input_text: str, conversation_history: list = None, user_info: dict = None) -> dict:
-        """대화 처리 (단일/멀티턴 지원)"""
+    async def process(
+        self, input_text: str, conversation_history: list = None, user_info: dict = None,
+        conversation_id: str = None, mode: str = "full", priority: Optional[int] = None
+    ) -> dict:
+        """대화 처리 (단일/멀티턴 지원)
+        
+        오래된 턴은 누적 요약으로 접고 최근 턴만 메시지로 유지하여 대화가 길어져도
+        상태와 프롬프트 크기가 일정하게 유지됩니다.
+        같은 질문(정규화 후)/위치 셀/층수 구간·이동 능력/대화 맥락의 동시 요청은 파이프라인 1회 실행을 공유합니다.
+        
+        동시 실행 제한(admission)은 답변 캐시와 요청 병합 뒤에 적용되어, 실제로 파이프라인을 시작하는
+        요청만 슬롯/대기열 자리를 차지합니다. 진행 중인 실행에 합류한 요청은 거절되지 않으며,
+        그 실행이 대기 시간 초과나 거절로 끝나면 로컬 답변을 받습니다.
+        
+        Args:
+            mode: "full" (LLM 파이프라인) | "local" (LLM 없이 로컬 데이터로 즉시 답변)
+            priority: admission 우선순위 (기본값: 좌표가 있으면 PRIORITY_LOCATION)
+        
+        Raises:
+            AdmissionRejected: 이 요청이 시작한 실행이 대기열 초과로 거절된 경우
+        """
+        if mode == "local":
+            return await asyncio.to_thread(self.local_answer.answer, input_text, user_info, "requested")
+        
+        # 시맨틱 답변 캐시 조회 (이전 대화에 의존하지 않는 첫 질문만 대상)
+        cache_key = None
+        if self.answer_cache is not None and not conversation_history:
+            cache_key = await self._answer_cache_key(input_text, user_info)
+            if cache_key is not None:
+                cached = self.answer_cache.lookup(*cache_key)
+                if cached is not None:
+                    payload, similarity = cached
+                    logger.info(f"[Orchestrator] 답변 캐시 hit (유사도 {similarity:.4f})")
+                    return await self._answer_from_payload(payload, input_text, user_info, "cache", {
+                        "hit": True,
+                        "similarity": round(similarity, 4),
+                        "data_version": cache_key[3]
+                    })
+        
+        if priority is None:
+            priority = PRIORITY_LOCATION if user_info else PRIORITY_DEFAULT
+        (response, payload), shared = await self.flights.do(
+            self._flight_key(input_text, user_info, conversation_history),
+            lambda: self._admitted_run(priority, input_text, conversation_history, user_info, conversation_id)
+        )
+        if isinstance(response, (AdmissionRejected, AdmissionTimeout)):
+            if isinstance(response, AdmissionRejected) and not shared:
+                raise response
+            # 대기 시간 초과, 또는 합류한 실행이 거절된 경우: LLM 없는 로컬 답변으로 대체
+            logger.warning(f"[Orchestrator] LLM 처리 포화, 로컬 답변으로 대체 (병합: {shared})")
+            return await asyncio.to_thread(self.local_answer.answer, input_text, user_info, "saturated")
+        if shared:
+            # 다른 요청의 실행 결과 공유: 주변 대피소는 이 요청의 위치 기준으로 다시 계산
+            logger.info("[Orchestrator] 진행 중인 동일 요청과 결과 공유")
+            if payload is None:
+                return response
+            return await self._answer_from_payload(payload, input_text, user_info, "coalesced", True)
+        
+        if cache_key is not None and payload is not None:
+            embedding, cell, profile, version = cache_key
+            self.answer_cache.store(embedding, cell, profile, payload, hazard=detect_hazard(input_text), version=version)
+        return response
+    
+    async def process_many(self, items: List[Dict[str, Any]], concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """여러 질문 일괄 처리 (캐시 사전 적재, 야간 평가용)
+        
+        스키마를 한 번만 조회하고 입력 질문 임베딩을 일괄 계산해 둔 뒤, 전역 배치 동시 실행 제한 안에서
+        각 질문을 process로 실행합니다. 같은 서브 문제의 Cypher 생성은 Cypher 캐시/병합으로 한 번만 수행됩니다.
+        각 항목은 /chat과 같은 admission 제한을 가장 낮은 우선순위(PRIORITY_BATCH)로 거치므로,
+        포화 시 대화형 요청에 밀려 오류(거절) 또는 로컬 답변(대기 시간 초과)으로 끝날 수 있습니다.
+        
+        Args:
+            items: {"input": str, "user_info": dict, "conversation_history": list, "mode": str} 목록
+            concurrency: 이 배치의 동시 실행 수 (전역 제한 BATCH_CONCURRENCY 이내)
+        
+        Returns:
+            입력 순서대로 {"index", "ok", "result" | "error", "elapsed_ms"}
+        """
+        rag_service = self.analyst_agent.rag_service
+        
+        with start_span("orchestrator.process_many", batch__size=len(items)):
+            # 1. 공유 스키마 1회 조회 (이후 분석 단계는 캐시 사용)
+            try:
+                with rag_service.get_neo4j_session() as session:
+                    await rag_service.get_schema(session, use_cache=True)
+            except Exception as e:
+                logger.warning(f"[Orchestrator] 배치 스키마 조회 실패: {e}")
+            
+            # 2. 답변 캐시 조회용 입력 임베딩 일괄 계산
+            if self.answer_cache is not None:
+                texts = [
+                    item["input"] for item in items
+                    if item.get("mode", "full") == "full" and not item.get("conversation_history")
+                ]
+                if texts:
+                    try:
+                        await asyncio.to_thread(rag_service.embed_queries, texts)
+                    except Exception as e:
+                        logger.warning(f"[Orchestrator] 배치 임베딩 실패, 개별 임베딩으로 진행: {e}")
+            
+            # 3. 전역 + 배치별 동시 실행 제한 안에서 개별 처리
+            local_limit = asyncio.Semaphore(max(1, min(concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY)))
+            
+            async def run(index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+                async with local_limit, self.batch_limit:
+                    start = time.perf_counter()
+                    try:
+                        result = await self.process(
+                            item["input"],
+                            item.get("conversation_history"),
+                            item.get("user_info"),
+                            mode=item.get("mode", "full"),
+                            priority=PRIORITY_BATCH
+                        )
+                        outcome = {"index": index, "ok": True, "result": result}
+                    except Exception as e:
+                        logger.warning(f"[Orchestrator] 배치 항목 {index} 처리 오류: {e}")
+                        outcome = {"index": index, "ok": False, "error": str(e)}
+                    outcome["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                    return outcome
+            
+            results = await asyncio.gather(*(run(i, item) for i, item in enumerate(items)))
+            set_span_attributes(error__count=sum(1 for r in results if not r["ok"]))
+        
+        logger.info(f"[Orchestrator] 배치 처리 완료: {len(results)}개 (오류 {sum(1 for r in results if not r['ok'])}개)")
+        return results
+    
+    async def _admitted_run(
+        self, priority: int, input_text: str, conversation_history: list, user_info: dict, conversation_id: str
+    ) -> tuple:
+        """admission 슬롯을 얻어 파이프라인 실행
+
+        슬롯을 얻지 못하면 예외 대신 (AdmissionRejected/AdmissionTimeout, None)을 반환하여
+        병합된 요청마다 대체 방식을 정하도록 합니다.
+        """
+        if self.admission is None:
+            return await self._run(input_text, conversation_history, user_info, conversation_id)
+        try:
+            async with self.admission.slot(priority):
+                return await self._run(input_text, conversation_history, user_info, conversation_id)
+        except (AdmissionRejected, AdmissionTimeout) as e:
+            return e, None
+    
+    async def _run(self, input_text: str, conversation_history: list, user_info: dict, conversation_id: str) -> tuple:
+        """파이프라인 실행
+        
+        Returns:
+            (응답, 위치 무관 부분만 담은 재사용용 payload 또는 None)
+        """
+        # 히스토리 압축 (누적 요약 + 최근 턴)
+        summary, recent_history = await self.history_manager.compact(
+            conversation_history or [], conversation_id
+        )
+        
         # 초기 상태 설정
         messages = []
-        if conversation_history:
-            for msg in conversation_history:
-                messages.append(
-                    Message(
-                        role=MessageRole(msg.get("role", "user")),
-                        content=msg.get("content", "")
-                    )
+        if summary:
+            messages.append(Message(role=MessageRole.SYSTEM, content=f"이전 대화 요약: {summary}"))
+        for msg in recent_history:
+            messages.append(
+                Message(
+                    role=MessageRole(msg.get("role", "user")),
+                    content=msg.get("content", "")
                 )
+            )
         
         # 사용자 메시지 추가
         user_msg = Message(
@@ -183,6 +382,7 @@ class Orchestrator:
             messages=messages,
             input=input_text,
             user_info=user_info,  # 좌표와 층수 정보
+            conversation_context=self.history_manager.format_context(summary, recent_history),
             planning=None,
             analysis=None,
             advisory=None,
@@ -190,22 +390,117 @@ class Orchestrator:
         )
         
         # Graph 실행 (async 지원 여부에 따라)
-        try:
-            # LangGraph가 async를 지원하는 경우
-            result = await self.graph.ainvoke(initial_state)
-        except AttributeError:
-            # async를 지원하지 않는 경우 동기 함수를 비동기로 실행
-            result = await asyncio.to_thread(self.graph.invoke, initial_state)
+        with start_span(
+            "orchestrator.process",
+            input__length=len(input_text),
+            history__length=len(conversation_history or []),
+            has_location=user_info is not None
+        ):
+            try:
+                # LangGraph가 async를 지원하는 경우
+                result = await self.graph.ainvoke(initial_state)
+            except AttributeError:
+                # async를 지원하지 않는 경우 동기 함수를 비동기로 실행
+                result = await asyncio.to_thread(self.graph.invoke, initial_state)
         
         # 최종 응답 생성
         advisory = result["advisory"]
         response_text = result["messages"][-1].content if result["messages"] else ""
         
-        return {
+        response = {
             "answer": response_text,
             "conclusion": advisory.conclusion,
             "evidence": advisory.evidence,
             "explanation": result["explanation"],
             "places_reference": advisory.places_reference
         }
+        return response, self._answer_payload(result)
+    
+    @staticmethod
+    def _flight_key(input_text: str, user_info: Optional[dict], conversation_history: Optional[list]) -> str:
+        """동시 요청 병합 키 (정규화된 질문 + 위치 셀 + 층수 구간/이동 능력 + 대화 맥락 해시 + 데이터 버전)
 
+        데이터 버전을 포함하여 무효화 이후에 들어온 요청이 무효화 전에 시작한 실행에 합류하지 않도록 합니다.
+        """
+        digest = hashlib.sha1(" ".join(input_text.split()).lower().encode("utf-8"))
+        digest.update(b"\x00" + get_data_version().encode("utf-8"))
+        digest.update(b"\x00" + location_cell(user_info).encode("utf-8"))
+        digest.update(b"\x00" + answer_profile(user_info).encode("utf-8"))
+        for msg in conversation_history or []:
+            digest.update(b"\x00" + msg.get("role", "").encode("utf-8"))
+            digest.update(b"\x01" + msg.get("content", "").encode("utf-8"))
+        return digest.hexdigest()
+    
+    async def _answer_cache_key(self, input_text: str, user_info: Optional[dict]) -> Optional[tuple]:
+        """답변 캐시 키 (질문 임베딩, 위치 셀, 층수 구간/이동 능력, 데이터 버전). 임베딩 실패 시 캐시를 건너뜀
+
+        데이터 버전은 파이프라인 실행 전에 고정하여, 실행 중 무효화된 경우 이전 데이터로 만든 답변을
+        새 버전 키로 저장하지 않도록 합니다.
+        """
+        version = get_data_version()
+        try:
+            embedding = await asyncio.to_thread(self.analyst_agent.rag_service.embed_query, input_text)
+        except Exception as e:
+            logger.warning(f"[Orchestrator] 답변 캐시용 임베딩 실패, 캐시 건너뜀: {e}")
+            return None
+        if not embedding:
+            return None
+        return embedding, self.answer_cache.location_cell(user_info), answer_profile(user_info), version
+    
+    def _answer_payload(self, result: dict) -> Optional[dict]:
+        """위치 무관한 부분만 담은 재사용용 payload (검색/추론 오류 결과는 None)"""
+        advisory = result["advisory"]
+        analysis = result.get("analysis")
+        if (analysis is None or analysis.graph_results.get("error")
+                or not advisory.evidence or advisory.fallback_reason):
+            return None
+        
+        base_evidence = advisory.evidence
+        if advisory.location_evidence and base_evidence.endswith(advisory.location_evidence):
+            base_evidence = base_evidence[:-len(advisory.location_evidence)].rstrip("\n")
+        
+        return {
+            "conclusion": advisory.conclusion,
+            "evidence": base_evidence,
+            "explanation": {k: v for k, v in result["explanation"].items() if k != "advisory"}
+        }
+    
+    async def _answer_from_payload(
+        self, payload: dict, input_text: str, user_info: Optional[dict], source: str, source_info: Any
+    ) -> dict:
+        """재사용 payload로 응답 생성 (주변 대피소는 사용자 위치 기준으로 다시 조회)"""
+        location_info = self._location_info(user_info)
+        nearby = None
+        if NEARBY_SOURCE == "neo4j" and location_info and location_info["lat"] is not None and location_info["lon"] is not None:
+            nearby = await asyncio.to_thread(
+                self.analyst_agent.rag_service.nearby_facilities,
+                float(location_info["lat"]), float(location_info["lon"]), location_info["radius_km"]
+            )
+        location_evidence, places = await asyncio.to_thread(
+            self.advisor_agent.build_location_evidence, nearby, location_info, detect_hazard(input_text)
+        )
+        evidence = payload["evidence"]
+        if location_evidence:
+            evidence = evidence + "\n\n" + location_evidence if evidence else location_evidence
+        
+        advisory = AdvisoryResult(
+            conclusion=payload["conclusion"],
+            evidence=evidence,
+            places_reference=places,
+            location_evidence=location_evidence
+        )
+        explanation = dict(payload["explanation"])
+        explanation["advisory"] = {
+            "conclusion": advisory.conclusion,
+            "evidence": advisory.evidence,
+            "places_reference": advisory.places_reference
+        }
+        explanation[source] = source_info
+        
+        return {
+            "answer": self._format_response(advisory),
+            "conclusion": advisory.conclusion,
+            "evidence": advisory.evidence,
+            "explanation": explanation,
+            "places_reference": advisory.places_reference
+        }
@@ -1,7 +1,16 @@
 """메인 실행 파일"""
+import os
+import shutil
 import uvicorn
-from api import app
+from config import API_WORKERS
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
-
+    if API_WORKERS > 1:
+        # 멀티 워커: 메트릭을 워커 간 공유 디렉토리에서 합산 (이전 실행 값 제거)
+        multiproc_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/sense_metrics")
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+        uvicorn.run("api:app", host="0.0.0.0", port=8000, workers=API_WORKERS)
+    else:
+        from api import app
+        uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,5 +1,5 @@
 """데이터 모델"""
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Literal, Optional, Any
 from pydantic import BaseModel
 from enum import Enum
 
@@ -22,6 +22,7 @@ class UserInfo(BaseModel):
     lat: float  # 위도
     lon: float  # 경도
     floor: int  # 층수
+    mobility: Optional[Literal["normal", "limited", "wheelchair"]] = None  # 이동 능력 (대피소 순위에 반영)
 
 
 class PlanningResult(BaseModel):
@@ -42,6 +43,8 @@ class AdvisoryResult(BaseModel):
     conclusion: str  # 핵심 결론 (3-5문장)
     evidence: str    # 추론한 증거만
     places_reference: Optional[Dict[str, Dict[str, Any]]] = None  # 결론에 언급된 장소들의 레퍼런스
+    location_evidence: Optional[str] = None  # evidence 중 사용자 위치에 따라 달라지는 부분 (주변 대피소)
+    fallback_reason: Optional[str] = None  # LLM 대신 로컬 답변을 사용한 경우 그 사유
 
 
 class ConversationState(BaseModel):
@@ -0,0 +1,137 @@
+"""/chat 동시 처리 제한 (admission control)
+
+동시에 실행하는 파이프라인 수를 제한하고, 초과 요청은 짧은 우선순위 대기열에서 기다립니다.
+- 좌표(user_info)가 있는 요청이 먼저, /chat/batch 항목이 가장 나중에 실행되며, 대기열이 가득 차면 우선순위가 낮은 대기 요청을 밀어냅니다
+- 대기열이 가득 차면 즉시 AdmissionRejected (API에서 503 + Retry-After)
+- 대기 시간이 길어지면 AdmissionTimeout (API에서 LLM 없는 로컬 답변으로 대체)
+"""
+import asyncio
+import itertools
+import logging
+from contextlib import asynccontextmanager
+from typing import List
+
+from config import (
+    ADMISSION_MAX_IN_FLIGHT, ADMISSION_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT_SECONDS
+)
+from services.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_SHED
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_LOCATION = 0  # 좌표가 있는 요청 (주변 대피소 안내가 필요)
+PRIORITY_DEFAULT = 1
+PRIORITY_BATCH = 2  # /chat/batch 항목 (대화형 요청에 항상 양보)
+
+_PRIORITY_LABELS = {PRIORITY_LOCATION: "location", PRIORITY_DEFAULT: "default", PRIORITY_BATCH: "batch"}
+
+
+class AdmissionRejected(Exception):
+    """대기열이 가득 차서 거절됨"""
+
+
+class AdmissionTimeout(Exception):
+    """대기 시간 초과 (LLM 처리 용량 포화)"""
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "future")
+
+    def __init__(self, priority: int, seq: int, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.future = future
+
+
+class AdmissionController:
+    """우선순위 대기열이 있는 동시 실행 제한기 (이벤트 루프 단일 스레드에서만 사용)"""
+
+    def __init__(
+        self,
+        max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT_SECONDS
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: List[_Waiter] = []  # (priority, seq) 순으로 정렬
+        self._seq = itertools.count()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_DEFAULT):
+        """실행 슬롯 획득 (AdmissionRejected / AdmissionTimeout 발생 가능)"""
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int) -> None:
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self._set_in_flight(self.in_flight + 1)
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            # max_queue=0이면 대기 없이 바로 거절
+            worst = self._waiters[-1] if self._waiters else None
+            if worst is None or worst.priority <= priority:
+                ADMISSION_SHED.labels(reason="queue_full").inc()
+                raise AdmissionRejected("대기열이 가득 찼습니다")
+            # 우선순위가 낮은 마지막 대기 요청을 밀어내고 자리 확보
+            self._remove(worst)
+            ADMISSION_SHED.labels(reason="evicted").inc()
+            worst.future.set_exception(AdmissionRejected("우선순위가 높은 요청에 밀려났습니다"))
+
+        waiter = _Waiter(priority, next(self._seq), asyncio.get_running_loop().create_future())
+        self._insert(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.future.done() and not waiter.future.exception():
+                # 타임아웃 직전에 슬롯을 넘겨받은 경우 그대로 실행
+                return
+            self._remove(waiter)
+            ADMISSION_SHED.labels(reason="timeout").inc()
+            raise AdmissionTimeout("대기 시간이 초과되었습니다")
+        except asyncio.CancelledError:
+            # 클라이언트 연결 종료 등으로 취소: 이미 넘겨받은 슬롯이 있으면 반납
+            if waiter.future.done() and not waiter.future.cancelled() and not waiter.future.exception():
+                self._release()
+            else:
+                self._remove(waiter)
+            raise
+
+    def _release(self) -> None:
+        # 대기 중인 요청이 있으면 슬롯을 그대로 넘김 (in_flight 유지)
+        while self._waiters:
+            waiter = self._waiters.pop(0)
+            self._update_queue_metric(waiter.priority)
+            if not waiter.future.done():
+                waiter.future.set_result(None)
+                return
+        self._set_in_flight(self.in_flight - 1)
+
+    def _insert(self, waiter: _Waiter) -> None:
+        index = len(self._waiters)
+        while index > 0 and (self._waiters[index - 1].priority, self._waiters[index - 1].seq) > (waiter.priority, waiter.seq):
+            index -= 1
+        self._waiters.insert(index, waiter)
+        self._update_queue_metric(waiter.priority)
+
+    def _remove(self, waiter: _Waiter) -> None:
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+            self._update_queue_metric(waiter.priority)
+
+    def _set_in_flight(self, value: int) -> None:
+        self.in_flight = value
+        ADMISSION_IN_FLIGHT.set(value)
+
+    def _update_queue_metric(self, priority: int) -> None:
+        depth = sum(1 for w in self._waiters if w.priority == priority)
+        ADMISSION_QUEUE_DEPTH.labels(priority=_PRIORITY_LABELS.get(priority, str(priority))).set(depth)
@@ -0,0 +1,285 @@
+"""시맨틱 답변 캐시
+
+재난 발생 시 많은 사용자가 같은 의미의 질문을 보내므로, 질문 임베딩의 코사인 유사도로
+이전 답변을 재사용합니다. 캐시 키는 (데이터 버전, 위치 셀, 층수 구간/이동 능력)이며 같은 키 안에서
+유사도가 임계값 이상인 가장 가까운 답변을 반환합니다.
+위치에 따라 달라지는 부분(주변 대피소)은 캐시하지 않고 요청마다 다시 계산합니다.
+재난 이벤트 수집 같은 일부 변경 시에는 영향 지역 셀과 관련 재난 유형 답변만 삭제하고
+나머지는 새 데이터 버전 키로 옮깁니다.
+"""
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    ANSWER_CACHE_SIMILARITY, ANSWER_CACHE_TTL_SECONDS,
+    ANSWER_CACHE_CELL_DEG, ANSWER_CACHE_MAX_ENTRIES
+)
+from services.data_version import DataChange, get_data_version, on_data_version_change
+from services.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_CELL = "global"  # 위치 정보가 없는 질문
+ANY_PROFILE = "any"  # 층수/이동 능력 정보가 없는 질문
+
+# 층수 구간 (상한, 이름): 대피소 순위와 답변이 층수에 따라 달라지므로 구간별로 답변을 나눔
+FLOOR_BUCKETS = ((0, "B"), (1, "1"), (4, "2-4"), (9, "5-9"), (19, "10-19"))
+
+
+def location_cell(user_info: Optional[dict], cell_deg: float = ANSWER_CACHE_CELL_DEG) -> str:
+    """사용자 좌표를 위치 셀 ID로 변환 (좌표가 없으면 global)"""
+    if not user_info or user_info.get("lat") is None or user_info.get("lon") is None:
+        return GLOBAL_CELL
+    row = int(np.floor(user_info["lat"] / cell_deg))
+    col = int(np.floor(user_info["lon"] / cell_deg))
+    return f"{row}:{col}"
+
+
+def answer_profile(user_info: Optional[dict]) -> str:
+    """층수 구간과 이동 능력을 답변 구분 키로 변환 (정보가 없으면 any)"""
+    if not user_info:
+        return ANY_PROFILE
+    floor = user_info.get("floor")
+    floor_bucket = "-"
+    if floor is not None:
+        floor_bucket = next((name for upper, name in FLOOR_BUCKETS if floor <= upper), "20+")
+    return f"{floor_bucket}:{user_info.get('mobility') or 'normal'}"
+
+
+class _Bucket:
+    """같은 (데이터 버전, 위치 셀, 층수/이동 능력)의 캐시 항목 (임베딩 행렬 + 답변)
+
+    임베딩 행렬은 용량을 두 배씩 늘리며 미리 할당하여, 항목 추가마다 전체 행렬을 복사하지 않습니다.
+    """
+
+    INITIAL_CAPACITY = 8
+
+    def __init__(self):
+        self._matrix: Optional[np.ndarray] = None  # (용량, dim), 앞의 len(self)행만 유효
+        self.created_at: List[float] = []
+        self.payloads: List[Dict[str, Any]] = []
+        self.hazards: List[Optional[str]] = []  # 질문에서 감지한 재난 유형 (일부 무효화 기준)
+
+    @property
+    def vectors(self) -> Optional[np.ndarray]:
+        """정규화된 임베딩 (n, dim) — 내부 행렬의 view"""
+        if self._matrix is None or not len(self):
+            return None
+        return self._matrix[:len(self)]
+
+    def _reserve(self, count: int, dim: int) -> None:
+        if self._matrix is None:
+            self._matrix = np.empty((max(self.INITIAL_CAPACITY, count), dim), dtype=np.float32)
+        elif count > self._matrix.shape[0]:
+            grown = np.empty((max(count, self._matrix.shape[0] * 2), dim), dtype=np.float32)
+            grown[:len(self)] = self._matrix[:len(self)]
+            self._matrix = grown
+
+    def add(self, vector: np.ndarray, payload: Dict[str, Any], now: float, hazard: Optional[str] = None) -> None:
+        self._reserve(len(self) + 1, vector.shape[0])
+        self._matrix[len(self)] = vector
+        self.created_at.append(now)
+        self.payloads.append(payload)
+        self.hazards.append(hazard)
+
+    def drop_expired(self, now: float, ttl: float) -> int:
+        return self.keep([i for i, t in enumerate(self.created_at) if now - t < ttl])
+
+    def keep(self, keep: List[int]) -> int:
+        """keep 위치의 항목만 남기고 삭제된 항목 수 반환"""
+        removed = len(self.created_at) - len(keep)
+        if removed:
+            if keep:
+                self._matrix[:len(keep)] = self._matrix[keep]
+            self.created_at = [self.created_at[i] for i in keep]
+            self.payloads = [self.payloads[i] for i in keep]
+            self.hazards = [self.hazards[i] for i in keep]
+        return removed
+
+    def merge(self, other: "_Bucket") -> None:
+        if not len(other):
+            return
+        count = len(self)
+        self._reserve(count + len(other), other._matrix.shape[1])
+        self._matrix[count:count + len(other)] = other.vectors
+        self.created_at.extend(other.created_at)
+        self.payloads.extend(other.payloads)
+        self.hazards.extend(other.hazards)
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+
+class SemanticAnswerCache:
+    """질문 임베딩 기반 답변 캐시"""
+
+    def __init__(
+        self,
+        similarity: float = ANSWER_CACHE_SIMILARITY,
+        ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        cell_deg: float = ANSWER_CACHE_CELL_DEG
+    ):
+        self.similarity = similarity
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.cell_deg = cell_deg
+        self._buckets: "OrderedDict[Tuple[str, str, str], _Bucket]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        # 그래프/문서 재적재 시 전체 무효화, 이벤트 수집 등 일부 변경 시 영향 범위만 무효화
+        on_data_version_change(self._on_data_change, scoped=True)
+
+    def location_cell(self, user_info: Optional[dict]) -> str:
+        """사용자 좌표를 위치 셀 ID로 변환 (좌표가 없으면 global)"""
+        return location_cell(user_info, self.cell_deg)
+
+    def lookup(
+        self, embedding: List[float], cell: str, profile: str = ANY_PROFILE, version: Optional[str] = None
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """유사한 질문의 캐시된 답변 조회 (같은 위치 셀과 층수/이동 능력 안에서)
+
+        Args:
+            version: 요청 시작 시점의 데이터 버전 (없으면 현재 버전)
+
+        Returns:
+            (캐시된 답변, 유사도) 또는 None
+        """
+        query = self._normalize(embedding)
+        now = time.time()
+        key = (version or get_data_version(), cell, profile)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                self._size -= bucket.drop_expired(now, self.ttl_seconds)
+            if bucket is None or not len(bucket) or bucket.vectors.shape[1] != query.shape[0]:
+                record_cache("answer", hit=False)
+                return None
+
+            scores = bucket.vectors @ query
+            best = int(np.argmax(scores))
+            score = float(scores[best])
+            if score < self.similarity:
+                record_cache("answer", hit=False)
+                return None
+
+            self._buckets.move_to_end(key)
+            record_cache("answer", hit=True)
+            return bucket.payloads[best], score
+
+    def store(
+        self, embedding: List[float], cell: str, profile: str, payload: Dict[str, Any],
+        hazard: Optional[str] = None, version: Optional[str] = None
+    ) -> bool:
+        """답변 저장 (최대 항목 수 초과 시 가장 오래 사용하지 않은 셀부터 삭제)
+
+        Args:
+            version: 답변을 만들기 시작한 시점의 데이터 버전. 파이프라인 실행 중에 버전이 바뀌었으면
+                (캐시 무효화, 이벤트 수집) 이전 데이터로 만든 답변이므로 저장하지 않음
+
+        Returns:
+            저장했으면 True
+        """
+        vector = self._normalize(embedding)
+        now = time.time()
+        with self._lock:
+            # 무효화 콜백도 같은 잠금을 쓰므로, 여기서 버전이 같으면 저장 후의 무효화가 이 항목을 처리함
+            current = get_data_version()
+            if version is not None and version != current:
+                logger.info(f"[AnswerCache] 실행 중 데이터 버전 변경 ({version} -> {current}), 답변 저장 건너뜀")
+                return False
+            key = (current, cell, profile)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket()
+            else:
+                self._size -= bucket.drop_expired(now, self.ttl_seconds)
+            bucket.add(vector, payload, now, hazard)
+            self._size += 1
+            self._buckets.move_to_end(key)
+
+            while self._size > self.max_entries and len(self._buckets) > 1:
+                _, evicted = self._buckets.popitem(last=False)
+                self._size -= len(evicted)
+        return True
+
+    def invalidate(self, cells: Optional[List[str]] = None) -> int:
+        """캐시 무효화 (cells 지정 시 해당 위치 셀만)
+
+        Returns:
+            삭제된 항목 수
+        """
+        with self._lock:
+            if cells is None:
+                removed = self._size
+                self._buckets.clear()
+                self._size = 0
+            else:
+                targets = set(cells)
+                removed = 0
+                for key in [k for k in self._buckets if k[1] in targets]:
+                    removed += len(self._buckets.pop(key))
+                self._size -= removed
+        logger.info(f"[AnswerCache] 캐시 무효화: {removed}개 항목")
+        return removed
+
+    def _on_data_change(self, version: str, change: Optional[DataChange]) -> None:
+        if change is None:
+            self.invalidate()
+        else:
+            self.invalidate_scope(version, change)
+
+    def invalidate_scope(self, version: str, change: DataChange) -> int:
+        """일부 데이터 변경 시 영향 범위의 답변만 삭제하고 나머지는 새 버전 키로 옮김
+
+        삭제 대상: 영향 지역(change.bbox)과 겹치는 위치 셀의 답변 전체, 그 밖의 셀에서는
+        관련 재난 유형(change.hazards)이거나 재난 유형을 감지하지 못한 질문의 답변
+
+        Returns:
+            삭제된 항목 수
+        """
+        hazards = set(change.hazards)
+        with self._lock:
+            removed = 0
+            buckets = list(self._buckets.items())
+            self._buckets.clear()
+            for (_, cell, profile), bucket in buckets:
+                if self._cell_in_bbox(cell, change.bbox):
+                    removed += len(bucket)
+                    continue
+                removed += bucket.keep([i for i, h in enumerate(bucket.hazards) if h is not None and h not in hazards])
+                if not len(bucket):
+                    continue
+                key = (version, cell, profile)
+                if key in self._buckets:
+                    self._buckets[key].merge(bucket)
+                else:
+                    self._buckets[key] = bucket
+            self._size -= removed
+        logger.info(
+            f"[AnswerCache] 일부 무효화 ({change.reason or '-'}): {removed}개 항목 삭제, "
+            f"{self._size}개 항목 유지"
+        )
+        return removed
+
+    def _cell_in_bbox(self, cell: str, bbox: Optional[Tuple[float, float, float, float]]) -> bool:
+        """위치 셀이 영향 지역과 겹치는지 (위치가 없는 질문은 재난 유형으로만 판단)"""
+        if cell == GLOBAL_CELL or bbox is None:
+            return False
+        row, col = (int(part) for part in cell.split(":"))
+        south, west, north, east = bbox
+        return (
+            int(np.floor(south / self.cell_deg)) <= row <= int(np.floor(north / self.cell_deg))
+            and int(np.floor(west / self.cell_deg)) <= col <= int(np.floor(east / self.cell_deg))
+        )
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
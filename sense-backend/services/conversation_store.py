@@ -0,0 +1,262 @@
+"""대화 히스토리 저장소
+
+- InMemoryConversationStore: 프로세스 내 LRU + TTL (대화 수/대화당 메시지 수 제한)
+- SQLiteConversationStore: WAL 모드 SQLite 파일 (여러 워커 프로세스가 같은 대화를 공유)
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from config import (
+    CONVERSATION_STORE_BACKEND, CONVERSATION_DB_PATH,
+    CONVERSATION_MAX_CONVERSATIONS, CONVERSATION_MAX_MESSAGES, CONVERSATION_TTL_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationStore(ABC):
+    """대화 저장소 인터페이스"""
+
+    backend = "base"
+
+    @abstractmethod
+    def get(self, conversation_id: str) -> Optional[List[Dict[str, str]]]:
+        """대화 메시지 조회 (없거나 만료되면 None, 조회하면 TTL이 다시 시작됨)"""
+
+    @abstractmethod
+    def append(self, conversation_id: str, messages: List[Dict[str, str]]) -> None:
+        """대화에 메시지 추가 (대화당 최대 메시지 수 초과 시 오래된 메시지부터 삭제)"""
+
+    @abstractmethod
+    def delete(self, conversation_id: str) -> bool:
+        """대화 삭제 (삭제했으면 True)"""
+
+    @abstractmethod
+    def size(self) -> int:
+        """저장된 대화 수"""
+
+
+class InMemoryConversationStore(ConversationStore):
+    """LRU + TTL 메모리 저장소
+
+    OrderedDict를 최근 접근 순으로 유지하므로 만료/초과 대화는 항상 앞쪽에 있어
+    append/get 모두 O(1)(분할 상환)로 정리됩니다.
+    """
+
+    backend = "memory"
+
+    def __init__(
+        self,
+        max_conversations: int = CONVERSATION_MAX_CONVERSATIONS,
+        max_messages: int = CONVERSATION_MAX_MESSAGES,
+        ttl_seconds: float = CONVERSATION_TTL_SECONDS
+    ):
+        self.max_conversations = max_conversations
+        self.max_messages = max_messages
+        self.ttl_seconds = ttl_seconds
+        # conversation_id -> (마지막 접근 시각, 메시지 deque)
+        self._conversations: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict_expired(self, now: float) -> None:
+        while self._conversations:
+            oldest_id, (accessed_at, _) = next(iter(self._conversations.items()))
+            if now - accessed_at < self.ttl_seconds:
+                break
+            del self._conversations[oldest_id]
+
+    def get(self, conversation_id: str) -> Optional[List[Dict[str, str]]]:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._conversations.get(conversation_id)
+            if entry is None:
+                return None
+            messages = entry[1]
+            self._conversations[conversation_id] = (now, messages)
+            self._conversations.move_to_end(conversation_id)
+            return list(messages)
+
+    def append(self, conversation_id: str, messages: List[Dict[str, str]]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._conversations.get(conversation_id)
+            stored = entry[1] if entry else deque(maxlen=self.max_messages)
+            stored.extend(messages)
+            self._conversations[conversation_id] = (now, stored)
+            self._conversations.move_to_end(conversation_id)
+            while len(self._conversations) > self.max_conversations:
+                self._conversations.popitem(last=False)
+
+    def delete(self, conversation_id: str) -> bool:
+        with self._lock:
+            return self._conversations.pop(conversation_id, None) is not None
+
+    def size(self) -> int:
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            return len(self._conversations)
+
+
+class SQLiteConversationStore(ConversationStore):
+    """SQLite(WAL) 저장소
+
+    메시지는 (conversation_id, seq) 기본키로 저장하여 추가는 단일 INSERT, 최대 메시지 수
+    초과분 삭제는 기본키 범위 삭제로 처리합니다. 만료 대화 정리는 일정 횟수의 append마다 수행합니다.
+    쓰기는 BEGIN IMMEDIATE 트랜잭션으로 처리하여, 같은 파일을 쓰는 다른 워커 프로세스가 next_seq를
+    동시에 읽고 같은 seq로 INSERT하지 않도록 합니다 (threading.Lock은 프로세스 안에서만 직렬화).
+    """
+
+    backend = "sqlite"
+    PURGE_INTERVAL = 200  # append N회마다 만료/초과 대화 정리
+
+    def __init__(
+        self,
+        path: str = CONVERSATION_DB_PATH,
+        max_conversations: int = CONVERSATION_MAX_CONVERSATIONS,
+        max_messages: int = CONVERSATION_MAX_MESSAGES,
+        ttl_seconds: float = CONVERSATION_TTL_SECONDS
+    ):
+        self.max_conversations = max_conversations
+        self.max_messages = max_messages
+        self.ttl_seconds = ttl_seconds
+        self._appends = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # 트랜잭션은 _write()에서 직접 시작 (sqlite3 모듈의 암묵적 BEGIN DEFERRED 사용 안 함)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS conversations (
+                id TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL,
+                next_seq INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_conversations_updated_at ON conversations(updated_at);
+            CREATE TABLE IF NOT EXISTS messages (
+                conversation_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                PRIMARY KEY (conversation_id, seq)
+            ) WITHOUT ROWID;
+        """)
+        logger.info(f"[ConversationStore] SQLite 저장소 사용: {path}")
+
+    @contextmanager
+    def _write(self):
+        """쓰기 트랜잭션 (시작 시 파일 쓰기 잠금을 잡아 다른 프로세스의 읽기-수정-쓰기와 겹치지 않음)"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def get(self, conversation_id: str) -> Optional[List[Dict[str, str]]]:
+        now = time.time()
+        with self._write():
+            row = self._conn.execute(
+                "SELECT updated_at FROM conversations WHERE id = ?", (conversation_id,)
+            ).fetchone()
+            if row is None or now - row[0] >= self.ttl_seconds:
+                return None
+            # 메모리 저장소와 같이 조회도 마지막 접근으로 보고 만료 시각을 갱신
+            self._conn.execute(
+                "UPDATE conversations SET updated_at = ? WHERE id = ?", (now, conversation_id)
+            )
+            rows = self._conn.execute(
+                "SELECT role, content FROM messages WHERE conversation_id = ? ORDER BY seq",
+                (conversation_id,)
+            ).fetchall()
+            return [{"role": role, "content": content} for role, content in rows]
+
+    def append(self, conversation_id: str, messages: List[Dict[str, str]]) -> None:
+        now = time.time()
+        with self._write():
+            row = self._conn.execute(
+                "SELECT updated_at, next_seq FROM conversations WHERE id = ?", (conversation_id,)
+            ).fetchone()
+            if row is not None and now - row[0] >= self.ttl_seconds:
+                # 만료된 대화는 새 대화로 시작
+                self._conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+                row = None
+            next_seq = row[1] if row else 0
+
+            self._conn.executemany(
+                "INSERT INTO messages (conversation_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                [
+                    (conversation_id, next_seq + i, m.get("role", "user"), m.get("content", ""))
+                    for i, m in enumerate(messages)
+                ]
+            )
+            next_seq += len(messages)
+            self._conn.execute(
+                "INSERT INTO conversations (id, updated_at, next_seq) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET updated_at = excluded.updated_at, next_seq = excluded.next_seq",
+                (conversation_id, now, next_seq)
+            )
+            if next_seq > self.max_messages:
+                self._conn.execute(
+                    "DELETE FROM messages WHERE conversation_id = ? AND seq < ?",
+                    (conversation_id, next_seq - self.max_messages)
+                )
+
+            self._appends += 1
+            if self._appends % self.PURGE_INTERVAL == 0:
+                self._purge(now)
+
+    def _purge(self, now: float) -> None:
+        """만료 대화 및 최대 대화 수 초과분(오래된 순) 삭제 (트랜잭션 내부에서 호출)"""
+        self._conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS purge_ids (id TEXT PRIMARY KEY)"
+        )
+        self._conn.execute("DELETE FROM purge_ids")
+        self._conn.execute(
+            "INSERT OR IGNORE INTO purge_ids SELECT id FROM conversations WHERE updated_at < ?",
+            (now - self.ttl_seconds,)
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO purge_ids SELECT id FROM conversations "
+            "ORDER BY updated_at DESC LIMIT -1 OFFSET ?",
+            (self.max_conversations,)
+        )
+        self._conn.execute("DELETE FROM messages WHERE conversation_id IN (SELECT id FROM purge_ids)")
+        deleted = self._conn.execute(
+            "DELETE FROM conversations WHERE id IN (SELECT id FROM purge_ids)"
+        ).rowcount
+        if deleted:
+            logger.info(f"[ConversationStore] 만료/초과 대화 {deleted}개 정리")
+
+    def delete(self, conversation_id: str) -> bool:
+        with self._write():
+            self._conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+            return self._conn.execute(
+                "DELETE FROM conversations WHERE id = ?", (conversation_id,)
+            ).rowcount > 0
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT count(*) FROM conversations WHERE updated_at >= ?",
+                (time.time() - self.ttl_seconds,)
+            ).fetchone()[0]
+
+
+def create_conversation_store() -> ConversationStore:
+    """설정(CONVERSATION_STORE_BACKEND)에 따라 저장소 생성"""
+    if CONVERSATION_STORE_BACKEND == "sqlite":
+        return SQLiteConversationStore()
+    return InMemoryConversationStore()
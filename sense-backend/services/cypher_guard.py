@@ -0,0 +1,279 @@
+"""LLM 생성 Cypher 안전성/비용 검사
+
+Gemini가 만든 Cypher를 그대로 실행하지 않고 다음 순서로 검사합니다.
+1. 정적 검사: 문자열/주석을 지운 뒤 절 위치의 키워드가 읽기 전용 절(MATCH, WHERE, WITH, RETURN 등)인지 검사,
+   다중 문장 거부, 마지막 절은 RETURN (별칭/변수/속성 위치의 단어는 검사하지 않음)
+2. LIMIT: 없으면 기본값을 붙이고, 상한보다 크면 상한으로 줄임
+3. EXPLAIN: 예상 행 수가 임계값을 넘거나 CartesianProduct 연산자가 있는 계획은 거부
+
+거부되면 질문 키워드로 만든 템플릿 쿼리로 대체하며, 모든 실행은 서버 측 트랜잭션 타임아웃을 겁니다.
+키워드 검사는 apoc.* 같은 함수 호출의 쓰기를 막지 못하므로, 검사한 쿼리는 읽기 전용(READ_ACCESS) 세션에서 실행합니다.
+"""
+import re
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from neo4j import Query
+
+from config import (
+    CYPHER_DEFAULT_LIMIT, CYPHER_MAX_LIMIT, CYPHER_MAX_ESTIMATED_ROWS,
+    CYPHER_TIMEOUT_SECONDS, CYPHER_GUARD_CACHE_SIZE
+)
+from services.metrics import CYPHER_GUARD_DECISIONS
+from services.lru_cache import LRUCache
+from services.local_answer import detect_hazard
+
+logger = logging.getLogger(__name__)
+
+# 허용하는 절 (OPTIONAL MATCH, ORDER BY는 MATCH/BY 토큰으로 검사)
+READ_CLAUSES = {"MATCH", "OPTIONAL", "WHERE", "WITH", "UNWIND", "RETURN", "ORDER", "BY", "SKIP", "LIMIT"}
+# 나오면 거부하는 절/키워드 (쓰기, 프로시저 호출, 스키마/관리 명령, 실행 계획 접두사)
+FORBIDDEN_CLAUSES = {
+    "CREATE", "MERGE", "DELETE", "DETACH", "SET", "REMOVE", "DROP", "FOREACH", "LOAD", "CALL",
+    "UNION", "USE", "SHOW", "GRANT", "DENY", "REVOKE", "ALTER", "RENAME", "START", "STOP",
+    "TERMINATE", "EXPLAIN", "PROFILE", "FINISH", "INSERT"
+}
+
+# 문자열/백틱 식별자(1번 그룹) 또는 주석을 앞에서부터 한 번에 찾음 ('http://...' 안의 //는 주석이 아님)
+_LITERAL_OR_COMMENT_PATTERN = re.compile(
+    r"('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`)|//[^\n]*|/\*.*?\*/", re.DOTALL
+)
+_TOKEN_PATTERN = re.compile(r"[A-Za-z_][A-Za-z_0-9]*|\d+(?:\.\d+)?|''|\S")
+# 이 토큰 바로 뒤의 단어는 식(별칭/변수/속성/파라미터) 위치이므로 절 키워드로 보지 않음
+# (예: RETURN s.name AS start, WITH s.capacity AS load, ORDER BY load, (start:Shelter))
+_EXPRESSION_PRECEDERS = {
+    "AS", "RETURN", "WITH", "WHERE", "BY", "AND", "OR", "XOR", "NOT", "IN", "IS", "DISTINCT",
+    "UNWIND", "WHEN", "THEN", "ELSE", "SKIP", "LIMIT",
+    ".", "$", ",", "(", "[", "=", "<", ">", "+", "-", "/", "%", "^", ":", "|"
+}
+_TRAILING_LIMIT_PATTERN = re.compile(r"\bLIMIT\s+(\S+)\s*$", re.IGNORECASE)
+_GU_PATTERN = re.compile(r"([가-힣]{1,4}구)")
+
+# Hazard 노드의 hazard_type (그래프에 있는 재난 유형만 템플릿으로 조회)
+GRAPH_HAZARDS = {"지진", "산사태", "붕괴", "노화"}
+
+
+class CypherRejected(Exception):
+    """안전성/비용 검사를 통과하지 못한 쿼리"""
+
+    def __init__(self, reason: str, detail: str = ""):
+        super().__init__(f"{reason}: {detail}" if detail else reason)
+        self.reason = reason
+        self.detail = detail
+
+
+@dataclass
+class GuardDecision:
+    """검사 결과 (query는 LIMIT 보정 후 실제로 실행할 쿼리)"""
+    decision: str  # allowed | rewritten | rejected | template
+    query: Optional[str]
+    reason: str = ""
+    parameters: Optional[Dict[str, Any]] = None
+    estimated_rows: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"decision": self.decision, "reason": self.reason, "estimated_rows": self.estimated_rows}
+
+
+def strip_literals(query: str) -> str:
+    """주석과 문자열/백틱 식별자를 지운 쿼리 (키워드 검사용)"""
+    return _LITERAL_OR_COMMENT_PATTERN.sub(lambda m: "''" if m.group(1) else " ", query)
+
+
+def strip_comments(query: str) -> str:
+    """주석만 지운 쿼리 (문자열은 유지, 실제로 실행할 쿼리)"""
+    return _LITERAL_OR_COMMENT_PATTERN.sub(lambda m: m.group(1) or " ", query)
+
+
+def clause_words(bare: str) -> List[str]:
+    """절 위치(쿼리 시작, 앞 절이 끝난 뒤)에 있는 단어를 대문자로 반환
+
+    앞 토큰이 AS/연산자/쉼표/식을 받는 키워드이거나, 뒤에 속성 접근(.)이나 레이블/맵 키(:)가 오는
+    단어는 별칭/변수이므로 제외합니다.
+    """
+    tokens = _TOKEN_PATTERN.findall(bare)
+    words = []
+    for i, token in enumerate(tokens):
+        if not (token[0].isalpha() or token[0] == "_"):
+            continue
+        previous = tokens[i - 1].upper() if i > 0 else None
+        following = tokens[i + 1] if i + 1 < len(tokens) else None
+        if previous in _EXPRESSION_PRECEDERS or following in (".", ":"):
+            continue
+        words.append(token.upper())
+    return words
+
+
+def check_clauses(query: str) -> str:
+    """읽기 전용 절만 쓰는지 검사하고 주석과 끝의 세미콜론을 뗀 쿼리 반환"""
+    query = strip_comments(query).strip().rstrip(";").strip()
+    if not query:
+        raise CypherRejected("empty")
+    bare = strip_literals(query)
+    if ";" in bare:
+        raise CypherRejected("multiple_statements")
+
+    clauses = []
+    for upper in clause_words(bare):
+        if upper in FORBIDDEN_CLAUSES:
+            raise CypherRejected("forbidden_clause", upper)
+        if upper in READ_CLAUSES:
+            clauses.append(upper)
+    if not clauses or clauses[0] not in ("MATCH", "OPTIONAL", "WITH", "UNWIND"):
+        raise CypherRejected("unsupported_start")
+    if "RETURN" not in clauses:
+        raise CypherRejected("no_return")
+    return query
+
+
+def apply_limit(query: str, default_limit: int = CYPHER_DEFAULT_LIMIT, max_limit: int = CYPHER_MAX_LIMIT) -> Tuple[str, bool]:
+    """마지막 절에 LIMIT 보장 (없으면 기본값 추가, 상한 초과 시 상한으로 변경)
+
+    주석을 지운 쿼리 기준으로 검사/수정하므로 끝의 주석이 LIMIT 검사를 가리지 못합니다.
+
+    Returns:
+        (쿼리, 변경 여부)
+    """
+    query = strip_comments(query).strip()
+    match = _TRAILING_LIMIT_PATTERN.search(strip_literals(query))
+    if not match:
+        return f"{query}\nLIMIT {default_limit}", True
+    value = match.group(1)
+    if not value.isdigit():
+        raise CypherRejected("dynamic_limit", value)
+    if int(value) <= max_limit:
+        return query, False
+    # strip_literals는 길이를 바꿀 수 있으므로 주석을 지운 쿼리 끝에서 다시 찾음
+    rewritten, count = _TRAILING_LIMIT_PATTERN.subn(f"LIMIT {max_limit}", query)
+    if count != 1:
+        raise CypherRejected("limit_rewrite_failed", value)
+    return rewritten, True
+
+
+def inspect_plan(plan: Optional[Dict[str, Any]]) -> Tuple[float, bool]:
+    """EXPLAIN 계획 트리의 최대 예상 행 수와 CartesianProduct 포함 여부"""
+    max_rows, cartesian = 0.0, False
+    stack = [plan] if plan else []
+    while stack:
+        node = stack.pop()
+        operator = str(node.get("operatorType", ""))
+        if operator.startswith("CartesianProduct"):
+            cartesian = True
+        rows = (node.get("args") or {}).get("EstimatedRows")
+        if isinstance(rows, (int, float)):
+            max_rows = max(max_rows, float(rows))
+        stack.extend(node.get("children") or [])
+    return max_rows, cartesian
+
+
+def template_query(question: str, limit: int = CYPHER_DEFAULT_LIMIT) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """질문 키워드로 고정 템플릿 쿼리 선택 (검증된 형태만, 값은 파라미터로 전달)"""
+    if "유발" in question or "일으키" in question:
+        return f"MATCH (h1:Hazard)-[:TRIGGERS]->(h2:Hazard) RETURN h1.name, h2.name LIMIT {limit}", {}
+    if "증가" in question:
+        return f"MATCH (h1:Hazard)-[:INCREASES_RISK_OF]->(h2:Hazard) RETURN h1.name, h2.name LIMIT {limit}", {}
+
+    label = "TemporaryHousing" if "임시주거" in question else "Shelter"
+    gu_match = _GU_PATTERN.search(question)
+    if gu_match:
+        params = {"gu": gu_match.group(1)}
+        if "몇 개" in question or "개수" in question:
+            return f"MATCH (s:{label})-[:IN]->(a:Admin {{gu: $gu}}) RETURN count(s) AS count", params
+        return (
+            f"MATCH (s:{label})-[:IN]->(a:Admin {{gu: $gu}}) "
+            f"RETURN s.name, s.address, s.shelter_type LIMIT {limit}"
+        ), params
+    if "대피소" in question or "임시주거" in question:
+        return f"MATCH (s:{label}) RETURN s.name, s.address LIMIT {limit}", {}
+
+    hazard = detect_hazard(question)
+    if hazard in GRAPH_HAZARDS:
+        return (
+            f"MATCH (p:Policy)-[:GUIDES]->(h:Hazard {{hazard_type: $hazard}}) "
+            f"RETURN p.name, p.content LIMIT {limit}"
+        ), {"hazard": hazard}
+    return None
+
+
+class CypherGuard:
+    """LLM 생성 Cypher 검사기 (같은 쿼리의 검사 결과는 데이터 버전이 바뀔 때까지 캐시)"""
+
+    def __init__(
+        self,
+        default_limit: int = CYPHER_DEFAULT_LIMIT,
+        max_limit: int = CYPHER_MAX_LIMIT,
+        max_estimated_rows: float = CYPHER_MAX_ESTIMATED_ROWS,
+        timeout_seconds: float = CYPHER_TIMEOUT_SECONDS
+    ):
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+        self.max_estimated_rows = max_estimated_rows
+        self.timeout_seconds = timeout_seconds
+        self._decisions = LRUCache("cypher_guard", CYPHER_GUARD_CACHE_SIZE)
+
+    def clear(self) -> None:
+        self._decisions.clear()
+
+    def query(self, text: str) -> Query:
+        """서버 측 트랜잭션 타임아웃을 건 쿼리 객체"""
+        return Query(text, timeout=self.timeout_seconds) if self.timeout_seconds > 0 else Query(text)
+
+    def check(self, cypher_query: str, session) -> GuardDecision:
+        """정적 검사 + LIMIT 보정 + EXPLAIN 검사 (결정은 캐시 여부와 관계없이 매번 로그/메트릭 기록)"""
+        decision = self._decisions.get(cypher_query)
+        cached = decision is not None
+        if decision is None:
+            decision = self._evaluate(cypher_query, session)
+            # 연결 오류 등 일시적인 EXPLAIN 실패는 다음 요청에서 다시 검사
+            if decision.reason != "explain_failed":
+                self._decisions.set(cypher_query, decision)
+
+        flat = " ".join((decision.query or cypher_query).split())[:200]
+        source = "캐시" if cached else "검사"
+        if decision.decision == "rejected":
+            logger.warning(f"[Cypher Guard] 거부 ({decision.reason}, {source}): {flat}")
+        else:
+            logger.info(
+                f"[Cypher Guard] {decision.decision} ({source}, 예상 {decision.estimated_rows:.0f}행): {flat}"
+            )
+        CYPHER_GUARD_DECISIONS.labels(decision=decision.decision, reason=decision.reason or "ok").inc()
+        return decision
+
+    def _evaluate(self, cypher_query: str, session) -> GuardDecision:
+        try:
+            query = check_clauses(cypher_query)
+            query, rewritten = apply_limit(query, self.default_limit, self.max_limit)
+            estimated_rows, cartesian = self._explain(query, session)
+            if cartesian:
+                raise CypherRejected("cartesian_product")
+            if estimated_rows > self.max_estimated_rows:
+                raise CypherRejected("estimated_rows", f"{estimated_rows:.0f}")
+        except CypherRejected as e:
+            if e.detail:
+                logger.debug(f"[Cypher Guard] 거부 상세: {e}")
+            return GuardDecision("rejected", None, reason=e.reason)
+        return GuardDecision(
+            "rewritten" if rewritten else "allowed", query,
+            reason="limit" if rewritten else "", estimated_rows=estimated_rows
+        )
+
+    def fallback(self, question: str, reason: str) -> GuardDecision:
+        """거부된 질문의 템플릿 쿼리 (맞는 템플릿이 없으면 query=None)"""
+        template = template_query(question, self.default_limit)
+        if template is None:
+            logger.info(f"[Cypher Guard] 템플릿 없음 ({reason}): {question[:100]}")
+            CYPHER_GUARD_DECISIONS.labels(decision="template", reason="no_template").inc()
+            return GuardDecision("rejected", None, reason=reason)
+
+        query, parameters = template
+        logger.info(f"[Cypher Guard] 템플릿으로 대체 ({reason}): {query}")
+        CYPHER_GUARD_DECISIONS.labels(decision="template", reason=reason).inc()
+        return GuardDecision("template", query, reason=reason, parameters=parameters)
+
+    def _explain(self, query: str, session) -> Tuple[float, bool]:
+        try:
+            summary = session.run(self.query(f"EXPLAIN {query}")).consume()
+        except Exception as e:
+            raise CypherRejected("explain_failed", str(e)[:200])
+        return inspect_plan(getattr(summary, "plan", None))
@@ -0,0 +1,76 @@
+"""데이터 버전 관리
+
+그래프/문서 데이터가 다시 적재되면 버전을 올리고, 등록된 캐시들의 무효화 콜백을 호출합니다.
+캐시 키에 데이터 버전을 포함하면 이전 데이터로 만든 결과가 재사용되지 않습니다.
+
+재난 이벤트 수집처럼 일부만 바뀐 경우에는 DataChange(바뀐 라벨/재난 유형/영향 지역)와 함께 버전을 올립니다.
+- 일반 콜백(on_data_version_change): 전체 재적재일 때만 호출
+- 범위 콜백(scoped=True): 모든 변경에 (버전, DataChange 또는 None) 인자로 호출되어 해당 범위만 무효화
+"""
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from config import DATA_VERSION
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_revision = 0
+_base_revision = 0
+_listeners: List[Tuple[Callable, bool]] = []
+
+
+@dataclass(frozen=True)
+class DataChange:
+    """일부 데이터 변경 범위"""
+    reason: str = ""
+    labels: Tuple[str, ...] = ()  # 바뀐 노드 라벨 (예: ("Event",))
+    hazards: Tuple[str, ...] = ()  # 관련 재난 유형
+    bbox: Optional[Tuple[float, float, float, float]] = None  # 영향 지역 (south, west, north, east)
+
+
+def get_data_version() -> str:
+    """현재 데이터 버전 (DATA_VERSION 기본값 + 프로세스 내 변경 횟수, 일부 변경 포함)"""
+    return f"{DATA_VERSION}.{_revision}"
+
+
+def get_base_version() -> str:
+    """마지막 전체 재적재 시점의 데이터 버전 (일부 변경에 영향받지 않는 캐시/번들용)"""
+    return f"{DATA_VERSION}.{_base_revision}"
+
+
+def on_data_version_change(callback: Callable, scoped: bool = False) -> None:
+    """데이터 버전 변경 시 호출할 콜백 등록
+
+    scoped=False: 전체 재적재 시 callback(새 버전)
+    scoped=True: 모든 변경 시 callback(새 버전, DataChange 또는 전체 재적재면 None)
+    """
+    with _lock:
+        _listeners.append((callback, scoped))
+
+
+def bump_data_version(reason: str = "", change: Optional[DataChange] = None) -> str:
+    """데이터 버전을 올리고 등록된 캐시 무효화 콜백 호출 (change가 있으면 해당 범위만)"""
+    global _revision, _base_revision
+    with _lock:
+        _revision += 1
+        if change is None:
+            _base_revision = _revision
+        version = get_data_version()
+        listeners = list(_listeners)
+
+    scope = "전체" if change is None else f"일부 {','.join(change.labels) or '-'}"
+    logger.info(f"[DataVersion] 데이터 버전 변경: {version} ({reason or '사유 없음'}, {scope})")
+    for callback, scoped in listeners:
+        if change is not None and not scoped:
+            continue
+        try:
+            if scoped:
+                callback(version, change)
+            else:
+                callback(version)
+        except Exception as e:
+            logger.warning(f"[DataVersion] 무효화 콜백 오류: {e}")
+    return version
@@ -0,0 +1,199 @@
+"""Neo4j 그래프 인덱스/제약조건 준비
+
+적재 스크립트(hybrid_rag_advanced.py)의 관계 적재 `MATCH (n:X {id: $id})`, Graph RAG의
+`Admin {gu: ...}`, `Hazard {hazard_type: ...}` 조회가 라벨 전체 스캔이 되지 않도록 다음을 만듭니다.
+- 모든 라벨의 id 유니크 제약조건 (중복 id가 있는 라벨은 range 인덱스로 대체)
+- Admin.gu, Admin.sigungu, Hazard.hazard_type, Policy.disaster_type range 인덱스
+- Shelter/TemporaryHousing의 lat/lon으로 만든 location(point) 속성과 point 인덱스
+
+모든 단계는 IF NOT EXISTS로 여러 번 실행해도 안전하며, API 시작 시 verify_graph_schema로 확인합니다.
+
+사용법 (sense-backend 디렉터리에서):
+    python -m services.graph_schema            # 생성 + 확인
+    python -m services.graph_schema --verify   # 확인만
+"""
+import re
+import sys
+import logging
+import argparse
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ID_LABELS = ["Admin", "Hazard", "Policy", "Event", "Shelter", "TemporaryHousing"]
+RANGE_INDEXES = [("Admin", "gu"), ("Admin", "sigungu"), ("Hazard", "hazard_type"), ("Policy", "disaster_type")]
+POINT_LABELS = ["Shelter", "TemporaryHousing"]
+LOCATION_PROPERTY = "location"
+
+
+def _snake(label: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", label).lower()
+
+
+def index_name(label: str, prop: str, suffix: str = "") -> str:
+    """인덱스/제약조건 이름 (예: temporary_housing_location, shelter_id_unique)"""
+    return f"{_snake(label)}_{prop}{suffix}"
+
+
+def expected_indexes() -> List[Tuple[str, str, str]]:
+    """있어야 하는 인덱스 (라벨, 속성, 종류). 유니크 제약조건도 RANGE 인덱스를 함께 만듭니다"""
+    expected = [(label, "id", "RANGE") for label in ID_LABELS]
+    expected += [(label, prop, "RANGE") for label, prop in RANGE_INDEXES]
+    expected += [(label, LOCATION_PROPERTY, "POINT") for label in POINT_LABELS]
+    return expected
+
+
+def duplicate_id_count(session, label: str) -> int:
+    """같은 id를 가진 노드가 있는 id 값의 수"""
+    record = session.run(
+        f"MATCH (n:{label}) WHERE n.id IS NOT NULL "
+        f"WITH n.id AS id, count(*) AS c WHERE c > 1 RETURN count(id) AS duplicates"
+    ).single()
+    return int(record["duplicates"]) if record else 0
+
+
+def create_id_constraints(session) -> Dict[str, str]:
+    """라벨별 id 유니크 제약조건 (중복 id가 있으면 range 인덱스로 대체)
+
+    Returns:
+        라벨 -> "constraint" | "index"
+    """
+    created = {}
+    for label in ID_LABELS:
+        duplicates = duplicate_id_count(session, label)
+        if duplicates == 0:
+            try:
+                session.run(
+                    f"CREATE CONSTRAINT {index_name(label, 'id', '_unique')} IF NOT EXISTS "
+                    f"FOR (n:{label}) REQUIRE n.id IS UNIQUE"
+                ).consume()
+                created[label] = "constraint"
+                continue
+            except Exception as e:
+                # 같은 속성에 range 인덱스가 이미 있는 경우 등
+                logger.warning(f"[Graph Schema] {label}.id 제약조건 생성 실패, range 인덱스 사용: {e}")
+        else:
+            logger.warning(f"[Graph Schema] {label}에 중복 id {duplicates}개가 있어 유니크 제약조건 대신 range 인덱스 사용")
+        session.run(f"CREATE INDEX {index_name(label, 'id')} IF NOT EXISTS FOR (n:{label}) ON (n.id)").consume()
+        created[label] = "index"
+    return created
+
+
+def create_property_indexes(session) -> None:
+    """조회 필터용 range 인덱스와 위치 point 인덱스"""
+    for label, prop in RANGE_INDEXES:
+        session.run(f"CREATE INDEX {index_name(label, prop)} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})").consume()
+    for label in POINT_LABELS:
+        session.run(
+            f"CREATE POINT INDEX {index_name(label, LOCATION_PROPERTY)} IF NOT EXISTS "
+            f"FOR (n:{label}) ON (n.{LOCATION_PROPERTY})"
+        ).consume()
+
+
+def backfill_locations(session) -> Dict[str, int]:
+    """lat/lon이 있고 location이 없는 노드에 WGS-84 point 설정
+
+    Returns:
+        라벨 -> 새로 설정한 노드 수
+    """
+    updated = {}
+    for label in POINT_LABELS:
+        record = session.run(
+            f"MATCH (n:{label}) WHERE n.lat IS NOT NULL AND n.lon IS NOT NULL AND n.{LOCATION_PROPERTY} IS NULL "
+            f"SET n.{LOCATION_PROPERTY} = point({{latitude: toFloat(n.lat), longitude: toFloat(n.lon)}}) "
+            f"RETURN count(n) AS updated"
+        ).single()
+        updated[label] = int(record["updated"]) if record else 0
+    return updated
+
+
+def ensure_graph_schema(session) -> Dict[str, Any]:
+    """제약조건/인덱스 생성과 location 설정 (노드 적재 후, 관계 적재 전에 실행)"""
+    id_keys = create_id_constraints(session)
+    create_property_indexes(session)
+    locations = backfill_locations(session)
+    session.run("CALL db.awaitIndexes(300)").consume()
+    logger.info(f"[Graph Schema] 준비 완료: id={id_keys}, location 설정={locations}")
+    return {"id_keys": id_keys, "locations_set": locations}
+
+
+def verify_graph_schema(session) -> Dict[str, Any]:
+    """필요한 인덱스가 ONLINE 상태로 있고 모든 좌표 노드에 location이 있는지 확인"""
+    online = set()
+    pending = set()
+    for record in session.run("SHOW INDEXES YIELD type, labelsOrTypes, properties, state"):
+        labels, props = record["labelsOrTypes"] or [], record["properties"] or []
+        if len(labels) != 1 or len(props) != 1:
+            continue
+        key = (labels[0], props[0], record["type"])
+        (online if record["state"] == "ONLINE" else pending).add(key)
+
+    expected = expected_indexes()
+    missing = [f"{label}.{prop} ({kind})" for label, prop, kind in expected if (label, prop, kind) not in online | pending]
+    not_online = [f"{label}.{prop} ({kind})" for label, prop, kind in expected if (label, prop, kind) in pending - online]
+
+    missing_locations = {}
+    for label in POINT_LABELS:
+        record = session.run(
+            f"MATCH (n:{label}) WHERE n.{LOCATION_PROPERTY} IS NULL AND n.lat IS NOT NULL "
+            f"RETURN count(n) AS count"
+        ).single()
+        count = int(record["count"]) if record else 0
+        if count:
+            missing_locations[label] = count
+
+    return {
+        "ok": not missing and not not_online and not missing_locations,
+        "missing": missing,
+        "not_online": not_online,
+        "missing_locations": missing_locations
+    }
+
+
+def check_on_startup(session, mode: str) -> Optional[Dict[str, Any]]:
+    """API 시작 시 확인 (mode: verify | ensure | off). 문제가 있으면 경고만 남기고 시작은 계속"""
+    if mode == "off":
+        return None
+    try:
+        if mode == "ensure":
+            ensure_graph_schema(session)
+        report = verify_graph_schema(session)
+    except Exception as e:
+        logger.warning(f"[Graph Schema] 인덱스 확인 실패: {e}")
+        return None
+
+    if report["ok"]:
+        logger.info("[Graph Schema] 인덱스/제약조건 확인 완료")
+    else:
+        logger.warning(
+            f"[Graph Schema] 인덱스 준비 필요 (python -m services.graph_schema): "
+            f"없음={report['missing']}, 생성 중={report['not_online']}, location 없음={report['missing_locations']}"
+        )
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    # 적재 스크립트가 sys.path로 이 모듈만 가져다 쓸 수 있도록 config는 CLI에서만 사용
+    from neo4j import GraphDatabase
+    from config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+
+    parser = argparse.ArgumentParser(description="Neo4j 인덱스/제약조건 준비")
+    parser.add_argument("--verify", action="store_true", help="생성하지 않고 확인만")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    try:
+        with driver.session() as session:
+            if not args.verify:
+                ensure_graph_schema(session)
+            report = verify_graph_schema(session)
+    finally:
+        driver.close()
+
+    print(f"[Graph Schema] {'정상' if report['ok'] else '준비 필요'}: {report}")
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+"""재난 이벤트 실시간 수집 (Event 노드/관계 증분 반영 + 영향 범위 캐시 무효화)
+
+preprocessing.py가 고정으로 만드는 Event 노드와 UPDATES/TRIGGERS 관계를 운영 중에 추가/갱신합니다.
+- 수집: POST /admin/events, 또는 EVENT_INBOX_DIR에 놓인 *.json(이벤트 하나 또는 목록) / *.jsonl 파일
+  (여러 워커가 같은 디렉터리를 보므로 processing/으로 이름을 바꾼 워커 하나만 처리)
+- 그래프: Event 노드를 id로 MERGE하고 재난 유형 관계를 다시 연결
+  (이벤트 유형이 곧 재난 유형이면 UPDATES, 아니면 TRIGGERS — 지진 UPDATES 지진, 강우 TRIGGERS 산사태)
+- 무효화: 전체 재적재 없이 DataChange(Event 라벨, 재난 유형, 영향 지역)로 데이터 버전을 올려
+  스키마 캐시, 영향 지역 셀/관련 재난 유형의 답변 캐시, 영향 지역 대피소 격자 셀의 조회 응답만 바뀜
+- 다른 워커: EVENT_POLL_SECONDS마다 ingested_at 이후 바뀐 Event 노드를 조회해 같은 무효화 적용
+
+이벤트 형식은 대량 알림과 같습니다 (services/mass_notify.validate_event). 추가 필드: name, description,
+date, active(false면 종료), magnitude/pga/rainfall/duration(관계 속성에도 기록).
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import EVENT_INBOX_DIR, EVENT_POLL_SECONDS
+from services.data_version import DataChange, bump_data_version
+from services.local_answer import detect_hazard
+from services.mass_notify import points_in_polygon, validate_event
+from services.metrics import EVENTS_INGESTED
+from services.spatial_index import KM_PER_DEG_LAT, haversine_km
+
+logger = logging.getLogger(__name__)
+
+MEASUREMENTS = ("magnitude", "pga", "rainfall", "duration")
+INBOX_SUFFIXES = (".json", ".jsonl")
+# 동기화 조회 겹침 구간: 다른 워커가 먼저 시각을 찍고 늦게 커밋한 이벤트도 놓치지 않도록 (이미 반영한 이벤트는 건너뜀)
+SYNC_OVERLAP_SECONDS = 60.0
+
+
+def normalize_event(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """수집 이벤트 정규화 (잘못된 값은 ValueError)"""
+    event = validate_event(raw)
+    measurements = {}
+    for key in MEASUREMENTS:
+        if raw.get(key) is not None:
+            try:
+                measurements[key] = float(raw[key])
+            except (TypeError, ValueError):
+                raise ValueError(f"{key}는 숫자여야 합니다")
+    event.update(
+        name=str(raw.get("name") or f"{event['event_type']} 이벤트"),
+        description=str(raw.get("description") or ""),
+        date=str(raw.get("date") or time.strftime("%Y-%m-%d")),
+        active=bool(raw.get("active", True)),
+        measurements=measurements,
+    )
+    return event
+
+
+def event_bbox(event: Dict[str, Any]) -> Optional[Tuple[float, float, float, float]]:
+    """이벤트 영향 지역의 (남, 서, 북, 동) 범위 (좌표가 없는 이벤트는 None)"""
+    if event.get("polygon"):
+        ring = np.asarray(event["polygon"], dtype=np.float64)
+        return float(ring[:, 1].min()), float(ring[:, 0].min()), float(ring[:, 1].max()), float(ring[:, 0].max())
+    if event.get("lat") is None or event.get("lon") is None or not event.get("radius_km"):
+        return None
+    lat_delta = event["radius_km"] / KM_PER_DEG_LAT
+    lon_delta = event["radius_km"] / (KM_PER_DEG_LAT * max(np.cos(np.radians(event["lat"])), 1e-6))
+    return event["lat"] - lat_delta, event["lon"] - lon_delta, event["lat"] + lat_delta, event["lon"] + lon_delta
+
+
+def _union(boxes: List[Optional[Tuple[float, float, float, float]]]) -> Optional[Tuple[float, float, float, float]]:
+    boxes = [box for box in boxes if box is not None]
+    if not boxes:
+        return None
+    return min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes), max(b[3] for b in boxes)
+
+
+def graph_record(event: Dict[str, Any]) -> Tuple[Dict[str, Any], str, str, Dict[str, Any]]:
+    """rag_service.upsert_event 인자 (노드 속성, 재난 유형, 관계 유형, 관계 속성)"""
+    properties = {
+        "id": event["event_id"],
+        "type": "Event",
+        "event_type": event["event_type"],
+        "hazard": event["hazard"],
+        "name": event["name"],
+        "description": event["description"],
+        "date": event["date"],
+        "severity": event["severity"],
+        "lat": event["lat"],
+        "lon": event["lon"],
+        "radius_km": event["radius_km"],
+        # Neo4j 속성은 중첩 목록을 담을 수 없어 GeoJSON 좌표 문자열로 저장
+        "polygon": json.dumps(event["polygon"]) if event["polygon"] else None,
+        "active": event["active"],
+        "ingested_at": event["ingested_at"],
+        **event["measurements"],
+    }
+    relationship_type = "UPDATES" if event["hazard"] == event["event_type"] else "TRIGGERS"
+    relationship = {"description": event["description"] or event["name"], **event["measurements"]}
+    return properties, event["hazard"], relationship_type, relationship
+
+
+class HazardEventStore:
+    """진행 중인 이벤트 목록과 그래프 반영/무효화
+
+    Args:
+        writer: rag_service.upsert_event와 같은 형태의 그래프 쓰기 함수
+        loader: rag_service.fetch_events와 같은 형태의 변경 이벤트 조회 함수 (since -> 행 목록)
+    """
+
+    def __init__(
+        self,
+        writer: Optional[Callable[..., None]] = None,
+        loader: Optional[Callable[[float], List[Dict[str, Any]]]] = None
+    ):
+        self.writer = writer
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._events: Dict[str, Dict[str, Any]] = {}  # 진행 중인 이벤트 (id -> 이벤트)
+        self._seen: Dict[str, float] = {}  # 이 워커가 반영한 이벤트별 ingested_at
+        self._since: Optional[float] = None  # 마지막 동기화한 ingested_at (None이면 아직 초기 적재 전)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def ingest(self, raw: Dict[str, Any], source: str = "api") -> Dict[str, Any]:
+        """이벤트 하나를 그래프에 반영하고 영향 범위 캐시 무효화
+
+        Returns:
+            {"event_id", "hazard", "relationship", "active", "bbox", "data_version"}
+        """
+        try:
+            event = normalize_event(raw)
+        except ValueError:
+            EVENTS_INGESTED.labels(source=source, result="invalid").inc()
+            raise
+        event["ingested_at"] = time.time()
+        record = graph_record(event)
+        if self.writer is not None:
+            try:
+                self.writer(*record)
+            except Exception:
+                EVENTS_INGESTED.labels(source=source, result="error").inc()
+                raise
+        version = self._apply(event, source)
+        EVENTS_INGESTED.labels(source=source, result="ok").inc()
+        return {
+            "event_id": event["event_id"],
+            "hazard": event["hazard"],
+            "relationship": record[2],
+            "active": event["active"],
+            "bbox": event_bbox(event),
+            "data_version": version
+        }
+
+    def _apply(self, event: Dict[str, Any], source: str, notify: bool = True) -> Optional[str]:
+        """이 워커의 진행 중 이벤트 목록 갱신 후 (이전 + 현재 영향 지역) 범위로 데이터 버전 올리기"""
+        with self._lock:
+            previous = self._events.pop(event["event_id"], None)
+            if event["active"]:
+                self._events[event["event_id"]] = event
+            self._seen[event["event_id"]] = event["ingested_at"]
+        if not notify:
+            return None
+        hazards = {event["hazard"], event["event_type"], detect_hazard(event["event_type"])}
+        if previous is not None:
+            hazards.add(previous["hazard"])
+        change = DataChange(
+            reason=f"event {event['event_id']} ({source})",
+            labels=("Event",),
+            hazards=tuple(sorted(h for h in hazards if h)),
+            bbox=_union([event_bbox(event), event_bbox(previous) if previous else None])
+        )
+        return bump_data_version(change.reason, change)
+
+    def sync(self) -> int:
+        """그래프에서 마지막 동기화 이후 바뀐 Event를 읽어 반영 (다른 워커가 수집한 이벤트)
+
+        첫 호출은 진행 중인 이벤트를 적재만 하고 캐시는 무효화하지 않습니다.
+
+        Returns:
+            새로 반영한 이벤트 수
+        """
+        if self.loader is None:
+            return 0
+        initial = self._since is None
+        rows = self.loader(max(0.0, (self._since or 0.0) - SYNC_OVERLAP_SECONDS))
+        applied = 0
+        for row in rows:
+            ingested_at = float(row.get("ingested_at") or 0.0)
+            self._since = max(self._since or 0.0, ingested_at)
+            if self._seen.get(row["event_id"], -1.0) >= ingested_at:
+                continue
+            try:
+                event = self._from_row(row)
+            except ValueError as e:
+                # preprocessing.py의 시나리오 이벤트처럼 좌표가 없는 Event는 영향 지역 없이 목록에서 제외
+                logger.debug(f"[HazardEvents] 좌표 없는 이벤트 건너뜀 {row['event_id']}: {e}")
+                self._seen[row["event_id"]] = ingested_at
+                continue
+            self._apply(event, "sync", notify=not initial)
+            if not initial:
+                EVENTS_INGESTED.labels(source="sync", result="ok").inc()
+            applied += 1
+        if self._since is None:
+            self._since = 0.0
+        if applied:
+            logger.info(f"[HazardEvents] 이벤트 {applied}개 동기화 ({'초기 적재' if initial else '변경'}), 진행 중 {len(self)}개")
+        return applied
+
+    @staticmethod
+    def _from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+        polygon = json.loads(row["polygon"]) if row.get("polygon") else None
+        event = validate_event({**row, "polygon": polygon})
+        event.update(
+            hazard=row.get("hazard") or event["hazard"],
+            name=row.get("name") or "",
+            active=bool(row.get("active", True)),
+            ingested_at=float(row.get("ingested_at") or 0.0),
+        )
+        return event
+
+    def active(self) -> List[Dict[str, Any]]:
+        """진행 중인 이벤트 목록 (수집 시각순)"""
+        with self._lock:
+            events = sorted(self._events.values(), key=lambda event: event["ingested_at"])
+        keys = ("event_id", "event_type", "hazard", "severity", "name", "lat", "lon", "radius_km", "polygon", "ingested_at")
+        return [{**{key: event.get(key) for key in keys}, "bbox": event_bbox(event)} for event in events]
+
+    def covering(self, lat: float, lon: float) -> List[Dict[str, Any]]:
+        """좌표가 영향 지역 안에 있는 진행 중 이벤트 (원형은 진앙 거리 km, 다각형은 None)"""
+        with self._lock:
+            events = list(self._events.values())
+        covering = []
+        for event in events:
+            distance_km = None
+            if event["polygon"]:
+                ring = np.asarray(event["polygon"], dtype=np.float64)
+                if not points_in_polygon(np.array([lat]), np.array([lon]), ring)[0]:
+                    continue
+            else:
+                distance_km = float(haversine_km(lat, lon, np.array([event["lat"]]), np.array([event["lon"]]))[0])
+                if distance_km > event["radius_km"]:
+                    continue
+                distance_km = round(distance_km, 2)
+            covering.append({
+                "event_id": event["event_id"],
+                "event_type": event["event_type"],
+                "hazard": event["hazard"],
+                "severity": event["severity"],
+                "name": event["name"],
+                "distance_km": distance_km
+            })
+        return covering
+
+
+class EventInbox:
+    """로컬 디렉터리에 놓인 이벤트 파일 수집 (processing/ -> done/ 또는 failed/)"""
+
+    def __init__(self, store: HazardEventStore, directory: str = EVENT_INBOX_DIR):
+        self.store = store
+        self.directory = directory
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def poll(self) -> int:
+        """inbox의 파일을 이름순으로 처리
+
+        Returns:
+            수집한 이벤트 수
+        """
+        if not self.enabled or not os.path.isdir(self.directory):
+            return 0
+        for sub in ("processing", "done", "failed"):
+            os.makedirs(os.path.join(self.directory, sub), exist_ok=True)
+        ingested = 0
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(INBOX_SUFFIXES):
+                continue
+            claimed = os.path.join(self.directory, "processing", name)
+            try:
+                # 같은 디렉터리를 보는 다른 워커와 경쟁: 이름을 먼저 바꾼 워커만 처리
+                os.rename(os.path.join(self.directory, name), claimed)
+            except FileNotFoundError:
+                continue
+            ingested += self._process(claimed, name)
+        return ingested
+
+    def _process(self, path: str, name: str) -> int:
+        errors = []
+        ingested = 0
+        try:
+            with open(path, encoding="utf-8") as f:
+                if name.endswith(".jsonl"):
+                    events = [json.loads(line) for line in f if line.strip()]
+                else:
+                    data = json.load(f)
+                    events = data if isinstance(data, list) else [data]
+        except (OSError, ValueError) as e:
+            events, errors = [], [f"파일 읽기 실패: {e}"]
+        for position, raw in enumerate(events):
+            try:
+                if not isinstance(raw, dict):
+                    raise ValueError("이벤트는 JSON 객체여야 합니다")
+                self.store.ingest(raw, source="inbox")
+                ingested += 1
+            except Exception as e:
+                errors.append(f"{position}: {e}")
+
+        target = os.path.join(self.directory, "failed" if errors else "done", name)
+        os.replace(path, target)
+        if errors:
+            with open(target + ".error", "w", encoding="utf-8") as f:
+                f.write("\n".join(errors) + "\n")
+            logger.warning(f"[HazardEvents] inbox {name}: {ingested}개 수집, {len(errors)}개 실패 ({errors[0]})")
+        else:
+            logger.info(f"[HazardEvents] inbox {name}: {ingested}개 수집")
+        return ingested
+
+
+async def watch_events(store: HazardEventStore, inbox: EventInbox, interval: float = EVENT_POLL_SECONDS) -> None:
+    """inbox 확인과 다른 워커 이벤트 동기화를 interval초마다 반복 (API 시작 시 백그라운드 태스크)"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(inbox.poll)
+            await asyncio.to_thread(store.sync)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"[HazardEvents] 이벤트 확인 오류: {e}")
@@ -0,0 +1,202 @@
+"""대화 히스토리 압축
+
+최근 N턴은 그대로 유지하고, 그 이전 턴은 누적 요약(rolling summary)으로 접어서
+대화가 길어져도 프롬프트 크기가 일정하게 유지되도록 합니다.
+요약은 대화별로 캐시하며, 새로 밀려난 턴만 기존 요약에 증분으로 반영합니다.
+요약 LLM 호출은 응답 경로 밖의 백그라운드 작업으로 실행합니다.
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from google import genai
+
+from config import (
+    GOOGLE_API_KEY, GEMINI_MODEL,
+    HISTORY_KEEP_TURNS, HISTORY_FOLD_BATCH_TURNS, HISTORY_SUMMARY_MAX_CHARS,
+    HISTORY_SUMMARY_CACHE_SIZE
+)
+from services.metrics import track_stage, record_cache, record_gemini_error, record_gemini_usage
+from services.tracing import start_span
+
+logger = logging.getLogger(__name__)
+
+# 프롬프트에 넣는 최근 메시지 1개당 최대 길이 (어시스턴트 답변은 길기 때문)
+RECENT_MESSAGE_MAX_CHARS = 300
+
+
+def _message_key(messages: List[Dict[str, str]]) -> str:
+    """메시지 묶음의 해시 (요약에 반영된 마지막 위치를 찾는 데 사용)"""
+    digest = hashlib.sha1()
+    for msg in messages:
+        digest.update(msg.get("role", "").encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(msg.get("content", "").encode("utf-8"))
+        digest.update(b"\x01")
+    return digest.hexdigest()
+
+
+class HistoryManager:
+    """대화 히스토리 압축 관리자"""
+
+    def __init__(
+        self,
+        keep_turns: int = HISTORY_KEEP_TURNS,
+        fold_batch_turns: int = HISTORY_FOLD_BATCH_TURNS,
+        max_summary_chars: int = HISTORY_SUMMARY_MAX_CHARS,
+        cache_size: int = HISTORY_SUMMARY_CACHE_SIZE
+    ):
+        self.client = genai.Client(api_key=GOOGLE_API_KEY)
+        self.keep_messages = keep_turns * 2
+        self.fold_batch_messages = max(fold_batch_turns, 1) * 2
+        self.max_summary_chars = max_summary_chars
+        self.cache_size = cache_size
+        # conversation_id -> (요약, 요약에 반영된 마지막 2개 메시지의 해시)
+        self._summaries: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # conversation_id -> 진행 중인 백그라운드 요약 작업 (이벤트 루프에서만 접근)
+        self._folding: Dict[str, asyncio.Future] = {}
+
+    async def compact(
+        self,
+        history: List[Dict[str, str]],
+        conversation_id: Optional[str] = None
+    ) -> Tuple[Optional[str], List[Dict[str, str]]]:
+        """히스토리를 (누적 요약, 그대로 유지할 최근 메시지)로 압축
+
+        /chat 응답 경로에서는 LLM을 호출하지 않습니다. 요약에 아직 반영되지 않은 메시지가
+        fold_batch 이상 쌓이면 요약 갱신을 백그라운드 작업으로 넘기고, 이번 요청에는 캐시된 요약과
+        최근 keep개 메시지만 사용합니다 (그 사이 메시지는 요약 갱신이 끝난 다음 턴부터 요약으로 반영).
+        따라서 프롬프트의 대화 맥락은 요약(max_summary_chars) + 최근 메시지 keep + fold_batch개 이내로 유지됩니다.
+        conversation_id가 없으면 요약을 재사용할 수 없으므로 요약하지 않고 최근 keep개 메시지만 사용합니다.
+        """
+        if not history:
+            return None, []
+        if not conversation_id:
+            return None, history[-self.keep_messages:] if self.keep_messages else []
+
+        # 요약 캐시는 conversation_id 단위로만 사용 (첫 메시지가 같은 다른 사용자의 요약을 섞지 않도록)
+        summary, folded_key = self._get_cached(conversation_id)
+
+        # 요약에 이미 반영된 위치 찾기 (저장소가 오래된 메시지를 잘라내도 뒤에서부터 탐색하여 찾음)
+        folded_until = 0
+        if folded_key:
+            for end in range(len(history), 1, -1):
+                if _message_key(history[end - 2:end]) == folded_key:
+                    folded_until = end
+                    break
+        if not folded_until:
+            # 반영 위치가 이 히스토리에 없으면 요약이 다른 히스토리 기준이므로 사용하지 않음
+            summary = None
+        record_cache("history_summary", hit=summary is not None)
+
+        unfolded = history[folded_until:]
+        overflow = len(unfolded) - self.keep_messages
+        if overflow < self.fold_batch_messages:
+            return summary, unfolded
+
+        self._schedule_fold(
+            conversation_id, summary, unfolded[:overflow],
+            _message_key(history[folded_until + overflow - 2:folded_until + overflow])
+        )
+        return summary, unfolded[overflow:]
+
+    def _schedule_fold(
+        self, conversation_id: str, summary: Optional[str], to_fold: List[Dict[str, str]], folded_key: str
+    ) -> None:
+        """요약 갱신을 백그라운드 작업으로 실행 (대화별로 하나만, 진행 중이면 다음 턴에 다시 판단)"""
+        if conversation_id in self._folding:
+            return
+
+        async def fold() -> None:
+            try:
+                new_summary = await self._summarize(summary, to_fold)
+                self._set_cached(conversation_id, new_summary, folded_key)
+            except Exception as e:
+                logger.warning(f"[HistoryManager] 백그라운드 요약 실패 ({conversation_id}): {e}")
+            finally:
+                self._folding.pop(conversation_id, None)
+
+        self._folding[conversation_id] = asyncio.ensure_future(fold())
+
+    async def wait_for_folds(self) -> None:
+        """진행 중인 백그라운드 요약이 끝날 때까지 대기 (종료 처리, 테스트용)"""
+        while self._folding:
+            await asyncio.gather(*list(self._folding.values()), return_exceptions=True)
+
+    def format_context(self, summary: Optional[str], recent: List[Dict[str, str]]) -> str:
+        """PlanningAgent 프롬프트용 대화 맥락 문자열"""
+        if not summary and not recent:
+            return ""
+
+        parts = []
+        if summary:
+            parts.append(f"이전 대화 요약:\n{summary}")
+        if recent:
+            parts.append("최근 대화:")
+            for msg in recent:
+                content = msg.get("content", "")
+                if len(content) > RECENT_MESSAGE_MAX_CHARS:
+                    content = content[:RECENT_MESSAGE_MAX_CHARS] + "..."
+                parts.append(f"- {msg.get('role', 'user')}: {content}")
+        return "\n".join(parts)
+
+    def _get_cached(self, key: str) -> Tuple[Optional[str], Optional[str]]:
+        with self._lock:
+            entry = self._summaries.get(key)
+            if entry is None:
+                return None, None
+            self._summaries.move_to_end(key)
+            return entry
+
+    def _set_cached(self, key: str, summary: str, folded_key: str) -> None:
+        with self._lock:
+            self._summaries[key] = (summary, folded_key)
+            self._summaries.move_to_end(key)
+            while len(self._summaries) > self.cache_size:
+                self._summaries.popitem(last=False)
+
+    async def _summarize(self, summary: Optional[str], messages: List[Dict[str, str]]) -> str:
+        """기존 요약에 새 메시지를 반영한 요약 생성 (실패 시 사용자 발화 위주로 잘라서 누적)"""
+        conversation = "\n".join(
+            f"{msg.get('role', 'user')}: {msg.get('content', '')[:1000]}" for msg in messages
+        )
+        prompt = f"""재난 대응 상담 대화의 누적 요약을 갱신하세요.
+
+기존 요약:
+{summary or '(없음)'}
+
+새로 추가된 대화:
+{conversation}
+
+지침:
+- 재난 유형, 사용자 위치/층수/동반자 등 상황 정보, 이미 안내된 대피소와 행동요령 등 이후 답변에 필요한 사실만 남기세요
+- {self.max_summary_chars}자 이내의 한국어 문장으로 작성하세요
+- 요약문만 응답하고 설명은 제외하세요
+"""
+        try:
+            with start_span("gemini.generate", stage="llm_summary"), track_stage("llm_summary"):
+                response = await asyncio.to_thread(
+                    self.client.models.generate_content,
+                    model=GEMINI_MODEL,
+                    contents=prompt.strip()
+                )
+            record_gemini_usage("llm_summary", response)
+
+            from utils import extract_text_from_response
+
+            new_summary = extract_text_from_response(response).strip()
+            logger.info(f"[HistoryManager] 메시지 {len(messages)}개를 요약에 반영")
+        except Exception as e:
+            record_gemini_error("llm_summary", e)
+            logger.warning(f"[HistoryManager] 요약 오류: {str(e)}, 사용자 발화로 대체")
+            user_lines = [m.get("content", "")[:100] for m in messages if m.get("role") == "user"]
+            new_summary = "\n".join(filter(None, [summary, *user_lines]))
+
+        # 요약 자체가 커지지 않도록 최근 내용 위주로 자르기
+        if len(new_summary) > self.max_summary_chars:
+            new_summary = new_summary[-self.max_summary_chars:]
+        return new_summary
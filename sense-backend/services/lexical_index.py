@@ -0,0 +1,68 @@
+"""문자 bigram BM25 검색
+
+형태소 분석기 없이 한국어 문서를 검색하기 위해 어절 내부의 문자 bigram을 토큰으로 사용합니다.
+역색인의 각 posting에 BM25 가중치(idf 제외)를 미리 계산해 두어 질의는 numpy 누적 합으로 끝납니다.
+"""
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_WORD_PATTERN = re.compile(r"[0-9A-Za-z가-힣]+")
+
+
+def bigrams(text: str) -> List[str]:
+    """어절별 문자 bigram (한 글자 어절은 그대로)"""
+    tokens = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class BigramBM25:
+    """문자 bigram 기반 BM25 역색인"""
+
+    def __init__(self, documents: List[str], k1: float = 1.2, b: float = 0.75):
+        self.size = len(documents)
+        term_docs: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        lengths = np.zeros(self.size, dtype=np.float64)
+        for doc_id, text in enumerate(documents):
+            counts = Counter(bigrams(text))
+            lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                term_docs[term].append((doc_id, tf))
+
+        avg_length = lengths.mean() if self.size and lengths.mean() > 0 else 1.0
+        norm = k1 * (1 - b + b * lengths / avg_length)
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, postings in term_docs.items():
+            doc_ids = np.fromiter((d for d, _ in postings), dtype=np.int64, count=len(postings))
+            tfs = np.fromiter((tf for _, tf in postings), dtype=np.float64, count=len(postings))
+            idf = np.log(1 + (self.size - len(postings) + 0.5) / (len(postings) + 0.5))
+            self._postings[term] = (doc_ids, idf * tfs * (k1 + 1) / (tfs + norm[doc_ids]))
+
+    def scores(self, query: str) -> np.ndarray:
+        """질의에 대한 전체 문서 BM25 점수"""
+        scores = np.zeros(self.size, dtype=np.float64)
+        for term, qtf in Counter(bigrams(query)).items():
+            posting = self._postings.get(term)
+            if posting is not None:
+                scores[posting[0]] += qtf * posting[1]
+        return scores
+
+    def search(self, query: str, k: int, boost: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """상위 k개 (문서 번호, 점수). boost는 문서별 점수 배율"""
+        scores = self.scores(query)
+        if boost is not None:
+            scores *= boost
+        candidates = np.flatnonzero(scores > 0)
+        if not len(candidates):
+            return []
+        k = min(k, len(candidates))
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(i), float(scores[i])) for i in top]
@@ -0,0 +1,388 @@
+"""LLM 없는 로컬 답변
+
+Gemini가 느리거나 응답하지 않을 때(또는 클라이언트가 mode=local을 요청할 때) 로컬 데이터만으로
+같은 형태의 /chat 응답을 수십 ms 안에 만듭니다.
+- 주변 대피소: 최근접 대피소 사전 계산 격자 후보를 층수/재난 유형/면적으로 재정렬 (services/shelter_ranking.py)
+- 주변 위험 구역: 사용자 위치 주변 위험 구역과 대피소 노출 (services/risk_zones.py, 그래프에서 1회 적재, 실패 시 CSV)
+- 행동요령 정책: 감지한 재난 유형(hazard_type)별 Policy 내용 (그래프에서 1회 적재, 실패 시 CSV)
+- 국민행동요령 문서: disaster_guidelines_for_rag.csv 문자 bigram BM25 상위 항목
+
+데이터 버전이 바뀌면 이미 로드한 엔진은 백그라운드 스레드에서 바로 다시 로드합니다
+(다음 요청이 CSV/그래프 재적재를 기다리지 않도록, 조회 메서드는 이벤트 루프 밖에서 호출).
+"""
+import os
+import logging
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import PROCESSED_DATA_DIR, SHELTER_RANK_CANDIDATES
+from services.data_version import on_data_version_change
+from services.lexical_index import BigramBM25
+from services.shelter_grid import ShelterGrid, SHELTER_TYPES
+from services.shelter_ranking import ShelterRanker, places_reference, distance_label
+from services.road_graph import RoadGraph
+from services.risk_zones import RiskZoneIndex, read_zone_csvs, format_report
+
+logger = logging.getLogger(__name__)
+
+GUIDELINES_FILE = os.path.join("docs", "disaster_guidelines_for_rag.csv")
+NODES_FILE = "neo4j_nodes_complete.csv"
+RELATIONSHIPS_FILE = "neo4j_relationships_complete.csv"
+
+# 질문 키워드 -> 행동요령 문서의 disaster_type
+HAZARD_KEYWORDS = {
+    "지진": ["지진", "흔들", "여진"],
+    "홍수": ["홍수", "침수", "호우", "폭우", "범람", "물이 차"],
+    "화재": ["화재", "불이", "불나", "연기"],
+    "공습": ["공습", "미사일", "폭격", "민방공"],
+    "댐붕괴": ["댐"],
+    "산사태": ["산사태", "토사", "땅밀림"],
+    "붕괴": ["붕괴", "무너"],
+    "정전·전력부족": ["정전", "전력"],
+    "전기·가스사고": ["가스", "감전"],
+    "폭발사고": ["폭발"],
+    "철도·지하철사고": ["지하철", "철도", "열차"],
+    "터널사고": ["터널"],
+    "테러": ["테러"],
+}
+
+
+def detect_hazard(text: str) -> Optional[str]:
+    """질문에서 재난 유형 추정 (키워드 기반)"""
+    for hazard, keywords in HAZARD_KEYWORDS.items():
+        if any(keyword in text for keyword in keywords):
+            return hazard
+    return None
+
+
+class LocalAnswerEngine:
+    """전처리 데이터 기반 답변 엔진"""
+
+    def __init__(
+        self,
+        data_dir: str = PROCESSED_DATA_DIR,
+        policy_loader: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+        zone_loader: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+        shelter_grid: Optional[ShelterGrid] = None,
+        road_graph: Optional[RoadGraph] = None,
+        max_shelters: int = 5,
+        max_policies: int = 3,
+        max_sections: int = 3
+    ):
+        """
+        Args:
+            data_dir: 전처리 데이터 디렉토리
+            policy_loader: {"hazard_type", "name", "content"} 목록을 반환하는 함수 (그래프 조회 등).
+                실패하거나 없으면 전처리 CSV의 Policy 노드를 사용
+            zone_loader: {"id", "zone_type", "name", "reason", "lat", "lon"} 위험 구역 목록을 반환하는 함수.
+                실패하거나 없으면 전처리/원본 CSV를 사용
+            shelter_grid: 최근접 대피소 격자 (API 엔드포인트와 공유, 없으면 새로 생성)
+            road_graph: 도로망 도보 거리 (ROAD_NETWORK_PATH가 없으면 직선 거리만 사용)
+        """
+        self.data_dir = data_dir
+        self.policy_loader = policy_loader
+        self.zone_loader = zone_loader
+        self.max_shelters = max_shelters
+        self.max_policies = max_policies
+        self.max_sections = max_sections
+        self._lock = threading.Lock()
+        # invalidate()는 이벤트 루프에서 호출될 수 있으므로 로드 중인 _lock을 기다리지 않고 세대만 올림
+        self._state_lock = threading.Lock()
+        self._generation = 0
+        self._loaded_generation: Optional[int] = None
+        self.shelter_grid = shelter_grid or ShelterGrid(data_dir)
+        self.road_graph = road_graph or RoadGraph()
+        self.ranker = ShelterRanker()
+        self._policies: Dict[str, List[Dict[str, str]]] = {}
+        self.risk_zones = RiskZoneIndex([])
+        self._sections: List[Dict[str, Any]] = []
+        self._section_index: Optional[BigramBM25] = None
+        self._section_types = np.empty(0, dtype=object)
+        # 데이터 재적재 시 백그라운드에서 다시 로드
+        on_data_version_change(lambda version: self.invalidate())
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_generation == self._generation
+
+    def invalidate(self, reload: bool = True) -> None:
+        """로드한 데이터를 무효화하고, 이미 로드한 적이 있으면 백그라운드 스레드에서 다시 로드"""
+        with self._state_lock:
+            self._generation += 1
+            was_loaded = self._loaded_generation is not None
+        if reload and was_loaded:
+            threading.Thread(target=self._reload, name="local-answer-reload", daemon=True).start()
+
+    def _reload(self) -> None:
+        try:
+            self.load()
+        except Exception as e:
+            logger.warning(f"[LocalAnswer] 백그라운드 재로드 실패, 다음 요청에서 다시 시도: {e}")
+
+    def load(self) -> None:
+        """대피소/정책/행동요령 데이터 로드 (데이터 버전마다 1회)"""
+        with self._lock:
+            generation = self._generation
+            if self._loaded_generation == generation:
+                return
+            start = time.perf_counter()
+            self.shelter_grid.load()
+            if self.road_graph.enabled:
+                self.road_graph.load()
+            self._load_policies()
+            self._load_zones()
+            self._load_guidelines()
+            # 로드 중에 다시 무효화되었으면 세대가 달라 다음 load()에서 한 번 더 로드
+            self._loaded_generation = generation
+            logger.info(
+                f"[LocalAnswer] 로드 완료 ({(time.perf_counter() - start) * 1000:.0f}ms): "
+                f"대피소 {len(self.shelter_grid)}개, 정책 {sum(len(v) for v in self._policies.values())}개, "
+                f"위험 구역 {len(self.risk_zones)}개, 행동요령 {len(self._sections)}개 항목"
+            )
+
+    def _load_policies(self) -> None:
+        policies = None
+        if self.policy_loader is not None:
+            try:
+                policies = self.policy_loader()
+            except Exception as e:
+                logger.warning(f"[LocalAnswer] 그래프 정책 조회 실패, CSV 사용: {e}")
+        if not policies:
+            policies = self._read_policy_csv()
+
+        by_hazard: Dict[str, List[Dict[str, str]]] = {}
+        seen = set()
+        for policy in policies:
+            content = (policy.get("content") or "").strip()
+            hazard_type = policy.get("hazard_type")
+            if not content or not hazard_type or (hazard_type, content) in seen:
+                continue
+            seen.add((hazard_type, content))
+            by_hazard.setdefault(hazard_type, []).append({"name": policy.get("name") or "", "content": content})
+        self._policies = by_hazard
+
+    def _load_zones(self) -> None:
+        zones = None
+        if self.zone_loader is not None:
+            try:
+                zones = self.zone_loader()
+            except Exception as e:
+                logger.warning(f"[LocalAnswer] 그래프 위험 구역 조회 실패, CSV 사용: {e}")
+        if not zones:
+            try:
+                zones = read_zone_csvs(self.data_dir)
+            except (OSError, ValueError) as e:
+                logger.warning(f"[LocalAnswer] 위험 구역 CSV 읽기 실패: {e}")
+                zones = []
+        self.risk_zones = RiskZoneIndex(zones)
+
+    def _read_policy_csv(self) -> List[Dict[str, Any]]:
+        """전처리 CSV에서 (Policy)-[:GUIDES]->(Hazard) 조합 읽기"""
+        nodes_path = os.path.join(self.data_dir, NODES_FILE)
+        rels_path = os.path.join(self.data_dir, RELATIONSHIPS_FILE)
+        if not (os.path.exists(nodes_path) and os.path.exists(rels_path)):
+            return []
+        nodes = pd.read_csv(nodes_path, low_memory=False)
+        rels = pd.read_csv(rels_path, low_memory=False)
+        policies = nodes[nodes["type"] == "Policy"][["id", "name", "content"]].drop_duplicates("id")
+        hazards = nodes[nodes["type"] == "Hazard"][["id", "hazard_type"]]
+        guides = rels[rels["relationship_type"] == "GUIDES"][["from_id", "to_id"]]
+        merged = guides.merge(policies, left_on="from_id", right_on="id").merge(
+            hazards, left_on="to_id", right_on="id", suffixes=("", "_hazard")
+        )
+        merged = merged.dropna(subset=["content"])
+        return merged[["hazard_type", "name", "content"]].to_dict("records")
+
+    def _load_guidelines(self) -> None:
+        path = os.path.join(self.data_dir, GUIDELINES_FILE)
+        if not os.path.exists(path):
+            logger.warning(f"[LocalAnswer] 행동요령 파일 없음: {path}")
+            self._sections, self._section_index = [], None
+            return
+        docs = pd.read_csv(path).dropna(subset=["content"])
+        # 문서 제목만 있는 섹션("# 재난 행동요령: 지진" 등)은 제외
+        docs = docs[~docs["content"].str.lstrip().str.startswith("#")].drop_duplicates("content")
+        self._sections = [
+            {
+                "doc_id": row.doc_id,
+                "disaster_type": row.disaster_type,
+                "title": row.section_title.lstrip("# ").strip() if isinstance(row.section_title, str) else "",
+                "content": row.content.strip().rstrip("-").strip()
+            }
+            for row in docs.itertuples()
+        ]
+        self._section_index = BigramBM25([f"{s['title']} {s['content']}" for s in self._sections])
+        self._section_types = np.array([s["disaster_type"] for s in self._sections], dtype=object)
+
+    def nearest_shelters(self, lat: float, lon: float, k: int) -> List[Dict[str, Any]]:
+        """가까운 대피소 k개 (사전 계산 격자)"""
+        return self.shelter_grid.nearest(lat, lon, k, SHELTER_TYPES)
+
+    def ranked_shelters(
+        self,
+        lat: float,
+        lon: float,
+        k: int,
+        hazard: Optional[str] = None,
+        floor: Optional[int] = None,
+        mobility: Optional[str] = None,
+        radius_km: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """유형별 가까운 후보 SHELTER_RANK_CANDIDATES개씩을 층수/이동 능력/재난 유형/면적으로 재정렬한 상위 k개
+
+        유형별로 후보를 모아야 공습처럼 특정 유형(실내)을 선호하는 재난에서 더 가까운 다른 유형에 밀려
+        후보에서 빠지지 않습니다.
+        """
+        candidates = []
+        for shelter_type in SHELTER_TYPES:
+            candidates.extend(self.shelter_grid.nearest(
+                lat, lon, max(k, SHELTER_RANK_CANDIDATES), [shelter_type], radius_km
+            ))
+        return self.rank_candidates(lat, lon, candidates, k, hazard, floor, mobility)
+
+    def rank_candidates(
+        self,
+        lat: float,
+        lon: float,
+        candidates: List[Dict[str, Any]],
+        k: int,
+        hazard: Optional[str] = None,
+        floor: Optional[int] = None,
+        mobility: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """후보 시설에 도로망 도보 거리와 위험 구역 노출을 붙인 뒤 순위 상위 k개"""
+        self.load()
+        candidates = self.risk_zones.annotate(candidates, hazard)
+        if self.road_graph.enabled:
+            try:
+                candidates = self.road_graph.annotate(lat, lon, candidates)
+            except Exception as e:
+                logger.warning(f"[LocalAnswer] 도보 거리 계산 오류, 직선 거리 사용: {e}")
+        return self.ranker.rank(candidates, hazard, floor, mobility, k)
+
+    def zone_report(self, lat: float, lon: float) -> Optional[str]:
+        """사용자 위치 주변 위험 구역 evidence (없으면 None)"""
+        self.load()
+        return format_report(self.risk_zones.report(lat, lon))
+
+    def all_policies(self) -> Dict[str, List[Dict[str, str]]]:
+        """재난 유형별 전체 행동요령 정책 (오프라인 번들용)"""
+        self.load()
+        return {hazard: list(items) for hazard, items in self._policies.items()}
+
+    def guidelines(self) -> List[Dict[str, Any]]:
+        """국민행동요령 문서 항목 전체 (오프라인 번들용)"""
+        self.load()
+        return list(self._sections)
+
+    def policies_for(self, hazard: Optional[str]) -> List[Dict[str, str]]:
+        """재난 유형별 행동요령 정책"""
+        self.load()
+        return self._policies.get(hazard, [])[:self.max_policies] if hazard else []
+
+    def search_guidelines(self, query: str, hazard: Optional[str] = None) -> List[Dict[str, Any]]:
+        """국민행동요령 문서 BM25 상위 항목 (감지한 재난 유형 문서에서 먼저 찾고, 없으면 전체 문서)"""
+        self.load()
+        if self._section_index is None:
+            return []
+        matches = []
+        if hazard:
+            mask = (self._section_types == hazard).astype(np.float64)
+            if mask.any():
+                matches = self._section_index.search(f"{query} {hazard}", self.max_sections, mask)
+        if not matches:
+            matches = self._section_index.search(query, self.max_sections)
+        return [{**self._sections[i], "score": round(score, 3)} for i, score in matches]
+
+    @staticmethod
+    def _clip(text: str, limit: int = 400) -> str:
+        return text if len(text) <= limit else text[:limit] + "..."
+
+    def answer(self, input_text: str, user_info: Optional[dict] = None, reason: str = "") -> dict:
+        """Orchestrator.process와 같은 형태의 응답 생성"""
+        start = time.perf_counter()
+        self.load()
+        hazard = detect_hazard(input_text)
+        policies = self.policies_for(hazard)
+        sections = self.search_guidelines(input_text, hazard)
+
+        shelters = []
+        zone_text = None
+        if user_info and user_info.get("lat") is not None and user_info.get("lon") is not None:
+            zone_text = self.zone_report(user_info["lat"], user_info["lon"])
+            shelters = self.ranked_shelters(
+                user_info["lat"], user_info["lon"], self.max_shelters,
+                hazard, user_info.get("floor"), user_info.get("mobility")
+            )
+
+        conclusion_parts = []
+        if hazard:
+            conclusion_parts.append(f"질문은 {hazard} 관련 상황으로 확인됩니다.")
+        if shelters:
+            best = shelters[0]
+            conclusion_parts.append(
+                f"우선 대피 장소는 {best['name']}({best['shelter_type']})으로 약 {best['distance_km']}km"
+                f"{' (도로 ' + str(best['walk_km']) + 'km)' if best.get('route') == 'road' else ''}, "
+                f"도보 약 {best['walk_min']:.0f}분, 예상 대피 시간 약 {best['evacuation_min']:.0f}분입니다."
+            )
+        found = []
+        if policies:
+            found.append(f"행동요령 정책 {len(policies)}건")
+        if sections:
+            found.append(f"국민행동요령 문서 {len(sections)}개 항목")
+        if found:
+            conclusion_parts.append(f"관련 {', '.join(found)}이 확인됩니다.")
+        if not conclusion_parts:
+            conclusion_parts.append("현재 상세 분석을 수행할 수 없어 확인된 정보가 제한적입니다.")
+        conclusion = " ".join(conclusion_parts)
+
+        evidence_parts = []
+        if policies:
+            evidence_parts.append(f"{hazard} 행동요령 정책:")
+            for i, policy in enumerate(policies, 1):
+                title = f"[{policy['name']}] " if policy["name"] else ""
+                evidence_parts.append(f"{i}. {title}{self._clip(policy['content'])}")
+        if sections:
+            if evidence_parts:
+                evidence_parts.append("")
+            evidence_parts.append("행동요령 문서에서 확인한 정보:")
+            for i, section in enumerate(sections, 1):
+                title = f"[{section['title']}] " if section["title"] else ""
+                evidence_parts.append(f"{i}. {title}{self._clip(section['content'])}")
+        if shelters:
+            evidence_parts.append("\n주변 안전 거점 (층수/재난 유형 반영 순위):")
+            for i, shelter in enumerate(shelters, 1):
+                line = f"{i}. {shelter['name']} ({shelter['shelter_type']})"
+                if shelter["address"]:
+                    line += f" - {shelter['address']}"
+                line += f" [{distance_label(shelter)}]"
+                evidence_parts.append(line)
+        if zone_text:
+            evidence_parts.append(zone_text)
+        evidence = "\n".join(evidence_parts)
+
+        places = places_reference(shelters, "Local")
+
+        answer_parts = ["## 결론", conclusion, ""]
+        if evidence:
+            answer_parts.extend(["## 증거", evidence])
+
+        return {
+            "answer": "\n".join(answer_parts),
+            "conclusion": conclusion,
+            "evidence": evidence,
+            "explanation": {
+                "mode": "local",
+                "reason": reason,
+                "hazard": hazard,
+                "shelter_count": len(shelters),
+                "policy_count": len(policies),
+                "guidelines": [{"doc_id": s["doc_id"], "score": s["score"]} for s in sections],
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+            },
+            "places_reference": places
+        }
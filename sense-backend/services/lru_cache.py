@@ -0,0 +1,45 @@
+"""스레드 안전 LRU 캐시 (임베딩, Cypher 쿼리 등 외부 호출 결과 재사용)"""
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from services.metrics import record_cache
+
+
+class LRUCache:
+    """크기 제한 LRU 캐시 (조회 시 hit/miss 메트릭 기록)"""
+
+    def __init__(self, name: str, max_size: int):
+        self.name = name
+        self.max_size = max_size
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+        record_cache(self.name, hit=value is not None)
+        return value
+
+    def peek(self, key: Hashable) -> bool:
+        """메트릭 기록 없이 존재 여부 확인"""
+        with self._lock:
+            return key in self._items
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,294 @@
+"""재난 이벤트 대량 알림 대상 매칭
+
+등록된 사용자 위치(NOTIFY_USERS_PATH, 수십만~수백만 건)를 격자 공간 인덱스에 올려 두고,
+이벤트(진앙 + 반경 또는 다각형)가 들어오면 영향 범위의 사용자를 찾아 각자의 최근접 안전 대피소와
+함께 사용자별 알림 payload를 만듭니다.
+
+- 영향 사용자: 원형은 GridIndex.within, 다각형은 범위 셀 후보에 벡터화된 ray casting
+- 안전 대피소: 이벤트 재난 유형에서 적합도가 SAFE_TYPE_MIN_PREFERENCE 이상인 시설 유형 중 최근접
+  (ShelterGrid.nearest_bulk, 사용자 100만 명 기준 수 초)
+- 이벤트 유형은 preprocessing.py의 Event 노드 관계와 같이 재난 유형으로 연결 (강우 -> 산사태 등)
+
+사용법 (sense-backend 디렉터리에서):
+    python -m services.mass_notify match event.json --users users.csv --output payloads.jsonl
+    python -m services.mass_notify bench --users 1000000
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import NOTIFY_USERS_PATH, NOTIFY_CHUNK_SIZE
+from services.shelter_grid import ShelterGrid, FACILITY_TYPES, SHELTER_TYPES
+from services.shelter_ranking import HAZARD_TYPE_PREFERENCE, DEFAULT_TYPE_PREFERENCE
+from services.spatial_index import GridIndex
+
+logger = logging.getLogger(__name__)
+
+# 이벤트 유형 -> 재난 유형 (preprocessing.py: 집중호우 TRIGGERS 산사태, 지진 UPDATES 지진)
+EVENT_HAZARDS = {"강우": "산사태", "호우": "산사태", "집중호우": "산사태", "태풍": "홍수"}
+SEVERITIES = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+SEVERITY_LABELS = {"LOW": "안내", "MEDIUM": "주의", "HIGH": "경보", "CRITICAL": "긴급"}
+# 알림에 안내할 대피소 유형 최소 적합도 (예: 공습은 옥외대피소 제외)
+SAFE_TYPE_MIN_PREFERENCE = 0.6
+USER_CELL_DEG = 0.01
+
+
+def event_hazard(event_type: str) -> str:
+    """이벤트 유형에 해당하는 재난 유형"""
+    return EVENT_HAZARDS.get(event_type, event_type)
+
+
+def safe_types(hazard: Optional[str]) -> List[str]:
+    """재난 유형에서 안내할 대피소 유형"""
+    table = HAZARD_TYPE_PREFERENCE.get(hazard, {})
+    types = [t for t in SHELTER_TYPES if table.get(t, DEFAULT_TYPE_PREFERENCE) >= SAFE_TYPE_MIN_PREFERENCE]
+    return types or list(SHELTER_TYPES)
+
+
+def validate_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """이벤트 정규화 (잘못된 값은 ValueError)
+
+    event: {"event_id", "event_type", "severity", "lat", "lon", "radius_km"} 또는
+        {"event_id", "event_type", "severity", "polygon": [[lon, lat], ...]} (GeoJSON 좌표 순서)
+    """
+    event_type = str(event.get("event_type") or "").strip()
+    if not event_type:
+        raise ValueError("event_type이 필요합니다")
+    severity = str(event.get("severity") or "HIGH").upper()
+    if severity not in SEVERITIES:
+        raise ValueError(f"severity는 {SEVERITIES} 중 하나여야 합니다")
+    normalized = {
+        "event_id": event.get("event_id") or f"event_{event_type}_{int(time.time())}",
+        "event_type": event_type,
+        "hazard": event_hazard(event_type),
+        "severity": severity,
+        "lat": None, "lon": None, "radius_km": None, "polygon": None,
+    }
+    polygon = event.get("polygon")
+    if polygon:
+        ring = np.asarray(polygon, dtype=np.float64)
+        if ring.ndim != 2 or ring.shape[1] != 2 or len(ring) < 3:
+            raise ValueError("polygon은 [경도, 위도] 좌표 3개 이상이어야 합니다")
+        normalized["polygon"] = ring.tolist()
+        return normalized
+    try:
+        lat, lon, radius_km = float(event["lat"]), float(event["lon"]), float(event["radius_km"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("lat, lon, radius_km 또는 polygon이 필요합니다")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180) or radius_km <= 0:
+        raise ValueError("좌표 또는 radius_km가 올바르지 않습니다")
+    normalized.update(lat=lat, lon=lon, radius_km=radius_km)
+    return normalized
+
+
+def points_in_polygon(lats: np.ndarray, lons: np.ndarray, ring: np.ndarray) -> np.ndarray:
+    """점들이 다각형 안에 있는지 (ray casting, 변 단위 루프 + 점 방향 벡터 연산)"""
+    inside = np.zeros(len(lats), dtype=bool)
+    xs, ys = ring[:, 0], ring[:, 1]
+    for i in range(len(ring)):
+        x1, y1, x2, y2 = xs[i - 1], ys[i - 1], xs[i], ys[i]
+        if y1 == y2:
+            continue
+        crosses = (y1 > lats) != (y2 > lats)
+        x_cross = x1 + (lats - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (lons < x_cross)
+    return inside
+
+
+class NotificationMatcher:
+    """등록 사용자 위치 인덱스와 이벤트별 영향 사용자/최근접 대피소 매칭"""
+
+    def __init__(self, shelter_grid: Optional[ShelterGrid] = None, users_path: str = NOTIFY_USERS_PATH):
+        self.shelter_grid = shelter_grid or ShelterGrid()
+        self.users_path = users_path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.user_ids = np.empty(0, dtype=object)
+        self._index: Optional[GridIndex] = None
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def set_users(self, user_ids: Sequence[Any], lats: np.ndarray, lons: np.ndarray) -> None:
+        """사용자 위치 등록 (기존 목록 교체, 좌표가 없는 사용자 제외)"""
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        valid = np.isfinite(lats) & np.isfinite(lons)
+        start = time.perf_counter()
+        index = GridIndex(lats[valid], lons[valid], USER_CELL_DEG)
+        with self._lock:
+            self.user_ids = np.asarray(user_ids, dtype=object)[valid]
+            self._index = index
+            self._loaded = True
+        logger.info(
+            f"[MassNotify] 사용자 위치 {len(self.user_ids)}명 인덱스 구성 "
+            f"({(time.perf_counter() - start) * 1000:.0f}ms)"
+        )
+
+    def load(self) -> bool:
+        """NOTIFY_USERS_PATH에서 사용자 위치 읽기 (CSV: user_id,lat,lon / NPZ: user_ids,lats,lons)"""
+        if self._loaded:
+            return True
+        if not self.users_path or not os.path.exists(self.users_path):
+            return False
+        if self.users_path.endswith(".npz"):
+            with np.load(self.users_path, allow_pickle=True) as data:
+                user_ids, lats, lons = data["user_ids"], data["lats"], data["lons"]
+        else:
+            frame = pd.read_csv(self.users_path, dtype={"user_id": str})
+            user_ids, lats, lons = frame["user_id"].to_numpy(), frame["lat"].to_numpy(), frame["lon"].to_numpy()
+        self.set_users(user_ids, lats, lons)
+        return True
+
+    def affected(self, event: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """영향 범위의 사용자 (사용자 인덱스, 진앙 거리 km — 다각형 이벤트는 nan)"""
+        index = self._index
+        if index is None or not len(index):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        if event["polygon"] is not None:
+            ring = np.asarray(event["polygon"], dtype=np.float64)
+            candidates = index.within_bbox(ring[:, 1].min(), ring[:, 0].min(), ring[:, 1].max(), ring[:, 0].max())
+            inside = points_in_polygon(index.lats[candidates], index.lons[candidates], ring)
+            users = np.sort(candidates[inside])
+            return users, np.full(len(users), np.nan)
+        return index.within(event["lat"], event["lon"], event["radius_km"])
+
+    def match(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """이벤트 영향 사용자와 각자의 최근접 안전 대피소
+
+        Returns:
+            {"event", "users", "event_distance_km", "shelter_types", "shelter_indices", "shelter_distance_km",
+             "elapsed_ms"} (배열은 사용자 순서가 같음)
+        """
+        event = validate_event(event)
+        start = time.perf_counter()
+        self.load()
+        users, event_distances = self.affected(event)
+        index = self._index
+        types = safe_types(event["hazard"])
+        if len(users):
+            type_codes, shelter_indices, shelter_distances = self.shelter_grid.nearest_bulk(
+                index.lats[users], index.lons[users], types, NOTIFY_CHUNK_SIZE
+            )
+        else:
+            type_codes = np.empty(0, dtype=np.int8)
+            shelter_indices = np.empty(0, dtype=np.int32)
+            shelter_distances = np.empty(0)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(
+            f"[MassNotify] {event['event_id']} ({event['event_type']}): 사용자 {len(self)}명 중 "
+            f"{len(users)}명 영향, {elapsed_ms:.0f}ms"
+        )
+        return {
+            "event": event,
+            "users": users,
+            "event_distance_km": event_distances,
+            "shelter_types": type_codes,
+            "shelter_indices": shelter_indices,
+            "shelter_distance_km": shelter_distances,
+            "elapsed_ms": elapsed_ms
+        }
+
+    def payloads(self, matched: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """사용자별 알림 payload (많은 사용자를 한 번에 만들지 않도록 generator)"""
+        event = matched["event"]
+        facilities = self.shelter_grid.facilities()
+        label = SEVERITY_LABELS[event["severity"]]
+        users = matched["users"].tolist()
+        event_distances = np.round(matched["event_distance_km"], 2).tolist()
+        type_codes = matched["shelter_types"].tolist()
+        shelter_indices = matched["shelter_indices"].tolist()
+        shelter_distances = np.round(matched["shelter_distance_km"], 2).tolist()
+        for user, event_distance, type_code, shelter_index, shelter_distance in zip(
+            users, event_distances, type_codes, shelter_indices, shelter_distances
+        ):
+            shelter = None
+            message = f"[{label}] {event['hazard']} 영향 지역입니다."
+            if type_code >= 0:
+                facility = facilities[FACILITY_TYPES[type_code]][shelter_index]
+                shelter = {
+                    "id": facility["id"],
+                    "name": facility["name"],
+                    "address": facility["address"],
+                    "type": facility["shelter_type"],
+                    "lat": facility["lat"],
+                    "lon": facility["lon"],
+                    "distance_km": shelter_distance
+                }
+                message += f" 가까운 대피소: {facility['name']} ({shelter_distance}km)"
+            yield {
+                "user_id": self.user_ids[user],
+                "event_id": event["event_id"],
+                "event_type": event["event_type"],
+                "hazard": event["hazard"],
+                "severity": event["severity"],
+                "event_distance_km": None if event_distance != event_distance else event_distance,
+                "shelter": shelter,
+                "message": message
+            }
+
+
+def _random_users(count: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """서울 범위 임의 사용자 위치 (벤치마크용)"""
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(37.45, 37.70, count)
+    lons = rng.uniform(126.80, 127.18, count)
+    return np.arange(count).astype(str).astype(object), lats, lons
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="재난 이벤트 대량 알림 대상 매칭")
+    sub = parser.add_subparsers(dest="command", required=True)
+    match = sub.add_parser("match", help="이벤트 JSON으로 사용자별 알림 payload 생성")
+    match.add_argument("event", help="이벤트 JSON 파일")
+    match.add_argument("--users", default=NOTIFY_USERS_PATH, help="사용자 위치 CSV/NPZ")
+    match.add_argument("--output", default="-", help="JSON Lines 출력 파일 (- 는 표준 출력)")
+    bench = sub.add_parser("bench", help="임의 사용자 위치로 처리량 측정")
+    bench.add_argument("--users", type=int, default=1_000_000)
+    bench.add_argument("--radius-km", type=float, default=30.0)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    if args.command == "bench":
+        matcher = NotificationMatcher(users_path="")
+        start = time.perf_counter()
+        matcher.set_users(*_random_users(args.users))
+        index_s = time.perf_counter() - start
+        matcher.shelter_grid.load()
+        matched = matcher.match({"event_type": "지진", "lat": 37.5665, "lon": 126.9780, "radius_km": args.radius_km})
+        start = time.perf_counter()
+        payload_count = sum(1 for _ in matcher.payloads(matched))
+        payload_s = time.perf_counter() - start
+        print(
+            f"[MassNotify] 사용자 {args.users}명: 인덱스 {index_s:.2f}s, 매칭 {matched['elapsed_ms'] / 1000:.2f}s "
+            f"({len(matched['users'])}명 영향), payload {payload_count}건 {payload_s:.2f}s"
+        )
+        return 0
+
+    matcher = NotificationMatcher(users_path=args.users)
+    if not matcher.load():
+        print(f"[MassNotify] 사용자 위치 파일이 없습니다: {args.users}")
+        return 1
+    with open(args.event, encoding="utf-8") as f:
+        event = json.load(f)
+    matched = matcher.match(event)
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for payload in matcher.payloads(matched):
+            output.write(json.dumps(payload, ensure_ascii=False) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
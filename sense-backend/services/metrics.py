@@ -0,0 +1,206 @@
+"""Prometheus 메트릭 (멀티 워커 지원)
+
+PROMETHEUS_MULTIPROC_DIR 환경변수가 설정되면 prometheus_client의 multiprocess 모드로
+동작하여 여러 uvicorn 워커의 값을 공유 디렉토리에서 합산해 노출합니다.
+"""
+import os
+import time
+import logging
+from contextlib import contextmanager
+from typing import Optional
+
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram,
+    CONTENT_TYPE_LATEST, REGISTRY, generate_latest, multiprocess
+)
+
+from config import CONVERSATION_STORE_BACKEND
+
+logger = logging.getLogger(__name__)
+_pool_warned = False  # Neo4j 풀 구조 경고는 프로세스당 한 번만
+
+# LLM/외부 호출은 수 초 단위까지 걸리므로 기본 버킷보다 넓게 설정
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0)
+
+# HTTP 요청
+REQUEST_COUNT = Counter(
+    "sense_http_requests_total", "HTTP 요청 수",
+    ["method", "endpoint", "status"]
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "sense_http_requests_in_flight", "처리 중인 HTTP 요청 수",
+    ["endpoint"], multiprocess_mode="livesum"
+)
+REQUEST_LATENCY = Histogram(
+    "sense_http_request_duration_seconds", "HTTP 요청 처리 시간",
+    ["method", "endpoint"], buckets=LATENCY_BUCKETS
+)
+
+# 파이프라인 단계 (llm_planning, llm_cypher, cypher_exec, embedding, vector_query 등)
+STAGE_LATENCY = Histogram(
+    "sense_stage_duration_seconds", "파이프라인 단계별 처리 시간",
+    ["stage"], buckets=LATENCY_BUCKETS
+)
+
+# 캐시 (hit ratio = hits / (hits + misses))
+CACHE_REQUESTS = Counter(
+    "sense_cache_requests_total", "캐시 조회 수",
+    ["cache", "result"]
+)
+
+# 요청 병합 (single-flight): leader = 실제 실행, shared = 진행 중인 실행 결과를 공유
+SINGLE_FLIGHT_CALLS = Counter(
+    "sense_single_flight_calls_total", "single-flight 호출 수",
+    ["layer", "result"]
+)
+
+# 동시 처리 제한 (admission control)
+ADMISSION_IN_FLIGHT = Gauge(
+    "sense_admission_in_flight", "실행 중인 /chat 파이프라인 수",
+    multiprocess_mode="livesum"
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "sense_admission_queue_depth", "실행 대기 중인 /chat 요청 수",
+    ["priority"], multiprocess_mode="livesum"
+)
+ADMISSION_SHED = Counter(
+    "sense_admission_shed_total", "처리하지 못하고 503 또는 로컬 답변으로 대체한 요청 수",
+    ["reason"]
+)
+
+# Neo4j
+NEO4J_SESSIONS_IN_USE = Gauge(
+    "sense_neo4j_sessions_in_use", "사용 중인 Neo4j 세션 수",
+    multiprocess_mode="livesum"
+)
+NEO4J_POOL_CONNECTIONS = Gauge(
+    "sense_neo4j_pool_connections", "Neo4j 커넥션 풀 상태",
+    ["state"], multiprocess_mode="livesum"
+)
+
+# LLM 생성 Cypher 검사 (decision: allowed/rewritten/rejected/template)
+CYPHER_GUARD_DECISIONS = Counter(
+    "sense_cypher_guard_decisions_total", "Cypher 안전성/비용 검사 결과 수",
+    ["decision", "reason"]
+)
+
+# 대피소 조회 경로 (grid: 사전 계산 격자, index: 격자 후보 부족, outside: 격자 범위 밖, within: 반경 조회,
+# bulk: 대량 알림 일괄 조회)
+SHELTER_LOOKUPS = Counter(
+    "sense_shelter_lookups_total", "최근접 대피소 조회 수",
+    ["path"]
+)
+
+# 도로망 도보 거리 계산 결과 (routed: 도로 거리, beyond: 탐색 한도 초과, unsnapped: 도로에 붙일 수 없음)
+ROUTE_RESULTS = Counter(
+    "sense_route_results_total", "도로망 도보 거리 계산 수",
+    ["result"]
+)
+
+# 재난 이벤트 수집 (source: api/inbox/sync, result: ok/invalid/error)
+EVENTS_INGESTED = Counter(
+    "sense_events_ingested_total", "수집한 재난 이벤트 수",
+    ["source", "result"]
+)
+
+# Gemini
+GEMINI_ERRORS = Counter(
+    "sense_gemini_errors_total", "Gemini API 오류 수",
+    ["stage", "kind"]
+)
+GEMINI_TOKENS = Counter(
+    "sense_gemini_tokens_total", "Gemini 토큰 사용량 (kind: prompt/output)",
+    ["stage", "kind"]
+)
+
+# 대화 저장소: memory 백엔드는 워커마다 다른 대화를 가지므로 살아 있는 워커 값의 합(livesum),
+# sqlite 백엔드는 모든 워커가 같은 파일의 대화 수를 보고하므로 최댓값(livemax)으로 집계
+CONVERSATIONS = Gauge(
+    "sense_conversations", "저장된 대화 수",
+    ["backend"], multiprocess_mode="livemax" if CONVERSATION_STORE_BACKEND == "sqlite" else "livesum"
+)
+
+
+@contextmanager
+def track_stage(stage: str):
+    """파이프라인 단계 처리 시간 측정"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+def record_cache(cache: str, hit: bool):
+    """캐시 hit/miss 기록"""
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def record_single_flight(layer: str, shared: bool):
+    """single-flight 실행/공유 기록"""
+    SINGLE_FLIGHT_CALLS.labels(layer=layer, result="shared" if shared else "leader").inc()
+
+
+def record_gemini_usage(stage: str, response) -> None:
+    """Gemini 응답의 usage_metadata로 토큰 사용량 기록 (없으면 건너뜀)"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    for kind, attr in (("prompt", "prompt_token_count"), ("output", "candidates_token_count")):
+        count = getattr(usage, attr, None)
+        if count:
+            GEMINI_TOKENS.labels(stage=stage, kind=kind).inc(count)
+
+
+def record_gemini_error(stage: str, error: Exception):
+    """Gemini 오류 기록 (429/RESOURCE_EXHAUSTED는 별도 분류)"""
+    code = getattr(error, "code", None)
+    message = str(error)
+    if code == 429 or "429" in message or "RESOURCE_EXHAUSTED" in message:
+        kind = "rate_limited"
+    else:
+        kind = "error"
+    GEMINI_ERRORS.labels(stage=stage, kind=kind).inc()
+
+
+def update_neo4j_pool(driver) -> None:
+    """Neo4j 드라이버 커넥션 풀 상태 샘플링
+
+    드라이버가 공개 API로 풀 상태를 제공하지 않으므로 내부 속성(driver._pool.connections,
+    in_use_connection_count — neo4j 5.x~6.x 기준)을 조회합니다. 드라이버 업그레이드로 구조가 바뀌면
+    0으로 덮어쓰지 않고 값을 비워 두며 경고를 한 번 남깁니다.
+    """
+    global _pool_warned
+    pool = getattr(driver, "_pool", None)
+    connections = getattr(pool, "connections", None)
+    if not isinstance(connections, dict) or not callable(getattr(pool, "in_use_connection_count", None)):
+        if not _pool_warned:
+            _pool_warned = True
+            logger.warning("[Metrics] Neo4j 드라이버 내부 풀 구조가 달라 커넥션 풀 메트릭을 건너뜁니다")
+        return
+    try:
+        in_use = 0
+        total = 0
+        for address, address_connections in list(connections.items()):
+            total += len(address_connections)
+            in_use += pool.in_use_connection_count(address)
+        NEO4J_POOL_CONNECTIONS.labels(state="in_use").set(in_use)
+        NEO4J_POOL_CONNECTIONS.labels(state="idle").set(total - in_use)
+    except Exception as e:
+        logger.debug(f"[Metrics] Neo4j 풀 상태 조회 실패: {e}")
+
+
+def render_latest() -> tuple:
+    """/metrics 응답 본문과 Content-Type 반환"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: Optional[int] = None) -> None:
+    """종료된 워커의 live gauge 파일 정리"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -0,0 +1,407 @@
+"""모바일 오프라인 번들 (대피소/임시주거시설/급수시설 + 행동요령 문구)
+
+재난 직후 네트워크가 혼잡할 때 앱이 API 없이 쓸 수 있도록 시설 목록과 Policy 행동요령,
+국민행동요령 문서 항목을 작은 바이너리 하나로 묶습니다.
+- 좌표: 1e-6도 정수로 바꿔 유형·위도순으로 정렬한 뒤 앞 시설과의 차이를 int32로 저장
+- 문자열: 번들 전체에서 중복을 제거한 문자열 테이블의 인덱스(u32)로 저장
+- 전체 본문은 zlib으로 압축
+- 버전: 시설/문구 내용 해시. 보관 중인 이전 버전마다 바뀐 항목만 담은 delta 번들을 함께 만듦
+
+형식 (압축 해제 후, little-endian):
+    MAGIC(8) | 헤더 JSON 길이 u32 | 헤더 JSON | 문자열 테이블 | 시설 | 삭제된 시설 | 정책 | 행동요령
+    문자열 테이블: 개수 n u32, 문자열별 끝 오프셋 u32[n], UTF-8 바이트
+    시설: 개수 m u32, 유형 u8[m], id/이름/주소/시설 구분 문자열 인덱스 u32[m] x 4, 위도/경도 차분 int32[m] x 2
+    삭제된 시설 (delta만, full은 0개): 개수 u32, 유형 u8[], id 문자열 인덱스 u32[]
+    정책/행동요령: 개수 u32, 재난 유형/제목/내용 문자열 인덱스 u32[] x 3
+        (delta에서 바뀌지 않은 섹션은 0개이며 헤더의 sections 값이 "unchanged")
+
+사용법 (sense-backend 디렉터리에서):
+    python -m services.offline_bundle export
+    python -m services.offline_bundle inspect data/bundles/<version>.bin
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import struct
+import hashlib
+import logging
+import argparse
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import BUNDLE_DIR, BUNDLE_KEEP_VERSIONS, BUNDLE_COMPRESSION_LEVEL
+from services.shelter_grid import FACILITY_TYPES
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SENSEBND"
+BUNDLE_FORMAT = 1
+COORD_SCALE = 1_000_000
+FACILITY_FIELDS = ("id", "name", "address", "shelter_type")
+TEXT_SECTIONS = ("policies", "guidelines")
+
+
+class StringTable:
+    """중복 없는 문자열 목록 (추가 순서가 인덱스)"""
+
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def add(self, text: Optional[str]) -> int:
+        text = text or ""
+        index = self._index.get(text)
+        if index is None:
+            index = self._index[text] = len(self.strings)
+            self.strings.append(text)
+        return index
+
+    def encode(self) -> bytes:
+        blobs = [text.encode("utf-8") for text in self.strings]
+        ends = np.cumsum([len(blob) for blob in blobs], dtype=np.int64).astype("<u4")
+        return struct.pack("<I", len(blobs)) + ends.tobytes() + b"".join(blobs)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def take(self, size: int) -> memoryview:
+        chunk = self.data[self.offset:self.offset + size]
+        if len(chunk) != size:
+            raise ValueError("번들이 잘렸습니다")
+        self.offset += size
+        return chunk
+
+    def u32(self) -> int:
+        return struct.unpack("<I", self.take(4))[0]
+
+    def array(self, dtype: str, count: int) -> np.ndarray:
+        return np.frombuffer(self.take(np.dtype(dtype).itemsize * count), dtype=dtype, count=count)
+
+
+def facility_records(facilities: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """번들에 넣을 시설 목록 (유형·위도·경도순, 좌표는 1e-6도로 반올림)"""
+    records = [
+        {
+            **{field: str(item.get(field) or "") for field in FACILITY_FIELDS},
+            "category": facility_type,
+            "lat": round(float(item["lat"]), 6),
+            "lon": round(float(item["lon"]), 6),
+        }
+        for facility_type in FACILITY_TYPES
+        for item in facilities.get(facility_type, [])
+    ]
+    records.sort(key=lambda r: (FACILITY_TYPES.index(r["category"]), r["lat"], r["lon"], r["id"]))
+    return records
+
+
+def bundle_texts(policies: Dict[str, List[Dict[str, str]]], sections: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, str]]]:
+    """재난 유형별 정책과 행동요령 문서 항목을 번들 문구 섹션(재난 유형, 제목, 내용)으로 변환"""
+    return {
+        "policies": [
+            {"hazard_type": hazard, "title": policy["name"], "content": policy["content"]}
+            for hazard in sorted(policies) for policy in policies[hazard]
+        ],
+        "guidelines": [
+            {
+                "hazard_type": section["disaster_type"] if isinstance(section["disaster_type"], str) else "",
+                "title": section["title"],
+                "content": section["content"],
+            }
+            for section in sections
+        ],
+    }
+
+
+def content_version(records: List[Dict[str, Any]], texts: Dict[str, List[Dict[str, str]]]) -> str:
+    """시설/문구 내용 해시 (같은 내용이면 같은 버전)"""
+    canonical = json.dumps({"format": BUNDLE_FORMAT, "facilities": records, **texts}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:12]
+
+
+def _encode_facilities(records: List[Dict[str, Any]], strings: StringTable) -> bytes:
+    types = np.array([FACILITY_TYPES.index(r["category"]) for r in records], dtype="u1")
+    parts = [struct.pack("<I", len(records)), types.tobytes()]
+    for field in FACILITY_FIELDS:
+        parts.append(np.array([strings.add(r[field]) for r in records], dtype="<u4").tobytes())
+    for axis in ("lat", "lon"):
+        scaled = np.rint(np.array([r[axis] for r in records], dtype=np.float64) * COORD_SCALE).astype(np.int64)
+        parts.append(np.diff(scaled, prepend=0).astype("<i4").tobytes())
+    return b"".join(parts)
+
+
+def _decode_facilities(reader: _Reader, strings: List[str]) -> List[Dict[str, Any]]:
+    count = reader.u32()
+    types = reader.array("u1", count)
+    fields = {field: reader.array("<u4", count) for field in FACILITY_FIELDS}
+    coords = {axis: np.cumsum(reader.array("<i4", count).astype(np.int64)) / COORD_SCALE for axis in ("lat", "lon")}
+    return [
+        {
+            **{field: strings[fields[field][i]] for field in FACILITY_FIELDS},
+            "category": FACILITY_TYPES[types[i]],
+            "lat": round(float(coords["lat"][i]), 6),
+            "lon": round(float(coords["lon"][i]), 6),
+        }
+        for i in range(count)
+    ]
+
+
+def _encode_removed(keys: List[Tuple[str, str]], strings: StringTable) -> bytes:
+    types = np.array([FACILITY_TYPES.index(category) for category, _ in keys], dtype="u1")
+    ids = np.array([strings.add(facility_id) for _, facility_id in keys], dtype="<u4")
+    return struct.pack("<I", len(keys)) + types.tobytes() + ids.tobytes()
+
+
+def _decode_removed(reader: _Reader, strings: List[str]) -> List[Tuple[str, str]]:
+    count = reader.u32()
+    types, ids = reader.array("u1", count), reader.array("<u4", count)
+    return [(FACILITY_TYPES[t], strings[i]) for t, i in zip(types, ids)]
+
+
+def _encode_texts(rows: List[Dict[str, str]], strings: StringTable) -> bytes:
+    parts = [struct.pack("<I", len(rows))]
+    for key in ("hazard_type", "title", "content"):
+        parts.append(np.array([strings.add(row[key]) for row in rows], dtype="<u4").tobytes())
+    return b"".join(parts)
+
+
+def _decode_texts(reader: _Reader, strings: List[str]) -> List[Dict[str, str]]:
+    count = reader.u32()
+    columns = {key: reader.array("<u4", count) for key in ("hazard_type", "title", "content")}
+    return [{key: strings[columns[key][i]] for key in columns} for i in range(count)]
+
+
+def encode_bundle(
+    header: Dict[str, Any],
+    facilities: List[Dict[str, Any]],
+    texts: Dict[str, Optional[List[Dict[str, str]]]],
+    removed: Optional[List[Tuple[str, str]]] = None,
+    level: int = BUNDLE_COMPRESSION_LEVEL
+) -> bytes:
+    """번들 바이너리 (texts의 값이 None인 섹션은 바뀌지 않음으로 표시)"""
+    header = {**header, "format": BUNDLE_FORMAT, "types": FACILITY_TYPES, "coord_scale": COORD_SCALE,
+              "sections": {name: "unchanged" if texts.get(name) is None else "replace" for name in TEXT_SECTIONS}}
+    strings = StringTable()
+    sections = [_encode_facilities(facilities, strings), _encode_removed(removed or [], strings)]
+    sections += [_encode_texts(texts.get(name) or [], strings) for name in TEXT_SECTIONS]
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    body = b"".join([MAGIC, struct.pack("<I", len(header_bytes)), header_bytes, strings.encode(), *sections])
+    return zlib.compress(body, level)
+
+
+def decode_bundle(blob: bytes) -> Dict[str, Any]:
+    """번들 바이너리 해석 (앱 구현 참고용, delta 계산에 사용)"""
+    reader = _Reader(zlib.decompress(blob))
+    if bytes(reader.take(len(MAGIC))) != MAGIC:
+        raise ValueError("SENSE 번들이 아닙니다")
+    header = json.loads(bytes(reader.take(reader.u32())).decode("utf-8"))
+    if header.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"지원하지 않는 번들 형식: {header.get('format')}")
+
+    count = reader.u32()
+    ends = reader.array("<u4", count).astype(np.int64)
+    blob_bytes = bytes(reader.take(int(ends[-1]) if count else 0))
+    starts = np.concatenate(([0], ends[:-1])) if count else ends
+    strings = [blob_bytes[s:e].decode("utf-8") for s, e in zip(starts, ends)]
+
+    decoded = {
+        "header": header,
+        "facilities": _decode_facilities(reader, strings),
+        "removed": _decode_removed(reader, strings),
+    }
+    for name in TEXT_SECTIONS:
+        rows = _decode_texts(reader, strings)
+        decoded[name] = None if header["sections"][name] == "unchanged" else rows
+    return decoded
+
+
+def _key(record: Dict[str, Any]) -> Tuple[str, str]:
+    return record["category"], record["id"]
+
+
+def diff_bundles(base: Dict[str, Any], records: List[Dict[str, Any]], texts: Dict[str, List[Dict[str, str]]]):
+    """base(decode_bundle 결과)에서 현재 내용으로 가는 변경분 (추가/수정 시설, 삭제 키, 바뀐 문구 섹션)"""
+    base_records = {_key(r): r for r in base["facilities"]}
+    current_keys = {_key(r) for r in records}
+    upserts = [r for r in records if base_records.get(_key(r)) != r]
+    removed = sorted(key for key in base_records if key not in current_keys)
+    changed = {name: (texts[name] if base.get(name) != texts[name] else None) for name in TEXT_SECTIONS}
+    return upserts, removed, changed
+
+
+def apply_delta(base: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """full 번들에 delta 적용 (앱이 하는 갱신과 같은 결과)"""
+    if delta["header"].get("base_version") != base["header"]["version"]:
+        raise ValueError("delta의 기준 버전이 다릅니다")
+    records = {_key(r): r for r in base["facilities"]}
+    for key in delta["removed"]:
+        records.pop(tuple(key), None)
+    for record in delta["facilities"]:
+        records[_key(record)] = record
+    facilities = sorted(records.values(), key=lambda r: (FACILITY_TYPES.index(r["category"]), r["lat"], r["lon"], r["id"]))
+    merged = {"header": {**delta["header"], "kind": "full"}, "facilities": facilities, "removed": []}
+    for name in TEXT_SECTIONS:
+        merged[name] = base[name] if delta[name] is None else delta[name]
+    return merged
+
+
+class BundleStore:
+    """번들 파일 보관 (최신 full 번들, 최근 keep_versions개 이전 버전에서 최신으로 가는 delta)
+
+    파일: {version}.bin, {base}-{version}.delta.bin, manifest.json
+    """
+
+    def __init__(self, bundle_dir: str = BUNDLE_DIR, keep_versions: int = BUNDLE_KEEP_VERSIONS):
+        self.bundle_dir = bundle_dir
+        self.keep_versions = keep_versions
+        self._lock = threading.Lock()
+        self._exported_for: Optional[str] = None
+        self._cache: Dict[str, bytes] = {}
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.bundle_dir, name)
+
+    def _write(self, name: str, data: bytes) -> None:
+        tmp = self._path(f"{name}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(name))
+
+    def manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self._path("manifest.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"current": None, "versions": []}
+
+    def export(
+        self,
+        facilities: Dict[str, List[Dict[str, Any]]],
+        texts: Dict[str, List[Dict[str, str]]],
+        data_version: str = ""
+    ) -> Dict[str, Any]:
+        """현재 내용으로 번들 생성 (내용이 같으면 기존 버전 유지)"""
+        records = facility_records(facilities)
+        version = content_version(records, texts)
+        manifest = self.manifest()
+        if manifest.get("current") == version and os.path.exists(self._path(f"{version}.bin")):
+            return manifest
+
+        start = time.perf_counter()
+        os.makedirs(self.bundle_dir, exist_ok=True)
+        created_at = time.time()
+        header = {"kind": "full", "version": version, "data_version": data_version, "created_at": created_at}
+        full = encode_bundle(header, records, texts)
+        self._write(f"{version}.bin", full)
+
+        previous = [v for v in manifest.get("versions", []) if v != version]
+        previous = previous[-(self.keep_versions - 1):] if self.keep_versions > 1 else []
+        deltas = {}
+        for base_version in previous:
+            try:
+                with open(self._path(f"{base_version}.bin"), "rb") as f:
+                    base = decode_bundle(f.read())
+            except (OSError, ValueError) as e:
+                logger.warning(f"[Bundle] 이전 버전 {base_version} 읽기 실패, delta 생략: {e}")
+                continue
+            upserts, removed, changed = diff_bundles(base, records, texts)
+            delta_header = {**header, "kind": "delta", "base_version": base_version}
+            delta = encode_bundle(delta_header, upserts, changed, removed)
+            self._write(f"{base_version}-{version}.delta.bin", delta)
+            deltas[base_version] = {"size": len(delta), "upserts": len(upserts), "removed": len(removed)}
+
+        manifest = {
+            "current": version,
+            "data_version": data_version,
+            "created_at": created_at,
+            "size": len(full),
+            "counts": {t: sum(1 for r in records if r["category"] == t) for t in FACILITY_TYPES},
+            "texts": {name: len(rows) for name, rows in texts.items()},
+            "versions": [v for v in previous if v in deltas] + [version],
+            "deltas": deltas,
+        }
+        self._write("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+        self._cleanup(manifest)
+        self._cache.clear()
+        logger.info(
+            f"[Bundle] 버전 {version} 생성 ({(time.perf_counter() - start) * 1000:.0f}ms): "
+            f"{len(full) / 1024:.0f}KB, 시설 {len(records)}개, delta {len(deltas)}개"
+        )
+        return manifest
+
+    def _cleanup(self, manifest: Dict[str, Any]) -> None:
+        """보관 대상이 아닌 full/delta 파일 삭제"""
+        keep = {f"{v}.bin" for v in manifest["versions"]}
+        keep |= {f"{base}-{manifest['current']}.delta.bin" for base in manifest["deltas"]}
+        for name in os.listdir(self.bundle_dir):
+            if name.endswith(".bin") and name not in keep:
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+
+    def ensure(self, data_version: str, loader: Callable[[], Tuple[Dict, Dict]]) -> Dict[str, Any]:
+        """이 프로세스에서 data_version으로 아직 만들지 않았으면 번들 갱신"""
+        with self._lock:
+            if self._exported_for != data_version:
+                facilities, texts = loader()
+                self.export(facilities, texts, data_version)
+                self._exported_for = data_version
+            return self.manifest()
+
+    def read(self, since: Optional[str] = None) -> Tuple[str, str, bytes]:
+        """(종류 full|delta, 최신 버전, 바이너리) — since에서 가는 delta가 있으면 delta"""
+        current = self.manifest().get("current")
+        if current is None:
+            raise FileNotFoundError("생성된 번들이 없습니다")
+        name, kind = f"{current}.bin", "full"
+        if since and since != current and os.path.exists(self._path(f"{since}-{current}.delta.bin")):
+            name, kind = f"{since}-{current}.delta.bin", "delta"
+        data = self._cache.get(name)
+        if data is None:
+            with open(self._path(name), "rb") as f:
+                data = self._cache[name] = f.read()
+        return kind, current, data
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="모바일 오프라인 번들")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="전처리 데이터로 번들 생성")
+    export.add_argument("--output", default=BUNDLE_DIR)
+    inspect = sub.add_parser("inspect", help="번들 파일 내용 요약")
+    inspect.add_argument("path")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    if args.command == "export":
+        # 오프라인 실행: 정책은 그래프 대신 전처리 CSV에서 읽음
+        from services.local_answer import LocalAnswerEngine
+        engine = LocalAnswerEngine()
+        texts = bundle_texts(engine.all_policies(), engine.guidelines())
+        manifest = BundleStore(args.output).export(engine.shelter_grid.facilities(), texts)
+        print(json.dumps(manifest, ensure_ascii=False, indent=2))
+        return 0
+
+    with open(args.path, "rb") as f:
+        blob = f.read()
+    bundle = decode_bundle(blob)
+    summary = {
+        "header": bundle["header"],
+        "compressed_bytes": len(blob),
+        "facilities": len(bundle["facilities"]),
+        "removed": len(bundle["removed"]),
+        **{name: None if bundle[name] is None else len(bundle[name]) for name in TEXT_SECTIONS},
+    }
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
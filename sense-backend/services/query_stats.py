@@ -0,0 +1,160 @@
+"""실행된 Cypher 쿼리 형태별 통계 (느린 쿼리 로그)
+
+LLM이 만든 쿼리는 값만 다르고 형태가 같은 경우가 많으므로, 문자열/숫자 리터럴을 ?로 바꾼
+fingerprint 단위로 실행 횟수, 실행 시간, 반환 행 수, db hits를 누적합니다.
+db hits는 PROFILE로 실행한 일부 요청(CYPHER_PROFILE_SAMPLE_RATE)에서만 측정합니다.
+통계는 워커 프로세스별 메모리에 보관하며 /admin/cypher/stats로 조회합니다.
+"""
+import re
+import time
+import random
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from config import CYPHER_SLOW_MS, CYPHER_PROFILE_SAMPLE_RATE, CYPHER_STATS_MAX_FINGERPRINTS
+
+logger = logging.getLogger(__name__)
+
+_COMMENT_PATTERN = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_PATTERN = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_PATTERN = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+
+SORT_KEYS = ("max_ms", "mean_ms", "total_ms", "count", "mean_db_hits")
+
+
+def fingerprint(query: str) -> str:
+    """리터럴을 ?로 바꾸고 공백을 정리한 쿼리 형태"""
+    text = _COMMENT_PATTERN.sub(" ", query)
+    text = _STRING_PATTERN.sub("?", text)
+    text = _NUMBER_PATTERN.sub("?", text)
+    return " ".join(text.split()).rstrip(";")
+
+
+def profile_db_hits(profile: Optional[Dict[str, Any]]) -> Optional[int]:
+    """PROFILE 계획 트리의 db hits 합계 (프로파일이 없으면 None)"""
+    if not profile:
+        return None
+    total = 0
+    stack = [profile]
+    while stack:
+        node = stack.pop()
+        hits = node.get("dbHits", (node.get("args") or {}).get("DbHits"))
+        if isinstance(hits, (int, float)):
+            total += int(hits)
+        stack.extend(node.get("children") or [])
+    return total
+
+
+@dataclass
+class FingerprintStats:
+    """fingerprint 하나의 누적 통계"""
+    fingerprint: str
+    sample_query: str = ""
+    count: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_ms: float = 0.0
+    rows_total: int = 0
+    max_rows: int = 0
+    profiled: int = 0
+    db_hits_total: int = 0
+    max_db_hits: int = 0
+    sources: Dict[str, int] = field(default_factory=dict)
+    last_seen: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "sample_query": self.sample_query,
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 1),
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 1),
+            "last_ms": round(self.last_ms, 1),
+            "mean_rows": round(self.rows_total / self.count, 1) if self.count else 0.0,
+            "max_rows": self.max_rows,
+            "profiled": self.profiled,
+            "mean_db_hits": round(self.db_hits_total / self.profiled, 1) if self.profiled else None,
+            "max_db_hits": self.max_db_hits if self.profiled else None,
+            "sources": dict(self.sources),
+            "last_seen": self.last_seen
+        }
+
+
+class QueryStats:
+    """fingerprint별 Cypher 실행 통계 (크기 제한, 넘치면 누적 실행 시간이 가장 작은 항목 제거)"""
+
+    def __init__(
+        self,
+        slow_ms: float = CYPHER_SLOW_MS,
+        profile_sample_rate: float = CYPHER_PROFILE_SAMPLE_RATE,
+        max_fingerprints: int = CYPHER_STATS_MAX_FINGERPRINTS
+    ):
+        self.slow_ms = slow_ms
+        self.profile_sample_rate = profile_sample_rate
+        self.max_fingerprints = max_fingerprints
+        self._stats: Dict[str, FingerprintStats] = {}
+        self._lock = threading.Lock()
+
+    def should_profile(self) -> bool:
+        """이번 실행을 PROFILE로 할지 (샘플링)"""
+        return self.profile_sample_rate > 0 and random.random() < self.profile_sample_rate
+
+    def record(
+        self,
+        query: str,
+        elapsed_ms: float,
+        rows: int = 0,
+        db_hits: Optional[int] = None,
+        error: bool = False,
+        source: str = "llm"
+    ) -> None:
+        key = fingerprint(query)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    victim = min(self._stats.values(), key=lambda s: s.total_ms)
+                    del self._stats[victim.fingerprint]
+                stats = self._stats[key] = FingerprintStats(key)
+            stats.sample_query = query
+            stats.count += 1
+            stats.errors += int(error)
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.last_ms = elapsed_ms
+            stats.rows_total += rows
+            stats.max_rows = max(stats.max_rows, rows)
+            if db_hits is not None:
+                stats.profiled += 1
+                stats.db_hits_total += db_hits
+                stats.max_db_hits = max(stats.max_db_hits, db_hits)
+            stats.sources[source] = stats.sources.get(source, 0) + 1
+            stats.last_seen = time.time()
+
+        if elapsed_ms >= self.slow_ms:
+            hits = f", db hits {db_hits}" if db_hits is not None else ""
+            logger.warning(
+                f"[Cypher Stats] 느린 쿼리 {elapsed_ms:.0f}ms ({rows}행{hits}, {source}): {key[:300]}"
+            )
+
+    def top(self, limit: int = 20, sort: str = "max_ms") -> List[Dict[str, Any]]:
+        """정렬 기준 상위 fingerprint 목록"""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort는 {', '.join(SORT_KEYS)} 중 하나여야 합니다: {sort}")
+        with self._lock:
+            items = [s.to_dict() for s in self._stats.values()]
+        items.sort(key=lambda item: item[sort] or 0, reverse=True)
+        return items[:limit]
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._stats)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats.clear()
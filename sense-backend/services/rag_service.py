@@ -1,9 +1,12 @@
 """Hybrid RAG 서비스 (노트북 코드 기반)"""
 import os
+import math
+import time
 import asyncio
 import logging
+from contextlib import contextmanager
 from typing import List, Dict, Optional
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, READ_ACCESS, WRITE_ACCESS
 import chromadb
 from chromadb.config import Settings
 from google import genai
@@ -13,11 +16,46 @@ from config import (
     NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD,
     CHROMA_PERSIST_DIR, CHROMA_HOST, CHROMA_PORT, CHROMA_USE_HTTP_CLIENT,
     GOOGLE_API_KEY,
-    GEMINI_MODEL, GEMINI_EMBEDDING_MODEL, EMBEDDING_DIM
+    GEMINI_MODEL, GEMINI_EMBEDDING_MODEL, EMBEDDING_DIM,
+    EMBEDDING_CACHE_SIZE, CYPHER_CACHE_SIZE, BATCH_EMBED_CHUNK, VECTOR_TOP_K,
+    CYPHER_GUARD_ENABLED, NEARBY_FACILITY_LABELS, NEARBY_RADIUS_KM, NEARBY_TOP_K
 )
+from services.metrics import (
+    NEO4J_SESSIONS_IN_USE, track_stage, record_cache, record_gemini_error, record_gemini_usage
+)
+from services.tracing import start_span, set_span_attributes, query_hash
+from services.data_version import DataChange, on_data_version_change
+from services.single_flight import SingleFlight
+from services.lru_cache import LRUCache
+from services.cypher_guard import CypherGuard
+from services.query_stats import QueryStats, profile_db_hits
+from services.graph_schema import LOCATION_PROPERTY
+from services.spatial_index import KM_PER_DEG_LAT
 
 logger = logging.getLogger(__name__)
 
+# shelter_type 속성이 없는 시설 라벨의 표시 이름
+FACILITY_TYPE_NAMES = {"Shelter": "대피소", "TemporaryHousing": "임시주거시설", "WaterFacility": "급수시설"}
+
+
+def nearby_facilities_query(labels: List[str]) -> str:
+    """라벨별 bounding box(point 인덱스)로 후보를 좁힌 뒤 DB에서 거리순 정렬해 상위 $k개 반환"""
+    bbox = (
+        f"point.withinBBox(n.{LOCATION_PROPERTY}, "
+        "point({latitude: $min_lat, longitude: $min_lon}), point({latitude: $max_lat, longitude: $max_lon}))"
+    )
+    branches = "\n    UNION ALL\n".join(f"    MATCH (n:{label}) WHERE {bbox} RETURN n" for label in labels)
+    return f"""CALL {{
+{branches}
+}}
+WITH n, point.distance(n.{LOCATION_PROPERTY}, point({{latitude: $lat, longitude: $lon}})) AS distance
+WHERE distance <= $radius_m
+RETURN n.id AS id, n.name AS name, n.address AS address,
+       n.shelter_type AS shelter_type, labels(n)[0] AS label,
+       n.lat AS lat, n.lon AS lon, n.area AS area, distance
+ORDER BY distance
+LIMIT $k"""
+
 
 class GeminiEmbeddingFunction:
     """Chroma용 Gemini 임베딩 함수"""
@@ -107,15 +145,73 @@ class HybridRAGService:
                 logger.error(f"[RAG Service] Chroma 컬렉션 생성 오류: {e}")
                 raise
         
-        # Neo4j 스키마 캐싱 (매번 조회하지 않도록)
+        # Neo4j 스키마 캐싱 (매번 조회하지 않도록, 데이터 재적재/이벤트 수집 시 무효화)
+        self._schema_cache = None
+        on_data_version_change(self._invalidate_schema_cache, scoped=True)
+        
+        # 동시에 들어온 동일한 외부 호출 병합 (N개의 동일 요청 -> 1번의 upstream 호출)
+        self._cypher_flight = SingleFlight("llm_cypher")
+        self._embed_flight = SingleFlight("embedding")
+        self._chroma_flight = SingleFlight("vector_query")
+        
+        # 질문 임베딩 / 질문별 Cypher 쿼리 캐시 (Cypher는 스키마가 바뀌면 무효)
+        self._embedding_cache = LRUCache("embedding", EMBEDDING_CACHE_SIZE)
+        self._cypher_cache = LRUCache("cypher", CYPHER_CACHE_SIZE)
+        
+        # LLM 생성 Cypher 검사 (타임아웃은 검사 사용 여부와 관계없이 항상 적용)
+        self.cypher_guard = CypherGuard()
+        self.cypher_guard_enabled = CYPHER_GUARD_ENABLED
+        
+        # 실행된 Cypher 형태별 통계 (느린 쿼리 로그, /admin/cypher/stats)
+        self.query_stats = QueryStats()
+        
+        # 서브 문제별 Vector RAG top_k 고정값 (0이면 검색 계획의 top_k 사용)
+        self.vector_top_k = VECTOR_TOP_K
+    
+    def _invalidate_schema_cache(self, version: str, change: Optional[DataChange] = None) -> None:
+        """데이터 버전 변경 시 스키마/Cypher 캐시 무효화
+
+        일부 변경(이벤트 수집 등)은 스키마만 다시 조회합니다. Cypher 캐시 키에 스키마 해시가 있어
+        스키마 문자열이 그대로면 기존 쿼리를 계속 쓰고, 바뀌면 이전 항목은 LRU로 밀려납니다.
+        """
         self._schema_cache = None
+        if change is None:
+            self._cypher_cache.clear()
+            self.cypher_guard.clear()
     
-    def get_neo4j_session(self):
-        """Neo4j 세션 가져오기"""
-        return self.neo4j_driver.session()
+    @contextmanager
+    def get_neo4j_session(self, read_only: bool = False):
+        """Neo4j 세션 가져오기 (사용 중인 세션 수 메트릭 기록)
+
+        read_only=True면 READ_ACCESS 세션으로 열어 서버가 쓰기 쿼리를 거부합니다
+        (LLM 생성 Cypher를 실행하는 검색 세션에 사용).
+        """
+        session = self.neo4j_driver.session(default_access_mode=READ_ACCESS if read_only else WRITE_ACCESS)
+        NEO4J_SESSIONS_IN_USE.inc()
+        try:
+            yield session
+        finally:
+            NEO4J_SESSIONS_IN_USE.dec()
+            session.close()
+    
+    async def get_schema(self, session, use_cache: bool = True) -> str:
+        """스키마 조회 (캐시 사용 시 최초 1회만 Neo4j 조회)"""
+        if use_cache and self._schema_cache:
+            record_cache("neo4j_schema", hit=True)
+            return self._schema_cache
+        
+        record_cache("neo4j_schema", hit=False)
+        schema = await asyncio.to_thread(self.get_neo4j_schema, session)
+        if use_cache:
+            self._schema_cache = schema
+        return schema
     
     def get_neo4j_schema(self, session) -> str:
         """Neo4j 그래프 스키마 정보 가져오기"""
+        with start_span("neo4j.schema"), track_stage("cypher_schema"):
+            return self._fetch_neo4j_schema(session)
+    
+    def _fetch_neo4j_schema(self, session) -> str:
         node_labels_query = "CALL db.labels()"
         node_labels = [record["label"] for record in session.run(node_labels_query)]
         
@@ -157,8 +253,82 @@ class HybridRAGService:
         
         return "\n".join(schema_parts)
     
+    def fetch_policies(self) -> List[Dict]:
+        """재난 유형별 Policy 행동요령 전체 조회 (LLM 없는 로컬 답변 엔진 적재용)"""
+        query = """
+        MATCH (p:Policy)-[:GUIDES]->(h:Hazard)
+        WHERE p.content IS NOT NULL AND p.content <> ''
+        RETURN h.hazard_type AS hazard_type, p.name AS name, p.content AS content
+        """
+        with self.get_neo4j_session() as session:
+            return [record.data() for record in session.run(query)]
+    
+    def fetch_zones(self) -> List[Dict]:
+        """좌표가 있는 위험 구역(Zone) 전체 조회 (위험 구역 공간 인덱스 적재용)"""
+        query = """
+        MATCH (z:Zone)
+        WHERE z.lat IS NOT NULL AND z.lon IS NOT NULL
+        RETURN z.id AS id, z.zone_type AS zone_type, z.name AS name, z.reason AS reason,
+               toFloat(z.lat) AS lat, toFloat(z.lon) AS lon
+        """
+        with self.get_neo4j_session() as session:
+            return [record.data() for record in session.run(query)]
+
+    def upsert_event(self, properties: Dict, hazard: str, relationship_type: str, relationship: Dict) -> None:
+        """Event 노드 MERGE(id 기준) 후 재난 유형(Hazard) 관계를 다시 연결 (실시간 이벤트 수집용)
+
+        Args:
+            properties: Event 노드 속성 (id 포함, None 값은 속성 삭제)
+            hazard: 연결할 Hazard의 hazard_type (없으면 생성)
+            relationship_type: UPDATES | TRIGGERS
+            relationship: 관계 속성
+        """
+        if relationship_type not in ("UPDATES", "TRIGGERS"):
+            raise ValueError(f"지원하지 않는 이벤트 관계: {relationship_type}")
+        query = f"""
+        MERGE (e:Event {{id: $id}})
+        SET e += $properties
+        WITH e
+        OPTIONAL MATCH (e)-[old:UPDATES|TRIGGERS]->(:Hazard)
+        DELETE old
+        WITH DISTINCT e
+        MERGE (h:Hazard {{hazard_type: $hazard}})
+        ON CREATE SET h.id = $hazard_id, h.type = 'Hazard', h.name = $hazard
+        MERGE (e)-[r:{relationship_type}]->(h)
+        SET r += $relationship
+        """
+        with self.get_neo4j_session() as session:
+            session.run(
+                query, id=properties["id"], properties=properties, hazard=hazard,
+                hazard_id=f"hazard_{hazard}", relationship=relationship
+            ).consume()
+
+    def fetch_events(self, since: float = 0.0) -> List[Dict]:
+        """ingested_at이 since 이후인 Event 조회 (다른 워커가 수집한 이벤트 동기화용)"""
+        query = """
+        MATCH (e:Event)
+        WHERE coalesce(e.ingested_at, 0.0) > $since
+        OPTIONAL MATCH (e)-[:UPDATES|TRIGGERS]->(h:Hazard)
+        RETURN e.id AS event_id, e.event_type AS event_type, e.name AS name, e.severity AS severity,
+               coalesce(e.hazard, h.hazard_type) AS hazard, e.lat AS lat, e.lon AS lon,
+               e.radius_km AS radius_km, e.polygon AS polygon, coalesce(e.active, true) AS active,
+               coalesce(e.ingested_at, 0.0) AS ingested_at
+        ORDER BY ingested_at
+        """
+        with self.get_neo4j_session() as session:
+            return [record.data() for record in session.run(query, since=since)]
+
     def generate_cypher_query(self, question: str, schema: str) -> Optional[str]:
-        """자연어 질문을 Cypher 쿼리로 변환"""
+        """자연어 질문을 Cypher 쿼리로 변환 (같은 질문/스키마는 캐시, 동시 호출은 병합)"""
+        key = (question, hash(schema))
+        cypher_query = self._cypher_cache.get(key)
+        if cypher_query is None:
+            cypher_query = self._cypher_flight.do(key, lambda: self._generate_cypher_query(question, schema))
+            if cypher_query:
+                self._cypher_cache.set(key, cypher_query)
+        return cypher_query
+    
+    def _generate_cypher_query(self, question: str, schema: str) -> Optional[str]:
         prompt = f"""
 당신은 Neo4j Cypher 쿼리 전문가입니다.
 다음 그래프 스키마 정보를 참고하여, 사용자의 자연어 질문을 Cypher 쿼리로 변환하세요.
@@ -206,10 +376,12 @@ Cypher 쿼리:
 
         
         try:
-            response = self.gemini_client.models.generate_content(
-                model=GEMINI_MODEL,
-                contents=prompt.strip()
-            )
+            with start_span("gemini.generate", stage="llm_cypher"), track_stage("llm_cypher"):
+                response = self.gemini_client.models.generate_content(
+                    model=GEMINI_MODEL,
+                    contents=prompt.strip()
+                )
+            record_gemini_usage("llm_cypher", response)
             
             from utils import extract_text_from_response
             
@@ -220,19 +392,48 @@ Cypher 쿼리:
             
             return cypher_query
         except Exception as e:
-            print(f"Cypher 쿼리 생성 오류: {e}")
+            record_gemini_error("llm_cypher", e)
+            logger.warning(f"[RAG Service] Cypher 쿼리 생성 오류: {e}")
             return None
     
     def graph_rag_search(self, question: str, schema: str, session) -> Dict:
         """Graph RAG 검색"""
+        with start_span("rag.graph_search"):
+            result = self._graph_rag_search(question, schema, session)
+            set_span_attributes(
+                cypher__hash=query_hash(result.get("query")),
+                result__count=len(result.get("results", [])),
+                guard__decision=(result.get("guard") or {}).get("decision"),
+                error=result.get("error")
+            )
+            return result
+    
+    def _graph_rag_search(self, question: str, schema: str, session) -> Dict:
         cypher_query = self.generate_cypher_query(question, schema)
+        parameters = None
+        guard_info = None
+        source = "llm"
         
-        if not cypher_query:
+        if self.cypher_guard_enabled:
+            # 거부되거나 생성에 실패하면 질문 키워드 템플릿으로 대체
+            decision = self.cypher_guard.check(cypher_query, session) if cypher_query else None
+            if decision is None or decision.decision == "rejected":
+                reason = decision.reason if decision else "generation_failed"
+                decision = self.cypher_guard.fallback(question, reason)
+            guard_info = decision.to_dict()
+            if decision.query is None:
+                return {
+                    "query": cypher_query, "results": [], "count": 0, "guard": guard_info,
+                    "error": f"Cypher 안전성 검사 거부 ({decision.reason})" if cypher_query else "Cypher 쿼리 생성 실패"
+                }
+            cypher_query, parameters = decision.query, decision.parameters
+            if decision.decision == "template":
+                source = "template"
+        elif not cypher_query:
             return {"query": None, "results": [], "count": 0, "error": "Cypher 쿼리 생성 실패"}
         
         try:
-            result = session.run(cypher_query)
-            records = [dict(record) for record in result]
+            records = self._run_cypher(cypher_query, parameters, session, source)
             
             actual_count = len(records)
             if actual_count == 1 and records:
@@ -243,45 +444,137 @@ Cypher 쿼리:
             return {
                 "query": cypher_query,
                 "results": records,
-                "count": actual_count
+                "count": actual_count,
+                "guard": guard_info
             }
         except Exception as e:
             return {
                 "query": cypher_query,
                 "results": [],
                 "count": 0,
+                "guard": guard_info,
                 "error": str(e)
             }
     
+    def _run_cypher(self, cypher_query: str, parameters: Optional[Dict], session, source: str) -> List[Dict]:
+        """Cypher 실행 + fingerprint별 통계 기록 (일부 요청은 PROFILE로 실행하여 db hits 측정)"""
+        profile = self.query_stats.should_profile()
+        text = f"PROFILE {cypher_query}" if profile else cypher_query
+        start = time.perf_counter()
+        records, db_hits, failed = [], None, True
+        try:
+            with start_span("neo4j.run", cypher__hash=query_hash(cypher_query), profiled=profile), track_stage("cypher_exec"):
+                result = session.run(self.cypher_guard.query(text), parameters)
+                records = [dict(record) for record in result]
+                if profile:
+                    db_hits = profile_db_hits(getattr(result.consume(), "profile", None))
+                set_span_attributes(result__count=len(records), db__hits=db_hits)
+            failed = False
+            return records
+        finally:
+            self.query_stats.record(
+                cypher_query, (time.perf_counter() - start) * 1000,
+                rows=len(records), db_hits=db_hits, error=failed, source=source
+            )
+    
+    def nearby_facilities(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float = NEARBY_RADIUS_KM,
+        k: int = NEARBY_TOP_K,
+        labels: Optional[List[str]] = None
+    ) -> Dict:
+        """사용자 좌표 기준 반경 내 시설을 거리순으로 k개 조회 (LLM 쿼리 형태와 무관)"""
+        labels = labels or NEARBY_FACILITY_LABELS
+        lat_delta = radius_km / KM_PER_DEG_LAT
+        lon_delta = radius_km / (KM_PER_DEG_LAT * max(math.cos(math.radians(lat)), 1e-6))
+        parameters = {
+            "lat": lat, "lon": lon, "radius_m": radius_km * 1000, "k": k,
+            "min_lat": lat - lat_delta, "max_lat": lat + lat_delta,
+            "min_lon": lon - lon_delta, "max_lon": lon + lon_delta
+        }
+        query = nearby_facilities_query(labels)
+        
+        with start_span("rag.nearby_facilities", radius_km=radius_km, k=k):
+            try:
+                with self.get_neo4j_session() as session:
+                    records = self._run_cypher(query, parameters, session, source="nearby")
+            except Exception as e:
+                logger.warning(f"[RAG Service] 주변 시설 조회 오류: {e}")
+                return {"query": query, "results": [], "count": 0, "radius_km": radius_km, "error": str(e)}
+            
+            for record in records:
+                record["distance_km"] = round(record.pop("distance") / 1000, 2)
+                if not record.get("shelter_type"):
+                    record["shelter_type"] = FACILITY_TYPE_NAMES.get(record["label"], record["label"])
+            set_span_attributes(result__count=len(records))
+            return {"query": query, "results": records, "count": len(records), "radius_km": radius_km}
+    
     def vector_rag_search(self, question: str, top_k: int = 5) -> Dict:
         """Vector RAG 검색"""
+        with start_span("rag.vector_search", top_k=top_k):
+            result = self._vector_rag_search(question, top_k)
+            set_span_attributes(
+                result__count=len(result.get("results", [])),
+                guard__decision=(result.get("guard") or {}).get("decision"),
+                error=result.get("error")
+            )
+            return result
+    
+    def embed_query(self, text: str) -> List[float]:
+        """질문 텍스트 임베딩 (Vector RAG 검색과 시맨틱 답변 캐시에서 공용, 캐시 + 동시 호출 병합)"""
+        embedding = self._embedding_cache.get(text)
+        if embedding is None:
+            embedding = self._embed_flight.do(text, lambda: self._embed_texts([text])[0])
+            self._embedding_cache.set(text, embedding)
+        return embedding
+    
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """여러 질문을 일괄 임베딩 (캐시에 없는 텍스트만 BATCH_EMBED_CHUNK개씩 API 호출)"""
+        missing = list(dict.fromkeys(t for t in texts if not self._embedding_cache.peek(t)))
+        for start in range(0, len(missing), BATCH_EMBED_CHUNK):
+            chunk = missing[start:start + BATCH_EMBED_CHUNK]
+            for text, embedding in zip(chunk, self._embed_texts(chunk)):
+                self._embedding_cache.set(text, embedding)
+        return [self.embed_query(t) for t in texts]
+    
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
         try:
-            embedding_result = self.gemini_client.models.embed_content(
-                model=GEMINI_EMBEDDING_MODEL,
-                contents=[question],
-                config=types.EmbedContentConfig(
-                    output_dimensionality=EMBEDDING_DIM
+            with start_span("gemini.embed", batch__size=len(texts)), track_stage("embedding"):
+                embedding_result = self.gemini_client.models.embed_content(
+                    model=GEMINI_EMBEDDING_MODEL,
+                    contents=texts,
+                    config=types.EmbedContentConfig(
+                        output_dimensionality=EMBEDDING_DIM
+                    )
                 )
-            )
-            
-            query_embedding = None
-            if embedding_result.embeddings:
-                embedding = embedding_result.embeddings[0]
-                if hasattr(embedding, 'values'):
-                    query_embedding = list(embedding.values)
-                elif isinstance(embedding, list):
-                    query_embedding = embedding
-                elif hasattr(embedding, '__iter__') and not isinstance(embedding, str):
-                    query_embedding = list(embedding)
-                else:
-                    query_embedding = [float(embedding)]
-            
-            if query_embedding is None:
-                raise ValueError("임베딩 추출 실패")
+        except Exception as e:
+            record_gemini_error("embedding", e)
+            raise
+        
+        embeddings = []
+        for embedding in embedding_result.embeddings or []:
+            if hasattr(embedding, 'values'):
+                embeddings.append(list(embedding.values))
+            elif isinstance(embedding, list):
+                embeddings.append(embedding)
+            elif hasattr(embedding, '__iter__') and not isinstance(embedding, str):
+                embeddings.append(list(embedding))
+            else:
+                embeddings.append([float(embedding)])
+        
+        if len(embeddings) != len(texts):
+            raise ValueError("임베딩 추출 실패")
+        return embeddings
+    
+    def _vector_rag_search(self, question: str, top_k: int) -> Dict:
+        try:
+            query_embedding = self.embed_query(question)
             
-            results = self.chroma_collection.query(
-                query_embeddings=[query_embedding],
-                n_results=top_k
+            results = self._chroma_flight.do(
+                (question, top_k),
+                lambda: self._query_chroma(query_embedding, top_k)
             )
             
             documents = []
@@ -306,6 +599,13 @@ Cypher 쿼리:
                 "error": str(e)
             }
     
+    def _query_chroma(self, query_embedding: List[float], top_k: int) -> Dict:
+        with start_span("chroma.query", top_k=top_k), track_stage("vector_query"):
+            return self.chroma_collection.query(
+                query_embeddings=[query_embedding],
+                n_results=top_k
+            )
+    
     async def search_sub_problems(self, sub_problems: List[Dict], schema: str, session, use_cache: bool = True) -> Dict:
         """서브 문제별 Hybrid RAG 검색 실행 (노트북 방식)
         
@@ -321,8 +621,47 @@ Cypher 쿼리:
         all_graph_results = []
         all_vector_results = []
         
-        for sub_problem in sub_problems:
-            sub_id = sub_problem.get("id", 0)
+        with start_span("rag.search_sub_problems", sub_problem__count=len(sub_problems)):
+            for sub_problem in sub_problems:
+                graph_results, vector_results = await self._search_sub_problem(
+                    sub_problem, schema, session
+                )
+                all_graph_results.append(graph_results)
+                all_vector_results.append(vector_results)
+        
+        # 모든 결과 통합 (평탄화)
+        all_graph_records = []
+        for r in all_graph_results:
+            if r.get("results"):
+                all_graph_records.extend(r["results"])
+        
+        all_vector_docs = []
+        for r in all_vector_results:
+            if r.get("results"):
+                all_vector_docs.extend(r["results"])
+        
+        combined_graph_results = {
+            "query": "서브 문제별 통합 쿼리",
+            "results": all_graph_records,
+            "count": len(all_graph_records),
+            "sub_problem_results": all_graph_results  # 서브 문제별 상세 결과
+        }
+        
+        combined_vector_results = {
+            "results": all_vector_docs,
+            "count": len(all_vector_docs),
+            "sub_problem_results": all_vector_results  # 서브 문제별 상세 결과
+        }
+        
+        return {
+            "graph_results": combined_graph_results,
+            "vector_results": combined_vector_results
+        }
+    
+    async def _search_sub_problem(self, sub_problem: Dict, schema: str, session) -> tuple:
+        """서브 문제 하나에 대한 Graph RAG / Vector RAG 검색"""
+        sub_id = sub_problem.get("id", 0)
+        with start_span("rag.sub_problem", sub_problem__id=str(sub_id)):
             sub_question = sub_problem.get("question", "")
             graph_search_info = sub_problem.get("graph_search", {})
             vector_search_info = sub_problem.get("vector_search", {})
@@ -337,13 +676,13 @@ Cypher 쿼리:
                 query_intent = graph_search_info.get("query_intent", "")
                 region_filter = graph_search_info.get("region_filter")
                 specific_info = graph_search_info.get("specific_info", "")
-                
+            
                 # 지역 필터가 있으면 질문에 명시
                 if region_filter:
                     graph_query = f"{sub_question} (지역: {region_filter})"
                 elif specific_info:
                     graph_query = f"{sub_question} ({specific_info})"
-                
+            
                 logger.debug(f"[RAG Service] 서브 문제 {sub_id} Graph RAG 쿼리: {graph_query}")
             
             graph_results = await asyncio.to_thread(
@@ -352,7 +691,6 @@ Cypher 쿼리:
             graph_results["sub_problem_id"] = sub_id
             graph_results["sub_question"] = sub_question
             graph_results["graph_search_info"] = graph_search_info
-            all_graph_results.append(graph_results)
             
             # Vector RAG 검색: 서브 문제의 question + vector_search 정보 활용하여 질문 구성
             # vector_search_info의 keywords, focus, situation_context 등을 활용
@@ -371,7 +709,7 @@ Cypher 쿼리:
                 situation = vector_search_info.get("situation_context")
                 vector_query = f"{vector_query} 상황: {situation}"
             
-            top_k = vector_search_info.get("top_k", 5)
+            top_k = self.vector_top_k or vector_search_info.get("top_k", 5)
             logger.debug(f"[RAG Service] 서브 문제 {sub_id} Vector RAG 쿼리: {vector_query} (top_k: {top_k})")
             
             vector_results = await asyncio.to_thread(
@@ -380,36 +718,8 @@ Cypher 쿼리:
             vector_results["sub_problem_id"] = sub_id
             vector_results["sub_question"] = sub_question
             vector_results["vector_search_info"] = vector_search_info
-            all_vector_results.append(vector_results)
-        
-        # 모든 결과 통합 (평탄화)
-        all_graph_records = []
-        for r in all_graph_results:
-            if r.get("results"):
-                all_graph_records.extend(r["results"])
-        
-        all_vector_docs = []
-        for r in all_vector_results:
-            if r.get("results"):
-                all_vector_docs.extend(r["results"])
-        
-        combined_graph_results = {
-            "query": "서브 문제별 통합 쿼리",
-            "results": all_graph_records,
-            "count": len(all_graph_records),
-            "sub_problem_results": all_graph_results  # 서브 문제별 상세 결과
-        }
-        
-        combined_vector_results = {
-            "results": all_vector_docs,
-            "count": len(all_vector_docs),
-            "sub_problem_results": all_vector_results  # 서브 문제별 상세 결과
-        }
-        
-        return {
-            "graph_results": combined_graph_results,
-            "vector_results": combined_vector_results
-        }
+            
+            return graph_results, vector_results
     
     async def search(self, question: str, use_cache: bool = True) -> Dict:
         """Hybrid RAG 검색 실행 (기본 방식 - 단일 질문)
@@ -418,14 +728,10 @@ Cypher 쿼리:
             question: 검색 질문
             use_cache: 스키마 캐시 사용 여부 (기본값: True)
         """
-        with self.get_neo4j_session() as session:
+        # LLM 생성 Cypher를 실행하므로 읽기 전용 세션 사용
+        with self.get_neo4j_session(read_only=True) as session:
             # 스키마 캐싱: 매번 조회하지 않고 캐시 사용
-            if use_cache and self._schema_cache:
-                schema = self._schema_cache
-            else:
-                schema = await asyncio.to_thread(self.get_neo4j_schema, session)
-                if use_cache:
-                    self._schema_cache = schema
+            schema = await self.get_schema(session, use_cache)
             
             # 병렬 검색 (Graph RAG와 Vector RAG 동시 실행)
             graph_task = asyncio.to_thread(
@@ -0,0 +1,236 @@
+"""위험 구역 공간 인덱스 (사용자 위치/대피소 노출 확인)
+
+인명피해우려지역, 산사태우려지역, 붕괴위험지역, 노후위험시설물, 재해위험지구를 점 + 유형별 영향 반경
+(RISK_ZONE_RADIUS_M)으로 보고 격자 공간 인덱스에 올려 둡니다.
+- 사용자 위치: RISK_ZONE_REPORT_M 이내 위험 구역 수와 가장 가까운 구역 (evidence "주변 위험 구역")
+- 후보 대피소: 현재 재난 유형과 관련된 구역의 영향 반경 안에 있으면 exposed_zones로 표시하고
+  순위 점수를 RISK_ZONE_PENALTY만큼 낮춤 (services/shelter_ranking.py)
+
+구역 목록은 그래프의 Zone 노드(zone_loader)를 우선 사용하고, 없으면 전처리 CSV(*_risk_clean.csv),
+그것도 없으면 원본 CSV(RISK_ZONE_SOURCE_DIR) 중 좌표가 있는 행을 읽습니다. 원본 산사태우려지역/
+붕괴위험지역 CSV에는 좌표 열이 없어 원본만 있으면 해당 유형은 0개입니다.
+"""
+import os
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import PROCESSED_DATA_DIR, RISK_ZONE_SOURCE_DIR, RISK_ZONE_RADIUS_M, RISK_ZONE_REPORT_M
+from services.spatial_index import GridIndex
+
+logger = logging.getLogger(__name__)
+
+ZONE_TYPE_NAMES = {
+    "casualty": "인명피해우려지역",
+    "landslide": "산사태우려지역",
+    "collapse": "붕괴위험지역",
+    "old_facility": "노후위험시설물",
+    "disaster_district": "재해위험지구",
+}
+DEFAULT_ZONE_RADIUS_M = 200.0
+
+# 재난 유형별로 대피소 노출을 따지는 구역 유형 (없는 재난 유형은 대피소를 표시하지 않음)
+HAZARD_ZONE_TYPES = {
+    "지진": {"collapse", "old_facility", "landslide"},
+    "붕괴": {"collapse", "old_facility"},
+    "산사태": {"landslide", "casualty"},
+    "홍수": {"casualty", "disaster_district"},
+    "댐붕괴": {"casualty", "disaster_district"},
+    "폭발사고": {"old_facility"},
+}
+
+# 전처리 CSV (preprocessing.py 입력과 같은 파일 이름, lat/lon 열)
+PROCESSED_FILES = {
+    "casualty": "casualty_risk_clean.csv",
+    "landslide": "landslide_risk_clean.csv",
+    "collapse": "collapse_risk_clean.csv",
+    "old_facility": "old_facility_clean.csv",
+    "disaster_district": "risk_zone_clean.csv",
+}
+# 원본 CSV: 유형 -> (파일, id 열, 이름 열, 사유 열, 위도 열, 경도 열)
+SOURCE_FILES = {
+    "casualty": ("인명피해우려지역.csv", "HULI_DAM_CNCR_RGN_MNG_NO", "DSTRCT_NM", "DSTRCT_DSGN_RSN_DTL_CN", "LAT", "LOT"),
+    "old_facility": ("재난센싱정보_노후위험시설물.csv", "DST_RSK_DSTRCT_FCLTY_CD", "MEMENT_NM", "WRN_APNT_CN", "LAT", "LOT"),
+    "disaster_district": ("재난센싱정보_재해위험지구.csv", "DST_RSK_DSTRCT_FCLTY_CD", "MEMENT_NM", "WRN_APNT_CN", "LAT", "LOT"),
+}
+ZONE_CELL_DEG = 0.005
+
+
+def zone_type_of(zone_id: str, zone_type: Optional[str] = None) -> Optional[str]:
+    """구역 유형 (속성이 없으면 preprocessing.py의 id 규칙 zone_<유형>_<번호>에서 추출)"""
+    if zone_type in ZONE_TYPE_NAMES:
+        return zone_type
+    for known in ZONE_TYPE_NAMES:
+        if str(zone_id).startswith(f"zone_{known}_"):
+            return known
+    return None
+
+
+def _text(value: Any) -> str:
+    return "" if value is None or (isinstance(value, float) and np.isnan(value)) else str(value).strip()
+
+
+def _coordinates(frame: pd.DataFrame, lat_column: str, lon_column: str) -> pd.DataFrame:
+    """좌표가 숫자인 행만 (원본 CSV의 한글 설명 행 등 제외)"""
+    frame = frame.assign(
+        lat=pd.to_numeric(frame[lat_column], errors="coerce"),
+        lon=pd.to_numeric(frame[lon_column], errors="coerce")
+    )
+    return frame[frame["lat"].between(-90, 90) & frame["lon"].between(-180, 180)]
+
+
+def read_zone_csvs(processed_dir: str = PROCESSED_DATA_DIR, source_dir: str = RISK_ZONE_SOURCE_DIR) -> List[Dict[str, Any]]:
+    """유형별 전처리 CSV, 없으면 원본 CSV에서 구역 목록 읽기"""
+    zones = []
+    for zone_type in ZONE_TYPE_NAMES:
+        processed = os.path.join(processed_dir, PROCESSED_FILES[zone_type])
+        if os.path.exists(processed):
+            frame = pd.read_csv(processed, encoding="utf-8-sig")
+            if not {"lat", "lon"} <= set(frame.columns):
+                continue
+            frame = _coordinates(frame, "lat", "lon")
+            id_column = "risk_id" if "risk_id" in frame.columns else None
+            for position, row in enumerate(frame.to_dict("records")):
+                zones.append({
+                    "id": f"zone_{zone_type}_{row[id_column] if id_column else position}",
+                    "zone_type": zone_type,
+                    "name": _text(row.get("name")),
+                    "reason": _text(row.get("reason")),
+                    "lat": row["lat"],
+                    "lon": row["lon"],
+                })
+            continue
+
+        if zone_type not in SOURCE_FILES:
+            continue
+        file_name, id_column, name_column, reason_column, lat_column, lon_column = SOURCE_FILES[zone_type]
+        path = os.path.join(source_dir, file_name)
+        if not os.path.exists(path):
+            continue
+        frame = _coordinates(pd.read_csv(path, encoding="utf-8-sig", low_memory=False), lat_column, lon_column)
+        # 삭제/해제된 구역 제외
+        if "DEL_YN" in frame.columns:
+            frame = frame[frame["DEL_YN"] != "Y"]
+        if "RMV_YMD" in frame.columns:
+            frame = frame[frame["RMV_YMD"].isna()]
+        for row in frame.to_dict("records"):
+            zones.append({
+                "id": f"zone_{zone_type}_{_text(row.get(id_column))}",
+                "zone_type": zone_type,
+                "name": _text(row.get(name_column)),
+                "reason": _text(row.get(reason_column)),
+                "lat": row["lat"],
+                "lon": row["lon"],
+            })
+    return zones
+
+
+class RiskZoneIndex:
+    """위험 구역 격자 공간 인덱스 (구역 목록은 생성 후 바뀌지 않음)"""
+
+    def __init__(self, zones: List[Dict[str, Any]], radius_m: Optional[Dict[str, float]] = None):
+        radius_m = {**RISK_ZONE_RADIUS_M, **(radius_m or {})}
+        self.zones = []
+        seen = set()
+        for zone in zones:
+            zone_type = zone_type_of(zone.get("id", ""), zone.get("zone_type"))
+            if zone_type is None or zone.get("lat") is None or zone.get("lon") is None or zone["id"] in seen:
+                continue
+            seen.add(zone["id"])
+            self.zones.append({**zone, "zone_type": zone_type})
+        self._types = np.array([zone["zone_type"] for zone in self.zones], dtype=object)
+        self._radius_m = np.array(
+            [radius_m.get(zone["zone_type"], DEFAULT_ZONE_RADIUS_M) for zone in self.zones], dtype=np.float64
+        )
+        self._max_radius_km = float(self._radius_m.max()) / 1000.0 if len(self.zones) else 0.0
+        self._index = GridIndex(
+            np.array([float(zone["lat"]) for zone in self.zones]),
+            np.array([float(zone["lon"]) for zone in self.zones]),
+            ZONE_CELL_DEG
+        )
+        # 시설 좌표 -> 영향 반경 안에 있는 구역 (시설은 고정이므로 한 번만 계산)
+        self._exposure_cache: Dict[Tuple[float, float], List[Tuple[int, float]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.zones)
+
+    def counts(self) -> Dict[str, int]:
+        """유형별 구역 수"""
+        return {zone_type: int((self._types == zone_type).sum()) for zone_type in ZONE_TYPE_NAMES}
+
+    def _covering(self, lat: float, lon: float) -> List[Tuple[int, float]]:
+        """영향 반경 안에 이 지점이 들어가는 구역 (인덱스, 거리 m)"""
+        key = (lat, lon)
+        if key not in self._exposure_cache:
+            indices, distances = self._index.within(lat, lon, self._max_radius_km)
+            distances_m = distances * 1000.0
+            inside = distances_m <= self._radius_m[indices]
+            self._exposure_cache[key] = list(zip(indices[inside].tolist(), distances_m[inside].tolist()))
+        return self._exposure_cache[key]
+
+    def report(self, lat: float, lon: float, report_m: float = RISK_ZONE_REPORT_M) -> Dict[str, Any]:
+        """사용자 위치 주변 위험 구역 요약
+
+        Returns:
+            {"radius_m", "count", "inside", "by_type": {유형: 수}, "zones": 가까운 순 최대 5개}
+        """
+        if not len(self.zones):
+            return {"radius_m": report_m, "count": 0, "inside": 0, "by_type": {}, "zones": []}
+        indices, distances = self._index.within(lat, lon, report_m / 1000.0)
+        distances_m = distances * 1000.0
+        inside = distances_m <= self._radius_m[indices]
+        by_type: Dict[str, int] = {}
+        for zone_type in self._types[indices]:
+            by_type[zone_type] = by_type.get(zone_type, 0) + 1
+        zones = [
+            {
+                **self.zones[index],
+                "type_name": ZONE_TYPE_NAMES[self.zones[index]["zone_type"]],
+                "distance_m": round(distance),
+                "inside": bool(is_inside)
+            }
+            for index, distance, is_inside in zip(indices[:5].tolist(), distances_m[:5].tolist(), inside[:5].tolist())
+        ]
+        return {
+            "radius_m": report_m,
+            "count": len(indices),
+            "inside": int(inside.sum()),
+            "by_type": by_type,
+            "zones": zones
+        }
+
+    def annotate(self, shelters: List[Dict[str, Any]], hazard: Optional[str]) -> List[Dict[str, Any]]:
+        """현재 재난 유형과 관련된 구역의 영향 반경 안에 있는 시설에 exposed_zones(구역 유형 이름 목록) 추가"""
+        relevant = HAZARD_ZONE_TYPES.get(hazard)
+        if not relevant or not len(self.zones):
+            return shelters
+        annotated = []
+        for shelter in shelters:
+            covering = self._covering(float(shelter["lat"]), float(shelter["lon"]))
+            exposed = sorted({
+                ZONE_TYPE_NAMES[self.zones[index]["zone_type"]]
+                for index, _ in covering if self.zones[index]["zone_type"] in relevant
+            })
+            annotated.append({**shelter, "exposed_zones": exposed} if exposed else shelter)
+        return annotated
+
+
+def format_report(report: Dict[str, Any]) -> Optional[str]:
+    """evidence용 주변 위험 구역 문장 (구역이 없으면 None)"""
+    if not report["count"]:
+        return None
+    by_type = ", ".join(f"{ZONE_TYPE_NAMES[t]} {n}곳" for t, n in sorted(report["by_type"].items()))
+    lines = [f"\n주변 위험 구역: 반경 {report['radius_m']:.0f}m 내 {report['count']}곳 ({by_type})"]
+    if report["inside"]:
+        lines.append(f"- 현재 위치가 위험 구역 {report['inside']}곳의 영향 범위 안에 있습니다.")
+    for zone in report["zones"]:
+        line = f"- {zone['type_name']}"
+        if zone.get("name"):
+            line += f" {zone['name']}"
+        line += f" ({zone['distance_m']}m)"
+        if zone.get("reason"):
+            line += f": {zone['reason'][:60]}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,436 @@
+"""도로망 기반 도보 거리 (선택 기능)
+
+직선 거리는 한강, 도시고속도로, 철도로 막힌 시설까지의 거리를 실제보다 짧게 보여줍니다.
+ROAD_NETWORK_PATH에 보행 가능한 도로망 추출본(OSM PBF 또는 LineString GeoJSON)을 두면
+CSR(compressed sparse row) 그래프로 변환해 ROAD_GRAPH_DIR에 저장해 두고, 사용자 위치에서
+후보 시설들까지의 도로 거리를 다중 목적지 Dijkstra 한 번으로 계산합니다.
+
+- 보행 불가 도로(motorway/trunk 등, foot=no, access=no/private)는 제외하고 양방향 간선으로 적재
+- 사용자/시설 좌표는 가장 가까운 도로 노드로 붙이며(ROUTE_SNAP_MAX_M 이내), 붙인 거리도 더함
+- 탐색은 모든 목적지가 확정되거나 ROUTE_MAX_WALK_KM, 가장 먼 목적지 직선 거리 x ROUTE_MAX_DETOUR를
+  넘으면 멈춤 (넘은 목적지는 "그 거리 이상"으로 표시)
+- 같은 출발 노드(같은 골목/블록의 사용자)의 결과는 목적지 노드별 거리로 LRU 캐시
+
+파일 (ROAD_GRAPH_DIR): lats/lons.npy (노드 좌표), indptr/indices/weights.npy (CSR, 간선 길이 m),
+meta.json (원본 파일 해시, 노드/간선 수)
+
+사용법 (sense-backend 디렉터리에서):
+    python -m services.road_graph build
+    python -m services.road_graph route 37.5665 126.9780 37.5172 126.9666
+"""
+import os
+import sys
+import json
+import time
+import heapq
+import hashlib
+import logging
+import argparse
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import (
+    ROAD_NETWORK_PATH, ROAD_GRAPH_DIR, ROUTE_MAX_WALK_KM, ROUTE_MAX_DETOUR, ROUTE_SNAP_MAX_M, ROUTE_CACHE_SIZE
+)
+from services.lru_cache import LRUCache
+from services.metrics import ROUTE_RESULTS
+from services.spatial_index import GridIndex, haversine_km, EARTH_RADIUS_KM
+
+logger = logging.getLogger(__name__)
+
+GRAPH_FORMAT = 1
+# 보행자가 다닐 수 없는 OSM highway 값 (서울의 도시고속도로는 motorway/trunk)
+EXCLUDED_HIGHWAYS = {
+    "motorway", "motorway_link", "trunk", "trunk_link", "construction", "proposed",
+    "bus_guideway", "raceway", "busway", "abandoned"
+}
+# 노드 병합 단위 (1e-7도 ≈ 1cm, OSM 공유 노드는 좌표가 같음)
+COORD_SCALE = 1e7
+SNAP_CELL_DEG = 0.002
+
+
+def is_walkable(tags: Dict[str, Any]) -> bool:
+    """보행 가능한 도로인지 (highway 태그가 없는 GeoJSON 선은 보행 가능으로 간주)"""
+    if tags.get("highway") in EXCLUDED_HIGHWAYS:
+        return False
+    foot = tags.get("foot")
+    if foot in ("no", "private"):
+        return False
+    return not (tags.get("access") in ("no", "private") and foot not in ("yes", "designated", "permissive"))
+
+
+def _read_geojson(path: str) -> Iterator[Tuple[List[Tuple[float, float]], Dict[str, Any]]]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for feature in data.get("features", []):
+        geometry = feature.get("geometry") or {}
+        tags = feature.get("properties") or {}
+        if geometry.get("type") == "LineString":
+            lines = [geometry["coordinates"]]
+        elif geometry.get("type") == "MultiLineString":
+            lines = geometry["coordinates"]
+        else:
+            continue
+        for line in lines:
+            yield [(float(point[1]), float(point[0])) for point in line], tags
+
+
+def _read_pbf(path: str) -> Iterator[Tuple[List[Tuple[float, float]], Dict[str, Any]]]:
+    try:
+        import osmium
+    except ImportError as e:
+        raise RuntimeError(
+            "PBF 도로망을 읽으려면 osmium 패키지가 필요합니다 (pip install osmium, 또는 GeoJSON으로 변환해 사용)"
+        ) from e
+
+    ways: List[Tuple[List[Tuple[float, float]], Dict[str, Any]]] = []
+
+    class _WayHandler(osmium.SimpleHandler):
+        def way(self, way):
+            if "highway" not in way.tags:
+                return
+            try:
+                coords = [(node.lat, node.lon) for node in way.nodes]
+            except osmium.InvalidLocationError:
+                return
+            ways.append((coords, {tag.k: tag.v for tag in way.tags}))
+
+    _WayHandler().apply_file(path, locations=True)
+    return iter(ways)
+
+
+def read_lines(path: str) -> Iterator[Tuple[List[Tuple[float, float]], Dict[str, Any]]]:
+    """도로망 파일의 선 목록 ((lat, lon) 좌표 목록, 태그)"""
+    if path.endswith(".pbf"):
+        return _read_pbf(path)
+    return _read_geojson(path)
+
+
+def _segment_km(lats1: np.ndarray, lons1: np.ndarray, lats2: np.ndarray, lons2: np.ndarray) -> np.ndarray:
+    """구간별 거리 (km, 벡터 연산)"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lats1, lons1, lats2, lons2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def build_graph(lines: Iterator[Tuple[List[Tuple[float, float]], Dict[str, Any]]]) -> Dict[str, np.ndarray]:
+    """선 목록으로 양방향 CSR 그래프 구성
+
+    Returns:
+        {"lats", "lons", "indptr", "indices", "weights"} (weights는 간선 길이 m)
+    """
+    starts, ends = [], []
+    for coords, tags in lines:
+        if len(coords) < 2 or not is_walkable(tags):
+            continue
+        points = np.asarray(coords, dtype=np.float64)
+        starts.append(points[:-1])
+        ends.append(points[1:])
+    if not starts:
+        raise ValueError("보행 가능한 도로 선이 없습니다")
+    starts, ends = np.concatenate(starts), np.concatenate(ends)
+
+    # 같은 좌표의 점을 한 노드로 병합
+    keys = np.round(np.concatenate((starts, ends)) * COORD_SCALE).astype(np.int64)
+    unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    src, dst = inverse[:len(starts)], inverse[len(starts):]
+    weights = _segment_km(starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1]) * 1000.0
+    keep = src != dst
+    src, dst, weights = src[keep], dst[keep], weights[keep]
+
+    # 양방향 간선을 출발 노드 순으로 정렬해 CSR 구성
+    all_src = np.concatenate((src, dst))
+    all_dst = np.concatenate((dst, src))
+    all_weights = np.concatenate((weights, weights))
+    order = np.argsort(all_src, kind="stable")
+    node_count = len(unique)
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(all_src, minlength=node_count), out=indptr[1:])
+    return {
+        "lats": unique[:, 0] / COORD_SCALE,
+        "lons": unique[:, 1] / COORD_SCALE,
+        "indptr": indptr,
+        "indices": all_dst[order].astype(np.int32),
+        "weights": all_weights[order].astype(np.float32),
+    }
+
+
+def source_hash(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _save_array(path: str, array: np.ndarray) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def save_graph(graph_dir: str, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> None:
+    """그래프 파일 저장 (meta.json을 마지막에 써서 중간에 실패하면 다음 로드에서 다시 계산)"""
+    os.makedirs(graph_dir, exist_ok=True)
+    for name, array in arrays.items():
+        _save_array(os.path.join(graph_dir, f"{name}.npy"), array)
+    tmp = os.path.join(graph_dir, "meta.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(graph_dir, "meta.json"))
+
+
+class RoadGraph:
+    """도로망 그래프와 다중 목적지 도보 거리 계산"""
+
+    def __init__(
+        self,
+        path: str = ROAD_NETWORK_PATH,
+        graph_dir: str = ROAD_GRAPH_DIR,
+        max_walk_km: float = ROUTE_MAX_WALK_KM,
+        max_detour: float = ROUTE_MAX_DETOUR,
+        snap_max_m: float = ROUTE_SNAP_MAX_M,
+        cache_size: int = ROUTE_CACHE_SIZE
+    ):
+        self.path = path
+        self.graph_dir = graph_dir
+        self.max_walk_m = max_walk_km * 1000.0
+        self.max_detour = max_detour
+        self.snap_max_m = snap_max_m
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._failed = False
+        self.meta: Dict[str, Any] = {}
+        # 출발 노드 -> ({목적지 노드: 거리 m}, 탐색을 마친 거리 m, 탐색한 목적지 노드)
+        self._cache = LRUCache("route", cache_size)
+        # 시설 좌표 -> 붙인 도로 노드 (시설은 고정이므로 한 번만 계산)
+        self._target_snaps: Dict[Tuple[float, float], Optional[Tuple[int, float]]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """도로망 파일이 설정되어 있고 로드에 실패하지 않았는지"""
+        return bool(self.path) and not self._failed
+
+    def __len__(self) -> int:
+        return len(self._lats) if self._loaded else 0
+
+    def _expected_meta(self) -> Dict[str, Any]:
+        return {"format": GRAPH_FORMAT, "source": os.path.basename(self.path), "source_sha1": source_hash(self.path)}
+
+    def _read_files(self, expected: Dict[str, Any]) -> Optional[Dict[str, np.ndarray]]:
+        meta_path = os.path.join(self.graph_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if any(meta.get(key) != value for key, value in expected.items()):
+                return None
+            arrays = {
+                name: np.load(os.path.join(self.graph_dir, f"{name}.npy"))
+                for name in ("lats", "lons", "indptr", "indices", "weights")
+            }
+        except (OSError, ValueError) as e:
+            logger.warning(f"[RoadGraph] 그래프 파일 읽기 실패, 다시 계산: {e}")
+            return None
+        self.meta = meta
+        return arrays
+
+    def load(self) -> bool:
+        """그래프 로드 (저장 파일이 없거나 원본과 다르면 계산 후 저장). 실패하면 비활성화"""
+        with self._lock:
+            if self._loaded or not self.enabled:
+                return self._loaded
+            start = time.perf_counter()
+            try:
+                expected = self._expected_meta()
+                arrays = self._read_files(expected)
+                source = "파일"
+                if arrays is None:
+                    source = "계산"
+                    arrays = build_graph(read_lines(self.path))
+                    self.meta = {
+                        **expected, "nodes": len(arrays["lats"]), "edges": len(arrays["indices"]),
+                        "built_at": time.time()
+                    }
+                    try:
+                        save_graph(self.graph_dir, arrays, self.meta)
+                    except OSError as e:
+                        logger.warning(f"[RoadGraph] 그래프 파일 저장 실패, 메모리에서만 사용: {e}")
+            except (OSError, ValueError, RuntimeError) as e:
+                self._failed = True
+                logger.warning(f"[RoadGraph] 도로망 로드 실패, 직선 거리 사용: {e}")
+                return False
+
+            self._lats, self._lons = arrays["lats"], arrays["lons"]
+            # heapq 탐색에서 numpy 스칼라 변환 비용을 피하려고 파이썬 리스트로 보관
+            self._indptr = arrays["indptr"].tolist()
+            self._indices = arrays["indices"].tolist()
+            self._weights = arrays["weights"].tolist()
+            self._snap_index = GridIndex(self._lats, self._lons, SNAP_CELL_DEG)
+            self._cache.clear()
+            self._target_snaps = {}
+            self._loaded = True
+            logger.info(
+                f"[RoadGraph] 로드 완료 ({source}, {(time.perf_counter() - start) * 1000:.0f}ms): "
+                f"노드 {len(self._lats)}개, 간선 {len(self._indices) // 2}개"
+            )
+            return True
+
+    def snap(self, lat: float, lon: float) -> Optional[Tuple[int, float]]:
+        """가장 가까운 도로 노드 (노드, 거리 m). ROUTE_SNAP_MAX_M보다 멀면 None"""
+        indices, distances = self._snap_index.nearest(lat, lon, 1)
+        if not len(indices) or distances[0] * 1000.0 > self.snap_max_m:
+            return None
+        return int(indices[0]), float(distances[0]) * 1000.0
+
+    def _search(self, origin: int, targets: set, bound_m: float) -> Tuple[Dict[int, float], float]:
+        """origin에서 targets까지 Dijkstra (모든 목적지 확정 또는 bound_m 초과 시 중단)
+
+        Returns:
+            ({확정된 목적지: 거리 m}, 탐색을 마친 거리 m — 그래프를 다 돌았으면 inf)
+        """
+        indptr, indices, weights = self._indptr, self._indices, self._weights
+        best = {origin: 0.0}
+        settled = set()
+        found: Dict[int, float] = {}
+        remaining = len(targets)
+        heap = [(0.0, origin)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if node in settled:
+                continue
+            if distance > bound_m:
+                return found, bound_m
+            settled.add(node)
+            if node in targets:
+                found[node] = distance
+                remaining -= 1
+                if remaining == 0:
+                    return found, distance
+            for edge in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[edge]
+                candidate = distance + weights[edge]
+                if candidate < best.get(neighbor, float("inf")):
+                    best[neighbor] = candidate
+                    heapq.heappush(heap, (candidate, neighbor))
+        return found, float("inf")
+
+    def walking_km(self, lat: float, lon: float, points: Sequence[Tuple[float, float]]) -> List[Optional[Tuple[float, bool]]]:
+        """사용자 위치에서 각 지점까지의 도로 거리
+
+        Returns:
+            지점별 (거리 km, 도달 여부) 또는 None(도로에 붙일 수 없음).
+            도달하지 못한 지점의 거리는 탐색을 마친 거리(실제 도로 거리의 하한)입니다.
+        """
+        if not points or not self.load():
+            return [None] * len(points)
+        origin = self.snap(lat, lon)
+        if origin is None:
+            ROUTE_RESULTS.labels(result="unsnapped").inc(len(points))
+            return [None] * len(points)
+        origin_node, origin_m = origin
+
+        snapped = []
+        for point in points:
+            if point not in self._target_snaps:
+                self._target_snaps[point] = self.snap(*point)
+            snapped.append(self._target_snaps[point])
+        targets = {item[0] for item in snapped if item is not None}
+        lats = np.array([point[0] for point in points], dtype=np.float64)
+        lons = np.array([point[1] for point in points], dtype=np.float64)
+        straight_m = float(haversine_km(lat, lon, lats, lons).max()) * 1000.0
+        bound_m = min(self.max_walk_m, straight_m * self.max_detour + self.snap_max_m * 2)
+
+        cached = self._cache.get(origin_node)
+        found, reached_m, searched = cached if cached is not None else ({}, 0.0, frozenset())
+        if not targets <= searched or (reached_m < bound_m and not targets <= found.keys()):
+            # 처음 보는 목적지가 있거나 이전 탐색이 이번 한도보다 일찍 멈췄으면 이전 목적지까지 포함해 다시 탐색
+            searched = frozenset(targets | searched)
+            found, reached_m = self._search(origin_node, searched, max(bound_m, reached_m))
+            self._cache.set(origin_node, (found, reached_m, searched))
+
+        results: List[Optional[Tuple[float, bool]]] = []
+        for item in snapped:
+            if item is None:
+                ROUTE_RESULTS.labels(result="unsnapped").inc()
+                results.append(None)
+            elif item[0] in found:
+                ROUTE_RESULTS.labels(result="routed").inc()
+                results.append(((origin_m + found[item[0]] + item[1]) / 1000.0, True))
+            else:
+                ROUTE_RESULTS.labels(result="beyond").inc()
+                results.append((min(reached_m, bound_m) / 1000.0, False))
+        return results
+
+    def annotate(self, lat: float, lon: float, shelters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """시설 목록에 도로 거리 추가 (walk_km, route: road | beyond). 계산할 수 없으면 그대로 반환"""
+        if not self.enabled or not shelters:
+            return shelters
+        points = [(float(s["lat"]), float(s["lon"])) for s in shelters]
+        routes = self.walking_km(lat, lon, points)
+        annotated = []
+        for shelter, route in zip(shelters, routes):
+            if route is None:
+                annotated.append(shelter)
+                continue
+            walk_km, reached = route
+            # 도로 거리가 직선 거리보다 짧을 수는 없음 (노드 병합/붙이기 오차 보정)
+            walk_km = max(walk_km, float(shelter["distance_km"]))
+            annotated.append({**shelter, "walk_km": round(walk_km, 2), "route": "road" if reached else "beyond"})
+        return annotated
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="도로망 그래프 (도보 거리)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="도로망 파일을 CSR 그래프로 변환해 저장")
+    build.add_argument("--input", default=ROAD_NETWORK_PATH)
+    build.add_argument("--output", default=ROAD_GRAPH_DIR)
+    route = sub.add_parser("route", help="두 지점 사이 도로 거리")
+    route.add_argument("lat", type=float)
+    route.add_argument("lon", type=float)
+    route.add_argument("to_lat", type=float)
+    route.add_argument("to_lon", type=float)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    if args.command == "build":
+        if not args.input:
+            print("[RoadGraph] 도로망 파일을 지정하세요 (--input 또는 ROAD_NETWORK_PATH)")
+            return 1
+        start = time.perf_counter()
+        graph = RoadGraph(args.input, args.output)
+        arrays = build_graph(read_lines(args.input))
+        meta = {
+            **graph._expected_meta(), "nodes": len(arrays["lats"]), "edges": len(arrays["indices"]),
+            "built_at": time.time()
+        }
+        save_graph(args.output, arrays, meta)
+        size_kb = sum(array.nbytes for array in arrays.values()) / 1024
+        print(
+            f"[RoadGraph] {args.output}: 노드 {meta['nodes']}개, 간선 {meta['edges'] // 2}개, "
+            f"{size_kb:.0f}KB, {time.perf_counter() - start:.1f}s"
+        )
+        return 0
+
+    graph = RoadGraph()
+    if not graph.load():
+        print("[RoadGraph] 도로망을 사용할 수 없습니다 (ROAD_NETWORK_PATH 확인)")
+        return 1
+    straight_km = float(haversine_km(args.lat, args.lon, np.array([args.to_lat]), np.array([args.to_lon]))[0])
+    route_result = graph.walking_km(args.lat, args.lon, [(args.to_lat, args.to_lon)])[0]
+    if route_result is None:
+        print(f"직선 {straight_km:.2f}km, 도로에 붙일 수 없음")
+    else:
+        walk_km, reached = route_result
+        print(f"직선 {straight_km:.2f}km, 도로 {walk_km:.2f}km{'' if reached else ' 이상'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,563 @@
+"""서울 최근접 대피소 사전 계산 격자
+
+서울 영역을 cell_deg 단위 격자로 나누고, 셀 중심에서 가까운 옥외대피소/실내대피소/임시주거시설/
+민방위 급수시설을 유형별로 K개씩 미리 계산해 .npy 파일로 저장합니다. 조회 시에는 질의 지점이 속한
+셀의 후보(유형별 K개)만 정확한 거리로 다시 계산합니다.
+
+정확성: 셀 중심 c 기준 K번째 후보 거리를 D_K, 질의 지점 q와 c의 거리를 δ라 하면 후보가 아닌 시설은
+q에서 D_K - δ 이상 떨어져 있습니다. 반환할 마지막 결과의 거리가 이 값 이하면 결과가 정확하고,
+아니면(후보 부족, 격자 밖 좌표, k > K) 유형별 GridIndex로 계산합니다.
+
+파일 (SHELTER_GRID_DIR):
+- cells.npy: int32 [유형, 행, 열, K] 시설 인덱스 (-1은 빈 칸), mmap으로 읽음
+- bounds.npy: float32 [유형, 행, 열] 셀 중심에서 K번째 후보까지 거리(km), 후보가 전부면 inf
+- facilities.json: 유형별 시설 목록, meta.json: 격자 범위/크기와 원본 파일 해시
+
+사용법 (sense-backend 디렉터리에서):
+    python -m services.shelter_grid build
+    python -m services.shelter_grid query 37.5665 126.9780 --k 5
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    PROCESSED_DATA_DIR, SHELTER_GRID_DIR, SHELTER_GRID_BBOX, SHELTER_GRID_CELL_DEG, SHELTER_GRID_K
+)
+from services.data_version import DataChange, on_data_version_change
+from services.metrics import SHELTER_LOOKUPS
+from services.spatial_index import GridIndex, haversine_km
+
+logger = logging.getLogger(__name__)
+
+# 시설 유형 -> 전처리 파일 (배열의 유형 축 순서)
+# 급수시설은 geojson이 없어 정제 CSV를 읽으며, 좌표가 채워진 행만 사용
+FACILITY_FILES = {
+    "outdoor": "outdoor_shelter.geojson",
+    "indoor": "indoor_shelter.geojson",
+    "temporary": "temporary_housing.geojson",
+    "water": "water_facility_clean.csv",
+}
+FACILITY_TYPES = list(FACILITY_FILES)
+# 답변의 "주변 안전 거점"에 쓰는 대피 가능 시설 (급수시설 제외)
+SHELTER_TYPES = ["outdoor", "indoor", "temporary"]
+DEFAULT_TYPE_NAMES = {"outdoor": "옥외대피소", "indoor": "실내대피소", "temporary": "임시주거시설", "water": "급수시설"}
+GRID_FORMAT = 2
+
+
+def _read_properties(path: str) -> List[Dict[str, Any]]:
+    """geojson feature 속성 또는 CSV 행 목록"""
+    if path.endswith(".csv"):
+        frame = pd.read_csv(path, encoding="utf-8-sig")
+        return frame.astype(object).where(frame.notna(), None).to_dict("records")
+    with open(path, encoding="utf-8") as f:
+        return [feature.get("properties", {}) for feature in json.load(f).get("features", [])]
+
+
+def load_facilities(data_dir: str = PROCESSED_DATA_DIR) -> Dict[str, List[Dict[str, Any]]]:
+    """유형별 시설 목록 (좌표가 없는 항목 제외)"""
+    facilities = {}
+    for facility_type, file_name in FACILITY_FILES.items():
+        path = os.path.join(data_dir, file_name)
+        items = []
+        if not os.path.exists(path):
+            logger.warning(f"[ShelterGrid] 시설 파일 없음: {path}")
+        else:
+            for props in _read_properties(path):
+                if props.get("lat") is None or props.get("lon") is None:
+                    continue
+                items.append({
+                    "id": str(props.get("shelter_id") or props.get("facility_id") or ""),
+                    "name": props.get("shelter_name") or props.get("facility_name") or "",
+                    "address": props.get("address") or "",
+                    "shelter_type": (
+                        props.get("shelter_type") or props.get("facility_type")
+                        or DEFAULT_TYPE_NAMES[facility_type]
+                    ),
+                    "category": facility_type,
+                    "lat": float(props["lat"]),
+                    "lon": float(props["lon"]),
+                    "area": float(props["area"]) if props.get("area") is not None else None,
+                })
+        facilities[facility_type] = items
+    return facilities
+
+
+def source_hashes(data_dir: str = PROCESSED_DATA_DIR) -> Dict[str, Optional[str]]:
+    """원본 파일 내용 해시 (격자 파일이 최신인지 확인)"""
+    hashes = {}
+    for file_name in FACILITY_FILES.values():
+        path = os.path.join(data_dir, file_name)
+        if not os.path.exists(path):
+            hashes[file_name] = None
+            continue
+        with open(path, "rb") as f:
+            hashes[file_name] = hashlib.sha1(f.read()).hexdigest()
+    return hashes
+
+
+def resolve_types(types: Optional[Sequence[str]]) -> List[str]:
+    """조회할 시설 유형 (없으면 전체, 알 수 없는 유형은 ValueError)"""
+    if not types:
+        return list(FACILITY_TYPES)
+    unknown = [t for t in types if t not in FACILITY_FILES]
+    if unknown:
+        raise ValueError(f"알 수 없는 시설 유형: {', '.join(unknown)} (가능: {', '.join(FACILITY_TYPES)})")
+    return list(dict.fromkeys(types))
+
+
+def grid_shape(bbox: Sequence[float], cell_deg: float) -> Tuple[int, int]:
+    """(행 수, 열 수) — bbox는 (남, 서, 북, 동)"""
+    south, west, north, east = bbox
+    return int(np.ceil((north - south) / cell_deg)), int(np.ceil((east - west) / cell_deg))
+
+
+def build_grid(
+    facilities: Dict[str, List[Dict[str, Any]]],
+    bbox: Sequence[float] = SHELTER_GRID_BBOX,
+    cell_deg: float = SHELTER_GRID_CELL_DEG,
+    k: int = SHELTER_GRID_K
+) -> Tuple[np.ndarray, np.ndarray]:
+    """셀 중심별 유형별 최근접 K개 계산
+
+    Returns:
+        (cells int32 [유형, 행, 열, K], bounds float32 [유형, 행, 열])
+    """
+    south, west = bbox[0], bbox[1]
+    rows, cols = grid_shape(bbox, cell_deg)
+    center_lats = south + (np.arange(rows) + 0.5) * cell_deg
+    center_lons = west + (np.arange(cols) + 0.5) * cell_deg
+
+    cells = np.full((len(FACILITY_TYPES), rows, cols, k), -1, dtype=np.int32)
+    bounds = np.full((len(FACILITY_TYPES), rows, cols), np.inf, dtype=np.float32)
+    for t, facility_type in enumerate(FACILITY_TYPES):
+        items = facilities.get(facility_type, [])
+        if not items:
+            continue
+        lats = np.array([item["lat"] for item in items])
+        lons = np.array([item["lon"] for item in items])
+        take = min(k, len(items))
+        # 행 단위로 (열 수 x 시설 수) 거리 행렬을 계산해 메모리 사용을 제한
+        for r, center_lat in enumerate(center_lats):
+            distances = haversine_km(center_lat, center_lons[:, None], lats[None, :], lons[None, :])
+            if take < len(items):
+                part = np.argpartition(distances, take - 1, axis=1)[:, :take]
+            else:
+                part = np.broadcast_to(np.arange(take), (cols, take))
+            part_distances = np.take_along_axis(distances, part, axis=1)
+            order = np.argsort(part_distances, axis=1, kind="stable")
+            cells[t, r, :, :take] = np.take_along_axis(part, order, axis=1)
+            if take < len(items):
+                bounds[t, r] = np.take_along_axis(part_distances, order, axis=1)[:, -1]
+    return cells, bounds
+
+
+def _save_array(path: str, array: np.ndarray) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def _save_json(path: str, data: Any) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def save_grid(
+    grid_dir: str,
+    facilities: Dict[str, List[Dict[str, Any]]],
+    cells: np.ndarray,
+    bounds: np.ndarray,
+    meta: Dict[str, Any]
+) -> None:
+    """격자 파일 저장 (meta.json을 마지막에 써서 중간에 실패하면 다음 로드에서 다시 계산)"""
+    os.makedirs(grid_dir, exist_ok=True)
+    _save_array(os.path.join(grid_dir, "cells.npy"), cells)
+    _save_array(os.path.join(grid_dir, "bounds.npy"), bounds)
+    _save_json(os.path.join(grid_dir, "facilities.json"), facilities)
+    _save_json(os.path.join(grid_dir, "meta.json"), meta)
+
+
+class ShelterGrid:
+    """유형별 최근접 시설 조회 (사전 계산 격자 + 정확 거리 보정)"""
+
+    def __init__(
+        self,
+        data_dir: str = PROCESSED_DATA_DIR,
+        grid_dir: str = SHELTER_GRID_DIR,
+        bbox: Sequence[float] = SHELTER_GRID_BBOX,
+        cell_deg: float = SHELTER_GRID_CELL_DEG,
+        k: int = SHELTER_GRID_K
+    ):
+        self.data_dir = data_dir
+        self.grid_dir = grid_dir
+        self.bbox = tuple(float(v) for v in bbox)
+        self.cell_deg = cell_deg
+        self.k = k
+        self.shape = grid_shape(self.bbox, cell_deg)
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._facilities: Dict[str, List[Dict[str, Any]]] = {}
+        self._coords: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._indexes: Dict[str, GridIndex] = {}
+        self._cells: Optional[np.ndarray] = None
+        self._bounds: Optional[np.ndarray] = None
+        self.meta: Dict[str, Any] = {}
+        # 셀별 일부 변경 횟수 (이벤트 영향 지역의 조회 응답 ETag만 바꾸기 위함, 격자 파일은 그대로)
+        self._cell_revisions = np.zeros(self.shape, dtype=np.int64)
+        self._outside_revision = 0
+        # 원본 재적재 시 다음 조회에서 해시를 다시 확인, 일부 변경은 영향 지역 셀만 표시
+        on_data_version_change(self._on_data_change, scoped=True)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded = False
+
+    def _on_data_change(self, version: str, change: Optional[DataChange]) -> None:
+        if change is None:
+            self.invalidate()
+        elif change.bbox is not None:
+            self.touch(change.bbox)
+
+    def touch(self, bbox: Sequence[float]) -> int:
+        """영향 지역(남, 서, 북, 동)과 겹치는 셀의 revision 증가
+
+        Returns:
+            revision이 바뀐 격자 셀 수 (격자 밖 영역은 하나의 셀로 취급)
+        """
+        south, west, north, east = bbox
+        rows, cols = self.shape
+        row0 = max(0, int(np.floor((south - self.bbox[0]) / self.cell_deg)))
+        row1 = min(rows - 1, int(np.floor((north - self.bbox[0]) / self.cell_deg)))
+        col0 = max(0, int(np.floor((west - self.bbox[1]) / self.cell_deg)))
+        col1 = min(cols - 1, int(np.floor((east - self.bbox[1]) / self.cell_deg)))
+        outside = south < self.bbox[0] or west < self.bbox[1] or north >= self.bbox[2] or east >= self.bbox[3]
+        touched = 0
+        with self._lock:
+            if row0 <= row1 and col0 <= col1:
+                self._cell_revisions[row0:row1 + 1, col0:col1 + 1] += 1
+                touched = (row1 - row0 + 1) * (col1 - col0 + 1)
+            if outside:
+                self._outside_revision += 1
+                touched += 1
+        return touched
+
+    def cell_revision(self, lat: float, lon: float) -> int:
+        """질의 지점이 속한 셀의 일부 변경 횟수"""
+        cell = self._cell(lat, lon)
+        return int(self._cell_revisions[cell]) if cell is not None else self._outside_revision
+
+    def __len__(self) -> int:
+        self.load()
+        return sum(len(items) for items in self._facilities.values())
+
+    @property
+    def version(self) -> str:
+        """격자 내용 식별자 (원본 파일 해시와 격자 설정, 응답 ETag에 사용)"""
+        self.load()
+        key = json.dumps({k: v for k, v in self.meta.items() if k != "built_at"}, sort_keys=True)
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+    def facilities(self) -> Dict[str, List[Dict[str, Any]]]:
+        """유형별 시설 목록 (오프라인 번들용)"""
+        self.load()
+        return self._facilities
+
+    def _expected_meta(self, hashes: Dict[str, Optional[str]]) -> Dict[str, Any]:
+        return {
+            "format": GRID_FORMAT,
+            "types": FACILITY_TYPES,
+            "bbox": list(self.bbox),
+            "cell_deg": self.cell_deg,
+            "k": self.k,
+            "shape": list(self.shape),
+            "sources": hashes,
+        }
+
+    def _read_files(self, expected: Dict[str, Any]) -> bool:
+        """저장된 격자가 현재 설정/원본과 같으면 읽기"""
+        meta_path = os.path.join(self.grid_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            return False
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if any(meta.get(key) != value for key, value in expected.items()):
+                return False
+            with open(os.path.join(self.grid_dir, "facilities.json"), encoding="utf-8") as f:
+                facilities = json.load(f)
+            cells = np.load(os.path.join(self.grid_dir, "cells.npy"), mmap_mode="r")
+            bounds = np.load(os.path.join(self.grid_dir, "bounds.npy"), mmap_mode="r")
+        except (OSError, ValueError) as e:
+            logger.warning(f"[ShelterGrid] 격자 파일 읽기 실패: {e}")
+            return False
+        self._facilities, self._cells, self._bounds, self.meta = facilities, cells, bounds, meta
+        return True
+
+    def load(self) -> None:
+        """격자 로드 (파일이 없거나 원본과 다르면 계산 후 저장)"""
+        with self._lock:
+            if self._loaded:
+                return
+            start = time.perf_counter()
+            expected = self._expected_meta(source_hashes(self.data_dir))
+            source = "파일"
+            if not self._read_files(expected):
+                source = "계산"
+                facilities = load_facilities(self.data_dir)
+                cells, bounds = build_grid(facilities, self.bbox, self.cell_deg, self.k)
+                meta = {**expected, "built_at": time.time()}
+                try:
+                    save_grid(self.grid_dir, facilities, cells, bounds, meta)
+                except OSError as e:
+                    logger.warning(f"[ShelterGrid] 격자 파일 저장 실패, 메모리에서만 사용: {e}")
+                self._facilities, self._cells, self._bounds, self.meta = facilities, cells, bounds, meta
+
+            self._coords = {
+                facility_type: (
+                    np.array([item["lat"] for item in items], dtype=np.float64),
+                    np.array([item["lon"] for item in items], dtype=np.float64)
+                )
+                for facility_type, items in self._facilities.items()
+            }
+            # 격자 밖 좌표, 보정 실패 시 사용하는 유형별 인덱스
+            self._indexes = {t: GridIndex(lats, lons) for t, (lats, lons) in self._coords.items()}
+            self._loaded = True
+            counts = {t: len(items) for t, items in self._facilities.items()}
+            logger.info(
+                f"[ShelterGrid] 로드 완료 ({source}, {(time.perf_counter() - start) * 1000:.0f}ms): "
+                f"{self.shape[0]}x{self.shape[1]}셀, K={self.k}, 시설 {counts}"
+            )
+
+    def _cell(self, lat: float, lon: float) -> Optional[Tuple[int, int]]:
+        south, west = self.bbox[0], self.bbox[1]
+        row = int(np.floor((lat - south) / self.cell_deg))
+        col = int(np.floor((lon - west) / self.cell_deg))
+        if 0 <= row < self.shape[0] and 0 <= col < self.shape[1]:
+            return row, col
+        return None
+
+    def _from_grid(
+        self, lat: float, lon: float, k: int, types: List[str], cell: Tuple[int, int]
+    ) -> Optional[List[Tuple[str, int, float]]]:
+        """셀 후보만 정확한 거리로 정렬 (정확성을 보장할 수 없으면 None)"""
+        row, col = cell
+        center_lat = self.bbox[0] + (row + 0.5) * self.cell_deg
+        center_lon = self.bbox[1] + (col + 0.5) * self.cell_deg
+        offset = float(haversine_km(lat, lon, center_lat, center_lon))
+
+        limit = np.inf
+        ranked: List[Tuple[str, int, float]] = []
+        for facility_type in types:
+            t = FACILITY_TYPES.index(facility_type)
+            candidates = np.asarray(self._cells[t, row, col])
+            candidates = candidates[candidates >= 0]
+            limit = min(limit, float(self._bounds[t, row, col]))
+            lats, lons = self._coords[facility_type]
+            distances = haversine_km(lat, lon, lats[candidates], lons[candidates])
+            ranked.extend(zip([facility_type] * len(candidates), candidates.tolist(), distances.tolist()))
+
+        ranked.sort(key=lambda item: item[2])
+        ranked = ranked[:k]
+        # 반환할 마지막 결과가 후보 밖 시설의 최소 가능 거리보다 멀면 순위가 틀릴 수 있음
+        if ranked and ranked[-1][2] > limit - offset - 1e-6:
+            return None
+        return ranked
+
+    def _from_index(self, lat: float, lon: float, k: int, types: List[str]) -> List[Tuple[str, int, float]]:
+        ranked: List[Tuple[str, int, float]] = []
+        for facility_type in types:
+            indices, distances = self._indexes[facility_type].nearest(lat, lon, k)
+            ranked.extend(zip([facility_type] * len(indices), indices.tolist(), distances.tolist()))
+        ranked.sort(key=lambda item: item[2])
+        return ranked[:k]
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int = 5,
+        types: Optional[Sequence[str]] = None,
+        radius_km: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """가까운 시설 k개 (거리 오름차순, types로 유형 제한, radius_km를 넘는 시설 제외)"""
+        self.load()
+        types = resolve_types(types)
+        if k <= 0:
+            return []
+
+        ranked = None
+        cell = self._cell(lat, lon)
+        if cell is not None and k <= self.k:
+            ranked = self._from_grid(lat, lon, k, types, cell)
+        path = "grid" if ranked is not None else ("index" if cell is not None else "outside")
+        if ranked is None:
+            ranked = self._from_index(lat, lon, k, types)
+        SHELTER_LOOKUPS.labels(path=path).inc()
+        if radius_km is not None:
+            ranked = [item for item in ranked if item[2] <= radius_km]
+        return self._records(ranked)
+
+    def within(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        types: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """반경 내 시설 전체 (거리 오름차순, limit개까지)"""
+        self.load()
+        types = resolve_types(types)
+        ranked: List[Tuple[str, int, float]] = []
+        for facility_type in types:
+            indices, distances = self._indexes[facility_type].within(lat, lon, radius_km)
+            ranked.extend(zip([facility_type] * len(indices), indices.tolist(), distances.tolist()))
+        ranked.sort(key=lambda item: item[2])
+        SHELTER_LOOKUPS.labels(path="within").inc()
+        return self._records(ranked[:limit] if limit is not None else ranked)
+
+    def nearest_bulk(
+        self,
+        lats: np.ndarray,
+        lons: np.ndarray,
+        types: Optional[Sequence[str]] = None,
+        chunk_size: int = 131072
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """여러 지점의 최근접 시설 1개 (대량 알림용, 벡터 연산)
+
+        셀 후보 중 최근접은 평면 근사 거리로 고르고 그 시설만 정확한 거리로 다시 계산합니다
+        (수 km 안에서 두 근사의 순서가 달라지는 차이는 cm 단위). nearest와 같은 방식으로 정확성을
+        확인할 수 없는 지점과 격자 밖 지점만 nearest로 하나씩 계산합니다.
+
+        Returns:
+            (FACILITY_TYPES 인덱스, 유형 내 시설 인덱스, 거리 km) — 시설이 없으면 -1, -1, inf
+        """
+        self.load()
+        types = resolve_types(types)
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        count = len(lats)
+        type_codes = np.full(count, -1, dtype=np.int8)
+        indices = np.full(count, -1, dtype=np.int32)
+        distances = np.full(count, np.inf)
+
+        south, west = self.bbox[0], self.bbox[1]
+        rows = np.floor((lats - south) / self.cell_deg).astype(np.int64)
+        cols = np.floor((lons - west) / self.cell_deg).astype(np.int64)
+        in_grid = (rows >= 0) & (rows < self.shape[0]) & (cols >= 0) & (cols < self.shape[1])
+        fallback = [np.flatnonzero(~in_grid)]
+
+        grid_points = np.flatnonzero(in_grid)
+        for start in range(0, len(grid_points), chunk_size):
+            points = grid_points[start:start + chunk_size]
+            lat, lon = lats[points], lons[points]
+            row, col = rows[points], cols[points]
+            lat_scale = np.cos(np.radians(lat))[:, None]
+            best_d2 = np.full(len(points), np.inf)
+            best_type = np.full(len(points), -1, dtype=np.int8)
+            best_index = np.full(len(points), -1, dtype=np.int32)
+            limit = np.full(len(points), np.inf)
+            for facility_type in types:
+                t = FACILITY_TYPES.index(facility_type)
+                candidates = np.asarray(self._cells[t, row, col])
+                valid = candidates >= 0
+                safe = np.where(valid, candidates, 0)
+                type_lats, type_lons = self._coords[facility_type]
+                if not len(type_lats):
+                    continue
+                d2 = (type_lats[safe] - lat[:, None]) ** 2 + ((type_lons[safe] - lon[:, None]) * lat_scale) ** 2
+                d2[~valid] = np.inf
+                column = np.argmin(d2, axis=1)
+                picked = d2[np.arange(len(points)), column]
+                better = picked < best_d2
+                best_d2[better] = picked[better]
+                best_type[better] = t
+                best_index[better] = safe[np.arange(len(points)), column][better]
+                limit = np.minimum(limit, np.asarray(self._bounds[t, row, col], dtype=np.float64))
+
+            found = best_type >= 0
+            best_distance = np.full(len(points), np.inf)
+            for t in np.unique(best_type[found]):
+                mask = best_type == t
+                type_lats, type_lons = self._coords[FACILITY_TYPES[t]]
+                best_distance[mask] = haversine_km(
+                    lat[mask], lon[mask], type_lats[best_index[mask]], type_lons[best_index[mask]]
+                )
+            centers_lat = south + (row + 0.5) * self.cell_deg
+            centers_lon = west + (col + 0.5) * self.cell_deg
+            offset = haversine_km(lat, lon, centers_lat, centers_lon)
+            exact = found & (best_distance <= limit - offset - 1e-6)
+
+            type_codes[points[exact]] = best_type[exact]
+            indices[points[exact]] = best_index[exact]
+            distances[points[exact]] = best_distance[exact]
+            fallback.append(points[~exact])
+
+        rest = np.concatenate(fallback)
+        for point in rest.tolist():
+            ranked = self._from_index(float(lats[point]), float(lons[point]), 1, types)
+            if ranked:
+                facility_type, index, distance = ranked[0]
+                type_codes[point] = FACILITY_TYPES.index(facility_type)
+                indices[point] = index
+                distances[point] = distance
+        SHELTER_LOOKUPS.labels(path="bulk").inc(count - len(rest))
+        SHELTER_LOOKUPS.labels(path="index").inc(len(rest))
+        return type_codes, indices, distances
+
+    def _records(self, ranked: List[Tuple[str, int, float]]) -> List[Dict[str, Any]]:
+        return [
+            {**self._facilities[facility_type][i], "distance_km": round(distance, 2)}
+            for facility_type, i, distance in ranked
+        ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="최근접 대피소 사전 계산 격자")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="격자 계산 후 저장")
+    build.add_argument("--data-dir", default=PROCESSED_DATA_DIR)
+    build.add_argument("--output", default=SHELTER_GRID_DIR)
+    query = sub.add_parser("query", help="저장된 격자로 조회")
+    query.add_argument("lat", type=float)
+    query.add_argument("lon", type=float)
+    query.add_argument("--k", type=int, default=5)
+    query.add_argument("--type", action="append", choices=FACILITY_TYPES, dest="types")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    if args.command == "build":
+        start = time.perf_counter()
+        facilities = load_facilities(args.data_dir)
+        cells, bounds = build_grid(facilities)
+        grid = ShelterGrid(args.data_dir, args.output)
+        meta = {**grid._expected_meta(source_hashes(args.data_dir)), "built_at": time.time()}
+        save_grid(args.output, facilities, cells, bounds, meta)
+        size_kb = (cells.nbytes + bounds.nbytes) / 1024
+        print(
+            f"[ShelterGrid] {args.output}: {grid.shape[0]}x{grid.shape[1]}셀, K={grid.k}, "
+            f"{size_kb:.0f}KB, {time.perf_counter() - start:.1f}s"
+        )
+        return 0
+
+    grid = ShelterGrid()
+    for item in grid.nearest(args.lat, args.lon, args.k, args.types):
+        print(f"{item['distance_km']:>6.2f}km  {item['category']:<9} {item['name']} ({item['address']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""층수/이동 능력을 반영한 대피소 순위
+
+격자에서 가져온 가까운 시설 후보를 다음 점수의 가중합(SHELTER_RANK_WEIGHTS)으로 다시 정렬합니다.
+점수는 후보 배열 단위 벡터 연산으로 계산합니다 (후보 수십 개 기준 수십 µs).
+- reach: 재난 유형별 대피 시간 예산에서 건물을 빠져나오는 시간(층수 x 층당 계단 이동 시간)을 뺀
+  남은 시간 대비 보행 시간. 고층일수록 남은 시간이 줄어 먼 시설의 점수가 더 빨리 떨어집니다.
+  도로망 거리(walk_km, services/road_graph.py)가 있으면 직선 거리 대신 사용합니다.
+- type: 재난 유형별 옥외대피소/실내대피소(지진실내구호소)/임시주거시설 적합도
+- capacity: 면적(area)의 로그 값을 후보 중 최댓값으로 나눈 값
+현재 재난과 관련된 위험 구역 영향권의 시설(exposed_zones, services/risk_zones.py)은 가중합에
+(1 - RISK_ZONE_PENALTY)를 곱합니다.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import SHELTER_RANK_WEIGHTS, RISK_ZONE_PENALTY
+from services.shelter_grid import FACILITY_TYPES, DEFAULT_TYPE_NAMES
+
+# 이동 능력 -> (보행 속도 km/h, 층당 계단 이동 분). 재난 시 엘리베이터는 쓰지 않는다고 가정
+MOBILITY_PROFILES = {
+    "normal": (4.5, 0.25),
+    "limited": (3.0, 0.6),
+    "wheelchair": (2.5, 2.0),
+}
+DEFAULT_MOBILITY = "normal"
+
+# 재난 유형별 대피 시간 예산 (분)
+HAZARD_TIME_BUDGET_MIN = {"공습": 5.0, "화재": 10.0, "폭발사고": 10.0, "지진": 15.0, "테러": 10.0}
+DEFAULT_TIME_BUDGET_MIN = 20.0
+# 건물을 빠져나오는 데 예산을 다 써도 보행 시간 비교에 남겨두는 최소 비율
+MIN_REMAINING_RATIO = 0.2
+
+# 재난 유형별 시설 유형 적합도 (0~1, 없는 유형은 기본값)
+# 지진: 흔들림이 멈추면 건물에서 떨어진 옥외대피소로, 이후 실내구호소/임시주거시설
+# 공습: 옥외 공간은 부적합, 건물 내 실내시설 우선
+HAZARD_TYPE_PREFERENCE = {
+    "지진": {"outdoor": 1.0, "indoor": 0.6, "temporary": 0.4},
+    "붕괴": {"outdoor": 1.0, "indoor": 0.5, "temporary": 0.5},
+    "화재": {"outdoor": 1.0, "indoor": 0.3, "temporary": 0.5},
+    "폭발사고": {"outdoor": 0.9, "indoor": 0.4, "temporary": 0.5},
+    "공습": {"outdoor": 0.0, "indoor": 1.0, "temporary": 0.6},
+    "테러": {"outdoor": 0.3, "indoor": 1.0, "temporary": 0.6},
+    "홍수": {"outdoor": 0.4, "indoor": 0.8, "temporary": 1.0},
+    "산사태": {"outdoor": 0.5, "indoor": 0.8, "temporary": 1.0},
+    "댐붕괴": {"outdoor": 0.4, "indoor": 0.8, "temporary": 1.0},
+}
+DEFAULT_TYPE_PREFERENCE = 0.5
+
+# Neo4j 위치 쿼리 결과처럼 category가 없는 후보는 시설 구분 이름으로 유형 추정
+_CATEGORY_BY_NAME = {name: category for category, name in DEFAULT_TYPE_NAMES.items()}
+_CATEGORY_INDEX = {category: i for i, category in enumerate(FACILITY_TYPES)}
+
+
+def type_preferences(hazard: Optional[str]) -> np.ndarray:
+    """FACILITY_TYPES 순서의 유형 적합도 (마지막 칸은 유형을 모르는 후보용)"""
+    table = HAZARD_TYPE_PREFERENCE.get(hazard, {})
+    return np.array([table.get(t, DEFAULT_TYPE_PREFERENCE) for t in FACILITY_TYPES] + [DEFAULT_TYPE_PREFERENCE])
+
+
+def egress_minutes(floor: Optional[int], mobility: Optional[str] = None) -> float:
+    """층수에서 지상으로 나오는 시간 (1층 0분, 지하 B1은 floor=-1 또는 0으로 1개 층)"""
+    if floor is None:
+        return 0.0
+    _, minutes_per_floor = MOBILITY_PROFILES.get(mobility or DEFAULT_MOBILITY, MOBILITY_PROFILES[DEFAULT_MOBILITY])
+    floors = floor - 1 if floor >= 1 else max(abs(floor), 1)
+    return floors * minutes_per_floor
+
+
+class ShelterRanker:
+    """후보 시설 재정렬 (가중치: reach, type, capacity)"""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, exposure_penalty: float = RISK_ZONE_PENALTY):
+        self.exposure_penalty = min(max(exposure_penalty, 0.0), 1.0)
+        weights = {**SHELTER_RANK_WEIGHTS, **(weights or {})}
+        total = sum(max(v, 0.0) for v in weights.values()) or 1.0
+        self.weights = {key: max(weights.get(key, 0.0), 0.0) / total for key in ("reach", "type", "capacity")}
+
+    def score(
+        self,
+        distance_km: np.ndarray,
+        category_codes: np.ndarray,
+        areas: np.ndarray,
+        hazard: Optional[str] = None,
+        floor: Optional[int] = None,
+        mobility: Optional[str] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """후보별 (점수, 예상 대피 시간 분, 보행 시간 분)
+
+        Args:
+            distance_km: 보행 거리 (도로망 거리, 없으면 직선 거리)
+            category_codes: FACILITY_TYPES 인덱스 (모르면 len(FACILITY_TYPES))
+            areas: 면적 m² (모르면 nan)
+        """
+        speed_kmh, _ = MOBILITY_PROFILES.get(mobility or DEFAULT_MOBILITY, MOBILITY_PROFILES[DEFAULT_MOBILITY])
+        budget = HAZARD_TIME_BUDGET_MIN.get(hazard, DEFAULT_TIME_BUDGET_MIN)
+        egress = egress_minutes(floor, mobility)
+        walk = distance_km / speed_kmh * 60.0
+        remaining = max(budget - egress, budget * MIN_REMAINING_RATIO)
+        reach = np.clip(1.0 - walk / remaining, 0.0, 1.0)
+
+        type_score = type_preferences(hazard)[category_codes]
+
+        log_area = np.log1p(np.nan_to_num(areas, nan=0.0).clip(min=0.0))
+        top = log_area.max() if len(log_area) else 0.0
+        capacity = log_area / top if top > 0 else np.zeros_like(log_area)
+
+        scores = (
+            self.weights["reach"] * reach
+            + self.weights["type"] * type_score
+            + self.weights["capacity"] * capacity
+        )
+        return scores, egress + walk, walk
+
+    def rank(
+        self,
+        shelters: List[Dict[str, Any]],
+        hazard: Optional[str] = None,
+        floor: Optional[int] = None,
+        mobility: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """점수 내림차순(같으면 가까운 순) 정렬, score/evacuation_min/walk_min 추가"""
+        if not shelters:
+            return []
+        unknown = len(FACILITY_TYPES)
+        distance_km = np.array([float(s.get("walk_km") or s["distance_km"]) for s in shelters])
+        category_codes = np.array([
+            _CATEGORY_INDEX.get(s.get("category") or _CATEGORY_BY_NAME.get(s.get("shelter_type")), unknown)
+            for s in shelters
+        ])
+        areas = np.array([s.get("area") if s.get("area") is not None else np.nan for s in shelters], dtype=np.float64)
+
+        scores, minutes, walk_minutes = self.score(distance_km, category_codes, areas, hazard, floor, mobility)
+        exposed = np.array([bool(s.get("exposed_zones")) for s in shelters])
+        scores = scores * np.where(exposed, 1.0 - self.exposure_penalty, 1.0)
+        order = np.lexsort((distance_km, -scores))[:limit]
+        return [
+            {
+                **shelters[i],
+                "score": round(float(scores[i]), 3),
+                "evacuation_min": round(float(minutes[i]), 1),
+                "walk_min": round(float(walk_minutes[i]), 1)
+            }
+            for i in order
+        ]
+
+
+def places_reference(shelters: List[Dict[str, Any]], source: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    """순위가 매겨진 시설 목록으로 응답의 places_reference 구성 (순서 유지)"""
+    places = {}
+    for shelter in shelters:
+        address = shelter.get("address") or ""
+        key = f"{shelter['name']}_{address[:20]}" if address else shelter["name"]
+        if key in places:
+            continue
+        places[key] = {
+            "name": shelter["name"],
+            "address": address,
+            "lat": shelter.get("lat"),
+            "lon": shelter.get("lon"),
+            "type": shelter.get("shelter_type"),
+            "distance_km": shelter.get("distance_km"),
+            "walk_km": shelter.get("walk_km"),
+            "walk_min": shelter.get("walk_min"),
+            "evacuation_min": shelter.get("evacuation_min"),
+            "score": shelter.get("score"),
+            "exposed_zones": shelter.get("exposed_zones") or None,
+            "source": source
+        }
+    return places or None
+
+
+def distance_label(shelter: Dict[str, Any]) -> str:
+    """evidence용 거리/시간 표기 (예: "거리: 1.2km, 도로 1.8km 도보 24분, 예상 대피 27분")"""
+    parts = [f"거리: {shelter['distance_km']}km"]
+    walk = f"도보 {shelter['walk_min']:.0f}분" if shelter.get("walk_min") is not None else ""
+    if shelter.get("route") == "road":
+        walk = f"도로 {shelter['walk_km']}km {walk}"
+    elif shelter.get("route") == "beyond":
+        walk = f"도로 {shelter['walk_km']}km 이상 {walk} 이상"
+    if walk:
+        parts.append(walk.strip())
+    if shelter.get("evacuation_min") is not None:
+        beyond = " 이상" if shelter.get("route") == "beyond" else ""
+        parts.append(f"예상 대피 {shelter['evacuation_min']:.0f}분{beyond}")
+    if shelter.get("exposed_zones"):
+        parts.append(f"주의: {', '.join(shelter['exposed_zones'])} 영향권")
+    return ", ".join(parts)
@@ -0,0 +1,93 @@
+"""요청 병합 (single-flight)
+
+같은 키의 호출이 동시에 들어오면 첫 호출만 실제로 실행하고 나머지는 그 결과(또는 예외)를
+공유합니다. 결과를 보관하지 않으므로 캐시와 달리 실행이 끝나면 다음 호출은 다시 실행됩니다.
+
+- AsyncSingleFlight: 코루틴용 (Orchestrator 파이프라인)
+- SingleFlight: 스레드용 (asyncio.to_thread로 실행되는 Gemini/Chroma 동기 호출)
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from services.metrics import record_single_flight
+
+
+class AsyncSingleFlight:
+    """코루틴 single-flight
+
+    실행은 별도 Task로 분리하고 모든 호출자가 shield로 기다리므로,
+    한 호출자(예: 연결이 끊긴 요청)가 취소되어도 다른 호출자의 실행은 계속됩니다.
+    """
+
+    def __init__(self, layer: str):
+        self.layer = layer
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """키별로 func를 한 번만 실행
+
+        Returns:
+            (결과, 다른 호출의 실행 결과를 공유했는지 여부)
+        """
+        task = self._tasks.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        record_single_flight(self.layer, shared)
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # 기다리는 호출자가 없을 때 "exception was never retrieved" 경고 방지
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """스레드 single-flight (동기 함수용)"""
+
+    def __init__(self, layer: str):
+        self.layer = layer
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """키별로 func를 한 번만 실행하고 결과를 동시 호출자와 공유 (예외도 공유)"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        record_single_flight(self.layer, not leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
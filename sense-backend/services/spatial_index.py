@@ -0,0 +1,130 @@
+"""격자 기반 공간 인덱스
+
+좌표를 cell_deg 단위 격자로 나누어 두고, 질의 지점이 속한 셀에서부터 바깥 링으로 넓혀가며
+후보만 거리 계산합니다. 전체 대피소(수천 개)를 매번 계산하지 않고 주변 몇 개 셀만 확인합니다.
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG_LAT = 111.32
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """한 지점에서 여러 지점까지의 거리 (km, 벡터 연산)"""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GridIndex:
+    """위경도 격자 인덱스 (셀별 점 인덱스 목록)"""
+
+    def __init__(self, lats: np.ndarray, lons: np.ndarray, cell_deg: float = 0.01):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.cell_deg = cell_deg
+
+        rows = np.floor(self.lats / cell_deg).astype(np.int64)
+        cols = np.floor(self.lons / cell_deg).astype(np.int64)
+        # 셀 순서로 정렬한 뒤 셀별 구간만 기록 (셀당 배열을 따로 만들지 않음)
+        self._order = np.lexsort((cols, rows))
+        self._cells: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        if len(self._order):
+            sorted_rows, sorted_cols = rows[self._order], cols[self._order]
+            change = np.flatnonzero((np.diff(sorted_rows) != 0) | (np.diff(sorted_cols) != 0)) + 1
+            starts = np.concatenate(([0], change))
+            ends = np.concatenate((change, [len(self._order)]))
+            for start, end in zip(starts, ends):
+                self._cells[(int(sorted_rows[start]), int(sorted_cols[start]))] = (int(start), int(end))
+            self._row_range = (int(rows.min()), int(rows.max()))
+            self._col_range = (int(cols.min()), int(cols.max()))
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def _ring(self, row: int, col: int, radius: int) -> np.ndarray:
+        """(row, col)에서 radius번째 링에 있는 셀들의 점 인덱스"""
+        if radius == 0:
+            cells = [(row, col)]
+        else:
+            cells = [(row + dr, col + dc) for dr in (-radius, radius) for dc in range(-radius, radius + 1)]
+            cells += [(row + dr, col + dc) for dc in (-radius, radius) for dr in range(-radius + 1, radius)]
+        chunks = [self._order[span[0]:span[1]] for span in map(self._cells.get, cells) if span]
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+    def _max_radius(self, row: int, col: int) -> int:
+        """데이터 범위 전체를 덮는 링 반경"""
+        return max(
+            abs(row - self._row_range[0]), abs(row - self._row_range[1]),
+            abs(col - self._col_range[0]), abs(col - self._col_range[1])
+        )
+
+    def nearest(self, lat: float, lon: float, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """가까운 점 k개 (인덱스, 거리 km) — 거리 오름차순"""
+        if not len(self) or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        row, col = int(np.floor(lat / self.cell_deg)), int(np.floor(lon / self.cell_deg))
+        # 링 r까지 확인하면 질의 지점에서 최소 r셀 폭 거리 이내의 점은 모두 확인한 것
+        cell_km = self.cell_deg * KM_PER_DEG_LAT * min(1.0, np.cos(np.radians(abs(lat) + self.cell_deg)))
+        max_radius = self._max_radius(row, col)
+
+        candidates = []
+        found = 0
+        for radius in range(max_radius + 1):
+            ring = self._ring(row, col, radius)
+            if len(ring):
+                candidates.append(ring)
+                found += len(ring)
+            if found >= k:
+                indices = np.concatenate(candidates)
+                distances = haversine_km(lat, lon, self.lats[indices], self.lons[indices])
+                kth = np.partition(distances, k - 1)[k - 1]
+                if kth <= radius * cell_km:
+                    return self._top_k(indices, distances, k)
+
+        indices = np.concatenate(candidates) if candidates else np.empty(0, dtype=np.int64)
+        distances = haversine_km(lat, lon, self.lats[indices], self.lons[indices])
+        return self._top_k(indices, distances, min(k, len(indices)))
+
+    def within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """반경 내 점 (인덱스, 거리 km) — 거리 오름차순"""
+        if not len(self):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        row, col = int(np.floor(lat / self.cell_deg)), int(np.floor(lon / self.cell_deg))
+        cell_km = self.cell_deg * KM_PER_DEG_LAT * min(1.0, np.cos(np.radians(abs(lat) + self.cell_deg)))
+        rings = min(int(np.ceil(radius_km / cell_km)) + 1, self._max_radius(row, col))
+        chunks = [self._ring(row, col, r) for r in range(rings + 1)]
+        indices = np.concatenate(chunks)
+        distances = haversine_km(lat, lon, self.lats[indices], self.lons[indices])
+        mask = distances <= radius_km
+        return self._top_k(indices[mask], distances[mask], int(mask.sum()))
+
+    def within_bbox(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """사각 범위와 겹치는 셀의 점 인덱스 (경계 셀의 범위 밖 점 포함, 호출 측에서 다시 거름)"""
+        if not len(self):
+            return np.empty(0, dtype=np.int64)
+        row_lo = max(int(np.floor(south / self.cell_deg)), self._row_range[0])
+        row_hi = min(int(np.floor(north / self.cell_deg)), self._row_range[1])
+        col_lo = max(int(np.floor(west / self.cell_deg)), self._col_range[0])
+        col_hi = min(int(np.floor(east / self.cell_deg)), self._col_range[1])
+        chunks = [
+            self._order[span[0]:span[1]]
+            for row in range(row_lo, row_hi + 1) for col in range(col_lo, col_hi + 1)
+            for span in (self._cells.get((row, col)),) if span
+        ]
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+    @staticmethod
+    def _top_k(indices: np.ndarray, distances: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        if k < len(distances):
+            part = np.argpartition(distances, k - 1)[:k]
+            indices, distances = indices[part], distances[part]
+        order = np.argsort(distances, kind="stable")
+        return indices[order], distances[order]
@@ -0,0 +1,83 @@
+"""OpenTelemetry 트레이싱
+
+/chat 요청이 LangGraph 노드, 서브 문제별 Graph/Vector 검색, 외부 호출(Gemini, Neo4j, Chroma)을
+거치는 과정을 span으로 기록합니다. 호스팅 백엔드 없이 분석할 수 있도록 기본값은 로컬 파일
+(JSON Lines) exporter이며, OTEL_EXPORTER_OTLP_ENDPOINT가 설정되면 OTLP(HTTP)로 전송합니다.
+"""
+import os
+import hashlib
+import logging
+from typing import Any, Optional
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor, ConsoleSpanExporter, SpanExporter
+)
+
+from config import TRACING_ENABLED, TRACE_FILE_PATH, OTEL_EXPORTER_OTLP_ENDPOINT
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("sense")
+
+_configured = False
+
+
+def _create_exporter() -> SpanExporter:
+    """설정에 따라 OTLP 또는 파일 exporter 생성"""
+    if OTEL_EXPORTER_OTLP_ENDPOINT:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        logger.info(f"[Tracing] OTLP exporter 사용: {OTEL_EXPORTER_OTLP_ENDPOINT}")
+        return OTLPSpanExporter()
+
+    # 워커별로 파일을 분리하여 여러 프로세스가 같은 파일에 쓰지 않도록 함
+    path = TRACE_FILE_PATH.format(pid=os.getpid())
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    logger.info(f"[Tracing] 파일 exporter 사용: {path}")
+    return ConsoleSpanExporter(
+        out=open(path, "a", encoding="utf-8"),
+        formatter=lambda span: span.to_json(indent=None) + "\n"
+    )
+
+
+def setup_tracing(exporter: Optional[SpanExporter] = None) -> None:
+    """TracerProvider 설정 (프로세스당 1회)
+
+    Args:
+        exporter: 직접 지정할 exporter (벤치마크 등에서 사용). 없으면 설정값 기반으로 생성
+    """
+    global _configured
+    if _configured or not (TRACING_ENABLED or exporter):
+        return
+
+    provider = TracerProvider(resource=Resource.create({"service.name": "sense-api"}))
+    provider.add_span_processor(BatchSpanProcessor(exporter or _create_exporter()))
+    trace.set_tracer_provider(provider)
+    _configured = True
+
+
+def start_span(name: str, **attributes: Any):
+    """현재 컨텍스트의 하위 span 시작 (None 값 속성은 제외)
+
+    asyncio.to_thread는 contextvars를 복사하므로 스레드에서 실행되는 동기 호출도
+    호출한 코루틴의 span 아래에 연결됩니다.
+    """
+    attrs = {k.replace("__", "."): v for k, v in attributes.items() if v is not None}
+    return tracer.start_as_current_span(name, attributes=attrs)
+
+
+def set_span_attributes(**attributes: Any) -> None:
+    """현재 span에 속성 추가"""
+    span = trace.get_current_span()
+    for key, value in attributes.items():
+        if value is not None:
+            span.set_attribute(key.replace("__", "."), value)
+
+
+def query_hash(text: Optional[str]) -> Optional[str]:
+    """Cypher 등 쿼리 텍스트의 짧은 해시 (span 속성용)"""
+    if not text:
+        return None
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
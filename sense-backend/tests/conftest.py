@@ -0,0 +1,92 @@
+"""공용 fixture
+
+API 테스트는 benchmarks/fakes의 로컬 대체 구현(Gemini/Neo4j/Chroma)을 설치한 뒤 api 모듈을 import합니다.
+startup 이벤트(이벤트 확인 태스크, 스키마 확인)는 실행하지 않도록 TestClient를 컨텍스트 없이 사용합니다.
+로컬 답변/순위/위험 구역 테스트는 임시 디렉토리의 작은 전처리 데이터(local_data_dir)를 사용합니다.
+"""
+import json
+
+import chromadb
+import pytest
+from fastapi.testclient import TestClient
+from google import genai
+
+from services import rag_service
+
+ADMIN_TOKEN = "test-admin-token"
+
+# 작은 전처리 데이터: 사용자 위치 (37.5, 127.0) 주변 시설/위험 구역
+LOCAL_BBOX = (37.45, 126.95, 37.55, 127.05)
+LOCAL_FACILITIES = {
+    "outdoor_shelter.geojson": [
+        {"shelter_id": "out-1", "shelter_name": "근린공원", "lat": 37.5009, "lon": 127.0, "area": 5000},
+        {"shelter_id": "out-2", "shelter_name": "먼 운동장", "lat": 37.53, "lon": 127.03, "area": 9000},
+    ],
+    "indoor_shelter.geojson": [
+        {"shelter_id": "in-1", "shelter_name": "지하주차장", "address": "서울 테스트구 1", "lat": 37.5018, "lon": 127.0, "area": 800},
+    ],
+    "temporary_housing.geojson": [
+        {"shelter_id": "tmp-1", "shelter_name": "주민센터", "lat": 37.51, "lon": 127.01},
+    ],
+}
+LOCAL_WATER_CSV = "facility_id,facility_name,lat,lon\nwater-1,급수대,37.5002,127.0002\n"
+LOCAL_GUIDELINES_CSV = (
+    "doc_id,disaster_type,section_title,content\n"
+    "eq-0,지진,# 재난 행동요령: 지진,# 재난 행동요령: 지진\n"
+    "eq-1,지진,## 흔들릴 때,탁자 아래로 들어가 몸을 보호하고 흔들림이 멈추면 계단으로 밖으로 대피합니다.\n"
+    "fl-1,홍수,## 침수 시,하천 근처를 피하고 높은 곳으로 이동합니다.\n"
+)
+LOCAL_ZONES_CSV = "risk_id,name,reason,lat,lon\nz1,저지대 마을,상습 침수,37.5003,127.0003\n"
+
+
+@pytest.fixture(scope="session")
+def local_data_dir(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp("processed")
+    for file_name, rows in LOCAL_FACILITIES.items():
+        features = [{"type": "Feature", "properties": row, "geometry": None} for row in rows]
+        (data_dir / file_name).write_text(json.dumps({"type": "FeatureCollection", "features": features}), encoding="utf-8")
+    (data_dir / "water_facility_clean.csv").write_text(LOCAL_WATER_CSV, encoding="utf-8")
+    (data_dir / "docs").mkdir()
+    (data_dir / "docs" / "disaster_guidelines_for_rag.csv").write_text(LOCAL_GUIDELINES_CSV, encoding="utf-8")
+    (data_dir / "casualty_risk_clean.csv").write_text(LOCAL_ZONES_CSV, encoding="utf-8")
+    return data_dir
+
+
+@pytest.fixture
+def make_shelter_grid(local_data_dir, tmp_path):
+    """임시 데이터로 ShelterGrid 생성 (격자 파일은 테스트별 임시 디렉토리)"""
+    from services.shelter_grid import ShelterGrid
+
+    def make():
+        return ShelterGrid(str(local_data_dir), str(tmp_path / "grid"), LOCAL_BBOX, 0.01, 8)
+    return make
+
+
+@pytest.fixture
+def make_local_engine(local_data_dir, make_shelter_grid):
+    """임시 데이터로 LocalAnswerEngine 생성 (도로망 없음)"""
+    from services.local_answer import LocalAnswerEngine
+    from services.road_graph import RoadGraph
+
+    def make(**kwargs):
+        return LocalAnswerEngine(
+            str(local_data_dir), shelter_grid=make_shelter_grid(), road_graph=RoadGraph(""), **kwargs
+        )
+    return make
+
+
+@pytest.fixture(scope="session")
+def api_module():
+    from benchmarks import fakes
+
+    originals = (genai.Client, rag_service.GraphDatabase, chromadb.PersistentClient, chromadb.HttpClient)
+    fakes.install(fakes.LatencyProfile(llm_ms=0, embed_ms=0, neo4j_ms=0, chroma_ms=0))
+    import api
+    yield api
+    genai.Client, rag_service.GraphDatabase, chromadb.PersistentClient, chromadb.HttpClient = originals
+
+
+@pytest.fixture
+def client(api_module, monkeypatch):
+    monkeypatch.setattr(api_module, "ADMIN_TOKEN", ADMIN_TOKEN)
+    return TestClient(api_module.app)
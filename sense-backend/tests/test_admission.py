@@ -0,0 +1,189 @@
+"""AdmissionController 단위 테스트"""
+import asyncio
+
+import pytest
+
+from services.admission import (
+    AdmissionController, AdmissionRejected, AdmissionTimeout,
+    PRIORITY_BATCH, PRIORITY_DEFAULT, PRIORITY_LOCATION
+)
+
+
+async def _hold(controller, priority, started, release, order=None, name=None):
+    async with controller.slot(priority):
+        if order is not None:
+            order.append(name)
+        started.set()
+        await release.wait()
+
+
+def test_limits_in_flight_and_queues_the_rest():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=2, max_queue=4, queue_timeout=5)
+        release = asyncio.Event()
+        tasks = [
+            asyncio.create_task(_hold(controller, PRIORITY_DEFAULT, asyncio.Event(), release))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        assert controller.in_flight == 2
+        assert controller.queue_depth == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert controller.in_flight == 0
+        assert controller.queue_depth == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiters_run_in_priority_order():
+    """대기열은 좌표 요청 → 일반 → 배치 순으로 슬롯을 넘겨받음"""
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=8, queue_timeout=5)
+        order = []
+        gate = asyncio.Event()
+        first = asyncio.create_task(_hold(controller, PRIORITY_DEFAULT, asyncio.Event(), gate, order, "first"))
+        await asyncio.sleep(0)
+
+        done = asyncio.Event()
+        done.set()
+        waiters = [
+            asyncio.create_task(_hold(controller, priority, asyncio.Event(), done, order, name))
+            for priority, name in [
+                (PRIORITY_BATCH, "batch"),
+                (PRIORITY_DEFAULT, "default"),
+                (PRIORITY_LOCATION, "location"),
+                (PRIORITY_DEFAULT, "default-2"),
+            ]
+        ]
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 4
+
+        gate.set()
+        await asyncio.gather(first, *waiters)
+        assert order == ["first", "location", "default", "default-2", "batch"]
+        assert controller.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_rejects_same_or_lower_priority():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, PRIORITY_DEFAULT, asyncio.Event(), release))
+        queued = asyncio.create_task(_hold(controller, PRIORITY_DEFAULT, asyncio.Event(), release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected):
+            async with controller.slot(PRIORITY_DEFAULT):
+                pass
+        with pytest.raises(AdmissionRejected):
+            async with controller.slot(PRIORITY_BATCH):
+                pass
+
+        release.set()
+        await asyncio.gather(holder, queued)
+        assert controller.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_higher_priority_evicts_lowest_waiter():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, PRIORITY_DEFAULT, asyncio.Event(), release))
+        batch = asyncio.create_task(_hold(controller, PRIORITY_BATCH, asyncio.Event(), release))
+        await asyncio.sleep(0)
+
+        located_started = asyncio.Event()
+        located = asyncio.create_task(_hold(controller, PRIORITY_LOCATION, located_started, release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected):
+            await batch
+        assert controller.queue_depth == 1
+
+        release.set()
+        await asyncio.gather(holder, located)
+        assert located_started.is_set()
+        assert controller.in_flight == 0
+        assert controller.queue_depth == 0
+
+    asyncio.run(scenario())
+
+
+def test_queue_timeout_raises_and_leaves_queue():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=0.05)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, PRIORITY_DEFAULT, asyncio.Event(), release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionTimeout):
+            async with controller.slot(PRIORITY_DEFAULT):
+                pass
+        assert controller.queue_depth == 0
+
+        release.set()
+        await holder
+        assert controller.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    """대기 중 취소된 요청은 대기열에서 빠지고 슬롯을 점유하지 않음"""
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=5)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, PRIORITY_DEFAULT, asyncio.Event(), release))
+        waiter = asyncio.create_task(_hold(controller, PRIORITY_DEFAULT, asyncio.Event(), release))
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 1
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.queue_depth == 0
+
+        release.set()
+        await holder
+        assert controller.in_flight == 0
+
+        async with controller.slot(PRIORITY_DEFAULT):
+            assert controller.in_flight == 1
+        assert controller.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_zero_queue_rejects_when_busy():
+    """ADMISSION_MAX_QUEUE=0: 슬롯이 없으면 대기하지 않고 거절"""
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=5)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, PRIORITY_BATCH, asyncio.Event(), release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected):
+            async with controller.slot(PRIORITY_LOCATION):
+                pass
+
+        release.set()
+        await holder
+        assert controller.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_chat_returns_503_with_retry_after_when_rejected(client, api_module, monkeypatch):
+    async def rejected(*args, **kwargs):
+        raise AdmissionRejected("대기열이 가득 찼습니다")
+
+    monkeypatch.setattr(api_module.orchestrator, "process", rejected)
+    response = client.post("/chat", json={"message": "지진 대피소"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(api_module.ADMISSION_RETRY_AFTER_SECONDS)
@@ -0,0 +1,171 @@
+"""시맨틱 답변 캐시 단위 테스트 (유사도, 키 구분, 전체/일부 무효화, 실행 중 무효화)"""
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+
+from graph import Orchestrator
+from services.answer_cache import GLOBAL_CELL, SemanticAnswerCache, _Bucket, answer_profile, location_cell
+from services.data_version import DataChange, bump_data_version, get_data_version
+from services.single_flight import AsyncSingleFlight
+
+CELL_DEG = 0.01
+
+
+def _cache(**kwargs):
+    options = {"similarity": 0.9, "ttl_seconds": 600, "max_entries": 100, "cell_deg": CELL_DEG}
+    options.update(kwargs)
+    return SemanticAnswerCache(**options)
+
+
+def _cell(lat, lon):
+    return location_cell({"lat": lat, "lon": lon}, CELL_DEG)
+
+
+def test_returns_answer_for_similar_question_only():
+    cache = _cache()
+    cache.store([1.0, 0.0, 0.0], GLOBAL_CELL, "any", {"answer": "a"})
+
+    payload, score = cache.lookup([0.99, 0.05, 0.0], GLOBAL_CELL, "any")
+    assert payload == {"answer": "a"}
+    assert score > 0.9
+    assert cache.lookup([0.0, 1.0, 0.0], GLOBAL_CELL, "any") is None
+
+
+def test_answers_are_separated_by_cell_and_profile():
+    cache = _cache()
+    seoul = _cell(37.5665, 126.9780)
+    cache.store([1.0, 0.0], seoul, "5-9:normal", {"answer": "high floor"})
+
+    assert cache.lookup([1.0, 0.0], seoul, "5-9:normal")[0] == {"answer": "high floor"}
+    assert cache.lookup([1.0, 0.0], seoul, "B:wheelchair") is None
+    assert cache.lookup([1.0, 0.0], _cell(35.1796, 129.0756), "5-9:normal") is None
+
+
+def test_answer_profile_buckets_floor_and_mobility():
+    assert answer_profile(None) == "any"
+    assert answer_profile({"floor": 7}) == answer_profile({"floor": 5, "mobility": None}) == "5-9:normal"
+    assert answer_profile({"floor": -1, "mobility": "wheelchair"}) == "B:wheelchair"
+    assert answer_profile({"floor": 30}) == "20+:normal"
+    assert answer_profile({"lat": 37.5}) == "-:normal"
+
+
+def test_expired_answers_are_not_returned(monkeypatch):
+    cache = _cache(ttl_seconds=10)
+    now = [1000.0]
+    monkeypatch.setattr("services.answer_cache.time.time", lambda: now[0])
+    cache.store([1.0, 0.0], GLOBAL_CELL, "any", {"answer": "a"})
+    now[0] += 11
+    assert cache.lookup([1.0, 0.0], GLOBAL_CELL, "any") is None
+
+
+def test_full_reload_invalidates_everything():
+    cache = _cache()
+    cache.store([1.0, 0.0], GLOBAL_CELL, "any", {"answer": "a"})
+    bump_data_version("test reload")
+    assert cache.lookup([1.0, 0.0], GLOBAL_CELL, "any") is None
+
+
+def test_scoped_change_drops_only_affected_answers():
+    """영향 지역 셀 답변과 관련/미상 재난 유형 답변만 삭제하고 나머지는 새 버전으로 이동"""
+    cache = _cache()
+    inside = _cell(37.505, 127.005)
+    outside = _cell(37.705, 127.305)
+    cache.store([1.0, 0.0], inside, "any", {"answer": "inside"}, hazard="지진")
+    cache.store([1.0, 0.0], outside, "any", {"answer": "related"}, hazard="지진")
+    cache.store([0.0, 1.0], outside, "any", {"answer": "unrelated"}, hazard="태풍")
+    cache.store([0.7, 0.7], GLOBAL_CELL, "any", {"answer": "unknown hazard"}, hazard=None)
+
+    change = DataChange(reason="event", labels=("Event",), hazards=("지진",), bbox=(37.50, 127.00, 37.51, 127.01))
+    bump_data_version("test event", change)
+
+    assert cache.lookup([1.0, 0.0], inside, "any") is None
+    assert cache.lookup([1.0, 0.0], outside, "any") is None
+    assert cache.lookup([0.7, 0.7], GLOBAL_CELL, "any") is None
+    assert cache.lookup([0.0, 1.0], outside, "any")[0] == {"answer": "unrelated"}
+
+
+def test_invalidate_cells():
+    cache = _cache()
+    first, second = _cell(37.5, 127.0), _cell(37.6, 127.1)
+    cache.store([1.0, 0.0], first, "any", {"answer": "1"})
+    cache.store([1.0, 0.0], second, "any", {"answer": "2"})
+    assert cache.invalidate([first]) == 1
+    assert cache.lookup([1.0, 0.0], first, "any") is None
+    assert cache.lookup([1.0, 0.0], second, "any") is not None
+
+
+def test_evicts_least_recently_used_cell():
+    cache = _cache(max_entries=2)
+    cells = [_cell(37.5, 127.0), _cell(37.6, 127.1), _cell(37.7, 127.2)]
+    cache.store([1.0, 0.0], cells[0], "any", {"answer": "0"})
+    cache.store([1.0, 0.0], cells[1], "any", {"answer": "1"})
+    cache.lookup([1.0, 0.0], cells[0], "any")
+    cache.store([1.0, 0.0], cells[2], "any", {"answer": "2"})
+
+    assert cache.lookup([1.0, 0.0], cells[1], "any") is None
+    assert cache.lookup([1.0, 0.0], cells[0], "any") is not None
+
+
+def test_store_skips_answer_built_before_version_change():
+    """파이프라인 실행 중에 무효화되면 이전 데이터로 만든 답변을 새 버전으로 저장하지 않음"""
+    cache = _cache()
+    version = get_data_version()
+    bump_data_version("test invalidate during run")
+
+    assert cache.store([1.0, 0.0], GLOBAL_CELL, "any", {"answer": "stale"}, version=version) is False
+    assert cache.lookup([1.0, 0.0], GLOBAL_CELL, "any") is None
+    assert cache.store([1.0, 0.0], GLOBAL_CELL, "any", {"answer": "fresh"}, version=get_data_version()) is True
+    assert cache.lookup([1.0, 0.0], GLOBAL_CELL, "any")[0] == {"answer": "fresh"}
+
+
+def test_orchestrator_does_not_cache_answer_invalidated_in_flight():
+    cache = _cache()
+    orchestrator = Orchestrator.__new__(Orchestrator)
+    orchestrator.answer_cache = cache
+    orchestrator.analyst_agent = SimpleNamespace(rag_service=SimpleNamespace(embed_query=lambda text: [1.0, 0.0]))
+    orchestrator.flights = AsyncSingleFlight("test")
+    orchestrator.admission = None
+
+    async def run(input_text, history, user_info, conversation_id):
+        # /admin/cache/invalidate 또는 이벤트 수집이 실행 중에 들어온 경우
+        bump_data_version("test invalidate during run")
+        return {"response": "llm"}, {"answer": "stale"}
+
+    orchestrator._run = run
+    assert asyncio.run(orchestrator.process("지진 대피 요령")) == {"response": "llm"}
+    assert cache.lookup([1.0, 0.0], GLOBAL_CELL, "any") is None
+
+
+def test_bucket_grows_without_losing_rows():
+    """용량을 늘리고 항목을 지우거나 합쳐도 임베딩 행과 답변의 짝이 유지됨"""
+    cache = _cache(max_entries=1000)
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(size=(100, 16)).astype(np.float32)
+    for i, vector in enumerate(vectors):
+        cache.store(vector.tolist(), GLOBAL_CELL, "any", {"answer": i}, hazard="지진" if i % 2 else "태풍")
+
+    bucket = cache._buckets[(get_data_version(), GLOBAL_CELL, "any")]
+    assert bucket.vectors.shape == (100, 16)
+    assert bucket._matrix.shape[0] == 128
+    for i in (0, 37, 99):
+        assert cache.lookup(vectors[i].tolist(), GLOBAL_CELL, "any")[0] == {"answer": i}
+
+    # 태풍 답변만 남기고 새 버전으로 이동 (keep 후 남은 행이 올바른 답변과 짝지어짐)
+    bump_data_version("test event", DataChange(reason="event", hazards=("지진",)))
+    for i in (0, 38, 98):
+        assert cache.lookup(vectors[i].tolist(), GLOBAL_CELL, "any")[0] == {"answer": i}
+    result = cache.lookup(vectors[37].tolist(), GLOBAL_CELL, "any")
+    assert result is None or result[0] != {"answer": 37}
+
+
+def test_bucket_merge_appends_rows():
+    first, second = _Bucket(), _Bucket()
+    for i in range(10):
+        first.add(np.full(4, i, dtype=np.float32), {"answer": i}, 0.0)
+    for i in range(10, 25):
+        second.add(np.full(4, i, dtype=np.float32), {"answer": i}, 0.0)
+    first.merge(second)
+    assert len(first) == 25
+    assert first.vectors[:, 0].tolist() == list(range(25))
+    assert [p["answer"] for p in first.payloads] == list(range(25))
@@ -0,0 +1,154 @@
+"""/chat/batch 일괄 처리 테스트
+
+process_many가 스키마를 한 번 조회하고 입력 임베딩을 묶어 계산한 뒤, 동시 실행 제한 안에서
+PRIORITY_BATCH로 각 항목을 처리해 입력 순서대로 결과/오류를 돌려주는지 확인합니다.
+"""
+import asyncio
+from contextlib import contextmanager
+
+from graph import Orchestrator
+from services.admission import PRIORITY_BATCH
+
+
+class _RagService:
+    def __init__(self, schema_error=None):
+        self.schema_calls = 0
+        self.embedded = []
+        self.schema_error = schema_error
+
+    @contextmanager
+    def get_neo4j_session(self, read_only=False):
+        yield object()
+
+    async def get_schema(self, session, use_cache=True):
+        self.schema_calls += 1
+        if self.schema_error:
+            raise self.schema_error
+        return "schema"
+
+    def embed_queries(self, texts):
+        self.embedded.append(list(texts))
+        return [[0.0] for _ in texts]
+
+
+class _Analyst:
+    def __init__(self, rag_service):
+        self.rag_service = rag_service
+
+
+def _orchestrator(process, rag_service, batch_concurrency=4):
+    orchestrator = Orchestrator.__new__(Orchestrator)
+    orchestrator.analyst_agent = _Analyst(rag_service)
+    orchestrator.answer_cache = object()
+    orchestrator.batch_limit = asyncio.Semaphore(batch_concurrency)
+    orchestrator.process = process
+    return orchestrator
+
+
+def test_process_many_keeps_order_and_isolates_errors():
+    async def scenario():
+        calls = []
+        active, peak = [0], [0]
+
+        async def process(input_text, conversation_history=None, user_info=None, mode="full", priority=None):
+            calls.append((input_text, mode, priority))
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.01 if input_text != "빠름" else 0)
+            active[0] -= 1
+            if input_text == "실패":
+                raise RuntimeError("boom")
+            return {"response": input_text}
+
+        rag_service = _RagService()
+        orchestrator = _orchestrator(process, rag_service)
+        items = [
+            {"input": "지진"},
+            {"input": "실패"},
+            {"input": "빠름", "mode": "local"},
+            {"input": "이어서", "conversation_history": [{"role": "user", "content": "안녕"}]},
+            {"input": "홍수"},
+        ]
+        results = await orchestrator.process_many(items, concurrency=2)
+
+        assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+        assert [r["ok"] for r in results] == [True, False, True, True, True]
+        assert results[1]["error"] == "boom" and "result" not in results[1]
+        assert results[2]["result"] == {"response": "빠름"}
+        assert all(r["elapsed_ms"] >= 0 for r in results)
+        assert {priority for _, _, priority in calls} == {PRIORITY_BATCH}
+        assert peak[0] == 2
+        assert rag_service.schema_calls == 1
+        # 답변 캐시를 조회하는 항목(full, 대화 기록 없음)만 한 번에 임베딩
+        assert rag_service.embedded == [["지진", "실패", "홍수"]]
+
+    asyncio.run(scenario())
+
+
+def test_process_many_continues_when_schema_lookup_fails():
+    async def scenario():
+        async def process(input_text, conversation_history=None, user_info=None, mode="full", priority=None):
+            return {"response": input_text}
+
+        orchestrator = _orchestrator(process, _RagService(schema_error=RuntimeError("neo4j down")))
+        results = await orchestrator.process_many([{"input": "지진"}])
+        assert results[0]["ok"] and results[0]["result"] == {"response": "지진"}
+
+    asyncio.run(scenario())
+
+
+def test_batch_concurrency_is_shared_across_batches():
+    async def scenario():
+        active, peak = [0], [0]
+
+        async def process(input_text, conversation_history=None, user_info=None, mode="full", priority=None):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.01)
+            active[0] -= 1
+            return {"response": input_text}
+
+        orchestrator = _orchestrator(process, _RagService(), batch_concurrency=3)
+        batches = [[{"input": f"{b}-{i}"} for i in range(4)] for b in range(3)]
+        await asyncio.gather(*(orchestrator.process_many(items, concurrency=10) for items in batches))
+        assert peak[0] == 3
+
+    asyncio.run(scenario())
+
+
+def test_batch_endpoint_rejects_too_many_items(client, api_module, monkeypatch):
+    monkeypatch.setattr(api_module, "BATCH_MAX_ITEMS", 2)
+    response = client.post("/chat/batch", json={"items": [{"message": "지진"}] * 3})
+    assert response.status_code == 400
+
+
+def test_batch_endpoint_maps_outcomes(client, api_module, monkeypatch):
+    received = {}
+
+    async def process_many(items, concurrency=None):
+        received["items"], received["concurrency"] = items, concurrency
+        return [
+            {"index": 0, "ok": True, "result": {"answer": "답변", "conclusion": "결론"}, "elapsed_ms": 1.5},
+            {"index": 1, "ok": False, "error": "대기열이 가득 찼습니다", "elapsed_ms": 0.1},
+        ]
+
+    monkeypatch.setattr(api_module.orchestrator, "process_many", process_many)
+    response = client.post("/chat/batch", json={
+        "items": [
+            {"message": "지진", "user_info": {"lat": 37.5, "lon": 127.0, "floor": 3}},
+            {"message": "홍수", "mode": "local"},
+        ],
+        "concurrency": 2,
+        "detail": "minimal",
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert received["concurrency"] == 2
+    assert received["items"][0]["input"] == "지진" and received["items"][0]["user_info"]["lat"] == 37.5
+    assert received["items"][1]["mode"] == "local"
+    assert (body["succeeded"], body["failed"]) == (1, 1)
+    assert body["results"][0]["result"]["answer"] == "답변"
+    assert "conclusion" not in body["results"][0]["result"]  # minimal 상세도
+    assert body["results"][1] == {
+        "index": 1, "ok": False, "result": None, "error": "대기열이 가득 찼습니다", "elapsed_ms": 0.1
+    }
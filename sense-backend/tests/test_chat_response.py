@@ -0,0 +1,95 @@
+"""/chat 응답 상세도(minimal | standard | debug)와 직렬화 테스트"""
+import numpy as np
+import pytest
+
+PLACE = {
+    "name": "근린공원", "address": "서울 테스트구 1", "type": "옥외대피소", "lat": 37.5009, "lon": 127.0,
+    "distance_km": np.float64(0.1), "walk_km": None, "exposed_zones": None, "source": "Local",
+}
+RESULT = {
+    "answer": "근린공원으로 대피하세요.",
+    "conclusion": "근린공원 대피",
+    "evidence": "지진 행동요령",
+    "explanation": {
+        "planning": {"search_plan": {"sub_problems": ["대피소", "행동요령"]}, "reasoning": "긴 계획"},
+        "analysis": {"graph_count": 3, "vector_count": 2, "graph_results": ["..."]},
+        "advisory": {"conclusion": "근린공원 대피", "fallback": "timeout"},
+        "guidelines": ["행동요령 원문"],
+        "cache": "miss",
+    },
+    "places_reference": {"근린공원_서울 테스트구 1": PLACE},
+}
+
+
+@pytest.fixture
+def chat(client, api_module, monkeypatch):
+    async def process(message, history, user_info, conversation_id, **kwargs):
+        return RESULT
+
+    monkeypatch.setattr(api_module.orchestrator, "process", process)
+    return lambda headers=None, **body: client.post("/chat", json={"message": "지진 대피소", **body}, headers=headers)
+
+
+def test_minimal_payload(api_module):
+    payload = api_module._chat_payload(RESULT, "minimal", "c-1")
+    assert set(payload) == {"answer", "places_reference", "conversation_id"}
+    place = payload["places_reference"]["근린공원_서울 테스트구 1"]
+    # 값이 없는 장소 속성은 생략
+    assert "walk_km" not in place and "exposed_zones" not in place
+    assert place["distance_km"] == 0.1
+    assert api_module._chat_payload({**RESULT, "places_reference": None}, "minimal")["places_reference"] is None
+
+
+def test_standard_payload_summarizes_explanation(api_module):
+    payload = api_module._chat_payload(RESULT, "standard")
+    assert payload["conclusion"] == "근린공원 대피" and payload["evidence"] == "지진 행동요령"
+    assert "places_html" not in payload
+    assert payload["explanation"] == {
+        "planning": {"sub_problems": 2},
+        "analysis": {"graph_count": 3, "vector_count": 2},
+        "advisory": {"fallback": "timeout"},
+        "cache": "miss",
+    }
+    no_fallback = {**RESULT["explanation"], "advisory": {"conclusion": "근린공원 대피"}}
+    assert "advisory" not in api_module._explanation_summary(no_fallback)
+
+
+def test_debug_payload_keeps_everything(api_module):
+    payload = api_module._chat_payload(RESULT, "debug", "c-1")
+    assert payload["explanation"] is RESULT["explanation"]
+    assert payload["places_reference"]["근린공원_서울 테스트구 1"]["walk_km"] is None
+    assert "근린공원" in payload["places_html"]
+    assert api_module._chat_payload({**RESULT, "places_reference": None}, "debug")["places_html"] is None
+
+
+def test_chat_detail_levels(chat, api_module, monkeypatch):
+    minimal = chat(detail="minimal")
+    assert minimal.status_code == 200
+    assert set(minimal.json()) == {"answer", "places_reference", "conversation_id"}
+    assert minimal.json()["conversation_id"]
+
+    debug = chat(detail="debug").json()
+    assert debug["explanation"]["analysis"]["graph_results"] == ["..."]
+    assert debug["places_html"]
+
+    # detail이 없으면 CHAT_RESPONSE_DETAIL
+    monkeypatch.setattr(api_module, "CHAT_RESPONSE_DETAIL", "minimal")
+    assert "conclusion" not in chat().json()
+    monkeypatch.setattr(api_module, "CHAT_RESPONSE_DETAIL", "standard")
+    assert chat().json()["explanation"]["planning"] == {"sub_problems": 2}
+
+    assert chat(detail="full").status_code == 422
+
+
+def test_responses_are_compressed(chat):
+    # 본문은 httpx가 풀어 주므로 Content-Encoding과 해석 결과만 확인
+    brotli_response = chat(detail="debug", headers={"Accept-Encoding": "br"})
+    assert brotli_response.headers["content-encoding"] == "br"
+    assert brotli_response.json()["answer"] == RESULT["answer"]
+
+    gzip_response = chat(detail="debug", headers={"Accept-Encoding": "gzip"})
+    assert gzip_response.headers["content-encoding"] == "gzip"
+    assert gzip_response.json()["explanation"] == brotli_response.json()["explanation"]
+
+    # RESPONSE_COMPRESSION_MIN_BYTES보다 작은 응답은 그대로
+    assert "content-encoding" not in chat(detail="minimal", headers={"Accept-Encoding": "br"}).headers
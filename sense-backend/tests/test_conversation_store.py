@@ -0,0 +1,155 @@
+"""대화 저장소 (메모리 / SQLite) 단위 테스트
+
+두 백엔드가 같은 동작(메시지 수 제한, TTL, 조회 시 TTL 갱신, 대화 수 제한)을 보장하는지 확인합니다.
+"""
+import threading
+
+import pytest
+
+from services import conversation_store
+from services.conversation_store import ConversationStore, InMemoryConversationStore, SQLiteConversationStore
+
+
+class _Clock:
+    """time.time / time.monotonic 대체 (테스트에서 시간을 직접 진행)"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(conversation_store, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(max_conversations=100, max_messages=10, ttl_seconds=60):
+        if request.param == "memory":
+            return InMemoryConversationStore(max_conversations, max_messages, ttl_seconds)
+        store = SQLiteConversationStore(str(tmp_path / "conversations.db"), max_conversations, max_messages, ttl_seconds)
+        store.PURGE_INTERVAL = 1
+        return store
+    return make
+
+
+def _messages(*contents):
+    return [{"role": "user", "content": c} for c in contents]
+
+
+def test_append_and_get(make_store, clock):
+    store = make_store()
+    assert store.get("c1") is None
+
+    store.append("c1", _messages("a", "b"))
+    store.append("c1", [{"role": "assistant", "content": "c"}])
+    assert store.get("c1") == _messages("a", "b") + [{"role": "assistant", "content": "c"}]
+    assert store.size() == 1
+
+
+def test_keeps_only_latest_messages(make_store, clock):
+    store = make_store(max_messages=3)
+    store.append("c1", _messages("1", "2"))
+    store.append("c1", _messages("3", "4", "5"))
+    assert store.get("c1") == _messages("3", "4", "5")
+
+
+def test_expires_after_ttl(make_store, clock):
+    store = make_store(ttl_seconds=60)
+    store.append("c1", _messages("old"))
+    clock.advance(61)
+    assert store.get("c1") is None
+    assert store.size() == 0
+
+    # 만료된 대화에 추가하면 새 대화로 시작
+    store.append("c1", _messages("new"))
+    assert store.get("c1") == _messages("new")
+
+
+def test_get_refreshes_ttl(make_store, clock):
+    store = make_store(ttl_seconds=60)
+    store.append("c1", _messages("a"))
+    clock.advance(40)
+    assert store.get("c1") == _messages("a")
+    clock.advance(40)
+    assert store.get("c1") == _messages("a")
+    clock.advance(61)
+    assert store.get("c1") is None
+
+
+def test_delete(make_store, clock):
+    store = make_store()
+    store.append("c1", _messages("a"))
+    assert store.delete("c1") is True
+    assert store.delete("c1") is False
+    assert store.get("c1") is None
+
+
+def test_drops_least_recently_used_conversations(make_store, clock):
+    store = make_store(max_conversations=2)
+    store.append("c1", _messages("1"))
+    clock.advance(1)
+    store.append("c2", _messages("2"))
+    clock.advance(1)
+    store.get("c1")
+    clock.advance(1)
+    store.append("c3", _messages("3"))
+
+    assert store.size() == 2
+    assert store.get("c2") is None
+    assert store.get("c1") == _messages("1")
+    assert store.get("c3") == _messages("3")
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path, clock):
+    """여러 워커 프로세스가 같은 파일을 공유하는 경우"""
+    path = str(tmp_path / "conversations.db")
+    writer = SQLiteConversationStore(path, 100, 10, 60)
+    reader = SQLiteConversationStore(path, 100, 10, 60)
+    writer.append("c1", _messages("a"))
+    assert reader.get("c1") == _messages("a")
+
+
+def test_sqlite_concurrent_appends_from_separate_connections(tmp_path):
+    """워커마다 연결이 따로 있어도 같은 대화에 동시에 추가하면 seq가 겹치지 않음"""
+    path = str(tmp_path / "conversations.db")
+    stores = [SQLiteConversationStore(path, 100, 1000, 3600) for _ in range(4)]
+    errors = []
+    start = threading.Barrier(len(stores))
+
+    def append(store, worker):
+        start.wait()
+        try:
+            for i in range(50):
+                store.append("shared", _messages(f"{worker}-{i}"))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=append, args=(store, n)) for n, store in enumerate(stores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    messages = stores[0].get("shared")
+    assert len(messages) == 200
+    for worker in range(len(stores)):
+        # 각 워커의 메시지는 추가한 순서대로 저장됨
+        assert [m["content"] for m in messages if m["content"].startswith(f"{worker}-")] == [f"{worker}-{i}" for i in range(50)]
+
+
+def test_store_interface_is_abstract():
+    with pytest.raises(TypeError):
+        ConversationStore()
@@ -0,0 +1,143 @@
+"""Cypher 검사기 단위 테스트"""
+from types import SimpleNamespace
+
+import pytest
+
+from services.cypher_guard import (
+    CypherGuard, CypherRejected, apply_limit, check_clauses, inspect_plan, template_query
+)
+
+
+@pytest.mark.parametrize("query", [
+    "MATCH (s:Shelter) RETURN s.name LIMIT 10",
+    "OPTIONAL MATCH (s:Shelter)-[:IN]->(a:Admin) RETURN s.name, a.gu ORDER BY s.name",
+    "MATCH (s:Shelter) RETURN s.name AS start, s.capacity AS load ORDER BY load",
+    "MATCH (start:Shelter) WITH start, start.capacity AS set RETURN start.name, set",
+    "MATCH (s:Shelter {name: 'CREATE TABLE'}) RETURN s // DELETE everything",
+    "MATCH (s:Shelter) WHERE s.name CONTAINS \"MERGE\" RETURN s;",
+    "UNWIND $names AS name MATCH (s:Shelter {name: name}) RETURN s",
+])
+def test_accepts_read_only_queries(query):
+    assert check_clauses(query)
+
+
+@pytest.mark.parametrize("query, reason", [
+    ("MATCH (n) DETACH DELETE n RETURN n", "forbidden_clause"),
+    ("MATCH (n) RETURN n LIMIT 5 CREATE (m:X) RETURN m", "forbidden_clause"),
+    ("MATCH (n) WITH * CREATE (m:X) RETURN m", "forbidden_clause"),
+    ("MATCH (n) SET n.x = 1 RETURN n", "forbidden_clause"),
+    ("MATCH (n) CALL { MATCH (m) RETURN m } RETURN n", "forbidden_clause"),
+    ("MATCH (n) CALL (n) { MATCH (m) RETURN m } RETURN n", "forbidden_clause"),
+    ("MATCH (n) FOREACH (x IN [1] | CREATE (:X)) RETURN n", "forbidden_clause"),
+    ("MATCH (n) RETURN n UNION MATCH (m) RETURN m", "forbidden_clause"),
+    ("MATCH (n) RETURN n; MATCH (m) DELETE m", "multiple_statements"),
+    ("RETURN 1", "unsupported_start"),
+    ("MATCH (n) WHERE n.x = 1", "no_return"),
+    ("// only a comment", "empty"),
+])
+def test_rejects_unsafe_queries(query, reason):
+    with pytest.raises(CypherRejected) as exc_info:
+        check_clauses(query)
+    assert exc_info.value.reason == reason
+
+
+def test_apply_limit_adds_default():
+    query, changed = apply_limit("MATCH (n) RETURN n", default_limit=25, max_limit=200)
+    assert changed
+    assert query.endswith("LIMIT 25")
+
+
+def test_apply_limit_keeps_small_limit():
+    assert apply_limit("MATCH (n) RETURN n LIMIT 10", 25, 200) == ("MATCH (n) RETURN n LIMIT 10", False)
+
+
+def test_apply_limit_caps_large_limit():
+    assert apply_limit("MATCH (n) RETURN n LIMIT 50000", 25, 200) == ("MATCH (n) RETURN n LIMIT 200", True)
+
+
+def test_apply_limit_ignores_trailing_comment():
+    """끝의 주석이 큰 LIMIT을 가리지 못함"""
+    assert apply_limit("MATCH (n) RETURN n LIMIT 50000 // top", 25, 200) == ("MATCH (n) RETURN n LIMIT 200", True)
+    query, changed = apply_limit("MATCH (n) RETURN n /* LIMIT 5 */", 25, 200)
+    assert changed
+    assert query.endswith("LIMIT 25")
+
+
+def test_apply_limit_rejects_parameter_limit():
+    with pytest.raises(CypherRejected) as exc_info:
+        apply_limit("MATCH (n) RETURN n LIMIT $limit", 25, 200)
+    assert exc_info.value.reason == "dynamic_limit"
+
+
+def test_inspect_plan_walks_children():
+    plan = {
+        "operatorType": "ProduceResults@neo4j",
+        "args": {"EstimatedRows": 10.0},
+        "children": [
+            {"operatorType": "CartesianProduct@neo4j", "args": {"EstimatedRows": 5000.0}, "children": []},
+        ],
+    }
+    assert inspect_plan(plan) == (5000.0, True)
+    assert inspect_plan(None) == (0.0, False)
+
+
+class _FakeSession:
+    def __init__(self, plan=None, error=None):
+        self.plan = plan
+        self.error = error
+        self.queries = []
+
+    def run(self, query):
+        self.queries.append(query.text)
+        if self.error:
+            raise self.error
+        return SimpleNamespace(consume=lambda: SimpleNamespace(plan=self.plan))
+
+
+def _guard():
+    return CypherGuard(default_limit=25, max_limit=200, max_estimated_rows=1000, timeout_seconds=5)
+
+
+def test_guard_allows_and_explains_rewritten_query():
+    session = _FakeSession({"operatorType": "ProduceResults", "args": {"EstimatedRows": 12.0}})
+    decision = _guard().check("MATCH (s:Shelter) RETURN s.name", session)
+    assert decision.decision == "rewritten"
+    assert decision.query.endswith("LIMIT 25")
+    assert session.queries == [f"EXPLAIN {decision.query}"]
+
+
+def test_guard_rejects_expensive_plan_and_caches_decision():
+    guard = _guard()
+    session = _FakeSession({"operatorType": "AllNodesScan", "args": {"EstimatedRows": 1e6}})
+    first = guard.check("MATCH (n) RETURN n LIMIT 10", session)
+    second = guard.check("MATCH (n) RETURN n LIMIT 10", session)
+    assert (first.decision, first.reason) == ("rejected", "estimated_rows")
+    assert second.reason == "estimated_rows"
+    assert len(session.queries) == 1
+
+
+def test_guard_does_not_cache_explain_failure():
+    guard = _guard()
+    session = _FakeSession(error=RuntimeError("connection reset"))
+    assert guard.check("MATCH (n) RETURN n LIMIT 10", session).reason == "explain_failed"
+    guard.check("MATCH (n) RETURN n LIMIT 10", session)
+    assert len(session.queries) == 2
+
+
+def test_guard_does_not_explain_forbidden_query():
+    session = _FakeSession()
+    decision = _guard().check("MATCH (n) DETACH DELETE n RETURN n", session)
+    assert (decision.decision, decision.reason) == ("rejected", "forbidden_clause")
+    assert session.queries == []
+
+
+def test_template_query_uses_parameters():
+    query, params = template_query("강남구 대피소 몇 개야?", 25)
+    assert "$gu" in query
+    assert params == {"gu": "강남구"}
+    assert template_query("오늘 점심 뭐 먹지", 25) is None
+
+
+def test_fallback_without_template_is_rejected():
+    decision = _guard().fallback("오늘 점심 뭐 먹지", "forbidden_clause")
+    assert (decision.decision, decision.query) == ("rejected", None)
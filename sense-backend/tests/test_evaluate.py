@@ -0,0 +1,139 @@
+"""검색 품질 평가(benchmarks/evaluate.py) 테스트
+
+라벨 채점(Graph 개수/목록/최댓값/관계, Vector recall@k), 집계와 비교표, 라벨 세트가 전처리 그래프에서
+해석되는지 확인하고, 작은 세트를 별도 프로세스에서 실제로 평가해 봅니다.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks import evaluate
+from benchmarks.fakes import InMemoryCollection, InMemoryGraph, hashed_embedding
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def labels():
+    nodes = {
+        "gu": {"id": "gu", "type": "Admin", "name": "강남구"},
+        "s1": {"id": "s1", "type": "Shelter", "name": "역삼공원", "area": 300.0},
+        "s2": {"id": "s2", "type": "Shelter", "name": "개포체육관", "area": 900.0},
+        "s3": {"id": "s3", "type": "Shelter", "name": "망원공원", "area": 5000.0},
+        "eq": {"id": "eq", "type": "Hazard", "name": "지진"},
+        "fire": {"id": "fire", "type": "Hazard", "name": "화재"},
+        "slide": {"id": "slide", "type": "Hazard", "name": "산사태"},
+    }
+    relationships = [
+        ("s1", "gu", "IN", {}), ("s2", "gu", "IN", {}),
+        ("eq", "fire", "TRIGGERS", {}), ("eq", "slide", "CAUSES", {}),
+    ]
+    return evaluate.GraphLabels(InMemoryGraph(nodes, relationships))
+
+
+def test_count_label(labels):
+    spec = {"kind": "count", "label": "Shelter", "rel": "IN", "to": "gu"}
+    assert labels.score(spec, [{"count(s)": 2}])["correct"]
+    assert not labels.score(spec, [{"count(s)": 3}])["correct"]
+
+
+def test_list_label_precision(labels):
+    spec = {"kind": "list", "label": "Shelter", "rel": "IN", "to": "gu"}
+    good = labels.score(spec, [{"s.name": "역삼공원"}, {"s.name": "개포체육관"}])
+    assert good == {"correct": True, "precision": 1.0, "returned": 2}
+    mixed = labels.score(spec, [{"s.name": "역삼공원"}, {"s.name": "망원공원"}, {"s.name": "모르는 곳"}])
+    assert mixed == {"correct": False, "precision": 0.5, "returned": 2}  # 이름이 없는 레코드는 제외
+    assert not labels.score(spec, [])["correct"]
+
+
+def test_argmax_label(labels):
+    spec = {"kind": "argmax", "label": "Shelter", "rel": "IN", "to": "gu", "order_by": "area"}
+    assert labels.expected_ids(spec) == ["s2"]
+    assert labels.score(spec, [{"s.name": "개포체육관"}, {"s.name": "역삼공원"}])["correct"]
+    assert not labels.score(spec, [{"s.name": "역삼공원"}, {"s.name": "개포체육관"}])["correct"]
+
+
+def test_edges_label(labels):
+    spec = {"kind": "edges", "from": "eq", "rels": ["TRIGGERS", "CAUSES"]}
+    full = labels.score(spec, [{"a": "지진", "b": "화재"}, {"a": "지진", "b": "산사태"}])
+    assert full == {"correct": True, "precision": 1.0, "recall": 1.0}
+    partial = labels.score(spec, [{"a": "지진", "b": "화재"}, {"a": "화재", "b": "홍수"}])
+    assert partial == {"correct": False, "precision": 0.5, "recall": 0.5}
+
+
+def test_vector_recall_at_k():
+    collection = InMemoryCollection("docs")
+    chunks = {
+        "지진행동요령_chunk_0": "지진 시 탁자 아래로",
+        "지진행동요령_chunk_1": "지진 후 계단으로 대피",
+        "지진행동요령_chunk_2": "비상용품 목록",
+        "홍수행동요령_chunk_0": "지진이 아닌 홍수",
+    }
+    collection.add(list(chunks), list(chunks.values()), [hashed_embedding(text) for text in chunks.values()])
+    vector_labels = evaluate.VectorLabels(collection)
+    spec = {"files": ["지진행동요령"], "contains": ["지진"]}
+
+    documents = [{"id": "지진행동요령_chunk_0"}, {"id": "홍수행동요령_chunk_0"}, {"id": "지진행동요령_chunk_1"}]
+    assert vector_labels.score(spec, documents, 3) == {"recall": 1.0, "hit": True, "relevant": 2}
+    assert vector_labels.score(spec, documents, 1) == {"recall": 1.0, "hit": True, "relevant": 2}
+    assert vector_labels.score(spec, documents[1:2], 1) == {"recall": 0.0, "hit": False, "relevant": 2}
+    assert vector_labels.score({"files": ["없는 파일"]}, documents, 3)["recall"] is None
+
+
+def test_aggregate_and_table():
+    rows = [
+        {"latency_ms": 10.0, "tokens": 100.0, "graph": {"correct": True, "precision": 1.0}},
+        {"latency_ms": 30.0, "tokens": 300.0, "graph": {"correct": False, "precision": 0.5}, "vector": {"recall": 0.5, "hit": True}},
+    ]
+    summary = evaluate.aggregate(rows)
+    assert summary["questions"] == 2
+    assert summary["graph_accuracy"] == 0.5
+    assert summary["graph_precision"] == 0.75
+    assert (summary["vector_recall"], summary["vector_hit"]) == (0.5, 1.0)
+    assert summary["tokens_per_question"] == 200.0
+
+    config = {"top_k": 5, "chunk_size": 500, "graph_max_chars": 2000, "vector_max_chars": 3000}
+    table = evaluate.format_table([{"config": config, "summary": summary, "sets": {"s": {"summary": summary}}}], live=False)
+    lines = table.splitlines()
+    assert len(lines) == 4  # 헤더, 구분선, 세트, 전체
+    assert lines[2].startswith("| 5 | 500 | 2000/3000 | s | 2 | 0.500 | 0.750 | 0.500 | 1.000 |")
+    assert "| ingested |" in evaluate.format_table(
+        [{"config": config, "summary": summary, "sets": {}}], live=True
+    )
+
+
+def test_eval_set_graph_labels_resolve_against_processed_graph():
+    sets = evaluate.load_eval_sets()
+    assert set(evaluate.load_eval_sets(names=["hazard_chains"])) == {"hazard_chains"}
+    graph_labels = evaluate.GraphLabels(InMemoryGraph.from_csv())
+    for items in sets.values():
+        for item in items:
+            assert item.get("graph") or item.get("vector"), item["id"]
+            spec = item.get("graph")
+            if spec is None:
+                continue
+            expected = graph_labels.expected_edges(spec) if spec["kind"] == "edges" else graph_labels.expected_ids(spec)
+            assert expected, f"라벨이 그래프에서 해석되지 않음: {item['id']}"
+
+
+def test_offline_evaluation_writes_report(tmp_path):
+    output = tmp_path / "eval.json"
+    subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.evaluate", "--sets", "hazard_chains", "--top-k", "3", "5",
+            "--llm-ms", "0", "--embed-ms", "0", "--neo4j-ms", "0", "--chroma-ms", "0", "--output", str(output)
+        ],
+        env={**os.environ, "PYTHONPATH": BACKEND_DIR, "EVENT_POLL_SECONDS": "0"},
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert report["mode"] == "offline"
+    assert [e["config"]["top_k"] for e in report["evaluations"]] == [3, 5]
+    for evaluation in report["evaluations"]:
+        items = evaluation["sets"]["hazard_chains"]["items"]
+        assert len(items) == 3
+        assert all("graph" in item and item["tokens"] > 0 for item in items)
+    assert report["table"].count("| hazard_chains |") == 2
@@ -0,0 +1,149 @@
+"""benchmarks/fakes 로컬 대체 구현 테스트
+
+벤치마크/부하 테스트/API 테스트가 의존하는 메모리 그래프 Cypher 해석, 세션 동작(EXPLAIN/PROFILE,
+파라미터, 위치 쿼리, 이벤트), 메모리 Chroma 검색, 가짜 Gemini 응답을 작은 데이터로 확인합니다.
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.fakes import (
+    FakeCypherError, FakeSession, InMemoryCollection, InMemoryGraph, LatencyProfile, _FakeModels,
+    hashed_embedding, split_text
+)
+from services.graph_schema import LOCATION_PROPERTY, expected_indexes
+
+NO_LATENCY = LatencyProfile(llm_ms=0, embed_ms=0, neo4j_ms=0, chroma_ms=0)
+
+
+@pytest.fixture
+def graph():
+    nodes = {
+        "a1": {"id": "a1", "type": "Admin", "gu": "강남구"},
+        "a2": {"id": "a2", "type": "Admin", "gu": "마포구"},
+        "s1": {"id": "s1", "type": "Shelter", "name": "역삼공원", "area": 300.0, "lat": 37.50, "lon": 127.03},
+        "s2": {"id": "s2", "type": "Shelter", "name": "개포체육관", "area": 900.0, "lat": 37.48, "lon": 127.05},
+        "s3": {"id": "s3", "type": "Shelter", "name": "망원공원", "lat": 37.55, "lon": 126.90},
+        "h1": {"id": "h1", "type": "Hazard", "hazard_type": "지진", "name": "지진"},
+        "p1": {"id": "p1", "type": "Policy", "name": "지진 정책", "content": "머리를 보호합니다"},
+    }
+    for node_id in ("s1", "s2", "s3"):
+        nodes[node_id][LOCATION_PROPERTY] = {"latitude": nodes[node_id]["lat"], "longitude": nodes[node_id]["lon"]}
+    relationships = [
+        ("s1", "a1", "IN", {}), ("s2", "a1", "IN", {}), ("s3", "a2", "IN", {}),
+        ("p1", "h1", "GUIDES", {}), ("x", "a1", "IN", {}),  # 없는 노드의 관계는 무시
+    ]
+    return InMemoryGraph(nodes, relationships)
+
+
+def test_graph_properties(graph):
+    assert graph.regions == ["강남구", "마포구"]
+    assert graph.hazards == ["지진"]
+    assert len(graph.by_type["IN"]) == 3
+
+
+def test_match_where_order_limit(graph):
+    records = graph.run(
+        "MATCH (s:Shelter)-[:IN]->(a:Admin {gu: '강남구'}) WHERE s.area IS NOT NULL "
+        "RETURN s.name AS name, s.area AS area ORDER BY area DESC LIMIT 1"
+    )
+    assert records == [{"name": "개포체육관", "area": 900.0}]
+
+    records = graph.run("MATCH (s:Shelter) WHERE s.name CONTAINS '공원' AND s.area IS NULL RETURN s.name")
+    assert records == [{"s.name": "망원공원"}]
+
+
+def test_count_groups_by_other_columns(graph):
+    records = graph.run("MATCH (s:Shelter)-[:IN]->(a:Admin) RETURN a.gu, count(s) ORDER BY a.gu")
+    assert records == [{"a.gu": "강남구", "count(s)": 2}, {"a.gu": "마포구", "count(s)": 1}]
+    assert graph.run("MATCH (s:Shelter {name: '없음'}) RETURN count(s)") == [{"count(s)": 0}]
+
+
+def test_unsupported_cypher_raises(graph):
+    with pytest.raises(FakeCypherError):
+        graph.run("MATCH (s:Shelter) WITH s RETURN s")
+    with pytest.raises(FakeCypherError):
+        graph.run("MATCH (s:Shelter) WHERE s.area > 3 RETURN s.name")
+    with pytest.raises(FakeCypherError):
+        graph.run("MATCH (s:Shelter) RETURN x.name")
+
+
+def test_session_substitutes_parameters_and_reports_plans(graph):
+    session = FakeSession(graph, NO_LATENCY)
+    assert session.run("MATCH (a:Admin {gu: $gu}) RETURN a.gu", gu="마포구") == [{"a.gu": "마포구"}]
+
+    explained = session.run("EXPLAIN MATCH (s:Shelter) RETURN s.name")
+    assert list(explained) == []
+    assert explained.consume().plan["args"]["EstimatedRows"] == 3.0
+
+    profiled = session.run(SimpleNamespace(text="PROFILE MATCH (s:Shelter) RETURN s.name"))
+    assert len(profiled) == 3 and profiled.consume().profile["rows"] == 3
+
+    indexes = session.run("SHOW INDEXES YIELD type, labelsOrTypes, properties, state")
+    assert len(indexes) == len(expected_indexes())
+    assert {row["state"] for row in indexes} == {"ONLINE"}
+
+
+def test_session_nearby_query_sorts_by_distance(graph):
+    session = FakeSession(graph, NO_LATENCY)
+    rows = session.run(
+        "MATCH (n:Shelter) WHERE point.withinBBox(n.location, ...) RETURN n",
+        lat=37.50, lon=127.03, radius_m=5000, k=5,
+        min_lat=37.4, max_lat=37.6, min_lon=127.0, max_lon=127.1
+    )
+    assert [row["id"] for row in rows] == ["s1", "s2"]
+    assert rows[0]["distance"] == pytest.approx(0.0)
+    assert rows[0]["label"] == "Shelter"
+
+
+def test_event_upsert_and_fetch(graph):
+    graph.upsert_event("UPDATES", "e1", {"event_type": "지진", "ingested_at": 10.0, "lat": 37.5}, "지진", "h1", {})
+    graph.upsert_event("TRIGGERS", "e1", {"lat": None, "ingested_at": 20.0}, "산사태", "h-new", {"weight": 1})
+    events = graph.events(since=0.0)
+    assert len(events) == 1
+    assert events[0]["hazard"] == "산사태"  # 관계를 다시 연결
+    assert events[0]["lat"] is None
+    assert graph.hazards == ["산사태", "지진"]
+    assert graph.events(since=20.0) == []
+
+
+def test_collection_query_orders_by_cosine_distance():
+    collection = InMemoryCollection("docs")
+    texts = ["지진 발생 시 탁자 아래로", "홍수 시 높은 곳으로", "화재 시 낮은 자세로"]
+    collection.add(["a", "b", "c"], texts, [hashed_embedding(t) for t in texts])
+    result = collection.query([hashed_embedding("지진 발생 시 탁자 아래로")], n_results=2)
+    assert result["ids"][0][0] == "a" and len(result["ids"][0]) == 2
+    assert result["distances"][0][0] == pytest.approx(0.0, abs=1e-5)
+    assert result["distances"][0][0] <= result["distances"][0][1]
+    assert collection.count() == 3
+    assert InMemoryCollection("empty").query([hashed_embedding("x")], n_results=3)["ids"] == [[]]
+
+
+def test_hashed_embedding_is_deterministic_and_normalized():
+    vector = hashed_embedding("지진 대피소", dim=64)
+    assert vector == hashed_embedding("지진 대피소", dim=64)
+    assert sum(v * v for v in vector) == pytest.approx(1.0, rel=1e-5)
+    assert hashed_embedding("", dim=8) == [0.0] * 8
+
+
+def test_split_text_overlaps_and_covers_text():
+    text = "첫 문장입니다. " * 30
+    chunks = split_text(text, chunk_size=60, overlap=10)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 60 for chunk in chunks)
+    assert chunks[-1].endswith("첫 문장입니다.")
+    assert split_text("짧은 글", 60, 10) == ["짧은 글"]
+
+
+def test_fake_models_route_prompts():
+    models = _FakeModels(NO_LATENCY, ["강남구"], ["지진"])
+    cypher = models.generate_content("m", "당신은 Cypher 쿼리 전문가입니다.\n# 사용자 질문:\n강남구 대피소 몇 개?\n\n")
+    assert cypher.text == "MATCH (s:Shelter)-[:IN]->(a:Admin {gu: '강남구'}) RETURN count(s)"
+    assert cypher.usage_metadata.prompt_token_count > 0
+
+    plan = json.loads(models.generate_content("m", "재난대응 검색 계획 전문가\n사용자 질문:\n지진 행동요령\n\n사용자 위치 정보").text)
+    assert [sp["id"] for sp in plan["sub_problems"]] == [1, 2]  # 위치가 있으면 주변 대피소 서브 문제 추가
+
+    embeddings = models.embed_content("m", ["a", "b"], SimpleNamespace(output_dimensionality=16)).embeddings
+    assert [len(e.values) for e in embeddings] == [16, 16]
@@ -0,0 +1,116 @@
+"""Neo4j 인덱스/제약조건 준비(services/graph_schema.py) 테스트
+
+실행한 Cypher를 기록하고 정해진 결과를 돌려주는 세션으로 생성/확인 흐름을 확인합니다.
+"""
+import logging
+import re
+
+from benchmarks.fakes import Record, Result
+from services.graph_schema import (
+    ID_LABELS, LOCATION_PROPERTY, POINT_LABELS, check_on_startup, create_id_constraints,
+    ensure_graph_schema, expected_indexes, index_name, verify_graph_schema
+)
+
+
+class _Session:
+    """쿼리 기록 + 라벨별 중복 id/location 누락 수, SHOW INDEXES 결과 지정"""
+
+    def __init__(self, indexes=(), duplicates=None, missing_locations=None, failing_constraints=()):
+        self.queries = []
+        self.indexes = list(indexes)
+        self.duplicates = duplicates or {}
+        self.missing_locations = missing_locations or {}
+        self.failing_constraints = set(failing_constraints)
+
+    def run(self, query, parameters=None):
+        self.queries.append(query)
+        label = (re.search(r"\(n:(\w+)\)", query) or [None, None])[1]
+        if query.startswith("SHOW INDEXES"):
+            return Result(self.indexes)
+        if "AS duplicates" in query:
+            return Result([Record(duplicates=self.duplicates.get(label, 0))])
+        if query.startswith("CREATE CONSTRAINT") and label in self.failing_constraints:
+            raise RuntimeError("equivalent index already exists")
+        if "AS updated" in query:
+            return Result([Record(updated=3)])
+        if "AS count" in query:
+            return Result([Record(count=self.missing_locations.get(label, 0))])
+        return Result()
+
+
+def _online(skip=(), pending=()):
+    rows = []
+    for label, prop, kind in expected_indexes():
+        if (label, prop) in skip:
+            continue
+        state = "POPULATING" if (label, prop) in pending else "ONLINE"
+        rows.append(Record(type=kind, labelsOrTypes=[label], properties=[prop], state=state))
+    # 복합 인덱스는 확인 대상이 아님
+    rows.append(Record(type="RANGE", labelsOrTypes=["Shelter"], properties=["name", "address"], state="ONLINE"))
+    return rows
+
+
+def test_expected_indexes_and_names():
+    expected = expected_indexes()
+    assert ("Shelter", "id", "RANGE") in expected
+    assert ("Admin", "gu", "RANGE") in expected
+    assert [(l, k) for l, p, k in expected if p == LOCATION_PROPERTY] == [(l, "POINT") for l in POINT_LABELS]
+    assert index_name("TemporaryHousing", "location") == "temporary_housing_location"
+    assert index_name("Shelter", "id", "_unique") == "shelter_id_unique"
+
+
+def test_id_constraints_fall_back_to_index():
+    session = _Session(duplicates={"Shelter": 2}, failing_constraints={"Hazard"})
+    created = create_id_constraints(session)
+    assert created["Shelter"] == "index" and created["Hazard"] == "index"
+    assert all(created[label] == "constraint" for label in ID_LABELS if label not in ("Shelter", "Hazard"))
+    assert not any(q.startswith("CREATE CONSTRAINT shelter_id_unique") for q in session.queries)
+    assert "CREATE INDEX shelter_id IF NOT EXISTS FOR (n:Shelter) ON (n.id)" in session.queries
+
+
+def test_ensure_is_idempotent_and_backfills_locations():
+    session = _Session()
+    report = ensure_graph_schema(session)
+    assert report["locations_set"] == {label: 3 for label in POINT_LABELS}
+    created = [q for q in session.queries if q.startswith("CREATE")]
+    assert created and all("IF NOT EXISTS" in q for q in created)
+    assert any(q.startswith("CREATE POINT INDEX shelter_location") for q in created)
+    assert session.queries[-1] == "CALL db.awaitIndexes(300)"
+
+
+def test_verify_reports_missing_pending_and_locations():
+    assert verify_graph_schema(_Session(_online()))["ok"]
+
+    report = verify_graph_schema(_Session(
+        _online(skip={("Admin", "gu")}, pending={("Shelter", "location")}),
+        missing_locations={"TemporaryHousing": 4}
+    ))
+    assert not report["ok"]
+    assert report["missing"] == ["Admin.gu (RANGE)"]
+    assert report["not_online"] == ["Shelter.location (POINT)"]
+    assert report["missing_locations"] == {"TemporaryHousing": 4}
+
+
+def test_check_on_startup_modes(caplog):
+    session = _Session(_online())
+    assert check_on_startup(session, "off") is None
+    assert session.queries == []
+
+    assert check_on_startup(session, "verify")["ok"]
+    assert not any(q.startswith("CREATE") for q in session.queries)
+
+    session = _Session(_online())
+    assert check_on_startup(session, "ensure")["ok"]
+    assert any(q.startswith("CREATE") for q in session.queries)
+
+    with caplog.at_level(logging.WARNING, logger="services.graph_schema"):
+        assert not check_on_startup(_Session(_online(skip={("Policy", "disaster_type")})), "verify")["ok"]
+
+        class _Broken:
+            def run(self, query, parameters=None):
+                raise RuntimeError("connection refused")
+
+        assert check_on_startup(_Broken(), "verify") is None
+    messages = [r.getMessage() for r in caplog.records]
+    assert any("인덱스 준비 필요" in m and "Policy.disaster_type" in m for m in messages)
+    assert any("인덱스 확인 실패" in m for m in messages)
@@ -0,0 +1,221 @@
+"""재난 이벤트 수집 단위 테스트 (정규화, 그래프 기록, 범위 무효화, 워커 간 동기화, inbox)"""
+import json
+
+import pytest
+
+from services import hazard_events
+from services.hazard_events import EventInbox, HazardEventStore, event_bbox, graph_record, normalize_event
+
+EARTHQUAKE = {"event_id": "eq-1", "event_type": "지진", "severity": "high", "lat": 37.5, "lon": 127.0, "radius_km": 5, "magnitude": "4.8"}
+RAIN = {
+    "event_id": "rain-1", "event_type": "호우", "rainfall": 120,
+    "polygon": [[126.9, 37.4], [127.1, 37.4], [127.1, 37.6], [126.9, 37.6]],
+}
+
+
+@pytest.fixture
+def bumps(monkeypatch):
+    """데이터 버전 변경 기록 (다른 테스트의 캐시에 무효화가 전파되지 않도록 대체)"""
+    calls = []
+
+    def bump(reason="", change=None):
+        calls.append(change)
+        return f"test.{len(calls)}"
+
+    monkeypatch.setattr(hazard_events, "bump_data_version", bump)
+    return calls
+
+
+class _Graph:
+    """upsert_event / fetch_events 대체 (기록한 Event 노드를 ingested_at 기준으로 조회)"""
+
+    def __init__(self):
+        self.nodes = {}
+        self.writes = []
+
+    def write(self, properties, hazard, relationship_type, relationship):
+        self.writes.append((properties["id"], hazard, relationship_type))
+        self.nodes[properties["id"]] = {**properties, "event_id": properties["id"]}
+
+    def load(self, since):
+        return [row for row in self.nodes.values() if row["ingested_at"] >= since]
+
+
+@pytest.mark.parametrize("raw, message", [
+    ({"lat": 37.5, "lon": 127.0, "radius_km": 5}, "event_type"),
+    ({"event_type": "지진"}, "radius_km"),
+    ({"event_type": "지진", "lat": 37.5, "lon": 127.0, "radius_km": 0}, "radius_km"),
+    ({"event_type": "지진", "polygon": [[127.0, 37.5], [127.1, 37.5]]}, "polygon"),
+    ({**EARTHQUAKE, "magnitude": "strong"}, "magnitude"),
+    ({**EARTHQUAKE, "severity": "extreme"}, "severity"),
+])
+def test_normalize_event_rejects_invalid(raw, message):
+    with pytest.raises(ValueError, match=message):
+        normalize_event(raw)
+
+
+def test_graph_record_relationship_types():
+    event = {**normalize_event(EARTHQUAKE), "ingested_at": 1.0}
+    properties, hazard, relationship_type, relationship = graph_record(event)
+    assert (hazard, relationship_type) == ("지진", "UPDATES")
+    assert properties["severity"] == "HIGH"
+    assert properties["magnitude"] == relationship["magnitude"] == 4.8
+
+    event = {**normalize_event(RAIN), "ingested_at": 1.0}
+    properties, hazard, relationship_type, _ = graph_record(event)
+    assert (hazard, relationship_type) == ("산사태", "TRIGGERS")
+    assert json.loads(properties["polygon"]) == RAIN["polygon"]
+
+
+def test_event_bbox():
+    assert event_bbox(normalize_event(RAIN)) == (37.4, 126.9, 37.6, 127.1)
+    south, west, north, east = event_bbox(normalize_event(EARTHQUAKE))
+    assert south < 37.5 < north and west < 127.0 < east
+    assert north - 37.5 == pytest.approx(5 / 111.32)
+
+
+def test_ingest_writes_graph_and_bumps_scoped_version(bumps):
+    graph = _Graph()
+    store = HazardEventStore(writer=graph.write)
+    result = store.ingest(RAIN)
+
+    assert graph.writes == [("rain-1", "산사태", "TRIGGERS")]
+    assert result["relationship"] == "TRIGGERS"
+    assert result["data_version"] == "test.1"
+    change = bumps[0]
+    assert change.labels == ("Event",)
+    assert {"산사태", "호우"} <= set(change.hazards)
+    assert change.bbox == (37.4, 126.9, 37.6, 127.1)
+    assert [event["event_id"] for event in store.active()] == ["rain-1"]
+
+
+def test_update_covers_previous_area_and_close_removes_event(bumps):
+    store = HazardEventStore()
+    store.ingest(EARTHQUAKE)
+    store.ingest({**EARTHQUAKE, "lat": 37.6, "active": False})
+
+    assert len(store) == 0
+    south, _, north, _ = bumps[-1].bbox
+    assert south < 37.5 - 0.04 and north > 37.6 + 0.04
+
+
+def test_writer_failure_is_not_applied(bumps):
+    def fail(*args):
+        raise RuntimeError("neo4j down")
+
+    store = HazardEventStore(writer=fail)
+    with pytest.raises(RuntimeError):
+        store.ingest(EARTHQUAKE)
+    assert len(store) == 0
+    assert bumps == []
+
+
+def test_invalid_event_is_not_applied(bumps):
+    store = HazardEventStore()
+    with pytest.raises(ValueError):
+        store.ingest({"event_type": "지진"})
+    assert bumps == []
+
+
+def test_covering():
+    store = HazardEventStore()
+    store._apply({**normalize_event(EARTHQUAKE), "ingested_at": 1.0}, "test", notify=False)
+    store._apply({**normalize_event(RAIN), "ingested_at": 2.0}, "test", notify=False)
+
+    near = {item["event_id"]: item for item in store.covering(37.51, 127.0)}
+    assert set(near) == {"eq-1", "rain-1"}
+    assert near["eq-1"]["distance_km"] == pytest.approx(1.11, abs=0.01)
+    assert near["rain-1"]["distance_km"] is None
+    assert [item["event_id"] for item in store.covering(37.65, 127.0)] == []
+
+
+def test_sync_applies_other_worker_events(bumps):
+    """다른 워커가 기록한 이벤트 동기화 (첫 동기화는 무효화 없이 적재만)"""
+    graph = _Graph()
+    writer_store = HazardEventStore(writer=graph.write)
+    writer_store.ingest(EARTHQUAKE)
+    bumps.clear()
+
+    reader = HazardEventStore(loader=graph.load)
+    assert reader.sync() == 1
+    assert [event["event_id"] for event in reader.active()] == ["eq-1"]
+    assert bumps == []
+
+    writer_store.ingest(RAIN)
+    bumps.clear()
+    assert reader.sync() == 1
+    assert len(bumps) == 1
+    assert {event["event_id"] for event in reader.active()} == {"eq-1", "rain-1"}
+
+    # 이미 반영한 이벤트는 겹침 구간에서 다시 읽어도 건너뜀
+    assert reader.sync() == 0
+
+    writer_store.ingest({**EARTHQUAKE, "active": False})
+    assert reader.sync() == 1
+    assert [event["event_id"] for event in reader.active()] == ["rain-1"]
+
+
+def test_sync_skips_events_without_area(bumps):
+    graph = _Graph()
+    graph.nodes["scenario"] = {"event_id": "scenario", "event_type": "지진", "ingested_at": 1.0}
+    reader = HazardEventStore(loader=graph.load)
+    assert reader.sync() == 0
+    assert len(reader) == 0
+
+
+def test_inbox_moves_files_to_done_and_failed(tmp_path, bumps):
+    store = HazardEventStore()
+    (tmp_path / "01-ok.json").write_text(json.dumps(EARTHQUAKE, ensure_ascii=False), encoding="utf-8")
+    (tmp_path / "02-mixed.jsonl").write_text(
+        json.dumps(RAIN, ensure_ascii=False) + "\n" + json.dumps({"event_type": "지진"}, ensure_ascii=False) + "\n",
+        encoding="utf-8"
+    )
+    (tmp_path / "03-broken.json").write_text("{not json", encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("ignored", encoding="utf-8")
+
+    assert EventInbox(store, str(tmp_path)).poll() == 2
+    assert sorted(p.name for p in (tmp_path / "done").iterdir()) == ["01-ok.json"]
+    assert sorted(p.name for p in (tmp_path / "failed").iterdir()) == [
+        "02-mixed.jsonl", "02-mixed.jsonl.error", "03-broken.json", "03-broken.json.error"
+    ]
+    assert (tmp_path / "failed" / "02-mixed.jsonl.error").read_text(encoding="utf-8").startswith("1: ")
+    assert list((tmp_path / "processing").iterdir()) == []
+    assert (tmp_path / "notes.txt").exists()
+    assert {event["event_id"] for event in store.active()} == {"eq-1", "rain-1"}
+
+
+@pytest.fixture
+def api_store(api_module, monkeypatch, bumps):
+    graph = _Graph()
+    store = HazardEventStore(writer=graph.write, loader=graph.load)
+    monkeypatch.setattr(api_module, "event_store", store)
+    return store
+
+
+def test_ingest_endpoint(client, api_module, api_store):
+    headers = {"X-Admin-Token": api_module.ADMIN_TOKEN}
+    response = client.post("/admin/events", json={**EARTHQUAKE, "severity": "HIGH", "magnitude": 4.8}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["relationship"] == "UPDATES"
+    events = client.get("/admin/events", headers=headers).json()["events"]
+    assert [event["event_id"] for event in events] == ["eq-1"]
+
+    assert client.post("/admin/events", json={"event_type": "지진"}, headers=headers).status_code == 400
+
+
+def test_ingest_endpoint_reports_graph_failure(client, api_module, api_store, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("neo4j down")
+
+    monkeypatch.setattr(api_store, "writer", fail)
+    headers = {"X-Admin-Token": api_module.ADMIN_TOKEN}
+    assert client.post("/admin/events", json={**EARTHQUAKE, "severity": "HIGH", "magnitude": 4.8}, headers=headers).status_code == 503
+    assert len(api_store) == 0
+
+
+def test_admin_endpoints_require_token(client, api_module, api_store, monkeypatch):
+    assert client.get("/admin/events").status_code == 401
+    assert client.get("/admin/events", headers={"X-Admin-Token": "wrong"}).status_code == 401
+    monkeypatch.setattr(api_module, "ADMIN_TOKEN", "")
+    # 토큰이 설정되지 않으면 관리자 API 전체 비활성화
+    assert client.get("/admin/events", headers={"X-Admin-Token": ""}).status_code == 503
@@ -0,0 +1,169 @@
+"""대화 히스토리 압축 단위 테스트
+
+- 요약은 응답 경로에서 기다리지 않고 백그라운드로 갱신되며 대화별로만 캐시됨
+- 대화가 길어져도 PlanningAgent 프롬프트 길이가 일정 범위를 넘지 않음
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from agents import planning_agent
+from agents.planning_agent import PlanningAgent
+from services import history_manager
+from services.history_manager import HistoryManager
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(history_manager.genai, "Client", lambda **kwargs: None)
+    manager = HistoryManager(keep_turns=1, fold_batch_turns=1, max_summary_chars=500, cache_size=8)
+    manager.calls = []
+
+    async def summarize(summary, messages):
+        manager.calls.append([m["content"] for m in messages])
+        return " / ".join(filter(None, [summary] + [m["content"] for m in messages]))
+
+    manager._summarize = summarize
+    return manager
+
+
+def _history(*contents):
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": c} for i, c in enumerate(contents)]
+
+
+def _compact(manager, history, conversation_id=None):
+    async def run():
+        result = await manager.compact(history, conversation_id)
+        await manager.wait_for_folds()
+        return result
+    return asyncio.run(run())
+
+
+def test_short_history_is_kept_as_is(manager):
+    history = _history("q1", "a1", "q2")
+    assert _compact(manager, history, "c1") == (None, history)
+    assert manager.calls == []
+
+
+def test_fold_runs_in_background_and_is_used_next_turn(manager):
+    history = _history("q1", "a1", "q2", "a2")
+
+    async def first_turn():
+        result = await manager.compact(history, "c1")
+        # 응답 경로에서는 요약을 기다리지 않고 최근 메시지만 사용
+        assert manager.calls == []
+        await manager.wait_for_folds()
+        return result
+
+    assert asyncio.run(first_turn()) == (None, history[2:])
+    assert manager.calls == [["q1", "a1"]]
+
+    # 반영된 위치 이후로 fold_batch가 쌓이기 전에는 LLM 요약 없이 캐시 재사용
+    longer = history + _history("q3")
+    assert _compact(manager, longer, "c1") == ("q1 / a1", longer[2:])
+    assert len(manager.calls) == 1
+
+    longest = history + _history("q3", "a3")
+    assert _compact(manager, longest, "c1") == ("q1 / a1", longest[4:])
+    assert manager.calls[-1] == ["q2", "a2"]
+    assert _compact(manager, longest + _history("q4"), "c1")[0] == "q1 / a1 / q2 / a2"
+
+
+def test_one_fold_at_a_time_per_conversation(manager):
+    release = asyncio.Event()
+    summarize = manager._summarize
+
+    async def slow(summary, messages):
+        await release.wait()
+        return await summarize(summary, messages)
+
+    manager._summarize = slow
+
+    async def scenario():
+        history = _history("q1", "a1", "q2", "a2")
+        await manager.compact(history, "c1")
+        await manager.compact(history + _history("q3", "a3"), "c1")
+        assert len(manager._folding) == 1
+        release.set()
+        await manager.wait_for_folds()
+
+    asyncio.run(scenario())
+    assert manager.calls == [["q1", "a1"]]
+
+
+def test_failed_fold_keeps_previous_summary(manager):
+    async def fail(summary, messages):
+        raise RuntimeError("gemini down")
+
+    manager._summarize = fail
+    history = _history("q1", "a1", "q2", "a2")
+    assert _compact(manager, history, "c1") == (None, history[2:])
+    assert manager._summaries == {}
+    assert manager._folding == {}
+
+
+def test_summary_is_not_shared_between_conversations(manager):
+    """첫 메시지가 같아도 다른 대화의 요약을 돌려주지 않음"""
+    _compact(manager, _history("안녕", "a1", "q2", "a2"), "user-a")
+    other = _history("안녕", "b1")
+    assert _compact(manager, other, "user-b") == (None, other)
+
+
+def test_summary_from_other_history_is_ignored(manager):
+    _compact(manager, _history("q1", "a1", "q2", "a2"), "c1")
+    replaced = _history("x1", "y1", "x2")
+    assert _compact(manager, replaced, "c1") == (None, replaced)
+
+
+def test_no_summary_without_conversation_id(manager):
+    history = _history("q1", "a1", "q2", "a2", "q3")
+    assert _compact(manager, history) == (None, history[-2:])
+    assert manager.calls == []
+    assert manager._summaries == {}
+
+
+class _CapturingClient:
+    """PlanningAgent용 Gemini 대체 (프롬프트 길이 기록, 빈 계획 응답)"""
+
+    def __init__(self, **kwargs):
+        self.prompts = []
+        self.models = SimpleNamespace(generate_content=self._generate)
+
+    def _generate(self, model, contents, **kwargs):
+        self.prompts.append(contents)
+        return SimpleNamespace(text="{}")
+
+
+def test_planner_prompt_length_stays_bounded(monkeypatch):
+    """N턴 대화에서 플래너 프롬프트 길이가 요약 상한 + 최근 메시지 수 범위 안에서 일정"""
+    monkeypatch.setattr(history_manager.genai, "Client", lambda **kwargs: None)
+    monkeypatch.setattr(planning_agent.genai, "Client", _CapturingClient)
+    manager = HistoryManager(keep_turns=2, fold_batch_turns=2, max_summary_chars=300, cache_size=8)
+
+    async def summarize(summary, messages):
+        # 실제 요약처럼 상한까지 커지는 요약
+        return ((summary or "") + "".join(m["content"] for m in messages))[-manager.max_summary_chars:]
+
+    manager._summarize = summarize
+    planner = PlanningAgent()
+    question = "지금 대피해야 하나요? " * 5
+
+    async def conversation(turns):
+        history = []
+        for turn in range(turns):
+            summary, recent = await manager.compact(history, "long")
+            await planner.plan(question, None, manager.format_context(summary, recent))
+            await manager.wait_for_folds()
+            history += [
+                {"role": "user", "content": f"질문 {turn:03d} " + "가" * 200},
+                {"role": "assistant", "content": f"답변 {turn:03d} " + "나" * 500},
+            ]
+
+    asyncio.run(conversation(60))
+    lengths = [len(prompt) for prompt in planner.client.prompts]
+    base = lengths[0]
+    # 맥락 상한: 요약 + (keep + fold_batch)턴 메시지 (메시지당 최대 300자 + 역할 표시)
+    bound = manager.max_summary_chars + (manager.keep_messages + manager.fold_batch_messages) * 320 + 100
+    assert max(lengths) - base <= bound
+    assert max(lengths[30:]) <= max(lengths[10:30])
@@ -0,0 +1,96 @@
+"""부하 시나리오(benchmarks/load.py) 테스트
+
+같은 seed로 같은 트래픽이 만들어지는지, 시나리오별 요청 형태와 응답 분류를 확인하고,
+작은 alert_burst를 별도 프로세스에서 실제로 실행해 보고서 형식을 확인합니다.
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+from types import SimpleNamespace
+
+from benchmarks import load
+from services.conversation_store import InMemoryConversationStore
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _args(**overrides):
+    args = load.parse_args(["--scenario", "mixed", "--duration", "5", "--burst", "20"])
+    for name, value in overrides.items():
+        setattr(args, name, value)
+    return args
+
+
+def test_sessions_are_reproducible_and_sorted():
+    first = load.build_sessions(_args())
+    assert first == load.build_sessions(_args())
+    assert first != load.build_sessions(_args(seed=7))
+    assert [s.start for s in first] == sorted(s.start for s in first)
+    assert {s.kind for s in first} == {"alert_burst", "shelter_search", "multi_turn"}
+
+
+def test_scenario_shapes():
+    rng = random.Random(1)
+    args = _args(burst=50, burst_window=2.0, variant_ratio=0.0, rate=4.0, duration=5.0, think_time=1.5)
+
+    burst = load.alert_burst(rng, args)
+    assert len(burst) == 50
+    assert all(0 <= s.start <= 2.0 for s in burst)
+    assert {s.turns[0]["message"] for s in burst} == {load.ALERT_QUESTION}
+
+    shelters = load.shelter_search(rng, args)
+    assert shelters and all(s.turns[0]["user_info"] is not None for s in shelters)
+    assert all(0 <= s.start < 5.0 for s in shelters)
+
+    conversations = load.multi_turn(rng, args)
+    for session in conversations:
+        assert [t["message"] for t in session.turns] in load.CONVERSATION_SCRIPTS
+        assert session.think_time == 1.5
+        assert len({json.dumps(t["user_info"]) for t in session.turns}) == 1  # 대화 안에서 위치 유지
+
+
+def test_poisson_times():
+    assert load._poisson_times(random.Random(0), 0, 10) == []
+    times = load._poisson_times(random.Random(0), 50, 10)
+    assert all(0 < t < 10 for t in times)
+    assert 400 < len(times) < 600
+
+
+def test_outcome_classification():
+    def response(status, explanation=None):
+        return SimpleNamespace(status_code=status, json=lambda: {"explanation": explanation})
+
+    assert load._outcome(response(503)) == "503"
+    assert load._outcome(response(200)) == "200"
+    assert load._outcome(response(200, {"mode": "local", "reason": "saturated"})) == "local:saturated"
+    assert load._outcome(response(200, {"mode": "local"})) == "local:requested"
+
+
+def test_conversation_footprint_counts_messages():
+    store = InMemoryConversationStore()
+    store.append("c1", [{"role": "user", "content": "지진"}, {"role": "assistant", "content": "대피"}])
+    assert load._conversation_footprint(store) == {"conversations": 1, "messages": 2, "content_bytes": 12}
+
+
+def test_alert_burst_run_writes_report(tmp_path):
+    output = tmp_path / "load.json"
+    subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.load", "--scenario", "alert_burst", "--burst", "6",
+            "--burst-window", "0.2", "--variant-ratio", "0", "--llm-ms", "0", "--embed-ms", "0",
+            "--neo4j-ms", "0", "--chroma-ms", "0", "--max-in-flight", "2", "--output", str(output)
+        ],
+        env={**os.environ, "PYTHONPATH": BACKEND_DIR, "EVENT_POLL_SECONDS": "0", "CONVERSATION_STORE_BACKEND": "memory"},
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    report = json.loads(output.read_text(encoding="utf-8"))
+    scenario = report["scenarios"]["alert_burst"]
+    assert report["sessions"] == 6
+    assert scenario["requests"] == 6
+    assert sum(scenario["outcomes"].values()) == 6
+    assert scenario["error_rate"] == 0.0
+    assert report["config"]["admission"]["max_in_flight"] == 2
+    assert report["conversations"]["growth"]["conversations"] == 6
+    assert report["timeline"] and "queue_depth" in report["timeline"][0]
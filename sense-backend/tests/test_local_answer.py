@@ -0,0 +1,145 @@
+"""LLM 없는 로컬 답변 테스트
+
+작은 전처리 데이터로 답변 구성(대피소/정책/행동요령/위험 구역)과, 데이터 버전 변경 시
+백그라운드 재로드, 위치 evidence 계산이 이벤트 루프 밖에서 실행되는지 확인합니다.
+"""
+import asyncio
+import threading
+import time
+
+from agents.advisor_agent import AdvisorAgent
+from graph import Orchestrator
+from services.data_version import bump_data_version
+from services.local_answer import detect_hazard
+
+USER = {"lat": 37.5, "lon": 127.0}
+POLICIES = [
+    {"hazard_type": "지진", "name": "지진 정책", "content": "낙하물을 피해 머리를 보호합니다."},
+    {"hazard_type": "지진", "name": "지진 정책", "content": "낙하물을 피해 머리를 보호합니다."},
+    {"hazard_type": "홍수", "name": "", "content": "지하 공간에서 즉시 나옵니다."},
+]
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "시간 안에 조건을 만족하지 않음"
+        time.sleep(0.01)
+
+
+def test_detect_hazard():
+    assert detect_hazard("집이 흔들려요") == "지진"
+    assert detect_hazard("지하철에서 연기가 나요") == "화재"
+    assert detect_hazard("오늘 날씨") is None
+
+
+def test_answer_combines_shelters_policies_guidelines_and_zones(make_local_engine):
+    engine = make_local_engine(policy_loader=lambda: POLICIES)
+    result = engine.answer("지진이 나서 흔들려요", USER, reason="requested")
+
+    explanation = result["explanation"]
+    assert explanation["mode"] == "local"
+    assert explanation["reason"] == "requested"
+    assert explanation["hazard"] == "지진"
+    assert explanation["policy_count"] == 1  # 중복 정책 제거
+    assert [g["doc_id"] for g in explanation["guidelines"]][0] == "eq-1"  # 제목 섹션 제외, 재난 유형 문서 우선
+    assert explanation["shelter_count"] == 4
+    assert "## 결론" in result["answer"] and "## 증거" in result["answer"]
+    assert "낙하물을 피해" in result["evidence"]
+    assert "주변 위험 구역: 반경 500m 내 1곳 (인명피해우려지역 1곳)" in result["evidence"]
+    assert "급수대" not in result["evidence"]  # 급수시설은 대피 장소가 아님
+    assert all(place["source"] == "Local" for place in result["places_reference"].values())
+
+
+def test_answer_without_location_or_hazard(make_local_engine):
+    result = make_local_engine().answer("오늘 뭐 하지")
+    assert result["explanation"]["shelter_count"] == 0
+    assert result["places_reference"] is None
+    assert result["conclusion"]
+
+
+def test_policy_loader_failure_falls_back_to_csv(make_local_engine):
+    def broken():
+        raise RuntimeError("neo4j down")
+
+    engine = make_local_engine(policy_loader=broken)
+    assert engine.policies_for("지진") == []  # 임시 데이터에 노드 CSV가 없음
+    assert engine.loaded
+
+
+def test_data_version_change_reloads_in_background(make_local_engine):
+    calls = []
+    policies = [POLICIES[:1]]
+
+    def loader():
+        calls.append(threading.current_thread().name)
+        return policies[-1]
+
+    engine = make_local_engine(policy_loader=loader)
+    engine.load()
+    assert calls == ["MainThread"]
+
+    policies.append(POLICIES[2:])
+    bump_data_version("test")
+    _wait_until(lambda: engine.loaded)
+    assert calls == ["MainThread", "local-answer-reload"]
+    assert engine.policies_for("홍수") == [{"name": "", "content": "지하 공간에서 즉시 나옵니다."}]
+
+
+def test_unloaded_engine_is_not_reloaded_eagerly(make_local_engine):
+    calls = []
+    engine = make_local_engine(policy_loader=lambda: calls.append(1) or POLICIES)
+    engine.invalidate()
+    time.sleep(0.05)
+    assert calls == []
+    assert not engine.loaded
+
+
+def test_invalidate_during_load_is_not_lost(make_local_engine):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        if len(calls) == 1:
+            started.set()
+            release.wait(5)
+        return POLICIES
+
+    engine = make_local_engine(policy_loader=loader)
+    loading = threading.Thread(target=engine.load)
+    loading.start()
+    assert started.wait(5)
+    # 로드 중인 _lock을 기다리지 않고 바로 반환 (이벤트 루프에서 호출해도 막히지 않음)
+    engine.invalidate(reload=False)
+    release.set()
+    loading.join(5)
+
+    assert not engine.loaded
+    engine.load()
+    assert engine.loaded and len(calls) == 2
+
+
+def test_location_evidence_runs_off_the_event_loop(make_local_engine):
+    engine = make_local_engine(policy_loader=lambda: POLICIES)
+    threads = []
+    zone_report = engine.zone_report
+
+    def recording_zone_report(lat, lon):
+        threads.append(threading.current_thread())
+        return zone_report(lat, lon)
+
+    engine.zone_report = recording_zone_report
+    advisor = AdvisorAgent.__new__(AdvisorAgent)
+    advisor.local_answer = engine
+    orchestrator = Orchestrator.__new__(Orchestrator)
+    orchestrator.advisor_agent = advisor
+    payload = {"conclusion": "결론", "evidence": "증거", "explanation": {}}
+
+    async def scenario():
+        return await orchestrator._answer_from_payload(payload, "지진 대피소", USER, "cache", {"hit": True})
+
+    result = asyncio.run(scenario())
+    assert threads and threads[0] is not threading.main_thread()
+    assert "주변 안전 거점" in result["explanation"]["advisory"]["evidence"]
+    assert result["places_reference"]
@@ -0,0 +1,131 @@
+"""재난 이벤트 대량 알림 대상 매칭 테스트 (영향 사용자, 안전 대피소, payload, /admin/notify/match)"""
+import json
+
+import numpy as np
+import pytest
+
+from services.mass_notify import NotificationMatcher, points_in_polygon, safe_types, validate_event
+
+# u1은 옥외대피소(out-1), u2는 실내대피소(in-1) 바로 옆, u3은 약 11km 북쪽, u4는 좌표 없음
+USERS = (
+    ["u1", "u2", "u3", "u4"],
+    np.array([37.5009, 37.5018, 37.6, np.nan]),
+    np.array([127.0, 127.0, 127.0, np.nan]),
+)
+QUAKE = {"event_id": "eq-1", "event_type": "지진", "lat": 37.5, "lon": 127.0, "radius_km": 1.0}
+
+
+def _square(south, west, north, east):
+    return [[west, south], [east, south], [east, north], [west, north]]
+
+
+@pytest.fixture
+def matcher(make_shelter_grid):
+    matcher = NotificationMatcher(make_shelter_grid(), users_path="")
+    matcher.set_users(*USERS)
+    return matcher
+
+
+def test_safe_types_follow_hazard():
+    assert safe_types("지진") == ["outdoor", "indoor"]
+    assert safe_types("공습") == ["indoor", "temporary"]
+    assert safe_types("알 수 없음") == ["outdoor", "indoor", "temporary"]
+
+
+def test_validate_event():
+    event = validate_event({"event_type": "집중호우", "severity": "critical", "lat": 37.5, "lon": 127.0, "radius_km": 2})
+    assert event["hazard"] == "산사태"
+    assert event["severity"] == "CRITICAL"
+    assert event["event_id"].startswith("event_집중호우_")
+    assert validate_event({"event_type": "지진", "polygon": _square(37.4, 126.9, 37.6, 127.1)})["lat"] is None
+    for invalid in (
+        {"lat": 37.5, "lon": 127.0, "radius_km": 1},
+        {"event_type": "지진", "severity": "SEVERE", **QUAKE},
+        {"event_type": "지진", "lat": 37.5, "lon": 127.0},
+        {"event_type": "지진", "lat": 95, "lon": 127.0, "radius_km": 1},
+        {"event_type": "지진", "lat": 37.5, "lon": 127.0, "radius_km": 0},
+        {"event_type": "지진", "polygon": [[127.0, 37.5], [127.1, 37.5]]},
+    ):
+        with pytest.raises(ValueError):
+            validate_event(invalid)
+
+
+def test_points_in_polygon_handles_concave_ring():
+    # ㄱ자 다각형: 오른쪽 위 사각형이 비어 있음
+    ring = np.array([[0, 0], [2, 0], [2, 1], [1, 1], [1, 2], [0, 2]], dtype=np.float64)
+    lats = np.array([0.5, 0.5, 1.5, 1.5, 3.0])
+    lons = np.array([0.5, 1.5, 0.5, 1.5, 0.5])
+    assert points_in_polygon(lats, lons, ring).tolist() == [True, True, True, False, False]
+
+
+def test_set_users_drops_missing_coordinates(matcher):
+    assert len(matcher) == 3
+    assert matcher.user_ids.tolist() == ["u1", "u2", "u3"]
+
+
+def test_radius_event_matches_nearest_safe_shelter(matcher):
+    matched = matcher.match(QUAKE)
+    assert matcher.user_ids[matched["users"]].tolist() == ["u1", "u2"]
+    assert matched["event_distance_km"].tolist() == pytest.approx([0.1, 0.2], abs=0.01)
+
+    payloads = list(matcher.payloads(matched))
+    assert [(p["user_id"], p["shelter"]["id"]) for p in payloads] == [("u1", "out-1"), ("u2", "in-1")]
+    assert payloads[0]["message"] == "[경보] 지진 영향 지역입니다. 가까운 대피소: 근린공원 (0.0km)"
+    assert payloads[0]["shelter"]["type"]
+    assert payloads[1]["event_distance_km"] == pytest.approx(0.2, abs=0.01)
+
+
+def test_hazard_excludes_unsafe_shelter_types(matcher):
+    matched = matcher.match({**QUAKE, "event_type": "공습", "severity": "CRITICAL"})
+    payloads = list(matcher.payloads(matched))
+    # 공습에는 옥외대피소를 안내하지 않음
+    assert [p["shelter"]["id"] for p in payloads] == ["in-1", "in-1"]
+    assert payloads[0]["message"].startswith("[긴급] 공습 영향 지역입니다.")
+
+
+def test_polygon_event(matcher):
+    matched = matcher.match({"event_id": "fl-1", "event_type": "태풍", "polygon": _square(37.5005, 126.99, 37.5012, 127.01)})
+    payloads = list(matcher.payloads(matched))
+    assert [p["user_id"] for p in payloads] == ["u1"]
+    assert payloads[0]["hazard"] == "홍수"
+    assert payloads[0]["event_distance_km"] is None
+
+
+def test_event_without_affected_users(matcher, make_shelter_grid):
+    assert len(matcher.match({**QUAKE, "lat": 37.3})["users"]) == 0
+    empty = NotificationMatcher(make_shelter_grid(), users_path="")
+    assert not empty.load()
+    assert list(empty.payloads(empty.match(QUAKE))) == []
+
+
+def test_load_users_from_csv_and_npz(tmp_path, make_shelter_grid):
+    csv_path = tmp_path / "users.csv"
+    csv_path.write_text("user_id,lat,lon\n007,37.5009,127.0\n008,,\n", encoding="utf-8")
+    matcher = NotificationMatcher(make_shelter_grid(), users_path=str(csv_path))
+    assert matcher.load()
+    assert matcher.user_ids.tolist() == ["007"]  # user_id는 문자열 그대로
+
+    npz_path = tmp_path / "users.npz"
+    np.savez(npz_path, user_ids=np.array(USERS[0], dtype=object), lats=USERS[1], lons=USERS[2])
+    matcher = NotificationMatcher(make_shelter_grid(), users_path=str(npz_path))
+    assert matcher.load() and len(matcher) == 3
+    assert not NotificationMatcher(make_shelter_grid(), users_path=str(tmp_path / "missing.csv")).load()
+
+
+def test_notify_match_endpoint(client, api_module, monkeypatch, matcher, make_shelter_grid):
+    headers = {"X-Admin-Token": api_module.ADMIN_TOKEN}
+    monkeypatch.setattr(api_module, "notification_matcher", NotificationMatcher(make_shelter_grid(), users_path=""))
+    assert client.post("/admin/notify/match", json=QUAKE, headers=headers).status_code == 503
+
+    monkeypatch.setattr(api_module, "notification_matcher", matcher)
+    response = client.post("/admin/notify/match", json=QUAKE, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["x-event-id"] == "eq-1"
+    assert response.headers["x-affected-users"] == "2"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["user_id"] for line in lines] == ["u1", "u2"]
+
+    invalid = client.post("/admin/notify/match", json={"event_type": "지진", "lat": 37.5}, headers=headers)
+    assert invalid.status_code == 400
+    assert client.post("/admin/notify/match", json=QUAKE).status_code == 401
@@ -0,0 +1,117 @@
+"""/metrics 엔드포인트와 멀티 워커(multiprocess) 집계 테스트"""
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+from prometheus_client.parser import text_string_to_metric_families
+
+from services import metrics
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _samples(text):
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(text)
+        for sample in family.samples
+    }
+
+
+def test_metrics_endpoint_counts_requests_by_route(client):
+    client.get("/health")
+    client.get("/conversations/abc")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    samples = _samples(response.text)
+    assert samples[("sense_http_requests_total", (("endpoint", "/health"), ("method", "GET"), ("status", "200")))] >= 1
+    # 경로 파라미터는 라우트 템플릿으로 묶임 (카디널리티 제한)
+    assert any(
+        name == "sense_http_requests_total" and dict(labels)["endpoint"] == "/conversations/{conversation_id}"
+        for name, labels in samples
+    )
+    assert not any("abc" in dict(labels).get("endpoint", "") for _, labels in samples)
+
+
+_WORKER = """
+import sys
+from services import metrics
+metrics.REQUEST_COUNT.labels(method="GET", endpoint="/health", status="200").inc(int(sys.argv[1]))
+metrics.ADMISSION_IN_FLIGHT.set(int(sys.argv[1]))
+metrics.CONVERSATIONS.labels(backend="sqlite").set(7)
+"""
+
+_COLLECT = """
+import sys
+from services import metrics
+if len(sys.argv) > 1:
+    metrics.mark_process_dead(int(sys.argv[1]))
+sys.stdout.write(metrics.render_latest()[0].decode("utf-8"))
+"""
+
+
+def _env(multiproc_dir):
+    return {
+        **os.environ,
+        "PROMETHEUS_MULTIPROC_DIR": str(multiproc_dir),
+        "CONVERSATION_STORE_BACKEND": "sqlite",
+        "PYTHONPATH": BACKEND_DIR,
+    }
+
+
+def _run(code, multiproc_dir, *args):
+    return subprocess.run(
+        [sys.executable, "-c", code, *map(str, args)],
+        env=_env(multiproc_dir), cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+
+
+def test_multiprocess_aggregation(tmp_path):
+    """워커별 값: 카운터는 합산, livesum gauge는 살아 있는 워커의 합, 공유 대화 수는 최댓값 하나"""
+    workers = [
+        subprocess.Popen([sys.executable, "-c", _WORKER, str(count)], env=_env(tmp_path), cwd=BACKEND_DIR)
+        for count in (2, 3)
+    ]
+    for worker in workers:
+        assert worker.wait() == 0
+
+    samples = _samples(_run(_COLLECT, tmp_path).stdout)
+    assert samples[("sense_http_requests_total", (("endpoint", "/health"), ("method", "GET"), ("status", "200")))] == 5
+    assert samples[("sense_conversations", (("backend", "sqlite"),))] == 7
+    assert [labels for name, labels in samples if name == "sense_conversations"] == [(("backend", "sqlite"),)]
+    # livesum gauge는 pid 라벨 없이 하나로 집계되고, 종료된 워커는 제외
+    assert samples[("sense_admission_in_flight", ())] == 5
+    samples = _samples(_run(_COLLECT, tmp_path, workers[0].pid).stdout)
+    assert samples[("sense_admission_in_flight", ())] == 3
+    assert samples[("sense_http_requests_total", (("endpoint", "/health"), ("method", "GET"), ("status", "200")))] == 5
+
+
+class _Pool:
+    def __init__(self):
+        self.connections = {"a": [object(), object(), object()], "b": [object()]}
+
+    def in_use_connection_count(self, address):
+        return {"a": 2, "b": 0}[address]
+
+
+def test_update_neo4j_pool_reads_driver_pool():
+    metrics.update_neo4j_pool(SimpleNamespace(_pool=_Pool()))
+    assert metrics.NEO4J_POOL_CONNECTIONS.labels(state="in_use")._value.get() == 2
+    assert metrics.NEO4J_POOL_CONNECTIONS.labels(state="idle")._value.get() == 2
+
+
+def test_update_neo4j_pool_leaves_gauge_when_driver_changes():
+    metrics.update_neo4j_pool(SimpleNamespace(_pool=_Pool()))
+    metrics.update_neo4j_pool(SimpleNamespace())
+    metrics.update_neo4j_pool(SimpleNamespace(_pool=SimpleNamespace(connections={})))
+    assert metrics.NEO4J_POOL_CONNECTIONS.labels(state="in_use")._value.get() == 2
+
+
+def test_record_gemini_error_classifies_rate_limit():
+    counter = metrics.GEMINI_ERRORS.labels(stage="test", kind="rate_limited")
+    before = counter._value.get()
+    metrics.record_gemini_error("test", RuntimeError("429 RESOURCE_EXHAUSTED"))
+    assert counter._value.get() == before + 1
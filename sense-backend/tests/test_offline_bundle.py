@@ -0,0 +1,137 @@
+"""모바일 오프라인 번들 테스트 (인코딩 왕복, delta 생성/적용, 보관, /bundle 엔드포인트)"""
+import zlib
+
+import pytest
+
+from services.data_version import bump_data_version
+from services.offline_bundle import (
+    BundleStore, apply_delta, content_version, decode_bundle, encode_bundle, facility_records
+)
+
+FACILITIES = {
+    "outdoor": [
+        {"id": "o1", "name": "근린공원", "address": "서울 강남구", "shelter_type": "옥외대피소", "lat": 37.5012345, "lon": 127.0398765},
+        {"id": "o2", "name": "운동장", "address": None, "shelter_type": "옥외대피소", "lat": 37.48, "lon": 127.05},
+    ],
+    "indoor": [{"id": "i1", "name": "지하주차장", "address": "서울 서초구", "shelter_type": "실내대피소", "lat": 37.49, "lon": 127.01}],
+    "water": [{"id": "w1", "name": "급수대", "address": "", "shelter_type": "급수시설", "lat": 37.6, "lon": 126.9}],
+}
+TEXTS = {
+    "policies": [{"hazard_type": "지진", "title": "지진 정책", "content": "머리를 보호합니다."}],
+    "guidelines": [{"hazard_type": "홍수", "title": "침수 시", "content": "높은 곳으로 이동합니다."}],
+}
+
+
+def _changed_facilities():
+    facilities = {key: [dict(item) for item in items] for key, items in FACILITIES.items()}
+    facilities["outdoor"][1]["name"] = "새 운동장"  # 수정
+    facilities["indoor"] = []  # 삭제
+    facilities["temporary"] = [{"id": "t1", "name": "주민센터", "lat": 37.51, "lon": 127.02}]  # 추가
+    return facilities
+
+
+def test_encode_decode_round_trip():
+    records = facility_records(FACILITIES)
+    header = {"kind": "full", "version": content_version(records, TEXTS)}
+    decoded = decode_bundle(encode_bundle(header, records, TEXTS))
+
+    assert decoded["header"]["version"] == header["version"]
+    assert decoded["header"]["sections"] == {"policies": "replace", "guidelines": "replace"}
+    assert decoded["facilities"] == records
+    by_id = {r["id"]: r for r in decoded["facilities"]}
+    assert (by_id["o1"]["lat"], by_id["o1"]["lon"]) == (37.501235, 127.039877)  # 1e-6도 단위
+    assert by_id["o2"]["address"] == ""
+    assert [r["id"] for r in decoded["facilities"]] == ["o2", "o1", "i1", "w1"]  # 유형·위도순
+    assert decoded["removed"] == []
+    assert decoded["policies"] == TEXTS["policies"] and decoded["guidelines"] == TEXTS["guidelines"]
+
+
+def test_unchanged_sections_and_removed_keys():
+    blob = encode_bundle({"kind": "delta"}, [], {"policies": None, "guidelines": []}, removed=[("indoor", "i1")])
+    decoded = decode_bundle(blob)
+    assert decoded["policies"] is None and decoded["guidelines"] == []
+    assert decoded["removed"] == [("indoor", "i1")]
+
+
+def test_decode_rejects_invalid_bundles():
+    with pytest.raises(ValueError):
+        decode_bundle(zlib.compress(b"NOTABUNDLE"))
+    body = zlib.decompress(encode_bundle({"kind": "full"}, facility_records(FACILITIES), TEXTS))
+    with pytest.raises(ValueError):
+        decode_bundle(zlib.compress(body[:-10]))
+
+
+def test_content_version_tracks_content():
+    records = facility_records(FACILITIES)
+    assert content_version(records, TEXTS) == content_version(facility_records(FACILITIES), dict(TEXTS))
+    assert content_version(facility_records(_changed_facilities()), TEXTS) != content_version(records, TEXTS)
+
+
+def test_store_delta_applies_to_previous_full(tmp_path):
+    store = BundleStore(str(tmp_path), keep_versions=3)
+    first = store.export(FACILITIES, TEXTS, "v1")
+    assert store.export(FACILITIES, TEXTS, "v1")["created_at"] == first["created_at"]  # 같은 내용은 그대로
+
+    second = store.export(_changed_facilities(), TEXTS, "v2")
+    base_version, version = first["current"], second["current"]
+    assert second["versions"] == [base_version, version]
+    assert second["deltas"][base_version] == {"size": second["deltas"][base_version]["size"], "upserts": 2, "removed": 1}
+
+    kind, current, delta_blob = store.read(since=base_version)
+    assert (kind, current) == ("delta", version)
+    delta = decode_bundle(delta_blob)
+    assert delta["policies"] is None and delta["guidelines"] is None  # 문구는 바뀌지 않음
+
+    with open(tmp_path / f"{base_version}.bin", "rb") as f:
+        base = decode_bundle(f.read())
+    merged = apply_delta(base, delta)
+    latest = decode_bundle(store.read()[2])
+    assert merged["facilities"] == latest["facilities"]
+    assert merged["policies"] == latest["policies"] and merged["guidelines"] == latest["guidelines"]
+
+    with pytest.raises(ValueError):
+        apply_delta(latest, delta)
+    assert store.read(since="unknown")[0] == "full"
+
+
+def test_store_keeps_limited_versions(tmp_path):
+    store = BundleStore(str(tmp_path), keep_versions=2)
+    versions = []
+    for i in range(3):
+        texts = {**TEXTS, "policies": [{"hazard_type": "지진", "title": str(i), "content": f"내용 {i}"}]}
+        versions.append(store.export(FACILITIES, texts, f"v{i}")["current"])
+    manifest = store.manifest()
+    assert manifest["versions"] == versions[1:]
+    assert sorted(p.name for p in tmp_path.glob("*.bin")) == sorted(
+        [f"{versions[1]}.bin", f"{versions[2]}.bin", f"{versions[1]}-{versions[2]}.delta.bin"]
+    )
+    with pytest.raises(FileNotFoundError):
+        BundleStore(str(tmp_path / "empty")).read()
+
+
+def test_bundle_endpoint(client, api_module, monkeypatch, tmp_path):
+    contents = [(FACILITIES, TEXTS)]
+    monkeypatch.setattr(api_module, "bundle_store", BundleStore(str(tmp_path)))
+    monkeypatch.setattr(api_module, "_bundle_contents", lambda: contents[-1])
+
+    response = client.get("/bundle")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["x-bundle-kind"] == "full"
+    base_version = response.headers["x-bundle-version"]
+    assert decode_bundle(response.content)["header"]["version"] == base_version
+
+    etag = response.headers["etag"]
+    assert client.get("/bundle", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/bundle", params={"since": base_version}).status_code == 304
+
+    # 데이터 버전이 바뀌면 다시 만들고, 이전 버전을 가진 앱에는 delta
+    contents.append((_changed_facilities(), TEXTS))
+    bump_data_version("test")
+    delta = client.get("/bundle", params={"since": base_version})
+    assert delta.status_code == 200
+    assert delta.headers["x-bundle-kind"] == "delta"
+    assert delta.headers["x-bundle-base"] == base_version
+    assert delta.headers["etag"] == f'"{base_version}-{delta.headers["x-bundle-version"]}"'
+    assert client.get("/bundle", params={"since": base_version}, headers={"If-None-Match": delta.headers["etag"]}).status_code == 304
+    assert client.get("/bundle").headers["x-bundle-kind"] == "full"
@@ -0,0 +1,178 @@
+"""Orchestrator 요청 병합 + admission 단위 테스트
+
+에이전트/LLM 없이 _run만 대체하여 같은 요청의 동시 실행이 한 번으로 합쳐지는지,
+병합된 요청 중 실제로 실행을 시작하는 요청만 슬롯을 차지하는지 확인합니다.
+"""
+import asyncio
+
+import pytest
+
+from graph import Orchestrator
+from services.admission import PRIORITY_DEFAULT, PRIORITY_LOCATION, AdmissionController, AdmissionRejected
+from services.single_flight import AsyncSingleFlight
+
+
+class _LocalAnswer:
+    def answer(self, input_text, user_info, reason):
+        return {"response": "local", "reason": reason}
+
+
+def _orchestrator(run, admission=None):
+    orchestrator = Orchestrator.__new__(Orchestrator)
+    orchestrator.answer_cache = None
+    orchestrator.flights = AsyncSingleFlight("test")
+    orchestrator.admission = admission
+    orchestrator.local_answer = _LocalAnswer()
+    orchestrator._run = run
+    return orchestrator
+
+
+def test_identical_concurrent_requests_run_once():
+    async def scenario():
+        calls = []
+
+        async def run(input_text, history, user_info, conversation_id):
+            calls.append(input_text)
+            await asyncio.sleep(0.01)
+            return {"response": "llm"}, None
+
+        orchestrator = _orchestrator(run)
+        results = await asyncio.gather(
+            *(orchestrator.process(text) for text in ["지진 나면 어디로?", " 지진 나면  어디로? ", "지진 나면 어디로?"]),
+            orchestrator.process("홍수 대피소")
+        )
+        assert sorted(calls) == ["지진 나면 어디로?", "홍수 대피소"]
+        assert results == [{"response": "llm"}] * 4
+
+    asyncio.run(scenario())
+
+
+def test_error_is_shared_and_next_request_reruns():
+    async def scenario():
+        calls = 0
+
+        async def run(input_text, history, user_info, conversation_id):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            if calls == 1:
+                raise RuntimeError("neo4j down")
+            return {"response": "llm"}, None
+
+        orchestrator = _orchestrator(run)
+        results = await asyncio.gather(*(orchestrator.process("지진") for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert await orchestrator.process("지진") == {"response": "llm"}
+        assert calls == 2
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("other", [
+    {"lat": 37.5665, "lon": 126.9780, "floor": 12},
+    {"lat": 37.5665, "lon": 126.9780, "floor": 3, "mobility": "wheelchair"},
+    {"lat": 35.1796, "lon": 129.0756, "floor": 3},
+])
+def test_flight_key_separates_location_and_profile(other):
+    base = {"lat": 37.5665, "lon": 126.9780, "floor": 3}
+    key = Orchestrator._flight_key
+    assert key("지진 대피", base, None) == key("  지진   대피 ", dict(base), [])
+    assert key("지진 대피", base, None) != key("지진 대피", other, None)
+
+
+def test_flight_key_separates_conversation_context():
+    key = Orchestrator._flight_key
+    history = [{"role": "user", "content": "강남구에 있어요"}]
+    assert key("대피소 어디?", None, history) != key("대피소 어디?", None, None)
+    assert key("대피소 어디?", None, history) == key("대피소 어디?", None, list(history))
+
+
+def test_identical_requests_share_one_admitted_run():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=1)
+        calls = []
+
+        async def run(input_text, history, user_info, conversation_id):
+            calls.append(input_text)
+            assert admission.in_flight == 1
+            await asyncio.sleep(0.01)
+            return {"response": "llm"}, None
+
+        orchestrator = _orchestrator(run, admission)
+        results = await asyncio.gather(*(orchestrator.process("지진 나면 어디로?") for _ in range(5)))
+        assert calls == ["지진 나면 어디로?"]
+        assert results == [{"response": "llm"}] * 5
+        assert admission.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_rejected_leader_raises_and_joiners_get_local_answer():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=1)
+        release = asyncio.Event()
+
+        async def run(input_text, history, user_info, conversation_id):
+            await release.wait()
+            return {"response": "llm"}, None
+
+        orchestrator = _orchestrator(run, admission)
+        busy = asyncio.create_task(orchestrator.process("다른 질문"))
+        await asyncio.sleep(0)
+
+        results = await asyncio.gather(
+            *(orchestrator.process("홍수 대피소") for _ in range(3)), return_exceptions=True
+        )
+        assert isinstance(results[0], AdmissionRejected)
+        assert results[1:] == [{"response": "local", "reason": "saturated"}] * 2
+
+        release.set()
+        assert await busy == {"response": "llm"}
+
+    asyncio.run(scenario())
+
+
+def test_queue_timeout_falls_back_to_local_answer():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=0.05)
+        release = asyncio.Event()
+
+        async def run(input_text, history, user_info, conversation_id):
+            await release.wait()
+            return {"response": "llm"}, None
+
+        orchestrator = _orchestrator(run, admission)
+        busy = asyncio.create_task(orchestrator.process("다른 질문"))
+        await asyncio.sleep(0)
+        assert await orchestrator.process("홍수 대피소") == {"response": "local", "reason": "saturated"}
+        release.set()
+        await busy
+
+    asyncio.run(scenario())
+
+
+def test_located_requests_get_higher_priority():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=1)
+        release = asyncio.Event()
+        order = []
+
+        async def run(input_text, history, user_info, conversation_id):
+            order.append(input_text)
+            if input_text == "first":
+                await release.wait()
+            return {"response": input_text}, None
+
+        orchestrator = _orchestrator(run, admission)
+        first = asyncio.create_task(orchestrator.process("first"))
+        await asyncio.sleep(0)
+        plain = asyncio.create_task(orchestrator.process("plain"))
+        await asyncio.sleep(0)
+        located = asyncio.create_task(orchestrator.process("located", user_info={"lat": 37.5, "lon": 127.0}))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, plain, located)
+        assert order == ["first", "located", "plain"]
+        assert PRIORITY_LOCATION < PRIORITY_DEFAULT
+
+    asyncio.run(scenario())
@@ -0,0 +1,103 @@
+"""Cypher 실행 통계(느린 쿼리 로그) 테스트"""
+import logging
+
+import pytest
+
+from benchmarks.fakes import FakeSession, InMemoryGraph, LatencyProfile
+from services.cypher_guard import CypherGuard
+from services.query_stats import QueryStats, fingerprint, profile_db_hits
+from services.rag_service import HybridRAGService
+
+
+def test_fingerprint_replaces_literals_and_comments():
+    a = fingerprint("MATCH (s:Shelter)-[:IN]->(a:Admin {gu: '강남구'}) RETURN s.name LIMIT 10 // 주석")
+    b = fingerprint("MATCH (s:Shelter)-[:IN]->(a:Admin {gu: \"서초구\"})\n  RETURN s.name LIMIT 5;")
+    assert a == b == "MATCH (s:Shelter)-[:IN]->(a:Admin {gu: ?}) RETURN s.name LIMIT ?"
+    # 파라미터, 식별자 안의 숫자는 그대로
+    assert fingerprint("MATCH (n1) WHERE n1.x = $p1 RETURN n1") == "MATCH (n1) WHERE n1.x = $p1 RETURN n1"
+
+
+def test_profile_db_hits_sums_plan_tree():
+    plan = {"dbHits": 3, "children": [{"args": {"DbHits": 4}, "children": [{"dbHits": 5}]}, {"children": []}]}
+    assert profile_db_hits(plan) == 12
+    assert profile_db_hits(None) is None
+
+
+def test_record_aggregates_per_fingerprint():
+    stats = QueryStats(slow_ms=1000, profile_sample_rate=0)
+    stats.record("MATCH (s) WHERE s.x = 1 RETURN s", 10.0, rows=2)
+    stats.record("MATCH (s) WHERE s.x = 2 RETURN s", 30.0, rows=4, db_hits=40, source="template")
+    stats.record("MATCH (s) WHERE s.x = 3 RETURN s", 5.0, error=True)
+
+    [entry] = stats.top()
+    assert entry["count"] == 3 and entry["errors"] == 1
+    assert (entry["total_ms"], entry["mean_ms"], entry["max_ms"], entry["last_ms"]) == (45.0, 15.0, 30.0, 5.0)
+    assert (entry["mean_rows"], entry["max_rows"]) == (2.0, 4)
+    assert (entry["profiled"], entry["mean_db_hits"], entry["max_db_hits"]) == (1, 40.0, 40)
+    assert entry["sources"] == {"llm": 2, "template": 1}
+    assert entry["sample_query"] == "MATCH (s) WHERE s.x = 3 RETURN s"
+    assert not stats.should_profile()
+
+
+def test_top_sorting_and_eviction():
+    stats = QueryStats(slow_ms=1000, max_fingerprints=2)
+    stats.record("MATCH (a) RETURN a", 50.0)
+    stats.record("MATCH (b) RETURN b", 5.0)
+    stats.record("MATCH (b) RETURN b", 5.0)
+    assert [e["fingerprint"] for e in stats.top(sort="count")] == ["MATCH (b) RETURN b", "MATCH (a) RETURN a"]
+
+    # 가득 차면 누적 실행 시간이 가장 작은 항목 제거
+    stats.record("MATCH (c) RETURN c", 1.0)
+    assert stats.size() == 2
+    assert {e["fingerprint"] for e in stats.top()} == {"MATCH (a) RETURN a", "MATCH (c) RETURN c"}
+    assert len(stats.top(limit=1)) == 1
+    with pytest.raises(ValueError):
+        stats.top(sort="rows")
+    stats.clear()
+    assert stats.size() == 0
+
+
+def test_slow_query_is_logged(caplog):
+    stats = QueryStats(slow_ms=100)
+    with caplog.at_level(logging.WARNING, logger="services.query_stats"):
+        stats.record("MATCH (s {name: '비밀'}) RETURN s", 99.0)
+        stats.record("MATCH (s {name: '비밀'}) RETURN s", 150.0, rows=3, db_hits=7)
+    [record] = caplog.records
+    assert "느린 쿼리 150ms (3행, db hits 7, llm)" in record.getMessage()
+    assert "비밀" not in record.getMessage()  # 리터럴은 로그에 남기지 않음
+
+
+def test_run_cypher_records_profiled_execution():
+    graph = InMemoryGraph(
+        {"s1": {"id": "s1", "type": "Shelter", "name": "A"}, "s2": {"id": "s2", "type": "Shelter", "name": "B"}}, []
+    )
+    service = HybridRAGService.__new__(HybridRAGService)
+    service.query_stats = QueryStats(slow_ms=1000, profile_sample_rate=1.0)
+    service.cypher_guard = CypherGuard(timeout_seconds=0)
+    session = FakeSession(graph, LatencyProfile(neo4j_ms=0))
+
+    records = service._run_cypher("MATCH (s:Shelter) RETURN s.name", None, session, "llm")
+    assert sorted(r["s.name"] for r in records) == ["A", "B"]
+    [entry] = service.query_stats.top()
+    assert (entry["count"], entry["max_rows"], entry["profiled"], entry["max_db_hits"]) == (1, 2, 1, 2)
+
+    with pytest.raises(Exception):
+        service._run_cypher("MATCH (s:Shelter) WITH s RETURN s", None, session, "template")
+    failed = next(e for e in service.query_stats.top() if e["sources"] == {"template": 1})
+    assert failed["errors"] == 1 and failed["max_rows"] == 0
+
+
+def test_cypher_stats_endpoints(client, api_module):
+    query_stats = api_module.orchestrator.analyst_agent.rag_service.query_stats
+    query_stats.clear()
+    query_stats.record("MATCH (s) RETURN s LIMIT 3", 12.0, rows=3)
+    headers = {"X-Admin-Token": api_module.ADMIN_TOKEN}
+
+    assert client.get("/admin/cypher/stats").status_code == 401
+    body = client.get("/admin/cypher/stats", params={"sort": "count"}, headers=headers).json()
+    assert body["sort"] == "count" and body["tracked"] == 1
+    assert body["fingerprints"][0]["fingerprint"] == "MATCH (s) RETURN s LIMIT ?"
+    assert client.get("/admin/cypher/stats", params={"sort": "rows"}, headers=headers).status_code == 400
+
+    assert client.delete("/admin/cypher/stats", headers=headers).status_code == 200
+    assert query_stats.size() == 0
@@ -0,0 +1,106 @@
+"""HybridRAGService 단위 테스트 (Neo4j/Gemini 없이 필요한 속성만 채운 인스턴스 사용)"""
+import logging
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.fakes import FakeSession, InMemoryGraph, LatencyProfile, Result
+from services.cypher_guard import CypherGuard
+from services.graph_schema import LOCATION_PROPERTY
+from services.query_stats import QueryStats
+from services.rag_service import FACILITY_TYPE_NAMES, HybridRAGService, nearby_facilities_query
+
+
+def _service(**attributes):
+    service = HybridRAGService.__new__(HybridRAGService)
+    service.__dict__.update(attributes)
+    return service
+
+
+def test_cypher_generation_failure_is_logged_as_warning(caplog):
+    def generate_content(**kwargs):
+        raise RuntimeError("quota exceeded")
+
+    service = _service(gemini_client=SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+    with caplog.at_level(logging.WARNING, logger="services.rag_service"):
+        assert service._generate_cypher_query("강남구 대피소", "schema") is None
+    assert [r.levelno for r in caplog.records if "Cypher 쿼리 생성 오류" in r.getMessage()] == [logging.WARNING]
+
+
+def _nearby_service(graph):
+    session = FakeSession(graph, LatencyProfile(neo4j_ms=0))
+    return _service(
+        query_stats=QueryStats(slow_ms=1000, profile_sample_rate=0),
+        cypher_guard=CypherGuard(timeout_seconds=0),
+        get_neo4j_session=lambda read_only=False: nullcontext(session)
+    )
+
+
+def _facility(node_id, label, lat, lon, **properties):
+    return {"id": node_id, "type": label, "lat": lat, "lon": lon,
+            LOCATION_PROPERTY: {"latitude": lat, "longitude": lon}, **properties}
+
+
+def test_nearby_facilities_query_unions_labels():
+    query = nearby_facilities_query(["Shelter", "TemporaryHousing"])
+    assert query.count("point.withinBBox(n.location") == 2
+    assert "MATCH (n:Shelter)" in query and "MATCH (n:TemporaryHousing)" in query
+    assert "UNION ALL" in query
+    assert query.rstrip().endswith("ORDER BY distance\nLIMIT $k")
+
+
+def test_nearby_facilities_returns_closest_within_radius():
+    graph = InMemoryGraph({
+        "far": _facility("far", "Shelter", 37.52, 127.0, name="먼 대피소"),
+        "near": _facility("near", "Shelter", 37.501, 127.0, name="가까운 대피소", shelter_type="실내대피소"),
+        "tmp": _facility("tmp", "TemporaryHousing", 37.505, 127.0, name="주민센터"),
+        "out": _facility("out", "Shelter", 37.6, 127.0, name="반경 밖"),
+    }, [])
+    result = _nearby_service(graph).nearby_facilities(37.5, 127.0, radius_km=3.0, k=5)
+
+    assert "error" not in result
+    assert [r["id"] for r in result["results"]] == ["near", "tmp", "far"]
+    assert result["count"] == 3 and result["radius_km"] == 3.0
+    assert result["results"][0]["distance_km"] == pytest.approx(0.11, abs=0.01)
+    assert result["results"][0]["shelter_type"] == "실내대피소"
+    assert result["results"][1]["shelter_type"] == FACILITY_TYPE_NAMES["TemporaryHousing"]
+
+    assert [r["id"] for r in _nearby_service(graph).nearby_facilities(37.5, 127.0, radius_km=3.0, k=1)["results"]] == ["near"]
+    only_shelters = _nearby_service(graph).nearby_facilities(37.5, 127.0, radius_km=3.0, labels=["Shelter"])
+    assert [r["id"] for r in only_shelters["results"]] == ["near", "far"]
+
+
+def test_nearby_facilities_bbox_widens_with_latitude():
+    captured = {}
+
+    class _Session:
+        def run(self, query, parameters=None):
+            captured.update(parameters)
+            return Result()
+
+    service = _service(
+        query_stats=QueryStats(slow_ms=1000, profile_sample_rate=0),
+        cypher_guard=CypherGuard(timeout_seconds=0),
+        get_neo4j_session=lambda read_only=False: nullcontext(_Session())
+    )
+    service.nearby_facilities(60.0, 10.0, radius_km=10.0, k=3)
+    lat_span = captured["max_lat"] - captured["min_lat"]
+    lon_span = captured["max_lon"] - captured["min_lon"]
+    assert lon_span == pytest.approx(2 * lat_span, rel=1e-6)  # cos(60°) = 0.5
+    assert (captured["radius_m"], captured["k"]) == (10000.0, 3)
+
+
+def test_nearby_facilities_error_is_reported():
+    class _Broken:
+        def run(self, query, parameters=None):
+            raise RuntimeError("point index missing")
+
+    service = _service(
+        query_stats=QueryStats(slow_ms=1000, profile_sample_rate=0),
+        cypher_guard=CypherGuard(timeout_seconds=0),
+        get_neo4j_session=lambda read_only=False: nullcontext(_Broken())
+    )
+    result = service.nearby_facilities(37.5, 127.0)
+    assert result["results"] == [] and result["error"] == "point index missing"
+    assert service.query_stats.top()[0]["errors"] == 1
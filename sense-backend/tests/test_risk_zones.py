@@ -0,0 +1,145 @@
+"""위험 구역 공간 인덱스 테스트 (사용자 위치 보고, 대피소 노출 표시, CSV 적재)"""
+import pytest
+
+from services.risk_zones import RiskZoneIndex, format_report, read_zone_csvs, zone_type_of
+
+ORIGIN = (37.5, 127.0)
+DEG_100M = 0.0009  # 위도 0.0009도 ≈ 100m
+RADIUS_M = {"casualty": 300, "landslide": 300, "collapse": 200, "old_facility": 100, "disaster_district": 300}
+
+
+def _zone(zone_id, meters_north, zone_type=None, **extra):
+    return {
+        "id": zone_id, "zone_type": zone_type, "name": zone_id, "reason": "",
+        "lat": ORIGIN[0] + DEG_100M * meters_north / 100, "lon": ORIGIN[1], **extra
+    }
+
+
+@pytest.fixture
+def index():
+    return RiskZoneIndex([
+        _zone("zone_collapse_1", 110, reason="축대 균열 " * 20),  # 영향 반경 200m 안
+        _zone("zone_old_facility_1", 220),  # 보고 반경 안, 영향 반경(100m) 밖
+        _zone("zone_casualty_1", 450),
+        _zone("zone_casualty_2", 1100),  # zone_type 없음: id 규칙으로 유형 추출, 보고 반경 밖
+        _zone("zone_collapse_1", 0),  # 중복 id
+        _zone("zone_unknown_1", 0),  # 알 수 없는 유형
+        {"id": "zone_landslide_1", "lat": None, "lon": None},  # 좌표 없음
+    ], radius_m=RADIUS_M)
+
+
+def test_zone_type_of():
+    assert zone_type_of("zone_landslide_3") == "landslide"
+    assert zone_type_of("Z-1", "collapse") == "collapse"
+    assert zone_type_of("Z-1", "unknown") is None
+    assert zone_type_of("zone_old_facility_9") == "old_facility"
+
+
+def test_index_skips_duplicates_and_unknown_zones(index):
+    assert len(index) == 4
+    assert index.counts() == {
+        "casualty": 2, "landslide": 0, "collapse": 1, "old_facility": 1, "disaster_district": 0
+    }
+
+
+def test_report_nearest_zones_and_inside_count(index):
+    report = index.report(*ORIGIN, report_m=500)
+    assert report["count"] == 3
+    assert report["inside"] == 1
+    assert report["by_type"] == {"collapse": 1, "old_facility": 1, "casualty": 1}
+    assert [zone["id"] for zone in report["zones"]] == ["zone_collapse_1", "zone_old_facility_1", "zone_casualty_1"]
+    nearest = report["zones"][0]
+    assert nearest["inside"] and nearest["type_name"] == "붕괴위험지역"
+    assert nearest["distance_m"] == pytest.approx(110, abs=2)
+
+    assert index.report(*ORIGIN, report_m=50)["count"] == 0
+    assert RiskZoneIndex([]).report(*ORIGIN)["zones"] == []
+
+
+def test_report_lists_at_most_five_zones():
+    index = RiskZoneIndex([_zone(f"zone_casualty_{i}", 10 * i) for i in range(8)], radius_m=RADIUS_M)
+    report = index.report(*ORIGIN, report_m=500)
+    assert report["count"] == 8 and report["inside"] == 8
+    assert len(report["zones"]) == 5
+
+
+def test_annotate_marks_only_hazard_relevant_zones(index):
+    shelters = [
+        {"id": "near-collapse", "lat": ORIGIN[0], "lon": ORIGIN[1]},
+        {"id": "near-casualty", "lat": ORIGIN[0] + DEG_100M * 4.5, "lon": ORIGIN[1]},
+    ]
+    quake = index.annotate(shelters, "지진")
+    assert quake[0]["exposed_zones"] == ["붕괴위험지역"]
+    assert "exposed_zones" not in quake[1]  # 인명피해우려지역은 지진과 무관
+
+    flood = index.annotate(shelters, "홍수")
+    assert "exposed_zones" not in flood[0]
+    assert flood[1]["exposed_zones"] == ["인명피해우려지역"]
+
+    # 관련 구역 유형이 없는 재난은 그대로 반환
+    assert index.annotate(shelters, "공습") is shelters
+    assert index.annotate(shelters, None) is shelters
+
+
+def test_radius_override():
+    zones = [_zone("zone_old_facility_1", 150)]
+    shelter = [{"id": "s", "lat": ORIGIN[0], "lon": ORIGIN[1]}]
+    assert "exposed_zones" not in RiskZoneIndex(zones, radius_m=RADIUS_M).annotate(shelter, "붕괴")[0]
+    wider = RiskZoneIndex(zones, radius_m={**RADIUS_M, "old_facility": 200})
+    assert wider.annotate(shelter, "붕괴")[0]["exposed_zones"] == ["노후위험시설물"]
+
+
+def test_format_report(index):
+    text = format_report(index.report(*ORIGIN, report_m=500))
+    lines = text.strip().split("\n")
+    assert lines[0] == "주변 위험 구역: 반경 500m 내 3곳 (인명피해우려지역 1곳, 붕괴위험지역 1곳, 노후위험시설물 1곳)"
+    assert lines[1] == "- 현재 위치가 위험 구역 1곳의 영향 범위 안에 있습니다."
+    assert lines[2].startswith("- 붕괴위험지역 zone_collapse_1 (110m): 축대 균열")
+    assert len(lines[2].split(": ", 1)[1]) == 60  # 사유는 60자까지
+    assert format_report(RiskZoneIndex([]).report(*ORIGIN)) is None
+
+
+def test_read_zone_csvs_prefers_processed_files(tmp_path):
+    processed = tmp_path / "processed"
+    source = tmp_path / "source"
+    processed.mkdir()
+    source.mkdir()
+    (processed / "casualty_risk_clean.csv").write_text(
+        "risk_id,name,reason,lat,lon\nc1,저지대,침수,37.5,127.0\nc2,좌표 없음,,,\n", encoding="utf-8"
+    )
+    (processed / "collapse_risk_clean.csv").write_text("risk_id,name\nx1,좌표 열 없음\n", encoding="utf-8")
+    # 전처리 파일이 있는 유형의 원본은 읽지 않음
+    (source / "인명피해우려지역.csv").write_text(
+        "HULI_DAM_CNCR_RGN_MNG_NO,DSTRCT_NM,DSTRCT_DSGN_RSN_DTL_CN,LAT,LOT\nsrc,원본,,37.6,127.1\n", encoding="utf-8"
+    )
+    # 원본: 설명 행, 삭제/해제된 구역 제외
+    (source / "재난센싱정보_노후위험시설물.csv").write_text(
+        "DST_RSK_DSTRCT_FCLTY_CD,MEMENT_NM,WRN_APNT_CN,LAT,LOT,DEL_YN,RMV_YMD\n"
+        "코드,명칭,사유,위도,경도,삭제여부,해제일자\n"
+        "f1,노후 교량,균열,37.51,127.01,N,\n"
+        "f2,삭제됨,,37.52,127.02,Y,\n"
+        "f3,해제됨,,37.53,127.03,N,20240101\n",
+        encoding="utf-8"
+    )
+    zones = read_zone_csvs(str(processed), str(source))
+    assert [(zone["id"], zone["name"], zone["reason"]) for zone in zones] == [
+        ("zone_casualty_c1", "저지대", "침수"),
+        ("zone_old_facility_f1", "노후 교량", "균열"),
+    ]
+    assert zones[1]["lat"] == pytest.approx(37.51)
+
+
+def test_engine_falls_back_to_csv_zones(make_local_engine):
+    def failing_loader():
+        raise ConnectionError("neo4j down")
+
+    engine = make_local_engine(zone_loader=failing_loader)
+    engine.load()
+    # 전처리 CSV (원본 디렉터리의 다른 유형 구역도 함께 적재될 수 있음)
+    csv_ids = [zone["id"] for zone in engine.risk_zones.zones]
+    assert "zone_casualty_z1" in csv_ids
+
+    graph_zones = [_zone("zone_collapse_g1", 0, name="그래프 구역")]
+    engine = make_local_engine(zone_loader=lambda: graph_zones)
+    engine.load()
+    assert [zone["id"] for zone in engine.risk_zones.zones] == ["zone_collapse_g1"]
@@ -0,0 +1,154 @@
+"""도로망 도보 거리 테스트
+
+강을 사이에 둔 작은 도로망(직선 도로는 자동차 전용)에서 우회 거리, 탐색 한도(ROUTE_MAX_WALK_KM,
+ROUTE_MAX_DETOUR), 연결되지 않은 시설, 그래프 파일 재사용, 출발 노드 캐시를 확인합니다.
+"""
+import json
+
+import numpy as np
+import pytest
+
+import services.road_graph as road_graph_module
+from services.road_graph import RoadGraph, build_graph, is_walkable, read_lines
+from services.spatial_index import haversine_km
+
+USER = (37.500, 127.000)
+ACROSS = (37.510, 127.000)  # 직선 약 1.1km, 도로로는 ㄷ자 우회
+ISLAND = (37.520, 127.020)  # 다른 도로와 연결되지 않은 구간
+DETOUR = [(37.500, 127.000), (37.500, 127.010), (37.510, 127.010), (37.510, 127.000)]
+
+
+def _line(coords, **tags):
+    return {
+        "type": "Feature", "properties": tags,
+        "geometry": {"type": "LineString", "coordinates": [[lon, lat] for lat, lon in coords]}
+    }
+
+
+def _path_km(coords):
+    lats, lons = np.array(coords).T
+    return float(sum(haversine_km(lats[i], lons[i], lats[i + 1:i + 2], lons[i + 1:i + 2])[0] for i in range(len(coords) - 1)))
+
+
+@pytest.fixture
+def network(tmp_path):
+    features = [
+        _line(DETOUR, highway="footway"),
+        _line([USER, ACROSS], highway="motorway"),  # 도시고속도로: 보행 불가
+        _line([ISLAND, (37.5205, 127.020)], highway="residential"),
+    ]
+    path = tmp_path / "roads.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}), encoding="utf-8")
+    return path
+
+
+def _graph(network, tmp_path, **kwargs):
+    params = {"max_walk_km": 6.0, "max_detour": 3.0, "snap_max_m": 50.0, "cache_size": 16, **kwargs}
+    return RoadGraph(str(network), str(tmp_path / "graph"), **params)
+
+
+def test_is_walkable():
+    assert is_walkable({})
+    assert is_walkable({"highway": "residential"})
+    assert not is_walkable({"highway": "trunk"})
+    assert not is_walkable({"highway": "footway", "foot": "no"})
+    assert not is_walkable({"highway": "service", "access": "private"})
+    assert is_walkable({"highway": "service", "access": "no", "foot": "designated"})
+
+
+def test_build_graph_merges_nodes_and_skips_unwalkable(network):
+    arrays = build_graph(read_lines(str(network)))
+    assert len(arrays["lats"]) == 6  # 우회로 4개 + 섬 구간 2개 (고속도로 끝점은 우회로와 공유)
+    assert len(arrays["indices"]) == 2 * 4  # 양방향
+    assert np.all(np.diff(arrays["indptr"]) >= 1)
+    assert arrays["weights"].sum() / 2 == pytest.approx((_path_km(DETOUR) + 0.0556) * 1000, rel=1e-2)
+    with pytest.raises(ValueError):
+        build_graph(iter([([USER, ACROSS], {"highway": "motorway"})]))
+
+
+def test_detour_distance(network, tmp_path):
+    graph = _graph(network, tmp_path)
+    (walk_km, reached), = graph.walking_km(*USER, [ACROSS])
+    assert reached
+    assert walk_km == pytest.approx(_path_km(DETOUR), rel=1e-3)
+    assert walk_km > 2.5 * haversine_km(*USER, np.array([ACROSS[0]]), np.array([ACROSS[1]]))[0]
+
+
+def test_search_stops_at_detour_bound(network, tmp_path):
+    graph = _graph(network, tmp_path, max_detour=1.5)
+    (walk_km, reached), = graph.walking_km(*USER, [ACROSS])
+    straight_m = haversine_km(*USER, np.array([ACROSS[0]]), np.array([ACROSS[1]]))[0] * 1000
+    assert not reached
+    # 도달하지 못한 시설은 탐색 한도(실제 도로 거리의 하한)로 표시
+    assert walk_km == pytest.approx((straight_m * 1.5 + 2 * 50.0) / 1000)
+    assert walk_km < _path_km(DETOUR)
+
+
+def test_search_stops_at_max_walk(network, tmp_path):
+    graph = _graph(network, tmp_path, max_walk_km=1.0)
+    (walk_km, reached), = graph.walking_km(*USER, [ACROSS])
+    assert not reached
+    assert walk_km == pytest.approx(1.0)
+
+
+def test_disconnected_and_unsnapped(network, tmp_path):
+    graph = _graph(network, tmp_path)
+    far_away = (37.6, 127.1)
+    across, island, unsnapped = graph.walking_km(*USER, [ACROSS, ISLAND, far_away])
+    assert across[1]
+    # 연결되지 않은 구간은 그래프를 다 돌아도 못 찾으므로 한도 값으로 표시
+    assert island[1] is False and np.isfinite(island[0])
+    assert unsnapped is None
+    assert graph.walking_km(*far_away, [ACROSS]) == [None]
+
+
+def test_origin_cache_reuses_and_extends_search(network, tmp_path, monkeypatch):
+    graph = _graph(network, tmp_path, max_detour=1.5)
+    calls = []
+    search = graph._search
+    monkeypatch.setattr(graph, "_search", lambda *args: calls.append(args) or search(*args))
+
+    assert graph.walking_km(*USER, [ACROSS])[0][1] is False
+    assert graph.walking_km(*USER, [ACROSS])[0][1] is False
+    assert len(calls) == 1  # 같은 출발 노드, 같은 한도: 캐시 사용
+
+    graph.max_detour = 3.0
+    (walk_km, reached), = graph.walking_km(*USER, [ACROSS])
+    assert reached and len(calls) == 2  # 이전 탐색이 이번 한도보다 일찍 멈췄으므로 다시 탐색
+    assert calls[1][2] > calls[0][2]
+    graph.walking_km(*USER, [ACROSS])
+    assert len(calls) == 2
+
+
+def test_graph_files_are_reused_until_source_changes(network, tmp_path, monkeypatch):
+    assert _graph(network, tmp_path).load()
+    meta = json.loads((tmp_path / "graph" / "meta.json").read_text(encoding="utf-8"))
+    assert meta["nodes"] == 6 and meta["edges"] == 8
+
+    def fail(lines):
+        raise AssertionError("저장된 그래프 파일을 사용해야 함")
+
+    monkeypatch.setattr(road_graph_module, "build_graph", fail)
+    reloaded = _graph(network, tmp_path)
+    assert reloaded.load() and len(reloaded) == 6
+
+    network.write_text(network.read_text(encoding="utf-8").replace("footway", "path"), encoding="utf-8")
+    monkeypatch.undo()
+    rebuilt = _graph(network, tmp_path)
+    assert rebuilt.load()
+    assert rebuilt.meta["source_sha1"] != meta["source_sha1"]
+
+
+def test_annotate(network, tmp_path):
+    shelters = [
+        {"id": "across", "lat": ACROSS[0], "lon": ACROSS[1], "distance_km": 1.11},
+        {"id": "far", "lat": 37.6, "lon": 127.1, "distance_km": 12.0},
+    ]
+    across, far = _graph(network, tmp_path).annotate(*USER, shelters)
+    assert across["route"] == "road" and across["walk_km"] == round(_path_km(DETOUR), 2)
+    assert far == shelters[1]
+
+    assert RoadGraph("").annotate(*USER, shelters) is shelters
+    missing = RoadGraph(str(tmp_path / "missing.geojson"), str(tmp_path / "graph2"))
+    assert missing.annotate(*USER, shelters) == shelters
+    assert not missing.enabled
@@ -0,0 +1,116 @@
+"""최근접 대피소 격자 정확성 테스트
+
+임의 시설 배치에서 격자 조회 결과가 전체 시설을 직접 계산한 결과와 같은지 확인합니다
+(격자 안/밖 좌표, k > K, 유형 제한, 대량 조회).
+"""
+import json
+
+import numpy as np
+import pytest
+
+from services.shelter_grid import FACILITY_FILES, FACILITY_TYPES, ShelterGrid
+from services.spatial_index import haversine_km
+
+BBOX = (37.40, 126.80, 37.70, 127.20)
+CELL_DEG = 0.02
+K = 4
+
+
+def _write_facilities(data_dir, rng):
+    coords = {}
+    for facility_type, file_name in FACILITY_FILES.items():
+        count = {"outdoor": 60, "indoor": 40, "temporary": 12, "water": 30}[facility_type]
+        lats = rng.uniform(BBOX[0] - 0.05, BBOX[2] + 0.05, count)
+        lons = rng.uniform(BBOX[1] - 0.05, BBOX[3] + 0.05, count)
+        coords[facility_type] = (lats, lons)
+        rows = [
+            {"shelter_id": f"{facility_type}-{i}", "shelter_name": f"{facility_type} {i}", "lat": lat, "lon": lon}
+            for i, (lat, lon) in enumerate(zip(lats.tolist(), lons.tolist()))
+        ]
+        path = data_dir / file_name
+        if file_name.endswith(".csv"):
+            lines = ["facility_id,facility_name,lat,lon"]
+            lines += [f"{r['shelter_id']},{r['shelter_name']},{r['lat']!r},{r['lon']!r}" for r in rows]
+            path.write_text("\n".join(lines), encoding="utf-8")
+        else:
+            features = [{"type": "Feature", "properties": r, "geometry": None} for r in rows]
+            path.write_text(json.dumps({"type": "FeatureCollection", "features": features}), encoding="utf-8")
+    return coords
+
+
+@pytest.fixture(scope="module")
+def grid_and_coords(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp("processed")
+    coords = _write_facilities(data_dir, np.random.default_rng(7))
+    grid = ShelterGrid(str(data_dir), str(data_dir / "grid"), BBOX, CELL_DEG, K)
+    return grid, coords
+
+
+def _brute_force(coords, lat, lon, k, types):
+    ranked = []
+    for facility_type in types:
+        lats, lons = coords[facility_type]
+        distances = haversine_km(lat, lon, lats, lons)
+        ranked.extend((facility_type, f"{facility_type}-{i}", d) for i, d in enumerate(distances.tolist()))
+    ranked.sort(key=lambda item: item[2])
+    return ranked[:k]
+
+
+def _query_points(count, margin=0.0):
+    rng = np.random.default_rng(11)
+    lats = rng.uniform(BBOX[0] - margin, BBOX[2] + margin, count)
+    lons = rng.uniform(BBOX[1] - margin, BBOX[3] + margin, count)
+    return lats, lons
+
+
+@pytest.mark.parametrize("k, types, margin", [
+    (1, None, 0.0),
+    (3, None, 0.0),
+    (K, ["temporary"], 0.0),
+    (K + 3, None, 0.0),
+    (3, ["outdoor", "indoor"], 0.1),
+])
+def test_nearest_matches_brute_force(grid_and_coords, k, types, margin):
+    grid, coords = grid_and_coords
+    lats, lons = _query_points(200, margin)
+    for lat, lon in zip(lats.tolist(), lons.tolist()):
+        expected = _brute_force(coords, lat, lon, k, types or FACILITY_TYPES)
+        result = grid.nearest(lat, lon, k, types)
+        assert [(r["category"], r["id"]) for r in result] == [(t, i) for t, i, _ in expected]
+        assert [r["distance_km"] for r in result] == [round(d, 2) for _, _, d in expected]
+
+
+def test_nearest_respects_radius(grid_and_coords):
+    grid, coords = grid_and_coords
+    lat, lon = 37.55, 127.00
+    result = grid.nearest(lat, lon, K, radius_km=3.0)
+    expected = [item for item in _brute_force(coords, lat, lon, K, FACILITY_TYPES) if item[2] <= 3.0]
+    assert [r["id"] for r in result] == [i for _, i, _ in expected]
+
+
+def test_nearest_bulk_matches_nearest(grid_and_coords):
+    grid, coords = grid_and_coords
+    lats, lons = _query_points(500, margin=0.05)
+    type_codes, indices, distances = grid.nearest_bulk(lats, lons, ["outdoor", "indoor", "temporary"])
+    for point, (lat, lon) in enumerate(zip(lats.tolist(), lons.tolist())):
+        facility_type, facility_id, distance = _brute_force(coords, lat, lon, 1, ["outdoor", "indoor", "temporary"])[0]
+        assert FACILITY_TYPES[type_codes[point]] == facility_type
+        assert f"{facility_type}-{indices[point]}" == facility_id
+        assert distances[point] == pytest.approx(distance, abs=1e-6)
+
+
+def test_saved_grid_is_reused(grid_and_coords):
+    grid, _ = grid_and_coords
+    reloaded = ShelterGrid(grid.data_dir, grid.grid_dir, BBOX, CELL_DEG, K)
+    assert reloaded.version == grid.version
+    assert reloaded.nearest(37.5, 127.0, 3) == grid.nearest(37.5, 127.0, 3)
+
+
+def test_touch_bumps_only_overlapping_cells(grid_and_coords):
+    grid, _ = grid_and_coords
+    inside = grid.cell_revision(37.55, 127.00)
+    far = grid.cell_revision(37.45, 126.85)
+    touched = grid.touch((37.54, 126.99, 37.56, 127.01))
+    assert touched > 0
+    assert grid.cell_revision(37.55, 127.00) == inside + 1
+    assert grid.cell_revision(37.45, 126.85) == far
@@ -0,0 +1,100 @@
+"""층수/이동 능력/재난 유형 반영 대피소 순위 테스트"""
+import numpy as np
+import pytest
+
+from services.shelter_ranking import (
+    MOBILITY_PROFILES, ShelterRanker, distance_label, egress_minutes, places_reference, type_preferences
+)
+
+
+def _shelter(shelter_id, distance_km, category, area=None, **extra):
+    return {"id": shelter_id, "name": shelter_id, "distance_km": distance_km, "category": category, "area": area, **extra}
+
+
+def _order(shelters, **kwargs):
+    return [s["id"] for s in ShelterRanker(**kwargs.pop("ranker", {})).rank(shelters, **kwargs)]
+
+
+def test_egress_minutes():
+    assert egress_minutes(None) == 0.0
+    assert egress_minutes(1) == 0.0
+    assert egress_minutes(11) == pytest.approx(10 * MOBILITY_PROFILES["normal"][1])
+    assert egress_minutes(-2) == egress_minutes(3)
+    assert egress_minutes(0) == egress_minutes(2)  # 지하 1층
+    assert egress_minutes(5, "wheelchair") > egress_minutes(5, "limited") > egress_minutes(5)
+
+
+def test_type_preferences_follow_hazard():
+    air_raid = type_preferences("공습")
+    assert air_raid[1] > air_raid[0]  # 실내 > 옥외
+    assert type_preferences("지진")[0] == 1.0
+    assert np.all(type_preferences(None) == 0.5)
+
+
+def test_hazard_changes_preferred_type():
+    shelters = [_shelter("outdoor", 0.3, "outdoor"), _shelter("indoor", 0.3, "indoor")]
+    assert _order(shelters, hazard="지진") == ["outdoor", "indoor"]
+    assert _order(shelters, hazard="공습") == ["indoor", "outdoor"]
+
+
+def test_high_floor_penalizes_distant_shelters():
+    # 1층에서는 더 적합한 유형이 조금 멀어도 앞서지만, 고층에서는 남은 시간이 줄어 가까운 시설이 앞섬
+    shelters = [_shelter("near-indoor", 0.2, "indoor"), _shelter("far-outdoor", 0.3, "outdoor")]
+    assert _order(shelters, hazard="지진", floor=1) == ["far-outdoor", "near-indoor"]
+    assert _order(shelters, hazard="지진", floor=30) == ["near-indoor", "far-outdoor"]
+    assert _order(shelters, hazard="지진", floor=5, mobility="wheelchair") == ["near-indoor", "far-outdoor"]
+
+
+def test_road_distance_and_mobility_are_used():
+    ranked = ShelterRanker().rank([_shelter("a", 0.5, "outdoor", walk_km=1.5)], mobility="wheelchair")
+    speed = MOBILITY_PROFILES["wheelchair"][0]
+    assert ranked[0]["walk_min"] == pytest.approx(round(1.5 / speed * 60, 1))
+    assert ranked[0]["evacuation_min"] == ranked[0]["walk_min"]
+
+
+def test_capacity_breaks_ties_and_unknown_area():
+    shelters = [_shelter("small", 0.3, "outdoor", area=100), _shelter("big", 0.3, "outdoor", area=10000),
+                _shelter("unknown", 0.3, "outdoor")]
+    assert _order(shelters) == ["big", "small", "unknown"]
+
+
+def test_exposed_shelters_are_penalized():
+    shelters = [_shelter("exposed", 0.2, "outdoor", exposed_zones=["붕괴위험지역"]), _shelter("safe", 0.4, "outdoor")]
+    assert _order(shelters, hazard="지진") == ["safe", "exposed"]
+    assert _order(shelters, hazard="지진", ranker={"exposure_penalty": 0.0}) == ["exposed", "safe"]
+
+
+def test_category_inferred_from_shelter_type_and_ties_by_distance():
+    # Neo4j 위치 쿼리 결과는 category 대신 시설 구분 이름만 있음
+    shelters = [
+        {"id": "graph-indoor", "name": "B", "distance_km": 0.3, "shelter_type": "실내대피소"},
+        {"id": "graph-outdoor", "name": "A", "distance_km": 0.3, "shelter_type": "옥외대피소"},
+    ]
+    assert _order(shelters, hazard="공습") == ["graph-indoor", "graph-outdoor"]
+    # 보행 시간이 예산을 넘으면 점수가 같아지므로 가까운 순
+    same = [_shelter("far", 9.0, "outdoor"), _shelter("near", 8.0, "outdoor")]
+    assert _order(same) == ["near", "far"]
+    assert _order(same, limit=1) == ["near"]
+    assert ShelterRanker().rank([]) == []
+
+
+def test_weights_are_normalized():
+    ranker = ShelterRanker({"reach": 2.0, "type": 2.0, "capacity": -1.0})
+    assert ranker.weights == {"reach": 0.5, "type": 0.5, "capacity": 0.0}
+
+
+def test_places_reference_and_distance_label():
+    ranked = ShelterRanker().rank([
+        _shelter("a", 0.3, "outdoor", address="서울 강남구 테헤란로 1", shelter_type="옥외대피소",
+                 walk_km=0.5, route="road", exposed_zones=["인명피해우려지역"]),
+        _shelter("a", 0.4, "outdoor", address="서울 강남구 테헤란로 1", shelter_type="옥외대피소"),
+    ])
+    places = places_reference(ranked, "Local")
+    assert list(places) == ["a_서울 강남구 테헤란로 1"]  # 같은 이름/주소는 한 번만
+    assert places["a_서울 강남구 테헤란로 1"]["source"] == "Local"
+    exposed = next(s for s in ranked if s.get("exposed_zones"))
+    label = distance_label(exposed)
+    assert label.startswith("거리: 0.3km, 도로 0.5km 도보")
+    assert label.endswith("주의: 인명피해우려지역 영향권")
+    assert places_reference([], "Local") is None
+    assert "이상" in distance_label({"distance_km": 1.0, "walk_km": 3.0, "walk_min": 40, "route": "beyond", "evacuation_min": 40})
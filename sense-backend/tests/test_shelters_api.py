@@ -0,0 +1,81 @@
+"""/shelters/nearest, /shelters/within 테스트
+
+API의 격자를 임시 데이터 격자로 바꿔 결과, 파라미터 검사, ETag/304 동작을 확인합니다.
+"""
+import pytest
+
+from services.data_version import bump_data_version
+
+USER = {"lat": 37.5, "lon": 127.0}
+
+
+@pytest.fixture
+def grid(api_module, monkeypatch, make_shelter_grid):
+    grid = make_shelter_grid()
+    monkeypatch.setattr(api_module.orchestrator.local_answer, "shelter_grid", grid)
+    return grid
+
+
+def test_nearest_returns_sorted_shelters(client, grid):
+    response = client.get("/shelters/nearest", params={**USER, "k": 3})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 3
+    assert [s["id"] for s in body["shelters"]] == ["water-1", "out-1", "in-1"]
+    distances = [s["distance_km"] for s in body["shelters"]]
+    assert distances == sorted(distances)
+    assert body["data_version"]
+    assert response.headers["cache-control"].startswith("public, max-age=")
+
+
+def test_type_filter_accepts_repeated_and_comma_values(client, grid):
+    repeated = client.get("/shelters/nearest", params=[("lat", 37.5), ("lon", 127.0), ("type", "indoor"), ("type", "temporary")])
+    comma = client.get("/shelters/nearest", params={**USER, "type": "indoor,temporary"})
+    assert repeated.json()["types"] == comma.json()["types"] == ["indoor", "temporary"]
+    assert [s["id"] for s in comma.json()["shelters"]] == ["in-1", "tmp-1"]
+    assert repeated.headers["etag"] == comma.headers["etag"]
+
+
+@pytest.mark.parametrize("params", [
+    {"lat": 95, "lon": 127.0},
+    {**USER, "type": "bunker"},
+    {**USER, "radius_km": 0},
+    {**USER, "radius_km": 1000},
+])
+def test_invalid_parameters_are_rejected(client, grid, params):
+    assert client.get("/shelters/nearest", params=params).status_code == 400
+
+
+def test_within_limits_radius_and_count(client, grid):
+    body = client.get("/shelters/within", params={**USER, "radius_km": 0.5}).json()
+    assert [s["id"] for s in body["shelters"]] == ["water-1", "out-1", "in-1"]
+    assert all(s["distance_km"] <= 0.5 for s in body["shelters"])
+    assert client.get("/shelters/within", params={**USER, "radius_km": 0.5, "limit": 1}).json()["count"] == 1
+    assert client.get("/shelters/within", params={**USER, "radius_km": 50}).status_code == 400
+
+
+def test_etag_revalidation(client, grid):
+    first = client.get("/shelters/nearest", params=USER)
+    etag = first.headers["etag"]
+    assert client.get("/shelters/nearest", params=USER, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/shelters/nearest", params=USER, headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert client.get("/shelters/nearest", params=USER, headers={"If-None-Match": "*"}).status_code == 304
+
+    # 파라미터나 엔드포인트가 다르면 다른 ETag
+    assert client.get("/shelters/nearest", params={**USER, "k": 2}).headers["etag"] != etag
+    assert client.get("/shelters/within", params=USER).headers["etag"] != etag
+
+
+def test_etag_changes_only_for_touched_cells(client, grid):
+    near = client.get("/shelters/nearest", params=USER).headers["etag"]
+    far_params = {"lat": 37.46, "lon": 126.96}
+    far = client.get("/shelters/nearest", params=far_params).headers["etag"]
+
+    # 이벤트 영향 지역(사용자 주변 셀)만 갱신
+    grid.touch((37.495, 126.995, 37.505, 127.005))
+    assert client.get("/shelters/nearest", params=USER).headers["etag"] != near
+    assert client.get("/shelters/nearest", params=far_params).headers["etag"] == far
+
+    # 전체 데이터 버전이 바뀌면 모두 갱신
+    bump_data_version("test")
+    assert client.get("/shelters/nearest", params=far_params).headers["etag"] != far
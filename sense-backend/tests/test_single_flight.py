@@ -0,0 +1,147 @@
+"""AsyncSingleFlight / SingleFlight 단위 테스트"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    async def scenario():
+        flights = AsyncSingleFlight("test")
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        results = await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+        assert calls == 1
+        assert [r for r, _ in results] == ["answer"] * 5
+        assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+        assert flights.in_flight() == 0
+
+    asyncio.run(scenario())
+
+
+def test_different_keys_run_separately_and_finished_key_reruns():
+    async def scenario():
+        flights = AsyncSingleFlight("test")
+        calls = []
+
+        async def work(tag):
+            calls.append(tag)
+            await asyncio.sleep(0)
+            return tag
+
+        await asyncio.gather(flights.do("a", lambda: work("a")), flights.do("b", lambda: work("b")))
+        result, shared = await flights.do("a", lambda: work("a"))
+        assert sorted(calls) == ["a", "a", "b"]
+        assert (result, shared) == ("a", False)
+
+    asyncio.run(scenario())
+
+
+def test_exception_is_shared_by_all_callers():
+    async def scenario():
+        flights = AsyncSingleFlight("test")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(*(flights.do("key", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flights.in_flight() == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_caller_does_not_cancel_shared_run():
+    """한 호출자가 취소되어도 나머지 호출자는 결과를 받음"""
+    async def scenario():
+        flights = AsyncSingleFlight("test")
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        leader = asyncio.create_task(flights.do("key", work))
+        follower = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        release.set()
+        assert await follower == ("done", True)
+
+    asyncio.run(scenario())
+
+
+def test_thread_single_flight_shares_result():
+    flights = SingleFlight("test")
+    calls = 0
+    entered = threading.Event()
+
+    def work():
+        nonlocal calls
+        calls += 1
+        entered.set()
+        time.sleep(0.05)
+        return 42
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        first = pool.submit(flights.do, "key", work)
+        entered.wait(1)
+        others = [pool.submit(flights.do, "key", work) for _ in range(3)]
+        results = [first.result()] + [f.result() for f in others]
+
+    assert results == [42] * 4
+    assert calls == 1
+
+
+def test_thread_single_flight_shares_exception():
+    flights = SingleFlight("test")
+    entered = threading.Event()
+
+    def fail():
+        entered.set()
+        time.sleep(0.05)
+        raise ValueError("bad")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(flights.do, "key", fail)
+        entered.wait(1)
+        second = pool.submit(flights.do, "key", fail)
+        for future in (first, second):
+            with pytest.raises(ValueError):
+                future.result()
+
+
+def test_rag_service_coalesces_identical_embedding_calls(api_module, monkeypatch):
+    """동시에 들어온 같은 질문의 임베딩은 Gemini 호출 1번으로 처리"""
+    rag_service = api_module.orchestrator.analyst_agent.rag_service
+    models = rag_service.gemini_client.models
+    embed = models.embed_content
+    calls = []
+
+    def slow_embed(**kwargs):
+        calls.append(kwargs["contents"])
+        time.sleep(0.05)
+        return embed(**kwargs)
+
+    monkeypatch.setattr(models, "embed_content", slow_embed)
+    text = f"single-flight 테스트 질문 {time.time()}"
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        embeddings = list(pool.map(lambda _: rag_service.embed_query(text), range(8)))
+
+    assert calls == [[text]]
+    assert all(embedding == embeddings[0] for embedding in embeddings)
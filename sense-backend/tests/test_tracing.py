@@ -0,0 +1,95 @@
+"""OpenTelemetry 트레이싱 테스트
+
+TracerProvider는 프로세스당 한 번만 설정되므로 별도 프로세스에서 실행합니다.
+"""
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PIPELINE = """
+import asyncio, json
+from opentelemetry import trace
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from benchmarks import fakes
+fakes.install(fakes.LatencyProfile(llm_ms=0, embed_ms=0, neo4j_ms=0, chroma_ms=0))
+from services.tracing import setup_tracing
+exporter = InMemorySpanExporter()
+setup_tracing(exporter)
+from graph import Orchestrator
+orchestrator = Orchestrator()
+orchestrator.answer_cache = None
+asyncio.run(orchestrator.process("강남구 지진 대피소 알려줘", user_info={"lat": 37.4979, "lon": 127.0276}))
+trace.get_tracer_provider().force_flush()
+spans = exporter.get_finished_spans()
+print(json.dumps([
+    {"name": s.name, "id": s.context.span_id, "parent": s.parent.span_id if s.parent else None,
+     "trace": s.context.trace_id, "attributes": dict(s.attributes)}
+    for s in spans
+]))
+"""
+
+_FILE_EXPORT = """
+from opentelemetry import trace
+from services.tracing import setup_tracing, start_span, query_hash
+setup_tracing()
+with start_span("test.root", cypher__hash=query_hash("MATCH (n) RETURN n"), skipped=None):
+    with start_span("test.child"):
+        pass
+provider = trace.get_tracer_provider()
+if hasattr(provider, "shutdown"):
+    provider.shutdown()
+"""
+
+
+def _run(code, **env):
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "PYTHONPATH": BACKEND_DIR, **env}, cwd=BACKEND_DIR,
+        capture_output=True, text=True, check=True
+    )
+    return result.stdout
+
+
+def test_chat_pipeline_spans_form_one_trace():
+    spans = json.loads(_run(_PIPELINE, EVENT_POLL_SECONDS="0").strip().splitlines()[-1])
+    by_id = {span["id"]: span for span in spans}
+
+    def ancestors(span):
+        names = []
+        while span["parent"] in by_id:
+            span = by_id[span["parent"]]
+            names.append(span["name"])
+        return names
+
+    roots = [span for span in spans if span["parent"] not in by_id]
+    assert [span["name"] for span in roots] == ["orchestrator.process"]
+    assert len({span["trace"] for span in spans}) == 1
+    assert roots[0]["attributes"]["has_location"] is True
+
+    names = {span["name"] for span in spans}
+    assert {"graph.planning", "graph.analysis", "graph.advisor", "gemini.generate", "rag.graph_search"} <= names
+    stages = {span["attributes"].get("stage"): ancestors(span) for span in spans if span["name"] == "gemini.generate"}
+    assert "graph.planning" in stages["llm_planning"]
+    assert "graph.advisor" in stages["llm_advisor"]
+    # to_thread로 실행되는 동기 호출도 호출한 코루틴의 span 아래에 연결됨
+    assert all("orchestrator.process" in ancestors(span) for span in spans if span["name"].startswith(("neo4j.", "chroma.")))
+
+
+def test_file_exporter_writes_json_lines_per_worker(tmp_path):
+    _run(_FILE_EXPORT, TRACING_ENABLED="true", TRACE_FILE_PATH=str(tmp_path / "traces-{pid}.jsonl"))
+    files = list(tmp_path.glob("traces-*.jsonl"))
+    assert len(files) == 1
+    spans = [json.loads(line) for line in files[0].read_text(encoding="utf-8").splitlines()]
+    assert [span["name"] for span in spans] == ["test.child", "test.root"]
+    root = spans[1]["attributes"]
+    assert len(root["cypher.hash"]) == 12
+    assert "skipped" not in root
+    assert spans[0]["parent_id"] == spans[1]["context"]["span_id"]
+
+
+def test_tracing_disabled_by_default(tmp_path):
+    _run(_FILE_EXPORT, TRACING_ENABLED="false", TRACE_FILE_PATH=str(tmp_path / "traces-{pid}.jsonl"))
+    assert list(tmp_path.iterdir()) == []